@@ -10,10 +10,10 @@ import tkinter as tk
 # mensagem, como alertas e confirmações.
 from tkinter import ttk, messagebox
 
-# Importa a classe MongoClient do módulo pymongo.
-# MongoClient é usado para estabelecer uma conexão com o banco de
-# dados MongoDB, permitindo operações como ler e escrever dados.
-from pymongo import MongoClient
+# Importa as exceções do pymongo:
+# - ConnectionFailure é lançada quando o servidor MongoDB está inacessível.
+# - DuplicateKeyError é lançada quando um índice único é violado.
+from pymongo.errors import ConnectionFailure, DuplicateKeyError
 
 # Importa a classe ObjectId do módulo bson.
 # ObjectId é um identificador único utilizado pelo MongoDB para documentos.
@@ -21,7 +21,7 @@ from pymongo import MongoClient
 from bson.objectid import ObjectId
 
 # Importa o módulo datetime para trabalhar com datas.
-from datetime import datetime, time
+from datetime import datetime, time, timezone
 
 # Importa o DateEntry do tkcalendar para seleção de datas.
 # Se o tkcalendar não estiver instalado, será necessário instalá-lo com: pip install tkcalendar
@@ -31,29 +31,111 @@ except ImportError:
     # Se tkcalendar não estiver disponível, usaremos Entry com validação
     DateEntry = None
 
-# Importa módulos para geração de PDF.
-# Se o reportlab não estiver instalado, será necessário instalá-lo com: pip install reportlab
-try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.units import inch
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
+# Importa os relatórios: o relatório PDF, desenhado conforme as tarefas são
+# lidas, o pacote com todos os relatórios e a função que distribui as
+# tarefas entre eles. Se o reportlab não estiver instalado, será necessário
+# instalá-lo com: pip install reportlab
+from relatorios import REPORTLAB_AVAILABLE, RelatorioPDF, PacoteRelatorios, distribuir
 
 # Importa filedialog para selecionar onde salvar o PDF
 from tkinter import filedialog
 
+# Importa o módulo queue.
+# As operações de rede são executadas em threads de segundo plano, e os
+# resultados voltam para a interface por meio de uma fila, já que o
+# tkinter só pode ser manipulado a partir da thread principal.
+import queue
+
+# Importa o asyncio, usado para reunir consultas independentes ao banco de dados.
+import asyncio
+
+# Importa o módulo os, usado nos nomes e tamanhos dos arquivos anexados.
+import os
+
+# Importa as funções de configuração da aplicação (arquivo INI e ambiente).
+from configuracao import carregar_configuracao, caminho_local
+
+# Importa as funções que criam e conectam o armazenamento (MongoDB ou SQLite).
+# Os dois armazenamentos oferecem coleções com a mesma API do pymongo.
+from armazenamento import criar_armazenamento, conectar, listar_pagina_tecnico
+
+# Importa o argparse, usado para ler as opções de linha de comando.
+import argparse
+
+# Importa o diário offline, que guarda as operações feitas sem conexão.
+from diario_offline import DiarioOffline, OPERACAO_INSERIR, OPERACAO_ATUALIZAR, OPERACAO_EXCLUIR
+
+# Importa a função que fornece o instante atual usado como versão das tarefas.
+from utilitarios import agora_utc
+
+# Importa o diretório de técnicos, um cache em memória compartilhado pelos
+# ComboBox de técnicos, com busca por prefixo.
+from diretorio_tecnicos import DiretorioTecnicos
+
+# Importa o arquivamento, que move as tarefas concluídas antigas para a
+# coleção de arquivo, e a função que mescla tarefas ativas e arquivadas.
+from arquivamento import COLECAO_ARQUIVO, arquivar_concluidas, mesclar_ordenado
+
+# Importa o instantâneo local, que guarda a última lista exibida para que a
+# próxima abertura a mostre imediatamente, e a função que busca as
+# alterações feitas desde então.
+from instantaneo import InstantaneoTarefas, origem_configurada, buscar_alteracoes
+
+# Importa a conclusão da exclusão de tarefas (registros de exclusão,
+# subtarefas e anexos), comum à interface, ao diário offline e ao serviço HTTP.
+from exclusao import concluir_exclusao
+
+# Importa a camada de dados assíncrona, que executa as consultas como
+# corrotinas em um laço asyncio ao lado do laço do tkinter.
+from camada_assincrona import CamadaAssincrona
+
+# Importa o modelo de tarefas, que guarda em registros compactos as tarefas
+# exibidas no Treeview, e as chaves de ordenação das colunas.
+from modelo_tarefas import ModeloTarefas, CHAVES_ORDENACAO, chave_data
+
+# Importa o resumo mensal, que mantém as quantidades de tarefas por mês,
+# técnico e status, lidas pelo resumo por período.
+from resumo_mensal import atualizar_resumo_mensal, ler_resumo
+
+# Importa o cache de relatórios, que entrega sem regenerar os relatórios PDF
+# cujas tarefas não mudaram, e a função que calcula a impressão digital das tarefas.
+from cache_relatorios import CacheRelatorios, impressao_tarefas
+
+# Importa a fila da entrada rápida, cujas tarefas são gravadas em lotes.
+from entrada_rapida import FilaInclusoes, inserir_lote
+
+# Importa o acúmulo e a gravação das edições feitas nas células do Treeview.
+from edicao_celulas import AlteracoesCelulas, gravar_alteracoes
+
+# Importa os anexos das tarefas (GridFS ou tabelas equivalentes no SQLite) e
+# o cache local das miniaturas.
+from anexos import (CAMPO_ANEXOS, CacheMiniaturas, anexar, listar_anexos, obter_miniatura, remover_anexo,
+                    salvar_anexo, tipo_arquivo)
+
+# Importa os prazos das tarefas: a conversão entre o texto do formulário e o
+# instante em UTC, e a consulta das tarefas vencidas.
+from lembretes import ESPERA_MAXIMA, filtro_vencidas, formatar_prazo, ler_prazo, vencida
+
+# Importa os modelos de tarefas recorrentes e o gerador das suas ocorrências.
+from recorrencia import (COLECAO_MODELOS, DIAS_SEMANA, FORMATO_PERIODO, NOMES_REGRAS, REGRA_DIARIA, REGRA_MENSAL,
+                         REGRA_SEMANAL, materializar_recorrentes, novo_modelo)
+
+# Importa as tags das tarefas: a leitura do texto do formulário, a exibição
+# na lista e o resumo das contagens do painel de filtros.
+from etiquetas import formatar_tags, ler_tags, resumir_contagens
+
+# Importa as subtarefas e dependências: a consulta das subtarefas, o texto do
+# progresso e a gravação validada dos vínculos.
+from hierarquia import CAMPO_DEPENDENCIAS, CAMPO_PAI, FILTRO_RAIZES, filtro_subtarefas, formatar_progresso, vincular
+
 
 # Define a classe GerenciadorTarefasApp que será responsável pela
 # lógica e interface gráfica do aplicativo.
 class GerenciadorTarefasApp:
 
     # Método construtor com o parâmetro 'janela', que é a janela
-    # principal do aplicativo.
-    def __init__(self, janela):
+    # principal do aplicativo, e o parâmetro opcional 'configuracao'.
+    def __init__(self, janela, configuracao=None):
 
         # Atribui a janela passada como argumento à variável de instância 'self.janela',
         # armazenando uma referência à janela principal.
@@ -70,23 +152,96 @@ class GerenciadorTarefasApp:
         # hexadecimal #f0f0f0, que é um tom claro de cinza.
         self.janela.configure(bg="#f0f0f0")  # Cor de fundo
 
-        # Conexão com o MongoDB
-        # Cria uma instância do MongoClient para conectar ao
-        # servidor MongoDB local na porta padrão 27017.
-        self.cliente = MongoClient("mongodb://localhost:27017/")
-
-        # Acessa o banco de dados chamado 'gerenciador_tarefas_db'. Se o banco de
-        # dados não existir, ele será criado automaticamente ao
-        # inserir os primeiros dados.
-        self.bd = self.cliente["gerenciador_tarefas_db"]
-
-        # Acessa a coleção 'tarefas' dentro do banco de dados. Coleções no
+        # Carrega as configurações da aplicação a partir do arquivo
+        # 'gerenciador.ini' e das variáveis de ambiente GERENCIADOR_*,
+        # caso não tenham sido fornecidas.
+        self.configuracao = configuracao or carregar_configuracao()
+
+        # Fila usada pelas threads de segundo plano para devolver
+        # resultados à interface gráfica.
+        self.fila_interface = queue.Queue()
+
+        # Cria a camada de dados assíncrona. As consultas independentes rodam
+        # ao mesmo tempo, até o tamanho do pool de conexões do MongoDB.
+        self.dados = CamadaAssincrona(self.fila_interface,
+                                      int(self.configuracao["mongodb"]["max_pool_size"]) or None)
+
+        # Conexão com o armazenamento
+        # Cria o armazenamento configurado: o MongoDB (com URI, pool de conexões,
+        # timeouts, compressão e preferência de leitura configuráveis) ou um
+        # arquivo SQLite local, para estações que não executam o 'mongod'.
+        # A conexão é aquecida em segundo plano para que a janela seja
+        # exibida imediatamente.
+        self.armazenamento = criar_armazenamento(self.configuracao)
+
+        # Indica se o armazenamento respondeu à última verificação de conexão.
+        self.conectado = False
+
+        # Indicadores usados para não disparar verificações de conexão e
+        # sincronizações do diário offline em paralelo.
+        self.verificando_conexao = False
+        self.reconexao_agendada = False
+        self.sincronizando = False
+        self.arquivando = False
+        self.resumindo = False
+        self.gerando_recorrentes = False
+
+        # Indicadores das verificações periódicas já agendadas.
+        self.sincronizacao_agendada = False
+        self.arquivamento_agendado = False
+        self.resumo_agendado = False
+        self.recorrentes_agendados = False
+
+        # Abre o diário offline, onde as operações feitas sem conexão com o
+        # servidor ficam guardadas até poderem ser enviadas.
+        self.diario = DiarioOffline(caminho_local(self.configuracao,
+                                                  self.configuracao["offline"]["arquivo_diario"]))
+
+        # Acessa a coleção 'tarefas' dentro do armazenamento. Coleções no
         # MongoDB são equivalentes a tabelas em bancos de dados relacionais.
-        self.colecao = self.bd["tarefas"]
+        # Se a coleção não existir, ela será criada automaticamente ao
+        # inserir os primeiros dados.
+        self.colecao = self.armazenamento.colecao("tarefas")
 
-        # Acessa a coleção 'tecnicos' dentro do banco de dados.
+        # Acessa a coleção 'tecnicos' dentro do armazenamento.
         # Esta coleção armazena os técnicos disponíveis para atribuição às tarefas.
-        self.colecao_tecnicos = self.bd["tecnicos"]
+        self.colecao_tecnicos = self.armazenamento.colecao("tecnicos")
+
+        # Acessa a coleção 'tarefas_arquivo', que guarda as tarefas concluídas
+        # há mais tempo. A lista principal não a consulta, a menos que o
+        # usuário peça para incluir as tarefas arquivadas.
+        self.colecao_arquivo = self.armazenamento.colecao(COLECAO_ARQUIVO)
+
+        # Cria o armazenamento dos anexos das tarefas, transferidos em blocos
+        # de [anexos] tamanho_bloco_kb, e o cache local das miniaturas das
+        # imagens anexadas. Com a opção [anexos] diretorio_miniaturas vazia,
+        # as miniaturas são desativadas.
+        configuracao_anexos = self.configuracao["anexos"]
+        self.anexos = self.armazenamento.anexos(int(configuracao_anexos["tamanho_bloco_kb"]) * 1024)
+        self.cache_miniaturas = CacheMiniaturas(
+            caminho_local(self.configuracao, configuracao_anexos["diretorio_miniaturas"]),
+            int(configuracao_anexos["tamanho_miniatura"])) if configuracao_anexos["diretorio_miniaturas"] else None
+
+        # Cria o diretório de técnicos. Ele é carregado uma única vez e
+        # atualizado ao cadastrar um técnico ou quando outra estação altera a
+        # coleção, evitando uma consulta a cada abertura de diálogo.
+        self.diretorio_tecnicos = DiretorioTecnicos(self.colecao_tecnicos)
+        self.verificacao_tecnicos_agendada = False
+
+        # Cria o instantâneo local da lista de tarefas, gravado ao fechar a
+        # janela. Com a opção [instantaneo] arquivo vazia, ele é desativado.
+        arquivo_instantaneo = self.configuracao["instantaneo"]["arquivo"]
+        self.instantaneo = InstantaneoTarefas(caminho_local(self.configuracao, arquivo_instantaneo),
+                                              origem_configurada(self.configuracao)) if arquivo_instantaneo else None
+
+        # Cria o cache de relatórios PDF. Com a opção [relatorios]
+        # diretorio_cache vazia, ele é desativado.
+        configuracao_relatorios = self.configuracao["relatorios"]
+        self.cache_relatorios = CacheRelatorios(
+            caminho_local(self.configuracao, configuracao_relatorios["diretorio_cache"]),
+            origem_configurada(self.configuracao),
+            int(configuracao_relatorios["tamanho_maximo_mb"]) * 1024 * 1024,
+            int(configuracao_relatorios["idade_maxima_dias"])) if configuracao_relatorios["diretorio_cache"] else None
 
         # Criação de estilo para o Treeview
         # Cria uma instância de Style do módulo ttk para customizar a
@@ -371,14 +526,13 @@ class GerenciadorTarefasApp:
 
         # Criação de um ComboBox para permitir ao usuário selecionar um
         # técnico responsável pela tarefa.
+        # O ComboBox aceita digitação: a lista é filtrada pelo prefixo
+        # digitado, usando o diretório de técnicos em memória.
         self.combo_tecnico = ttk.Combobox(quadro_entrada,
                                           textvariable=self.var_tecnico,
-                                          state='readonly',
                                           font=("Arial", 11),
                                           width=52)
-
-        # Carrega a lista de técnicos do banco de dados.
-        self.carregar_tecnicos()
+        self.configurar_busca_tecnicos(self.combo_tecnico, incluir_vazio=True)
 
         # Posiciona o ComboBox no quadro de entrada usando o grid.
         # - row=4 indica que está na mesma linha do rótulo correspondente.
@@ -407,11 +561,138 @@ class GerenciadorTarefasApp:
                                     pady=5,
                                     padx=5)
 
+        # Cria um botão para renomear um técnico já cadastrado.
+        # As tarefas guardam o '_id' do técnico, então a renomeação altera
+        # um único documento, não importa quantas tarefas ele tenha.
+        botao_renomear_tecnico = tk.Button(quadro_entrada,
+                                           text="✎",
+                                           command=self.renomear_tecnico,
+                                           bg="#fff59d",
+                                           font=("Arial", 10, "bold"),
+                                           width=3)
+
+        # Posiciona o botão ao lado do botão de cadastro de técnico.
+        botao_renomear_tecnico.grid(row=4,
+                                    column=3,
+                                    sticky='w',
+                                    pady=5,
+                                    padx=5)
+
+        # Criação do campo do prazo da tarefa, opcional, em horário local
+        # (DD/MM/AAAA HH:MM, ou DD/MM/AAAA para o fim do dia).
+        rotulo_prazo = tk.Label(quadro_entrada,
+                                text="Prazo:",
+                                font=("Arial", 12),
+                                bg="#f0f0f0")
+        rotulo_prazo.grid(row=5, column=0, sticky='e', padx=5, pady=5)
+
+        self.entrada_prazo = tk.Entry(quadro_entrada,
+                                      width=17,
+                                      font=("Arial", 11))
+        self.entrada_prazo.grid(row=5, column=1, sticky='w', pady=5, padx=5)
+
+        # Criação do campo das tags da tarefa, separadas por vírgulas.
+        rotulo_tags = tk.Label(quadro_entrada,
+                               text="Tags:",
+                               font=("Arial", 12),
+                               bg="#f0f0f0")
+        rotulo_tags.grid(row=6, column=0, sticky='e', padx=5, pady=5)
+
+        self.entrada_tags = tk.Entry(quadro_entrada,
+                                     width=40,
+                                     font=("Arial", 11))
+        self.entrada_tags.grid(row=6, column=1, sticky='w', pady=5, padx=5)
+
         # Inicializa a variável que armazenará o ID da tarefa selecionada.
         # Esta variável será usada para identificar qual tarefa deve ser
         # atualizada ou excluída quando o usuário selecionar uma tarefa no Treeview.
         self.id_tarefa_selecionada = None
 
+        # Armazena a versão ('atualizado_em') da tarefa selecionada, usada para
+        # detectar conflitos ao sincronizar edições feitas sem conexão.
+        self.versao_tarefa_selecionada = None
+
+        # Número da última seleção de tarefa. A leitura de uma tarefa que já
+        # deixou de estar selecionada não preenche o formulário.
+        self.geracao_selecao = 0
+
+        # Escritas de tarefas enviadas ao servidor e ainda não concluídas,
+        # com as escritas seguintes de cada tarefa, que aguardam a anterior.
+        self.escritas_em_andamento = {}
+
+        # Modelo das tarefas exibidas no Treeview, indexado pelo identificador.
+        # Guarda a versão de cada tarefa, a referência ao técnico (usada para
+        # atualizar a coluna "Técnico" quando os nomes mudam) e se a tarefa
+        # está arquivada. Tarefas arquivadas podem ser consultadas, mas não alteradas.
+        self.modelo = ModeloTarefas()
+
+        # Coluna pela qual a lista foi ordenada pelo usuário, e o sentido.
+        self.coluna_ordenacao = None
+        self.ordem_decrescente = False
+
+        # Filtros da visão exibida. Eles são aplicados localmente sobre o
+        # modelo, que pode conter mais tarefas do que as exibidas.
+        self.visao_status = None
+        self.visao_tecnico = ""
+        self.visao_arquivo = False
+        self.visao_vencidas = False
+        self.visao_tag = None
+        self.visao_agendada = False
+
+        # Filtro de status, texto de busca e inclusão do arquivo atualmente
+        # aplicados ao Treeview.
+        self.filtro_status_atual = None
+        self.texto_busca_atual = None
+        self.incluir_arquivo_atual = False
+        self.vencidas_atual = False
+        self.tag_atual = None
+
+        # Número da última consulta das contagens do painel de filtros. O
+        # resultado de uma consulta superada por outra é descartado.
+        self.geracao_contagens = 0
+
+        # Resumo das subtarefas e dependências de cada tarefa exibida
+        # ('resumir_hierarquia'), e tarefas cujas subtarefas já foram carregadas.
+        self.hierarquia = {}
+        self.subtarefas_carregadas = set()
+
+        # Instante do início do último carregamento completo da lista (a marca
+        # d'água do instantâneo) e indicador de que a lista exibida veio do
+        # instantâneo e ainda não foi reconciliada com o banco de dados.
+        self.marca_carregamento = None
+        self.reconciliacao_pendente = False
+
+        # Número do último carregamento de tarefas iniciado. O resultado de
+        # um carregamento superado por outro mais recente é descartado.
+        self.geracao_tarefas = 0
+
+        # Estado do agendador de atualizações da lista: se há uma atualização
+        # agendada, se há uma consulta em andamento, se outra atualização foi
+        # pedida durante ela, e quantas atualizações redundantes foram evitadas.
+        self.atualizacao_agendada = False
+        self.carregando_tarefas = False
+        self.atualizacao_pendente = False
+        self.atualizacoes_evitadas = 0
+
+        # Fila da entrada rápida, com as tarefas exibidas que ainda não foram
+        # gravadas, e indicador de envio agendado.
+        self.fila_inclusoes = FilaInclusoes(int(self.configuracao["entrada_rapida"]["tamanho_lote"]))
+        self.envio_agendado = False
+
+        # Edições de células ainda não gravadas, gravação agendada (o
+        # identificador do 'after', adiado a cada nova edição) e editor aberto
+        # sobre uma célula, como a tupla (widget, tarefa, coluna).
+        self.alteracoes_celulas = AlteracoesCelulas()
+        self.gravacao_celulas_agendada = None
+        self.editor_celula = None
+
+        # Temporizador dos lembretes, agendado para o prazo mais próximo da
+        # fila do modelo, como a tupla (identificador do 'after', prazo), e o
+        # instante até o qual os prazos já foram tratados: prazos anteriores
+        # a ele (já vencidos ao carregar a lista) são destacados sem aviso.
+        self.lembrete_agendado = None
+        self.prazos_tratados_ate = agora_utc()
+
         # Criação de um quadro (Frame) que irá conter os botões de ações principais
         # do aplicativo: Adicionar, Atualizar e Excluir.
         # Este quadro atua como um container para manter os botões agrupados e
@@ -539,6 +820,89 @@ class GerenciadorTarefasApp:
         # igual aos outros botões.
         botao_gerar_pdf.grid(row=0, column=3, padx=10, pady=5)
 
+        # Cria o botão "Conflitos", que abre as operações feitas sem conexão
+        # que não foram aplicadas por conflito, para reaplicá-las ou descartá-las.
+        botao_conflitos = tk.Button(quadro_botoes,
+                                    text="Conflitos",
+                                    command=self.abrir_conflitos,
+                                    bg="#ffab91",
+                                    font=("Arial", 11, "bold"),
+                                    width=18)
+
+        # Posiciona o botão 'Conflitos' ao lado do botão 'Gerar Relatório PDF'.
+        botao_conflitos.grid(row=0, column=4, padx=10, pady=5)
+
+        # Cria o botão "Filas por Técnico", que abre a visão das tarefas
+        # agrupadas por técnico, com as quantidades de cada status.
+        botao_filas = tk.Button(quadro_botoes,
+                                text="Filas por Técnico",
+                                command=self.abrir_filas_tecnicos,
+                                bg="#ce93d8",
+                                font=("Arial", 11, "bold"),
+                                width=18)
+
+        # Posiciona o botão 'Filas por Técnico' em uma segunda linha.
+        botao_filas.grid(row=1, column=1, padx=10, pady=5)
+
+        # Cria o botão "Resumo por Período", que mostra as quantidades de
+        # tarefas por mês e técnico, lidas do resumo mensal.
+        botao_resumo = tk.Button(quadro_botoes,
+                                 text="Resumo por Período",
+                                 command=self.abrir_resumo_periodo,
+                                 bg="#80cbc4",
+                                 font=("Arial", 11, "bold"),
+                                 width=18)
+
+        # Posiciona o botão 'Resumo por Período' ao lado do botão 'Filas por Técnico'.
+        botao_resumo.grid(row=1, column=2, padx=10, pady=5)
+
+        # Cria o botão "Anexos", que abre os anexos (fotos e PDFs) da tarefa selecionada.
+        botao_anexos = tk.Button(quadro_botoes,
+                                 text="Anexos",
+                                 command=self.abrir_anexos,
+                                 bg="#ffcc80",
+                                 font=("Arial", 11, "bold"),
+                                 width=18)
+
+        # Posiciona o botão 'Anexos' ao lado do botão 'Resumo por Período'.
+        botao_anexos.grid(row=1, column=3, padx=10, pady=5)
+
+        # Cria o botão "Recorrentes", que abre os modelos de tarefas recorrentes.
+        botao_recorrentes = tk.Button(quadro_botoes,
+                                      text="Recorrentes",
+                                      command=self.abrir_recorrentes,
+                                      bg="#b39ddb",
+                                      font=("Arial", 11, "bold"),
+                                      width=18)
+
+        # Posiciona o botão 'Recorrentes' ao lado do botão 'Anexos'.
+        botao_recorrentes.grid(row=1, column=4, padx=10, pady=5)
+
+        # Cria o botão "Vínculos", que abre a tarefa pai, as dependências e a
+        # cadeia de bloqueio da tarefa selecionada.
+        botao_vinculos = tk.Button(quadro_botoes,
+                                   text="Vínculos",
+                                   command=self.abrir_vinculos,
+                                   bg="#ffcc80",
+                                   font=("Arial", 11, "bold"),
+                                   width=18)
+
+        # Posiciona o botão 'Vínculos' ao lado do botão 'Recorrentes'.
+        botao_vinculos.grid(row=1, column=5, padx=10, pady=5)
+
+        # Caixa de seleção do modo de entrada rápida: Enter no campo do título
+        # inclui a tarefa, que aparece na lista imediatamente e é gravada
+        # depois, em lote, sem recarregar a lista nem exibir mensagem.
+        self.var_entrada_rapida = tk.BooleanVar(value=False)
+        caixa_entrada_rapida = tk.Checkbutton(quadro_botoes,
+                                              text="Entrada rápida",
+                                              variable=self.var_entrada_rapida,
+                                              font=("Arial", 11),
+                                              bg="#f0f0f0")
+        caixa_entrada_rapida.grid(row=1, column=0, padx=10, pady=5)
+        self.entrada_titulo.bind("<Return>",
+                                 lambda e: self.adicionar_tarefa() if self.var_entrada_rapida.get() else None)
+
         # Criação de um quadro para agrupar os elementos de filtro de
         # status na janela principal.
         # Este quadro serve para organizar visualmente os controles
@@ -657,6 +1021,114 @@ class GerenciadorTarefasApp:
                           # garantindo espaço adequado ao redor do botão.
                           padx=5)
 
+        # Criação do campo de busca textual, que procura o texto digitado no
+        # título e na descrição das tarefas usando o índice de texto do banco.
+        rotulo_busca = tk.Label(quadro_filtro,
+                                text="Buscar:",
+                                font=("Arial", 12),
+                                bg="#f0f0f0")
+        rotulo_busca.grid(row=0, column=3, padx=5)
+
+        self.entrada_busca = tk.Entry(quadro_filtro,
+                                      width=20,
+                                      font=("Arial", 11))
+        self.entrada_busca.grid(row=0, column=4, padx=5)
+
+        # Pressionar Enter no campo de busca aplica o filtro.
+        self.entrada_busca.bind('<Return>', lambda e: self.aplicar_filtro())
+
+        # Caixa de seleção que inclui na lista as tarefas arquivadas.
+        self.var_incluir_arquivo = tk.BooleanVar(value=False)
+        caixa_arquivo = tk.Checkbutton(quadro_filtro,
+                                       text="Incluir arquivadas",
+                                       variable=self.var_incluir_arquivo,
+                                       font=("Arial", 11),
+                                       bg="#f0f0f0")
+        caixa_arquivo.grid(row=0, column=5, padx=5)
+
+        # Escolher um status no ComboBox aplica o filtro imediatamente.
+        self.combo_filtro.bind("<<ComboboxSelected>>", lambda e: self.aplicar_filtro())
+
+        # Filtro por técnico, com busca incremental pelo diretório de técnicos.
+        # Ele é sempre aplicado sobre as tarefas já carregadas.
+        rotulo_filtro_tecnico = tk.Label(quadro_filtro,
+                                         text="Técnico:",
+                                         font=("Arial", 12),
+                                         bg="#f0f0f0")
+        rotulo_filtro_tecnico.grid(row=1, column=0, padx=5, pady=(5, 0), sticky='e')
+
+        self.var_filtro_tecnico = tk.StringVar()
+        self.combo_filtro_tecnico = ttk.Combobox(quadro_filtro,
+                                                 textvariable=self.var_filtro_tecnico,
+                                                 font=("Arial", 11))
+        self.combo_filtro_tecnico.grid(row=1, column=1, padx=5, pady=(5, 0))
+        self.configurar_busca_tecnicos(self.combo_filtro_tecnico, incluir_vazio=True)
+        self.combo_filtro_tecnico.bind("<<ComboboxSelected>>", lambda e: self.aplicar_filtro())
+        self.combo_filtro_tecnico.bind("<Return>", lambda e: self.aplicar_filtro())
+
+        # Campo de busca rápida: filtra as tarefas carregadas pelo título e pela
+        # descrição enquanto o usuário digita, sem consultar o banco de dados.
+        rotulo_localizar = tk.Label(quadro_filtro,
+                                    text="Localizar:",
+                                    font=("Arial", 12),
+                                    bg="#f0f0f0")
+        rotulo_localizar.grid(row=1, column=3, padx=5, pady=(5, 0))
+
+        self.entrada_localizar = tk.Entry(quadro_filtro,
+                                          width=20,
+                                          font=("Arial", 11))
+        self.entrada_localizar.grid(row=1, column=4, padx=5, pady=(5, 0))
+        self.entrada_localizar.bind("<KeyRelease>", lambda e: self.agendar_visao())
+
+        # Caixa de seleção que exibe apenas as tarefas pendentes com o prazo vencido.
+        self.var_somente_vencidas = tk.BooleanVar(value=False)
+        caixa_vencidas = tk.Checkbutton(quadro_filtro,
+                                        text="Somente vencidas",
+                                        variable=self.var_somente_vencidas,
+                                        command=self.aplicar_filtro,
+                                        font=("Arial", 11),
+                                        bg="#f0f0f0")
+        caixa_vencidas.grid(row=1, column=5, padx=5, pady=(5, 0))
+
+        # Filtro por tag. As tags oferecidas são as das tarefas que atendem
+        # aos demais filtros, das mais frequentes para as menos frequentes.
+        rotulo_filtro_tag = tk.Label(quadro_filtro,
+                                     text="Tag:",
+                                     font=("Arial", 12),
+                                     bg="#f0f0f0")
+        rotulo_filtro_tag.grid(row=2, column=0, padx=5, pady=(5, 0), sticky='e')
+
+        self.var_filtro_tag = tk.StringVar()
+        self.combo_filtro_tag = ttk.Combobox(quadro_filtro,
+                                             textvariable=self.var_filtro_tag,
+                                             font=("Arial", 11))
+        self.combo_filtro_tag.grid(row=2, column=1, padx=5, pady=(5, 0))
+        self.combo_filtro_tag.bind("<<ComboboxSelected>>", lambda e: self.aplicar_filtro())
+        self.combo_filtro_tag.bind("<Return>", lambda e: self.aplicar_filtro())
+
+        # Contagens por status, técnico e tag das tarefas que atendem aos
+        # filtros, atualizadas a cada filtragem ('atualizar_contagens').
+        self.rotulo_contagens = tk.Label(quadro_filtro,
+                                         text="",
+                                         font=("Arial", 10),
+                                         bg="#f0f0f0",
+                                         fg="#555555",
+                                         anchor='w',
+                                         justify='left',
+                                         wraplength=700)
+        self.rotulo_contagens.grid(row=2, column=2, columnspan=4, padx=5, pady=(5, 0), sticky='w')
+
+        # Criação de uma barra de status na parte inferior da janela.
+        # Ela informa ao usuário o estado da conexão com o banco de dados.
+        # É empacotada antes do quadro do Treeview para nunca ser encoberta por ele.
+        self.rotulo_conexao = tk.Label(self.janela,
+                                       text="Conectando ao banco de dados...",
+                                       font=("Arial", 10),
+                                       bg="#e0e0e0",
+                                       fg="#555555",
+                                       anchor='w')
+        self.rotulo_conexao.pack(side=tk.BOTTOM, fill='x')
+
         # Criação de um quadro para conter o Treeview, que é usado para listar as tarefas.
         # Este quadro serve como um container para organizar visualmente a lista de
         # tarefas dentro da interface gráfica.
@@ -702,30 +1174,47 @@ class GerenciadorTarefasApp:
 
         # Localiza o Treeview dentro do quadro designado para a árvore de tarefas.
         # Define as colunas que o Treeview deve ter.
-        # Garante que apenas os cabeçalhos das colunas sejam mostrados,
-        # omitindo a coluna de ícones à esquerda.
+        # Exibe os cabeçalhos das colunas e, à esquerda, a coluna da árvore,
+        # usada apenas para expandir as subtarefas.
         # Define a altura do Treeview, permitindo mostrar 15 linhas
         # antes de necessitar rolagem.
         self.arvore_tarefas = ttk.Treeview(quadro_arvore,
-                                           columns=("Título", "Descrição", "Status", "Data da Criação", "Técnico"),
-                                           show="headings",
+                                           columns=("Título", "Descrição", "Status", "Data da Criação", "Técnico",
+                                                    "Prazo", "Tags", "Progresso"),
+                                           show="tree headings",
                                            height=15,
                                            yscrollcommand=barra_rolagem.set)
 
         # Configura o cabeçalho da coluna "Título" no Treeview para exibir "Título".
-        self.arvore_tarefas.heading("Título", text="Título")
+        self.arvore_tarefas.heading("Título", text="Título",
+                                    command=lambda: self.ordenar_coluna("Título"))
 
         # Configura o cabeçalho da coluna "Descrição" no Treeview para exibir "Descrição".
-        self.arvore_tarefas.heading("Descrição", text="Descrição")
+        self.arvore_tarefas.heading("Descrição", text="Descrição",
+                                    command=lambda: self.ordenar_coluna("Descrição"))
 
         # Configura o cabeçalho da coluna "Status" no Treeview para exibir "Status".
-        self.arvore_tarefas.heading("Status", text="Status")
+        self.arvore_tarefas.heading("Status", text="Status",
+                                    command=lambda: self.ordenar_coluna("Status"))
 
         # Configura o cabeçalho da coluna "Data da Criação" no Treeview para exibir "Data da Criação".
-        self.arvore_tarefas.heading("Data da Criação", text="Data da Criação")
+        self.arvore_tarefas.heading("Data da Criação", text="Data da Criação",
+                                    command=lambda: self.ordenar_coluna("Data da Criação"))
 
         # Configura o cabeçalho da coluna "Técnico" no Treeview para exibir "Técnico".
-        self.arvore_tarefas.heading("Técnico", text="Técnico")
+        self.arvore_tarefas.heading("Técnico", text="Técnico",
+                                    command=lambda: self.ordenar_coluna("Técnico"))
+
+        # Configura o cabeçalho da coluna "Prazo" no Treeview para exibir "Prazo".
+        self.arvore_tarefas.heading("Prazo", text="Prazo",
+                                    command=lambda: self.ordenar_coluna("Prazo"))
+
+        # Configura o cabeçalho da coluna "Tags" no Treeview para exibir "Tags".
+        self.arvore_tarefas.heading("Tags", text="Tags",
+                                    command=lambda: self.ordenar_coluna("Tags"))
+
+        # Configura o cabeçalho da coluna "Progresso", o progresso das subtarefas.
+        self.arvore_tarefas.heading("Progresso", text="Progresso")
 
         # Configura a largura da coluna "Título" no Treeview.
         # A largura é definida como 180 pixels para garantir que o
@@ -757,6 +1246,40 @@ class GerenciadorTarefasApp:
         # Isso garante que o nome do técnico seja exibido completamente.
         self.arvore_tarefas.column("Técnico", width=150)
 
+        # Configura a largura da coluna "Prazo", no formato DD/MM/AAAA HH:MM.
+        self.arvore_tarefas.column("Prazo", width=130)
+
+        # Configura a largura da coluna "Tags", com as tags separadas por vírgulas.
+        self.arvore_tarefas.column("Tags", width=150)
+
+        # Configura a largura da coluna "Progresso" (percentual e quantidades)
+        # e a da coluna da árvore, que só exibe o indicador de expansão.
+        self.arvore_tarefas.column("Progresso", width=100)
+        self.arvore_tarefas.column("#0", width=40, stretch=False)
+
+        # Configura a aparência das tarefas que aguardam sincronização com o servidor.
+        # - 'pendente': criada ou alterada sem conexão (fundo amarelo claro).
+        # - 'pendente_exclusao': excluída sem conexão (texto cinza).
+        self.arvore_tarefas.tag_configure("pendente", background="#fff8e1", foreground="#6d4c41")
+        self.arvore_tarefas.tag_configure("pendente_exclusao", background="#eeeeee", foreground="#9e9e9e")
+
+        # Configura a aparência das tarefas arquivadas (texto azul acinzentado).
+        self.arvore_tarefas.tag_configure("arquivada", foreground="#607d8b")
+
+        # Configura a aparência das tarefas da entrada rápida.
+        # - 'enviando': exibida, mas ainda não gravada (texto cinza).
+        # - 'falha_envio': rejeitada pelo banco de dados (fundo vermelho claro).
+        self.arvore_tarefas.tag_configure("enviando", foreground="#757575")
+        self.arvore_tarefas.tag_configure("falha_envio", background="#ffcdd2", foreground="#b71c1c")
+
+        # Configura a aparência das tarefas pendentes com o prazo vencido (texto vermelho).
+        self.arvore_tarefas.tag_configure("vencida", foreground="#c62828")
+
+        # Configura a aparência das tarefas bloqueadas por dependências
+        # pendentes (texto laranja) e da linha provisória das subtarefas.
+        self.arvore_tarefas.tag_configure("bloqueada", foreground="#e65100")
+        self.arvore_tarefas.tag_configure("provisoria", foreground="#9e9e9e")
+
         # Vincula o evento "TreeviewSelect" ao método 'ao_selecionar_tarefa'.
         # O evento "TreeviewSelect" é disparado quando o usuário
         # seleciona uma linha no Treeview.
@@ -765,6 +1288,13 @@ class GerenciadorTarefasApp:
         # selecionada nos campos de entrada.
         self.arvore_tarefas.bind("<<TreeviewSelect>>", self.ao_selecionar_tarefa)
 
+        # Vincula o clique duplo à edição da célula clicada (título, status
+        # ou técnico) diretamente no Treeview.
+        self.arvore_tarefas.bind("<Double-1>", self.editar_celula)
+
+        # Vincula a expansão de uma tarefa à consulta das suas subtarefas.
+        self.arvore_tarefas.bind("<<TreeviewOpen>>", self.expandir_tarefa)
+
         # Posiciona o Treeview na interface gráfica usando o método 'pack'.
         # - pady=10 adiciona um espaçamento vertical de 10 pixels acima e abaixo do Treeview.
         # - padx=10 adiciona um espaçamento horizontal de 10 pixels em ambos os lados.
@@ -784,275 +1314,2063 @@ class GerenciadorTarefasApp:
         # linhas do Treeview quando o conteúdo excede a altura disponível.
         barra_rolagem.config(command=self.arvore_tarefas.yview)
 
-        # Chama o método 'carregar_tarefas' para carregar as tarefas do banco
-        # de dados ou outra fonte de dados ao iniciar a aplicação.
-        # Este método é responsável por preencher o Treeview com as tarefas
-        # disponíveis, garantindo que a interface comece funcional e populada.
-        self.carregar_tarefas()
+        # Exibe imediatamente a lista salva ao fechar a sessão anterior. Ela é
+        # reconciliada com o banco de dados assim que a conexão for estabelecida.
+        self.exibir_instantaneo()
 
-    # Define o método 'carregar_tecnicos', que carrega a lista de técnicos
-    # do banco de dados e atualiza o ComboBox de técnicos.
-    def carregar_tecnicos(self):
+        # Grava o instantâneo da lista ao fechar a janela.
+        self.janela.protocol("WM_DELETE_WINDOW", self.ao_fechar)
+
+        # Inicia o processamento da fila de resultados das threads de segundo plano.
+        self.processar_fila_interface()
+
+        # Inicia a conexão com o banco de dados em segundo plano.
+        # Quando o servidor responder, os técnicos e as tarefas são carregados,
+        # garantindo que a interface comece funcional e populada sem travar a janela.
+        self.iniciar_conexao()
+
+    # Define o método 'executar_em_segundo_plano', que executa uma função
+    # bloqueante na camada de dados e entrega o resultado à interface.
+    def executar_em_segundo_plano(self, funcao, ao_concluir=None, ao_falhar=None):
+
+        """
+        Este método executa 'funcao' no executor da camada de dados
+        assíncrona, o mesmo das consultas, e é um atalho para
+        'self.dados.executar(self.dados.chamar(funcao), ...)' quando não há
+        consultas a reunir. Ao terminar, 'ao_concluir' recebe o valor
+        retornado; em caso de exceção, 'ao_falhar' recebe o erro. Os dois
+        callbacks rodam na thread da interface.
+        """
+
+        self.dados.executar(self.dados.chamar(funcao), ao_concluir=ao_concluir, ao_falhar=ao_falhar)
+
+    # Define o método 'processar_fila_interface', que entrega à interface os
+    # resultados produzidos pelas threads de segundo plano.
+    def processar_fila_interface(self):
 
         """
-        Este método carrega os técnicos cadastrados no MongoDB e
-        atualiza o ComboBox de técnicos com a lista disponível.
+        Este método consome a fila de resultados e executa os callbacks na
+        thread principal do tkinter. Ele se reagenda a cada 50 milissegundos.
         """
 
         try:
-            # Busca todos os técnicos do banco de dados MongoDB.
-            tecnicos = self.colecao_tecnicos.find().sort("nome", 1)
+            while True:
+                callback, valor = self.fila_interface.get_nowait()
+                if callback:
+                    callback(valor)
+        except queue.Empty:
+            pass
 
-            # Cria uma lista com os nomes dos técnicos.
-            lista_tecnicos = [tecnico["nome"] for tecnico in tecnicos]
+        self.janela.after(50, self.processar_fila_interface)
 
-            # Adiciona uma opção vazia no início da lista.
-            lista_tecnicos.insert(0, "")
+    # Define o método 'iniciar_conexao', que verifica a conexão com o
+    # armazenamento em segundo plano.
+    def iniciar_conexao(self):
 
-            # Atualiza os valores do ComboBox com a lista de técnicos.
-            self.combo_tecnico['values'] = lista_tecnicos
+        """
+        Este método verifica o armazenamento em segundo plano (no MongoDB, com
+        um 'ping' ao servidor) e garante os índices das coleções.
+        Enquanto o cliente aquece, a barra de status mostra "Conectando...".
+        """
 
-        except Exception as e:
-            # Em caso de erro, define uma lista vazia.
-            self.combo_tecnico['values'] = [""]
+        self.reconexao_agendada = False
+        if self.verificando_conexao:
+            return
+        self.verificando_conexao = True
 
-    # Define o método 'cadastrar_tecnico', que abre uma janela para
-    # cadastrar um novo técnico no banco de dados.
-    def cadastrar_tecnico(self):
+        if not self.conectado:
+            self.definir_status_conexao("Conectando ao banco de dados...", "#555555")
+        self.executar_em_segundo_plano(lambda: conectar(self.armazenamento),
+                                       ao_concluir=self.ao_conectar,
+                                       ao_falhar=self.ao_falhar_verificacao)
+
+    # Define o método 'ao_conectar', chamado quando o servidor responde ao ping.
+    def ao_conectar(self, resposta):
 
         """
-        Este método abre uma janela de diálogo para cadastrar um novo técnico.
-        O técnico será salvo no banco de dados MongoDB e adicionado à lista
-        de técnicos disponíveis no ComboBox.
+        Este método marca a aplicação como conectada e carrega os técnicos e as
+        tarefas do banco de dados. Se houver operações feitas sem conexão,
+        elas são sincronizadas antes do recarregamento das tarefas. Se a lista
+        exibida veio do instantâneo local, apenas as alterações feitas desde
+        então são buscadas.
         """
 
-        # Cria uma janela top-level (popup) para cadastrar técnico.
-        janela_tecnico = tk.Toplevel(self.janela)
-        janela_tecnico.title("Cadastrar Técnico")
-        janela_tecnico.geometry("400x150")
-        janela_tecnico.configure(bg="#f0f0f0")
-        janela_tecnico.transient(self.janela)  # Mantém a janela acima da principal
-        janela_tecnico.grab_set()  # Torna a janela modal
+        self.verificando_conexao = False
+        self.conectado = True
+        self.definir_status_conexao("Conectado ao banco de dados.", "#2e7d32")
 
-        # Cria um rótulo para o campo de nome do técnico.
-        rotulo_nome = tk.Label(janela_tecnico,
-                              text="Nome do Técnico:",
-                              font=("Arial", 12),
-                              bg="#f0f0f0")
-        rotulo_nome.grid(row=0, column=0, padx=10, pady=20, sticky='e')
+        if self.diario.quantidade_pendente():
+            self.carregar_tecnicos()
+            self.sincronizar_diario()
+        else:
+            self.carregar_tecnicos_e_tarefas()
 
-        # Cria um campo de entrada para o nome do técnico.
-        entrada_nome = tk.Entry(janela_tecnico,
-                               width=30,
-                               font=("Arial", 11))
-        entrada_nome.grid(row=0, column=1, padx=10, pady=20)
-        entrada_nome.focus()  # Define o foco no campo de entrada
+        # Inicia a verificação periódica do diário offline, o arquivamento
+        # periódico das tarefas concluídas, a atualização do resumo mensal e
+        # a geração das tarefas recorrentes.
+        self.agendar_sincronizacao()
+        self.agendar_arquivamento()
+        self.agendar_resumo()
+        self.agendar_recorrentes()
 
-        # Função interna para salvar o técnico.
-        def salvar_tecnico():
-            nome_tecnico = entrada_nome.get().strip()
+    # Define o método 'ao_falhar_verificacao', chamado quando o ping não é respondido.
+    def ao_falhar_verificacao(self, erro):
 
-            # Valida se o nome foi preenchido.
-            if not nome_tecnico:
-                messagebox.showwarning("Aviso", "O nome do técnico não pode estar vazio.")
-                return
+        """
+        Este método encerra a verificação de conexão em andamento e trata a falha.
+        """
 
-            # Verifica se o técnico já existe.
-            tecnico_existente = self.colecao_tecnicos.find_one({"nome": nome_tecnico})
-            if tecnico_existente:
-                messagebox.showwarning("Aviso", "Este técnico já está cadastrado.")
-                return
+        self.verificando_conexao = False
+        self.ao_falhar_conexao(erro)
 
-            try:
-                # Insere o novo técnico no banco de dados.
-                self.colecao_tecnicos.insert_one({"nome": nome_tecnico})
+    # Define o método 'ao_falhar_conexao', chamado quando o servidor não responde.
+    def ao_falhar_conexao(self, erro):
 
-                # Recarrega a lista de técnicos no ComboBox.
-                self.carregar_tecnicos()
+        """
+        Este método informa a falha de conexão na barra de status e agenda uma
+        nova tentativa após o intervalo configurado. Enquanto a aplicação está
+        sem conexão, as alterações de tarefas são gravadas no diário offline.
+        """
 
-                # Exibe mensagem de sucesso.
-                messagebox.showinfo("Sucesso", f"Técnico '{nome_tecnico}' cadastrado com sucesso!")
+        self.conectado = False
+        pendentes = self.diario.quantidade_pendente()
+        texto = "Sem conexão com o banco de dados. Tentando novamente..."
+        if pendentes:
+            texto += f" {pendentes} operação(ões) aguardando sincronização."
+        self.definir_status_conexao(f"{texto} ({erro.__class__.__name__})", "#c62828")
 
-                # Fecha a janela de cadastro.
-                janela_tecnico.destroy()
+        if not self.reconexao_agendada:
+            self.reconexao_agendada = True
+            intervalo = int(self.configuracao["mongodb"]["intervalo_reconexao_ms"])
+            self.janela.after(intervalo, self.iniciar_conexao)
 
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao cadastrar técnico:\n\n{str(e)}")
+    # Define o método 'definir_status_conexao', que atualiza a barra de status.
+    def definir_status_conexao(self, texto, cor):
 
-        # Cria um botão para salvar o técnico.
-        botao_salvar = tk.Button(janela_tecnico,
-                                text="Salvar",
-                                command=salvar_tecnico,
-                                bg="#81c784",
-                                font=("Arial", 11, "bold"),
-                                width=12)
-        botao_salvar.grid(row=1, column=0, columnspan=2, pady=10)
+        """
+        Este método altera o texto e a cor da barra de status da conexão.
+        """
 
-        # Permite salvar pressionando Enter.
-        entrada_nome.bind('<Return>', lambda e: salvar_tecnico())
+        self.rotulo_conexao.config(text=texto, fg=cor)
 
-    # Define o método 'carregar_tarefas', que é responsável por carregar as
-    # tarefas do banco de dados e exibi-las no Treeview.
-    # O parâmetro 'filtro_status' permite que o método carregue apenas tarefas
-    # com um status específico (por exemplo, "Pendente" ou "Concluída").
-    def carregar_tarefas(self, filtro_status=None):
+    # Define o método 'agendar_sincronizacao', que verifica periodicamente se
+    # há operações offline a enviar.
+    def agendar_sincronizacao(self):
 
         """
-        Este método carrega as tarefas do MongoDB e as exibe no Treeview.
-        Se 'filtro_status' for igual a 'Pendente' ou 'Concluída', ele filtra as tarefas por esse status.
-        Caso contrário, ele carrega todas as tarefas disponíveis no banco de dados.
+        Este método agenda a próxima verificação do diário offline.
+        A sincronização só é disparada quando há conexão e operações pendentes.
         """
 
-        # Limpa todos os itens atualmente exibidos no Treeview para evitar duplicação de dados.
-        # 'get_children()' retorna todos os identificadores de itens no Treeview.
-        # Para cada item, 'delete(item)' remove-o do Treeview.
-        for item in self.arvore_tarefas.get_children():
-            self.arvore_tarefas.delete(item)
+        if self.sincronizacao_agendada:
+            return
+        self.sincronizacao_agendada = True
 
-        # Cria um dicionário vazio para a consulta ao banco de dados.
-        # Este dicionário será usado como filtro para buscar
-        # tarefas específicas no MongoDB.
-        consulta = {}
+        def verificar():
+            self.sincronizacao_agendada = False
+            if self.conectado and self.diario.quantidade_pendente():
+                self.sincronizar_diario()
+            self.agendar_sincronizacao()
 
-        # Verifica se o filtro 'filtro_status' é válido.
-        # Se 'filtro_status' não for None e estiver na lista ["Pendente", "Concluída"],
-        # atualiza o dicionário 'consulta'.
-        # O filtro "status" será usado para buscar tarefas no banco de
-        # dados com o status correspondente.
-        if filtro_status and filtro_status in ["Pendente", "Concluída"]:
-            consulta = {"status": filtro_status}
+        intervalo = int(self.configuracao["offline"]["intervalo_sincronizacao_ms"])
+        self.janela.after(intervalo, verificar)
 
-        # Realiza a consulta no banco de dados MongoDB usando o método 'find'.
-        # O método 'find(consulta)' retorna todos os documentos da coleção que
-        # correspondem aos critérios especificados em 'consulta'.
-        tarefas = self.colecao.find(consulta)
+    # Define o método 'sincronizar_diario', que envia as operações do diário
+    # offline ao servidor em segundo plano.
+    def sincronizar_diario(self):
 
-        # Itera sobre as tarefas retornadas pela consulta ao banco de dados.
-        for tarefa in tarefas:
+        """
+        Este método reproduz o diário offline na coleção 'tarefas' em lotes
+        ordenados de 'bulk_write', sem bloquear a interface.
+        """
 
-            # Formata a data da criação para exibição.
-            # Se a tarefa tiver uma data de criação, formata no formato DD/MM/YYYY.
-            # Caso contrário, usa a data atual como padrão.
-            if "data_criacao" in tarefa:
-                # Se a data estiver armazenada como string, usa diretamente.
-                # Se estiver como datetime, formata para string.
-                if isinstance(tarefa["data_criacao"], datetime):
-                    data_formatada = tarefa["data_criacao"].strftime("%d/%m/%Y")
-                else:
-                    data_formatada = tarefa["data_criacao"]
-            else:
-                # Se não houver data, usa a data atual.
-                data_formatada = datetime.now().strftime("%d/%m/%Y")
+        if self.sincronizando or not self.conectado:
+            return
+        self.sincronizando = True
+        self.definir_status_conexao("Sincronizando operações feitas sem conexão...", "#555555")
 
-            # Obtém o nome do técnico responsável pela tarefa.
-            # Se não houver técnico atribuído, exibe "N/A".
-            tecnico_tarefa = tarefa.get("tecnico", "N/A")
-            if not tecnico_tarefa:
-                tecnico_tarefa = "N/A"
+        tamanho_lote = int(self.configuracao["offline"]["tamanho_lote"])
+        # A exclusão das tarefas sincronizadas é concluída como a exclusão
+        # feita com conexão (registros de exclusão, subtarefas e anexos).
+        def ao_excluir(ids, datas_criacao):
+            concluir_exclusao(self.armazenamento, self.anexos, ids, self.cache_miniaturas, datas_criacao)
 
-            # Insere cada tarefa no Treeview.
-            # - "" especifica que o item será inserido na raiz do Treeview, ou seja, sem um pai.
-            # - tk.END insere o item no final da lista.
-            # - 'values' define os valores a serem exibidos nas colunas do Treeview.
-            # - 'iid' atribui um identificador exclusivo ao item no Treeview,
-            # aqui convertido do '_id' do MongoDB para string.
-            self.arvore_tarefas.insert("", tk.END,
-                                       values=(tarefa["titulo"], tarefa["descricao"], tarefa["status"], data_formatada, tecnico_tarefa),
-                                       iid=str(tarefa["_id"]))
+        self.executar_em_segundo_plano(lambda: self.diario.reproduzir(self.colecao, tamanho_lote,
+                                                                      ao_excluir=ao_excluir),
+                                       ao_concluir=self.ao_sincronizar_diario,
+                                       ao_falhar=self.ao_falhar_sincronizacao)
 
+    # Define o método 'ao_sincronizar_diario', chamado ao final da sincronização.
+    def ao_sincronizar_diario(self, resultado):
 
-    # Define o método 'adicionar_tarefa', responsável por adicionar uma
-    # nova tarefa ao banco de dados MongoDB.
-    def adicionar_tarefa(self):
+        """
+        Este método recarrega as tarefas após a sincronização e informa ao
+        usuário as operações que não puderam ser aplicadas por conflito.
+        """
+
+        self.sincronizando = False
+        aplicadas, conflitos = resultado
+        self.definir_status_conexao(f"Conectado ao banco de dados. {aplicadas} operação(ões) offline sincronizada(s).",
+                                    "#2e7d32")
+        self.carregar_tarefas(self.filtro_status_atual, self.texto_busca_atual, self.incluir_arquivo_atual,
+                              self.vencidas_atual, self.tag_atual)
+
+        if conflitos:
+            linhas = []
+            for operacao, motivo in conflitos:
+                titulo = (operacao.dados or {}).get("titulo", operacao.tarefa_id)
+                linhas.append(f"- {titulo}: {motivo}")
+            messagebox.showwarning("Conflitos de sincronização",
+                                   "As seguintes alterações feitas sem conexão não foram aplicadas, "
+                                   "pois a tarefa foi modificada em outra estação:\n\n" + "\n".join(linhas) +
+                                   "\n\nUse o botão \"Conflitos\" para reaplicá-las ou descartá-las.")
+
+    # Define o método 'ao_falhar_sincronizacao', chamado se a sincronização falhar.
+    def ao_falhar_sincronizacao(self, erro):
 
         """
-        Este método adiciona uma nova tarefa ao banco de dados MongoDB.
-        Ele coleta os dados inseridos pelo usuário nos campos da interface, valida o título da tarefa,
-        e insere a nova tarefa na coleção do MongoDB.
+        Este método trata falhas da sincronização. Se a conexão caiu, as
+        operações restantes continuam no diário para a próxima tentativa.
         """
 
-        # Obtém o texto do campo de entrada do título e remove quaisquer
-        # espaços em branco no início e no final da string.
-        titulo = self.entrada_titulo.get().strip()
+        self.sincronizando = False
+        if isinstance(erro, ConnectionFailure):
+            self.ao_falhar_conexao(erro)
+        else:
+            messagebox.showerror("Erro", f"Erro ao sincronizar operações offline:\n\n{str(erro)}")
 
-        # Obtém o texto do campo de descrição, desde a posição "1.0" (primeira
-        # linha, primeira coluna) até o final.
-        # 'strip()' é usado para remover espaços em branco desnecessários.
-        descricao = self.texto_descricao.get("1.0", tk.END).strip()
+    # Define o método 'agendar_arquivamento', que move periodicamente as
+    # tarefas concluídas antigas para a coleção de arquivo.
+    def agendar_arquivamento(self, atraso=None):
 
-        # Obtém o valor selecionado no ComboBox de status.
-        # Este valor é gerenciado pela variável tkinter 'StringVar' associada ao ComboBox.
-        status = self.var_status.get()
+        """
+        Este método agenda o arquivamento em segundo plano: sem 'atraso', assim
+        que a interface estiver ociosa (logo após a conexão); depois, a cada
+        intervalo configurado em [arquivo]. O arquivamento só roda com conexão
+        e fora de uma sincronização.
+        """
 
-        # Obtém a data selecionada no campo de data.
-        # Se DateEntry estiver disponível, obtém a data como objeto datetime.
-        # Caso contrário, obtém como string e converte para datetime.
-        if DateEntry and isinstance(self.entrada_data, DateEntry):
-            # DateEntry retorna um objeto date, convertemos para datetime
-            data_selecionada = datetime.combine(self.entrada_data.get_date(), time.min)
+        if self.arquivamento_agendado:
+            return
+        self.arquivamento_agendado = True
+
+        def executar():
+            self.arquivamento_agendado = False
+            if self.conectado and not self.sincronizando and not self.arquivando:
+                self.arquivando = True
+                idade_dias = int(self.configuracao["arquivo"]["idade_dias"])
+                tamanho_lote = int(self.configuracao["arquivo"]["tamanho_lote"])
+                self.executar_em_segundo_plano(lambda: arquivar_concluidas(self.armazenamento, idade_dias, tamanho_lote),
+                                               ao_concluir=self.ao_arquivar,
+                                               ao_falhar=self.ao_falhar_arquivamento)
+            self.agendar_arquivamento(int(self.configuracao["arquivo"]["intervalo_ms"]))
+
+        if atraso is None:
+            self.janela.after_idle(executar)
         else:
-            # Se for Entry comum, obtém a string e converte para datetime
-            data_str = self.entrada_data.get().strip()
-            try:
-                # Tenta converter a string no formato DD/MM/YYYY para datetime
-                data_selecionada = datetime.strptime(data_str, "%d/%m/%Y")
-            except ValueError:
-                # Se a conversão falhar, usa a data atual
-                data_selecionada = datetime.now()
+            self.janela.after(atraso, executar)
 
-        # Verifica se o campo título está vazio.
-        # Se o título não for fornecido, exibe uma mensagem de aviso
-        # ao usuário usando o messagebox.
-        if not titulo:
+    # Define o método 'ao_arquivar', chamado ao final do arquivamento.
+    def ao_arquivar(self, arquivadas):
 
-            messagebox.showwarning("Aviso", "O título da tarefa não pode estar vazio.")  # Exibe um alerta.
-            return  # Interrompe a execução do método.
+        """
+        Este método recarrega a lista se alguma tarefa foi arquivada, para que
+        ela não continue sendo exibida (e editada) como tarefa ativa.
+        """
 
-        # Obtém o técnico selecionado no ComboBox de técnicos.
-        # Se nenhum técnico for selecionado, o valor será uma string vazia.
-        tecnico = self.var_tecnico.get().strip()
+        self.arquivando = False
+        if arquivadas:
+            self.carregar_tarefas(self.filtro_status_atual, self.texto_busca_atual, self.incluir_arquivo_atual,
+                                  self.vencidas_atual, self.tag_atual)
 
-        # Cria um dicionário representando a nova tarefa, com os
-        # valores coletados dos campos de entrada.
-        nova_tarefa = {
-            "titulo": titulo,  # Atribui o valor do título inserido.
-            "descricao": descricao,  # Atribui o valor da descrição inserida.
-            "status": status,  # Atribui o status selecionado no ComboBox.
-            "data_criacao": data_selecionada.strftime("%d/%m/%Y"),  # Atribui a data de criação formatada.
-            "tecnico": tecnico if tecnico else ""  # Atribui o técnico selecionado, ou string vazia se nenhum for selecionado.
-        }
+    # Define o método 'ao_falhar_arquivamento', chamado se o arquivamento falhar.
+    def ao_falhar_arquivamento(self, erro):
 
-        # Insere o dicionário 'nova_tarefa' no banco de dados
-        # MongoDB, na coleção especificada.
-        # 'insert_one' adiciona um único documento à coleção.
-        self.colecao.insert_one(nova_tarefa)
+        """
+        Este método trata falhas do arquivamento. As tarefas não arquivadas
+        continuam na coleção principal e são tentadas na próxima execução.
+        """
 
-        # Atualiza o Treeview para refletir a nova tarefa adicionada.
-        # Isso recarrega todas as tarefas do banco de dados e as exibe na interface.
-        self.carregar_tarefas()
+        self.arquivando = False
+        if isinstance(erro, ConnectionFailure):
+            self.ao_falhar_conexao(erro)
 
-        # Limpa os campos de entrada na interface para que o usuário possa
-        # adicionar uma nova tarefa sem interferência de dados anteriores.
-        self.limpar_campos_entrada()
+    # Define o método 'agendar_resumo', que atualiza periodicamente o resumo mensal.
+    def agendar_resumo(self, atraso=None):
 
-        # Exibe uma mensagem de sucesso ao usuário indicando que a
-        # tarefa foi adicionada com sucesso.
-        messagebox.showinfo("Sucesso", "Tarefa adicionada com sucesso!")
+        """
+        Este método agenda a atualização do resumo mensal em segundo plano:
+        sem 'atraso', assim que a interface estiver ociosa; depois, a cada
+        intervalo configurado em [resumo]. Cada execução recalcula apenas os
+        meses com tarefas alteradas ou excluídas desde a anterior.
+        """
 
+        if self.resumo_agendado:
+            return
+        self.resumo_agendado = True
+
+        def executar():
+            self.resumo_agendado = False
+            if self.conectado and not self.resumindo:
+                self.resumindo = True
+                self.executar_em_segundo_plano(lambda: atualizar_resumo_mensal(self.armazenamento),
+                                               ao_concluir=self.ao_resumir,
+                                               ao_falhar=self.ao_falhar_resumo)
+            self.agendar_resumo(int(self.configuracao["resumo"]["intervalo_ms"]))
+
+        if atraso is None:
+            self.janela.after_idle(executar)
+        else:
+            self.janela.after(atraso, executar)
 
-    # Define o método 'limpar_campos_entrada', que é usado para limpar os
-    # campos de entrada da interface.
-    # Este método é chamado após adicionar, atualizar ou excluir uma
-    # tarefa para garantir que os campos fiquem vazios
-    # e prontos para uma nova entrada de dados.
-    def limpar_campos_entrada(self):
+    # Define o método 'ao_resumir', chamado ao final da atualização do resumo.
+    def ao_resumir(self, meses):
+        self.resumindo = False
+
+    # Define o método 'ao_falhar_resumo', chamado se a atualização do resumo falhar.
+    def ao_falhar_resumo(self, erro):
 
         """
-        Este método limpa os campos de entrada da interface gráfica.
-        Ele é utilizado após operações como adicionar, atualizar ou excluir uma tarefa,
-        para evitar que dados anteriores permaneçam visíveis nos campos.
+        Este método trata falhas da atualização do resumo. A marca d'água só
+        avança ao final de uma atualização completa, e os meses alterados são
+        recalculados na próxima execução.
         """
 
+        self.resumindo = False
+        if isinstance(erro, ConnectionFailure):
+            self.ao_falhar_conexao(erro)
+
+    # Define o método 'agendar_recorrentes', que gera periodicamente as
+    # ocorrências das tarefas recorrentes.
+    def agendar_recorrentes(self, atraso=None):
+
+        """
+        Este método agenda a geração das ocorrências em segundo plano: sem
+        'atraso', assim que a interface estiver ociosa (logo após a conexão,
+        o que recupera de uma só vez as ocorrências do período sem conexão);
+        depois, a cada intervalo configurado em [recorrencia].
+        """
+
+        if self.recorrentes_agendados:
+            return
+        self.recorrentes_agendados = True
+
+        def executar():
+            self.recorrentes_agendados = False
+            self.gerar_recorrentes()
+            self.agendar_recorrentes(int(self.configuracao["recorrencia"]["intervalo_ms"]))
+
+        if atraso is None:
+            self.janela.after_idle(executar)
+        else:
+            self.janela.after(atraso, executar)
+
+    # Define o método 'gerar_recorrentes', que inicia a geração das ocorrências.
+    def gerar_recorrentes(self, ao_concluir=None):
+
+        """
+        Este método gera em segundo plano as ocorrências vencidas de todos os
+        modelos, se houver conexão e nenhuma geração em andamento. A lista
+        é recarregada se alguma tarefa foi criada. 'ao_concluir', se
+        informado, é chamado ao final, com a quantidade de tarefas criadas.
+        """
+
+        if not self.conectado or self.gerando_recorrentes:
+            return
+        self.gerando_recorrentes = True
+
+        def ao_gerar(criadas):
+            self.gerando_recorrentes = False
+            if criadas:
+                self.carregar_tarefas(self.filtro_status_atual, self.texto_busca_atual, self.incluir_arquivo_atual,
+                                      self.vencidas_atual, self.tag_atual)
+            if ao_concluir is not None:
+                ao_concluir(criadas)
+
+        def ao_falhar(erro):
+            self.gerando_recorrentes = False
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+
+        self.executar_em_segundo_plano(lambda: materializar_recorrentes(self.armazenamento),
+                                       ao_concluir=ao_gerar, ao_falhar=ao_falhar)
+
+    # Define o método 'executar_escrita', que envia uma escrita ao servidor
+    # ou a grava no diário offline quando não há conexão.
+    def executar_escrita(self, escrever, operacao, tarefa_id, dados=None, versao_base=None, versao_nova=None,
+                         ao_concluir=None):
+
+        """
+        Este método executa a função 'escrever' no servidor, em segundo plano.
+        Se não houver conexão, ou se ela cair durante a escrita, a operação é
+        gravada no diário offline para ser enviada depois. Tarefas que já têm
+        operações no diário continuam passando por ele, e uma escrita pedida
+        enquanto outra da mesma tarefa está em andamento aguarda o seu
+        término, preservando a ordem das alterações.
+        'ao_concluir' recebe True se a escrita foi feita no servidor e False
+        se ficou pendente no diário. Outros erros são exibidos ao usuário.
+        """
+
+        chave = str(tarefa_id)
+        if chave in self.escritas_em_andamento:
+            self.escritas_em_andamento[chave].append(
+                lambda: self.executar_escrita(escrever, operacao, tarefa_id, dados, versao_base, versao_nova,
+                                              ao_concluir))
+            return
+
+        def registrar_no_diario():
+            self.diario.registrar(operacao, tarefa_id, dados, versao_base, versao_nova)
+            if self.conectado:
+                self.sincronizar_diario()
+            else:
+                self.ao_falhar_conexao(ConnectionFailure("Servidor indisponível."))
+            if ao_concluir:
+                ao_concluir(False)
+
+        if not self.conectado or self.diario.possui_pendencias(tarefa_id):
+            registrar_no_diario()
+            return
+
+        # Ao terminar, as escritas que aguardavam esta são enviadas, em ordem.
+        def liberar_seguintes():
+            for seguinte in self.escritas_em_andamento.pop(chave):
+                seguinte()
+
+        def ao_escrever(_):
+            if ao_concluir:
+                ao_concluir(True)
+            liberar_seguintes()
+
+        def ao_falhar(erro):
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+                registrar_no_diario()
+            else:
+                self.carregar_tarefas()
+                messagebox.showerror("Erro", f"Erro ao gravar a tarefa:\n\n{str(erro)}")
+            liberar_seguintes()
+
+        self.escritas_em_andamento[chave] = []
+        self.dados.executar(self.dados.chamar(escrever), ao_concluir=ao_escrever, ao_falhar=ao_falhar)
+
+    # Define o método 'concluir_exclusoes', que conclui em segundo plano a
+    # exclusão de tarefas já removidas do servidor.
+    def concluir_exclusoes(self, ids, datas_criacao=None):
+
+        """
+        Este método executa 'concluir_exclusao' (registros de exclusão,
+        subtarefas e anexos) em segundo plano e recarrega a lista ao terminar.
+        'datas_criacao' ({identificador: data}) é gravado nos registros de
+        exclusão, para o resumo mensal.
+        Se a conclusão falhar, a exclusão é gravada no diário offline: como a
+        tarefa já não existe no servidor, a reprodução a considera aplicada e
+        repete apenas a conclusão, que é idempotente.
+        """
+
+        def ao_concluir(_):
+            self.carregar_tarefas()
+
+        def ao_falhar(erro):
+            for tarefa_id in ids:
+                self.diario.registrar(OPERACAO_EXCLUIR, tarefa_id,
+                                      {"data_criacao": (datas_criacao or {}).get(tarefa_id)})
+            self.carregar_tarefas()
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+
+        self.executar_em_segundo_plano(lambda: concluir_exclusao(self.armazenamento, self.anexos, ids,
+                                                                 self.cache_miniaturas, datas_criacao),
+                                       ao_concluir=ao_concluir, ao_falhar=ao_falhar)
+
+    # Define o método 'formatar_linha_tarefa', que converte um documento de
+    # tarefa nos valores exibidos nas colunas do Treeview.
+    def formatar_linha_tarefa(self, tarefa):
+
+        """
+        Este método retorna a tupla (título, descrição, status, data, técnico,
+        prazo, tags) exibida no Treeview para a tarefa informada.
+        """
+
+        # Formata a data da criação para exibição.
+        # Se a tarefa tiver uma data de criação, formata no formato DD/MM/YYYY.
+        # Caso contrário, usa a data atual como padrão.
+        if "data_criacao" in tarefa:
+            # Se a data estiver armazenada como string, usa diretamente.
+            # Se estiver como datetime, formata para string.
+            if isinstance(tarefa["data_criacao"], datetime):
+                data_formatada = tarefa["data_criacao"].strftime("%d/%m/%Y")
+            else:
+                data_formatada = tarefa["data_criacao"]
+        else:
+            # Se não houver data, usa a data atual.
+            data_formatada = datetime.now().strftime("%d/%m/%Y")
+
+        # Obtém o nome do técnico responsável pela tarefa.
+        # Se não houver técnico atribuído, exibe "N/A".
+        tecnico_tarefa = self.nome_tecnico(tarefa) or "N/A"
+
+        return (tarefa["titulo"], tarefa["descricao"], tarefa["status"], data_formatada, tecnico_tarefa,
+                formatar_prazo(tarefa.get("data_limite")), formatar_tags(tarefa.get("tags")))
+
+    # Define o método 'nome_tecnico', que obtém o nome do técnico de uma tarefa.
+    def nome_tecnico(self, tarefa):
+
+        """
+        Este método resolve a referência 'tecnico_id' da tarefa pelo diretório
+        de técnicos em memória. Um nome no campo legado 'tecnico' (ainda não
+        migrado) tem precedência, pois é a alteração mais recente.
+        Retorna uma string vazia se a tarefa não tiver técnico.
+        """
+
+        return tarefa.get("tecnico") or self.diretorio_tecnicos.nome_por_id(tarefa.get("tecnico_id")) or ""
+
+    # Define o método 'campos_tecnico', que monta os campos gravados na tarefa
+    # para o técnico escolhido no formulário.
+    def campos_tecnico(self, tecnico, limpar_legado=False):
+
+        """
+        Este método retorna a referência 'tecnico_id' do técnico informado.
+        - Se o diretório de técnicos ainda não foi carregado (sem conexão desde
+          a abertura), um nome digitado é gravado no campo legado 'tecnico' e
+          convertido em referência pela migração na próxima conexão; sem nome,
+          o técnico da tarefa não é alterado.
+        - Com 'limpar_legado', o campo legado é anulado, para que um nome
+          antigo não substitua a nova escolha durante a migração.
+        """
+
+        if not self.diretorio_tecnicos.carregado:
+            return {"tecnico_id": None, "tecnico": tecnico} if tecnico else {}
+
+        campos = {"tecnico_id": self.diretorio_tecnicos.id_por_nome(tecnico) if tecnico else None}
+        if limpar_legado:
+            campos["tecnico"] = None
+        return campos
+
+    # Define o método 'atualizar_nomes_tecnicos', que reescreve a coluna
+    # "Técnico" do Treeview a partir do diretório de técnicos.
+    def atualizar_nomes_tecnicos(self):
+
+        """
+        Este método é chamado quando o diretório de técnicos é carregado ou
+        muda (por exemplo, após uma renomeação), sem consultar as tarefas.
+        """
+
+        for iid, registro in self.modelo.registros.items():
+            if registro.tecnico_id is not None and not registro.tecnico:
+                nome = self.diretorio_tecnicos.nome_por_id(registro.tecnico_id) or "N/A"
+                self.arvore_tarefas.set(iid, "Técnico", nome)
+
+    # Define o método 'tarefa_da_linha', que reconstrói os campos de uma
+    # tarefa exibida no Treeview a partir do modelo de tarefas.
+    def tarefa_da_linha(self, iid):
+
+        """
+        Este método é usado quando o servidor está inacessível: os dados da
+        tarefa são obtidos do modelo em memória, sem consultar o Treeview.
+        """
+
+        registro = self.modelo.obter(iid)
+        return registro.como_documento() if registro else {}
+
+    # Define o método 'exibir_linha_tarefa', que inclui ou atualiza uma linha
+    # do Treeview e o registro correspondente no modelo.
+    # O destaque de tarefa vencida é refeito pelos lembretes, conforme o prazo
+    # atual, e o de tarefa bloqueada pelo resumo da hierarquia. Uma subtarefa
+    # é exibida sob a linha da tarefa pai, e muda de linha se o pai mudar.
+    def exibir_linha_tarefa(self, tarefa_id, tarefa, tags=(), arquivada=False):
+        tags = tuple(tag for tag in tags if tag not in ("vencida", "bloqueada"))
+        self.modelo.definir(tarefa_id, tarefa, arquivada)
+        pai = str(tarefa[CAMPO_PAI]) if tarefa.get(CAMPO_PAI) is not None else ""
+        if pai and not self.arvore_tarefas.exists(pai):
+            pai = ""
+        if self.arvore_tarefas.exists(tarefa_id):
+            self.arvore_tarefas.item(tarefa_id, values=self.formatar_linha_tarefa(tarefa), tags=tags)
+            if self.arvore_tarefas.parent(tarefa_id) != pai:
+                self.arvore_tarefas.move(tarefa_id, pai, tk.END)
+        else:
+            self.arvore_tarefas.insert(pai, tk.END, values=self.formatar_linha_tarefa(tarefa), iid=tarefa_id, tags=tags)
+        self.exibir_hierarquia(tarefa_id)
+        self.agendar_lembretes()
+
+    # Define o método 'remover_linha_tarefa', que retira uma tarefa do
+    # Treeview e do modelo, junto com as subtarefas carregadas sob ela.
+    def remover_linha_tarefa(self, tarefa_id):
+        if self.arvore_tarefas.exists(tarefa_id):
+            for filho in self.arvore_tarefas.get_children(tarefa_id):
+                if filho in self.modelo:
+                    self.remover_linha_tarefa(filho)
+            self.arvore_tarefas.delete(tarefa_id)
+        self.modelo.remover(tarefa_id)
+        self.subtarefas_carregadas.discard(tarefa_id)
+        self.hierarquia.pop(tarefa_id, None)
+
+    # Define o método 'exibir_hierarquia', que mostra na linha de uma tarefa
+    # o progresso das subtarefas e o bloqueio por dependências.
+    def exibir_hierarquia(self, tarefa_id):
+
+        """
+        Este método preenche a coluna "Progresso" e o destaque de tarefa
+        bloqueada a partir do resumo guardado em 'self.hierarquia'. Uma tarefa
+        com subtarefas ainda não carregadas recebe uma linha provisória, que
+        permite expandi-la; as subtarefas são consultadas na expansão.
+        """
+
+        resumo = self.hierarquia.get(tarefa_id)
+        arvore = self.arvore_tarefas
+        arvore.set(tarefa_id, "Progresso", formatar_progresso(resumo))
+
+        tags = tuple(tag for tag in arvore.item(tarefa_id, "tags") if tag != "bloqueada")
+        if resumo and resumo["bloqueios"]:
+            tags += ("bloqueada",)
+        arvore.item(tarefa_id, tags=tags)
+
+        provisoria = "provisoria:" + tarefa_id
+        if resumo and resumo["subtarefas"] and tarefa_id not in self.subtarefas_carregadas:
+            if not arvore.exists(provisoria):
+                arvore.insert(tarefa_id, tk.END, iid=provisoria, values=("Carregando...",), tags=("provisoria",))
+        elif arvore.exists(provisoria):
+            arvore.delete(provisoria)
+
+    # Define o método 'atualizar_hierarquia', que consulta o resumo da
+    # hierarquia das tarefas exibidas.
+    def atualizar_hierarquia(self, ids):
+
+        """
+        Este método calcula no banco de dados, em segundo plano e com uma
+        única consulta, o progresso das subtarefas e a cadeia de bloqueio
+        das tarefas informadas ('resumir_hierarquia'). O resultado é
+        descartado se a lista for recarregada durante a consulta.
+        """
+
+        ids = [tarefa_id for tarefa_id in ids if ObjectId.is_valid(tarefa_id)]
+        if not self.conectado or not ids:
+            return
+        geracao = self.geracao_tarefas
+
+        def consultar():
+            resumos = self.armazenamento.resumir_hierarquia([ObjectId(tarefa_id) for tarefa_id in ids])
+            if self.incluir_arquivo_atual:
+                resumos.update(self.armazenamento.resumir_hierarquia([ObjectId(tarefa_id) for tarefa_id in ids],
+                                                                     "tarefas_arquivo"))
+            return resumos
+
+        def ao_consultar(resumos):
+            if geracao != self.geracao_tarefas:
+                return
+            for tarefa_id in ids:
+                if tarefa_id in self.modelo:
+                    self.hierarquia[tarefa_id] = resumos.get(ObjectId(tarefa_id))
+                    self.exibir_hierarquia(tarefa_id)
+
+        def ao_falhar(erro):
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+
+        self.dados.executar(self.dados.chamar(consultar), ao_concluir=ao_consultar, ao_falhar=ao_falhar)
+
+    # Define o método 'expandir_tarefa', chamado ao expandir uma linha do Treeview.
+    def expandir_tarefa(self, evento):
+
+        """
+        Este método consulta, na primeira expansão de uma tarefa, as suas
+        subtarefas diretas (com o índice de 'pai_id') e o resumo da
+        hierarquia delas, e as exibe no lugar da linha provisória. As
+        subtarefas das subtarefas são consultadas quando elas forem
+        expandidas.
+        """
+
+        tarefa_id = self.arvore_tarefas.focus()
+        if tarefa_id not in self.modelo or tarefa_id in self.subtarefas_carregadas or not self.conectado:
+            return
+        if not self.arvore_tarefas.exists("provisoria:" + tarefa_id):
+            return
+        self.subtarefas_carregadas.add(tarefa_id)
+        geracao = self.geracao_tarefas
+        incluir_arquivo = self.incluir_arquivo_atual
+        projecao = {CAMPO_ANEXOS: 0}
+
+        def consultar():
+            tarefas = list(self.colecao.find(filtro_subtarefas(tarefa_id), projecao).sort("_id", 1))
+            arquivadas = set()
+            if incluir_arquivo:
+                for tarefa in self.colecao_arquivo.find(filtro_subtarefas(tarefa_id), projecao).sort("_id", 1):
+                    arquivadas.add(str(tarefa["_id"]))
+                    tarefas.append(tarefa)
+            ids = [tarefa["_id"] for tarefa in tarefas]
+            resumos = self.armazenamento.resumir_hierarquia(ids)
+            if arquivadas:
+                resumos.update(self.armazenamento.resumir_hierarquia(ids, "tarefas_arquivo"))
+            return tarefas, arquivadas, resumos
+
+        def ao_consultar(resultado):
+            if geracao != self.geracao_tarefas or tarefa_id not in self.modelo:
+                return
+            tarefas, arquivadas, resumos = resultado
+            self.arvore_tarefas.delete("provisoria:" + tarefa_id)
+            for tarefa in tarefas:
+                filho = str(tarefa["_id"])
+                self.hierarquia[filho] = resumos.get(tarefa["_id"])
+                self.exibir_linha_tarefa(filho, tarefa, tags=("arquivada",) if filho in arquivadas else (),
+                                         arquivada=filho in arquivadas)
+
+        def ao_falhar(erro):
+            self.subtarefas_carregadas.discard(tarefa_id)
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+            else:
+                messagebox.showerror("Erro", f"Erro ao carregar as subtarefas:\n\n{str(erro)}")
+
+        self.dados.executar(self.dados.chamar(consultar), ao_concluir=ao_consultar, ao_falhar=ao_falhar)
+
+    # Define o método 'agendar_lembretes', que mantém o temporizador no prazo
+    # mais próximo.
+    def agendar_lembretes(self):
+
+        """
+        Este método é chamado sempre que as tarefas do modelo mudam. O
+        temporizador só é trocado se o prazo mais próximo da fila mudou; a
+        espera é limitada a ESPERA_MAXIMA, e um prazo já passado dispara o
+        temporizador imediatamente.
+        """
+
+        proximo = self.modelo.proximo_prazo()
+        if self.lembrete_agendado is not None:
+            if self.lembrete_agendado[1] == proximo:
+                return
+            self.janela.after_cancel(self.lembrete_agendado[0])
+            self.lembrete_agendado = None
+        if proximo is None:
+            return
+
+        espera = max(min(proximo - agora_utc(), ESPERA_MAXIMA).total_seconds(), 0)
+        self.lembrete_agendado = (self.janela.after(int(espera * 1000) + 1, self.disparar_lembretes), proximo)
+
+    # Define o método 'disparar_lembretes', chamado pelo temporizador.
+    def disparar_lembretes(self):
+
+        """
+        Este método retira da fila os prazos que chegaram e destaca as linhas
+        dessas tarefas. As tarefas cujo prazo venceu com a aplicação aberta
+        são informadas em um único aviso; as que já estavam vencidas ao serem
+        carregadas são apenas destacadas.
+        """
+
+        self.lembrete_agendado = None
+        agora = agora_utc()
+        avisos = []
+        for tarefa_id, data_limite in self.modelo.retirar_prazos(agora):
+            if self.arvore_tarefas.exists(tarefa_id):
+                tags = self.arvore_tarefas.item(tarefa_id, "tags")
+                if "vencida" not in tags:
+                    self.arvore_tarefas.item(tarefa_id, tags=tuple(tags) + ("vencida",))
+            if data_limite > self.prazos_tratados_ate:
+                avisos.append(tarefa_id)
+        self.prazos_tratados_ate = agora
+
+        # As tarefas que acabaram de vencer passam a atender o filtro de vencidas.
+        if avisos and self.visao_vencidas:
+            self.aplicar_visao()
+        self.agendar_lembretes()
+
+        if avisos:
+            linhas = [f"- {self.modelo.obter(tarefa_id).titulo}" for tarefa_id in avisos[:20]]
+            if len(avisos) > 20:
+                linhas.append(f"... e mais {len(avisos) - 20} tarefa(s).")
+            self.janela.bell()
+            messagebox.showwarning("Prazo vencido", "O prazo das tarefas abaixo venceu:\n\n" + "\n".join(linhas))
+
+    # Define o método 'fora_do_carregamento', que indica se uma tarefa alterada
+    # deixou de atender aos filtros com que a lista foi carregada.
+    # Uma subtarefa só é exibida se as subtarefas do seu pai foram carregadas.
+    def fora_do_carregamento(self, tarefa):
+        if tarefa.get(CAMPO_PAI) is not None:
+            return str(tarefa[CAMPO_PAI]) not in self.subtarefas_carregadas
+        if self.filtro_status_atual and tarefa.get("status") != self.filtro_status_atual:
+            return True
+        if self.tag_atual and self.tag_atual not in (tarefa.get("tags") or ()):
+            return True
+        return self.vencidas_atual and not vencida(tarefa, agora_utc())
+
+    # Define o método 'exibir_operacoes_pendentes', que mostra no Treeview as
+    # tarefas criadas, alteradas ou excluídas sem conexão.
+    def exibir_operacoes_pendentes(self):
+
+        """
+        Este método aplica sobre o Treeview o efeito das operações que ainda
+        aguardam sincronização, destacando as linhas correspondentes.
+        """
+
+        # As tarefas da entrada rápida ainda não gravadas continuam na lista.
+        for tarefa in self.fila_inclusoes.tarefas():
+            if str(tarefa["_id"]) not in self.modelo:
+                self.exibir_linha_tarefa(str(tarefa["_id"]), tarefa, tags=("enviando",))
+
+        # As edições de células ainda não gravadas continuam exibidas.
+        for tarefa_id in self.alteracoes_celulas.tarefas():
+            if tarefa_id in self.modelo:
+                tarefa = dict(self.tarefa_da_linha(tarefa_id), **self.alteracoes_celulas.campos(tarefa_id))
+                self.exibir_linha_tarefa(tarefa_id, tarefa, tags=self.arvore_tarefas.item(tarefa_id, "tags"))
+
+        for tarefa_id, (operacao, campos) in self.diario.estado_pendente().items():
+            existe = tarefa_id in self.modelo
+
+            if operacao == OPERACAO_EXCLUIR:
+                if existe:
+                    self.arvore_tarefas.item(tarefa_id, tags=("pendente_exclusao",))
+                continue
+
+            tarefa = dict(self.tarefa_da_linha(tarefa_id), **campos)
+            if self.fora_do_carregamento(tarefa):
+                if existe:
+                    self.remover_linha_tarefa(tarefa_id)
+                continue
+
+            if existe or operacao == OPERACAO_INSERIR:
+                self.exibir_linha_tarefa(tarefa_id, tarefa, tags=("pendente",))
+
+        # Reaplica os filtros e a ordenação da visão sobre o modelo atualizado
+        # e agenda os lembretes dos prazos carregados.
+        self.aplicar_visao()
+        self.agendar_lembretes()
+
+    # Define o método 'exibir_instantaneo', que mostra a lista salva na
+    # sessão anterior enquanto a conexão é estabelecida.
+    def exibir_instantaneo(self):
+
+        """
+        Este método preenche o Treeview com as linhas do instantâneo local,
+        sem consultar o banco de dados, e restaura o filtro de status com que
+        elas foram carregadas. As operações pendentes do diário offline são
+        exibidas sobre elas.
+        """
+
+        conteudo = self.instantaneo.carregar() if self.instantaneo else None
+        if conteudo is None:
+            return
+        marca, filtro_status, linhas = conteudo
+
+        self.filtro_status_atual = filtro_status if filtro_status in ["Pendente", "Concluída"] else None
+        self.visao_status = self.filtro_status_atual
+        self.var_filtro.set(self.filtro_status_atual or "Todos")
+        for iid, valores, versao, tecnico_id, data_limite in linhas:
+            titulo, descricao, status, data_criacao, tecnico, _, tags = valores
+            self.arvore_tarefas.insert("", tk.END, values=valores, iid=iid)
+            self.modelo.definir(iid, {"titulo": titulo, "descricao": descricao, "status": status,
+                                      "data_criacao": data_criacao, "tecnico_id": tecnico_id,
+                                      "tecnico": tecnico if tecnico_id is None and tecnico != "N/A" else None,
+                                      "atualizado_em": versao, "data_limite": data_limite,
+                                      "tags": ler_tags(tags)})
+
+        self.marca_carregamento = marca
+        self.reconciliacao_pendente = True
+        self.exibir_operacoes_pendentes()
+
+    # Define o método 'preparar_reconciliacao', que atualiza a lista do
+    # instantâneo com as alterações feitas desde que ela foi salva.
+    def preparar_reconciliacao(self):
+
+        """
+        Este método retorna a corrotina que busca apenas as tarefas alteradas
+        e excluídas desde a marca d'água do instantâneo, em vez de recarregar
+        a lista inteira, e os callbacks que tratam o seu resultado.
+        """
+
+        desde = self.marca_carregamento
+
+        def consultar():
+            inicio = agora_utc()
+            return inicio, buscar_alteracoes(self.armazenamento, desde)
+
+        return self.dados.chamar(consultar), self.ao_reconciliar_instantaneo, self.ao_falhar_reconciliacao
+
+    # Define o método 'ao_reconciliar_instantaneo', que aplica as alterações no Treeview.
+    def ao_reconciliar_instantaneo(self, resultado):
+
+        """
+        Este método remove as linhas das tarefas excluídas, e atualiza, insere
+        ou remove (conforme o filtro de status) as linhas das tarefas
+        alteradas. Se a lista foi recarregada por completo enquanto as
+        alterações eram buscadas, o resultado é descartado.
+        """
+
+        if not self.reconciliacao_pendente:
+            return
+        inicio, (alteradas, excluidas) = resultado
+
+        for tarefa_id in excluidas:
+            self.remover_linha_tarefa(tarefa_id)
+
+        for tarefa in alteradas:
+            tarefa_id = str(tarefa["_id"])
+            if self.fora_do_carregamento(tarefa):
+                self.remover_linha_tarefa(tarefa_id)
+            else:
+                self.exibir_linha_tarefa(tarefa_id, tarefa)
+
+        self.marca_carregamento = inicio
+        self.reconciliacao_pendente = False
+        self.exibir_operacoes_pendentes()
+        self.atualizar_contagens()
+        self.atualizar_hierarquia(list(self.modelo.registros))
+        self.definir_status_conexao(f"Conectado ao banco de dados. {len(alteradas) + len(excluidas)} "
+                                    "alteração(ões) desde a última sessão.", "#2e7d32")
+
+    # Define o método 'ao_falhar_reconciliacao', chamado se a busca das alterações falhar.
+    def ao_falhar_reconciliacao(self, erro):
+
+        """
+        Este método mantém a reconciliação pendente se a conexão caiu; em
+        outros erros, a lista é carregada por completo.
+        """
+
+        if isinstance(erro, ConnectionFailure):
+            self.ao_falhar_conexao(erro)
+        else:
+            self.carregar_tarefas(self.filtro_status_atual, self.texto_busca_atual, self.incluir_arquivo_atual,
+                                  self.vencidas_atual, self.tag_atual)
+
+    # Define o método 'ao_fechar', chamado quando o usuário fecha a janela.
+    def ao_fechar(self):
+
+        """
+        Este método grava o instantâneo da lista exibida e fecha a janela.
+        Listas com busca textual, com tarefas arquivadas, apenas com as
+        vencidas ou com uma tag não podem ser reconciliadas apenas pelas
+        alterações; nesses casos o instantâneo é descartado e a próxima
+        abertura carrega a lista por completo.
+        O instantâneo guarda apenas as tarefas sem pai, sem o progresso das
+        subtarefas, que é consultado de novo ao conectar.
+        Uma falha ao gravar o arquivo não impede o fechamento. As tarefas da
+        entrada rápida ainda não confirmadas vão para o diário offline e são
+        enviadas na próxima abertura, assim como as edições de células ainda
+        não gravadas.
+        """
+
+        self.guardar_inclusoes_no_diario(self.fila_inclusoes.esvaziar())
+        self.confirmar_edicao_celula()
+        self.guardar_alteracoes_no_diario(self.alteracoes_celulas.esvaziar())
+
+        if self.instantaneo:
+            try:
+                if self.marca_carregamento and not self.texto_busca_atual and not self.incluir_arquivo_atual \
+                        and not self.vencidas_atual and not self.tag_atual:
+                    linhas = [(iid, self.arvore_tarefas.item(iid, "values")[:7], registro.atualizado_em,
+                               registro.tecnico_id, registro.data_limite)
+                              for iid, registro in self.modelo.registros.items() if registro.pai_id is None]
+                    self.instantaneo.salvar(self.marca_carregamento, self.filtro_status_atual, linhas)
+                else:
+                    self.instantaneo.descartar()
+            except OSError:
+                pass
+
+        self.dados.fechar()
+        self.janela.destroy()
+
+    # Define o método 'carregar_tecnicos', que carrega a lista de técnicos
+    # do banco de dados no diretório de técnicos.
+    def carregar_tecnicos(self):
+
+        """
+        Este método carrega os técnicos cadastrados no banco de dados para o
+        diretório de técnicos, em segundo plano. Os ComboBox de técnicos
+        consultam o diretório, e não o banco de dados.
+        """
+
+        self.dados.executar(*self.preparar_carregamento_tecnicos())
+
+    # Define o método 'preparar_carregamento_tecnicos', que monta a consulta
+    # do diretório de técnicos e os callbacks que tratam o seu resultado.
+    def preparar_carregamento_tecnicos(self):
+
+        """
+        Este método retorna a corrotina que carrega o diretório de técnicos,
+        o callback de conclusão e o callback de falha.
+        """
+
+        def ao_carregar(_):
+            self.atualizar_nomes_tecnicos()
+            self.agendar_verificacao_tecnicos()
+
+        return (self.dados.chamar(self.diretorio_tecnicos.carregar), ao_carregar,
+                lambda erro: self.agendar_verificacao_tecnicos())
+
+    # Define o método 'carregar_tecnicos_e_tarefas', chamado ao conectar.
+    def carregar_tecnicos_e_tarefas(self):
+
+        """
+        Este método carrega o diretório de técnicos e as tarefas em duas
+        consultas concorrentes, reunidas com 'asyncio.gather', em vez de uma
+        após a outra. Os técnicos são aplicados primeiro, para que as linhas
+        já sejam exibidas com os nomes resolvidos. Se a lista exibida veio do
+        instantâneo local, apenas as alterações feitas desde então são buscadas.
+        Uma falha em uma das consultas não impede a outra.
+        """
+
+        etapas = [self.preparar_carregamento_tecnicos()]
+        if self.reconciliacao_pendente:
+            etapas.append(self.preparar_reconciliacao())
+        else:
+            etapas.append(self.preparar_carregamento_tarefas(self.filtro_status_atual, self.texto_busca_atual,
+                                                             self.incluir_arquivo_atual, self.vencidas_atual,
+                                                             self.tag_atual))
+
+        async def reunir():
+            return await asyncio.gather(*(corrotina for corrotina, _, _ in etapas), return_exceptions=True)
+
+        def ao_reunir(resultados):
+            for (_, ao_concluir, ao_falhar), resultado in zip(etapas, resultados):
+                if isinstance(resultado, Exception):
+                    ao_falhar(resultado)
+                else:
+                    ao_concluir(resultado)
+
+        self.dados.executar(reunir(), ao_concluir=ao_reunir)
+
+    # Define o método 'agendar_verificacao_tecnicos', que detecta técnicos
+    # cadastrados ou removidos por outras estações.
+    def agendar_verificacao_tecnicos(self):
+
+        """
+        Este método agenda a próxima verificação da coleção de técnicos.
+        A verificação compara uma impressão barata da coleção e só recarrega o
+        diretório quando ela muda; nesse caso, os nomes exibidos no Treeview
+        também são atualizados.
+        """
+
+        if self.verificacao_tecnicos_agendada:
+            return
+        self.verificacao_tecnicos_agendada = True
+
+        def verificar():
+            self.verificacao_tecnicos_agendada = False
+            if not self.conectado:
+                self.agendar_verificacao_tecnicos()
+                return
+
+            def recarregar_se_mudou():
+                if self.diretorio_tecnicos.mudou():
+                    self.diretorio_tecnicos.carregar()
+                    return True
+                return False
+
+            def ao_verificar(recarregado):
+                if recarregado:
+                    self.atualizar_nomes_tecnicos()
+                self.agendar_verificacao_tecnicos()
+
+            self.executar_em_segundo_plano(recarregar_se_mudou,
+                                           ao_concluir=ao_verificar,
+                                           ao_falhar=lambda erro: self.agendar_verificacao_tecnicos())
+
+        intervalo = int(self.configuracao["tecnicos"]["intervalo_verificacao_ms"])
+        self.janela.after(intervalo, verificar)
+
+    # Define o método 'configurar_busca_tecnicos', que liga um ComboBox ao
+    # diretório de técnicos.
+    def configurar_busca_tecnicos(self, combo, incluir_vazio=False):
+
+        """
+        Este método faz o ComboBox filtrar os técnicos pelo texto digitado.
+        A lista é preenchida a partir do diretório em memória ao digitar e ao
+        abrir a lista suspensa, sem consultar o banco de dados.
+        """
+
+        def preencher():
+            nomes = self.diretorio_tecnicos.buscar_prefixo(combo.get())
+            combo['values'] = ([""] if incluir_vazio else []) + nomes
+
+        def ao_digitar(evento):
+            # Teclas de navegação não alteram o texto e não refazem a busca.
+            if evento.keysym not in ("Up", "Down", "Return", "Escape", "Tab"):
+                preencher()
+
+        combo.configure(postcommand=preencher)
+        combo.bind("<KeyRelease>", ao_digitar)
+
+    # Define o método 'validar_tecnico', que verifica o técnico digitado.
+    def validar_tecnico(self, tecnico):
+
+        """
+        Este método retorna True se o técnico estiver vazio ou cadastrado.
+        Caso contrário, exibe um aviso e retorna False. Enquanto o diretório
+        não tiver sido carregado (por exemplo, sem conexão), aceita o nome.
+        """
+
+        if tecnico and self.diretorio_tecnicos.carregado and not self.diretorio_tecnicos.contem(tecnico):
+            messagebox.showwarning("Aviso", f"O técnico '{tecnico}' não está cadastrado.")
+            return False
+        return True
+
+    # Define o método 'cadastrar_tecnico', que abre uma janela para
+    # cadastrar um novo técnico no banco de dados.
+    def cadastrar_tecnico(self):
+
+        """
+        Este método abre uma janela de diálogo para cadastrar um novo técnico.
+        O técnico será salvo no banco de dados MongoDB e adicionado à lista
+        de técnicos disponíveis no ComboBox.
+        """
+
+        # Cria uma janela top-level (popup) para cadastrar técnico.
+        janela_tecnico = tk.Toplevel(self.janela)
+        janela_tecnico.title("Cadastrar Técnico")
+        janela_tecnico.geometry("400x150")
+        janela_tecnico.configure(bg="#f0f0f0")
+        janela_tecnico.transient(self.janela)  # Mantém a janela acima da principal
+        janela_tecnico.grab_set()  # Torna a janela modal
+
+        # Cria um rótulo para o campo de nome do técnico.
+        rotulo_nome = tk.Label(janela_tecnico,
+                              text="Nome do Técnico:",
+                              font=("Arial", 12),
+                              bg="#f0f0f0")
+        rotulo_nome.grid(row=0, column=0, padx=10, pady=20, sticky='e')
+
+        # Cria um campo de entrada para o nome do técnico.
+        entrada_nome = tk.Entry(janela_tecnico,
+                               width=30,
+                               font=("Arial", 11))
+        entrada_nome.grid(row=0, column=1, padx=10, pady=20)
+        entrada_nome.focus()  # Define o foco no campo de entrada
+
+        # Função interna para salvar o técnico.
+        def salvar_tecnico():
+            # Ignora o Enter enquanto uma inserção está em andamento.
+            if str(botao_salvar["state"]) == tk.DISABLED:
+                return
+            nome_tecnico = entrada_nome.get().strip()
+
+            # Valida se o nome foi preenchido.
+            if not nome_tecnico:
+                messagebox.showwarning("Aviso", "O nome do técnico não pode estar vazio.")
+                return
+
+            # Verifica se o técnico já existe, consultando o diretório em memória.
+            # O índice único da coleção garante a regra mesmo se outra estação
+            # cadastrar o mesmo nome ao mesmo tempo.
+            if self.diretorio_tecnicos.contem(nome_tecnico):
+                messagebox.showwarning("Aviso", "Este técnico já está cadastrado.")
+                return
+
+            def ao_inserir(resultado):
+                # Adiciona o técnico ao diretório, sem recarregar a lista inteira.
+                self.diretorio_tecnicos.adicionar(nome_tecnico, resultado.inserted_id, versao)
+
+                # Exibe mensagem de sucesso.
+                messagebox.showinfo("Sucesso", f"Técnico '{nome_tecnico}' cadastrado com sucesso!")
+
+                # Fecha a janela de cadastro, se ainda estiver aberta.
+                if janela_tecnico.winfo_exists():
+                    janela_tecnico.destroy()
+
+            def ao_falhar(erro):
+                if isinstance(erro, ConnectionFailure):
+                    self.ao_falhar_conexao(erro)
+                if janela_tecnico.winfo_exists():
+                    botao_salvar.config(state=tk.NORMAL)
+                messagebox.showerror("Erro", f"Erro ao cadastrar técnico:\n\n{str(erro)}")
+
+            # Insere o novo técnico no banco de dados, em segundo plano. O
+            # botão fica desativado até o fim da inserção.
+            versao = agora_utc()
+            botao_salvar.config(state=tk.DISABLED)
+            self.dados.executar(self.dados.chamar(self.colecao_tecnicos.insert_one,
+                                                  {"nome": nome_tecnico, "atualizado_em": versao}),
+                                ao_concluir=ao_inserir, ao_falhar=ao_falhar)
+
+        # Cria um botão para salvar o técnico.
+        botao_salvar = tk.Button(janela_tecnico,
+                                text="Salvar",
+                                command=salvar_tecnico,
+                                bg="#81c784",
+                                font=("Arial", 11, "bold"),
+                                width=12)
+        botao_salvar.grid(row=1, column=0, columnspan=2, pady=10)
+
+        # Permite salvar pressionando Enter.
+        entrada_nome.bind('<Return>', lambda e: salvar_tecnico())
+
+    # Define o método 'renomear_tecnico', que abre uma janela para
+    # alterar o nome de um técnico cadastrado.
+    def renomear_tecnico(self):
+
+        """
+        Este método abre uma janela de diálogo para renomear um técnico.
+        Como as tarefas guardam apenas o '_id' do técnico, a renomeação é uma
+        única escrita na coleção de técnicos; o Treeview e os ComboBox passam
+        a exibir o novo nome a partir do diretório em memória.
+        """
+
+        if not self.diretorio_tecnicos.carregado:
+            messagebox.showwarning("Aviso", "A lista de técnicos ainda não foi carregada do banco de dados.")
+            return
+
+        # Cria uma janela top-level (popup) para renomear o técnico.
+        janela_renomear = tk.Toplevel(self.janela)
+        janela_renomear.title("Renomear Técnico")
+        janela_renomear.geometry("420x170")
+        janela_renomear.configure(bg="#f0f0f0")
+        janela_renomear.transient(self.janela)  # Mantém a janela acima da principal
+        janela_renomear.grab_set()  # Torna a janela modal
+
+        # Cria o ComboBox do técnico a renomear, já preenchido com o
+        # técnico do formulário, se houver.
+        rotulo_atual = tk.Label(janela_renomear,
+                                text="Técnico:",
+                                font=("Arial", 12),
+                                bg="#f0f0f0")
+        rotulo_atual.grid(row=0, column=0, padx=10, pady=10, sticky='e')
+
+        var_tecnico_atual = tk.StringVar(value=self.var_tecnico.get().strip())
+        combo_tecnico_atual = ttk.Combobox(janela_renomear,
+                                           textvariable=var_tecnico_atual,
+                                           font=("Arial", 11),
+                                           width=28)
+        self.configurar_busca_tecnicos(combo_tecnico_atual)
+        combo_tecnico_atual.grid(row=0, column=1, padx=10, pady=10)
+
+        # Cria o campo de entrada do novo nome.
+        rotulo_novo = tk.Label(janela_renomear,
+                               text="Novo nome:",
+                               font=("Arial", 12),
+                               bg="#f0f0f0")
+        rotulo_novo.grid(row=1, column=0, padx=10, pady=10, sticky='e')
+
+        entrada_novo = tk.Entry(janela_renomear,
+                                width=30,
+                                font=("Arial", 11))
+        entrada_novo.grid(row=1, column=1, padx=10, pady=10)
+        entrada_novo.focus()  # Define o foco no campo de entrada
+
+        # Função interna para salvar o novo nome.
+        def salvar_nome():
+            # Ignora o Enter enquanto uma gravação está em andamento.
+            if str(botao_salvar["state"]) == tk.DISABLED:
+                return
+            nome_atual = var_tecnico_atual.get().strip()
+            nome_novo = entrada_novo.get().strip()
+
+            identificador = self.diretorio_tecnicos.id_por_nome(nome_atual)
+            if identificador is None:
+                messagebox.showwarning("Aviso", f"O técnico '{nome_atual}' não está cadastrado.")
+                return
+
+            # Valida se o novo nome foi preenchido e se é diferente do atual.
+            if not nome_novo or nome_novo == nome_atual:
+                messagebox.showwarning("Aviso", "Informe um novo nome para o técnico.")
+                return
+
+            if self.diretorio_tecnicos.contem(nome_novo):
+                messagebox.showwarning("Aviso", "Já existe um técnico com este nome.")
+                return
+
+            # Atualiza o diretório, o formulário e a coluna "Técnico" do Treeview.
+            def ao_gravar(_):
+                self.diretorio_tecnicos.renomear(identificador, nome_novo, versao)
+                if self.var_tecnico.get().strip() == nome_atual:
+                    self.var_tecnico.set(nome_novo)
+                self.atualizar_nomes_tecnicos()
+
+                messagebox.showinfo("Sucesso", f"Técnico '{nome_atual}' renomeado para '{nome_novo}'.")
+                if janela_renomear.winfo_exists():
+                    janela_renomear.destroy()
+
+            def ao_falhar(erro):
+                if isinstance(erro, ConnectionFailure):
+                    self.ao_falhar_conexao(erro)
+                if janela_renomear.winfo_exists():
+                    botao_salvar.config(state=tk.NORMAL)
+                if isinstance(erro, DuplicateKeyError):
+                    messagebox.showwarning("Aviso", "Já existe um técnico com este nome.")
+                else:
+                    messagebox.showerror("Erro", f"Erro ao renomear técnico:\n\n{str(erro)}")
+
+            # Grava o novo nome e a versão do técnico, usada pelas outras
+            # estações para perceber a alteração, em segundo plano. O botão
+            # fica desativado até o fim da gravação.
+            versao = agora_utc()
+            botao_salvar.config(state=tk.DISABLED)
+            self.dados.executar(self.dados.chamar(self.colecao_tecnicos.update_one, {"_id": identificador},
+                                                  {"$set": {"nome": nome_novo, "atualizado_em": versao}}),
+                                ao_concluir=ao_gravar, ao_falhar=ao_falhar)
+
+        # Cria um botão para salvar o novo nome.
+        botao_salvar = tk.Button(janela_renomear,
+                                 text="Salvar",
+                                 command=salvar_nome,
+                                 bg="#fff59d",
+                                 font=("Arial", 11, "bold"),
+                                 width=12)
+        botao_salvar.grid(row=2, column=0, columnspan=2, pady=10)
+
+        # Permite salvar pressionando Enter.
+        entrada_novo.bind('<Return>', lambda e: salvar_nome())
+
+    # Define o método 'carregar_tarefas', que é responsável por carregar as
+    # tarefas do banco de dados e exibi-las no Treeview.
+    # O parâmetro 'filtro_status' permite que o método carregue apenas tarefas
+    # com um status específico (por exemplo, "Pendente" ou "Concluída").
+    def carregar_tarefas(self, filtro_status=None, texto_busca=None, incluir_arquivo=False, somente_vencidas=False,
+                         tag=None):
+
+        """
+        Este método carrega as tarefas do MongoDB, em segundo plano, e as exibe no Treeview.
+        Se 'filtro_status' for igual a 'Pendente' ou 'Concluída', ele filtra as tarefas por esse status.
+        Caso contrário, ele carrega todas as tarefas disponíveis no banco de dados.
+        Se 'texto_busca' for informado, apenas as tarefas cujo título ou descrição
+        contenham esse texto são carregadas.
+        Se 'incluir_arquivo' for True, as tarefas arquivadas que atendem aos
+        mesmos filtros também são exibidas, mescladas às ativas em ordem de criação.
+        Se 'somente_vencidas' for True, apenas as tarefas pendentes com o
+        prazo vencido são carregadas.
+        Se 'tag' for informada, apenas as tarefas com essa tag são carregadas.
+        Sem conexão, as linhas atuais são mantidas e as operações pendentes do
+        diário offline são exibidas sobre elas.
+        """
+
+        # Um filtro diferente do exibido torna o instantâneo inútil: a lista
+        # passa a ser carregada por completo ao conectar.
+        if (filtro_status if filtro_status in ["Pendente", "Concluída"] else None, texto_busca or None,
+                incluir_arquivo, somente_vencidas, tag or None) != (self.filtro_status_atual, self.texto_busca_atual,
+                                                                    self.incluir_arquivo_atual, self.vencidas_atual,
+                                                                    self.tag_atual):
+            self.reconciliacao_pendente = False
+
+        # Guarda os filtros aplicados, para que recarregamentos posteriores os respeitem.
+        self.filtro_status_atual = filtro_status if filtro_status in ["Pendente", "Concluída"] else None
+        self.texto_busca_atual = texto_busca or None
+        self.incluir_arquivo_atual = incluir_arquivo
+        self.vencidas_atual = somente_vencidas
+        self.tag_atual = tag or None
+
+        # Sem conexão, as linhas atuais são mantidas e as operações pendentes
+        # são exibidas sobre elas.
+        if not self.conectado:
+            self.exibir_operacoes_pendentes()
+            return
+
+        # A consulta é feita em segundo plano, e o Treeview só é limpo quando
+        # o resultado chega: se o servidor estiver inacessível, as linhas
+        # exibidas são preservadas. Pedidos próximos são agrupados pelo agendador.
+        self.agendar_atualizacao()
+
+    # Define o método 'agendar_atualizacao', o ponto único por onde passam os
+    # recarregamentos da lista de tarefas.
+    def agendar_atualizacao(self):
+
+        """
+        Este método marca a lista como desatualizada. A atualização é feita
+        após um curto intervalo ([interface] intervalo_atualizacao_ms; com 0,
+        quando a janela ficar ociosa), e os pedidos feitos nesse intervalo
+        (por exemplo, uma gravação seguida de uma sincronização) são atendidos
+        pela mesma consulta. Os pedidos agrupados são contados em
+        'atualizacoes_evitadas'.
+        """
+
+        if self.atualizacao_agendada:
+            self.atualizacoes_evitadas += 1
+            return
+        self.atualizacao_agendada = True
+
+        intervalo = int(self.configuracao["interface"]["intervalo_atualizacao_ms"])
+        if intervalo > 0:
+            self.janela.after(intervalo, self.executar_atualizacao)
+        else:
+            self.janela.after_idle(self.executar_atualizacao)
+
+    # Define o método 'executar_atualizacao', chamado pelo agendador.
+    def executar_atualizacao(self):
+
+        """
+        Este método inicia a consulta das tarefas com os filtros atuais. Se
+        uma consulta já estiver em andamento, apenas registra o pedido: o
+        resultado em andamento será descartado, sem ser exibido, e uma nova
+        consulta será feita em seguida. Assim, há no máximo uma consulta em
+        andamento e uma renderização por resultado atual.
+        """
+
+        self.atualizacao_agendada = False
+        if self.carregando_tarefas:
+            if self.atualizacao_pendente:
+                self.atualizacoes_evitadas += 1
+            self.atualizacao_pendente = True
+            return
+        if not self.conectado:
+            self.exibir_operacoes_pendentes()
+            return
+
+        self.dados.executar(*self.preparar_carregamento_tarefas(self.filtro_status_atual, self.texto_busca_atual,
+                                                                self.incluir_arquivo_atual, self.vencidas_atual,
+                                                                self.tag_atual))
+
+    # Define o método 'preparar_carregamento_tarefas', que monta a consulta
+    # das tarefas e os callbacks que exibem o seu resultado.
+    def preparar_carregamento_tarefas(self, filtro_status, texto_busca, incluir_arquivo, somente_vencidas=False,
+                                      tag=None):
+
+        """
+        Este método retorna a corrotina que consulta as tarefas com os filtros
+        informados, o callback que as exibe no Treeview e o callback de falha.
+        O resultado é descartado se outro carregamento tiver sido iniciado
+        depois deste.
+        """
+
+        self.geracao_tarefas += 1
+        geracao = self.geracao_tarefas
+        self.carregando_tarefas = True
+
+        # Cria um dicionário vazio para a consulta ao banco de dados.
+        # Este dicionário será usado como filtro para buscar
+        # tarefas específicas no MongoDB.
+        consulta = {}
+
+        # Verifica se o filtro 'filtro_status' é válido.
+        # Se 'filtro_status' não for None e estiver na lista ["Pendente", "Concluída"],
+        # atualiza o dicionário 'consulta'.
+        # O filtro "status" será usado para buscar tarefas no banco de
+        # dados com o status correspondente.
+        if filtro_status and filtro_status in ["Pendente", "Concluída"]:
+            consulta = {"status": filtro_status}
+
+        # Adiciona a busca textual, que usa o índice de texto da coleção.
+        if texto_busca:
+            consulta["$text"] = {"$search": texto_busca}
+
+        # Adiciona o filtro por tag, que usa o índice multichave de 'tags'.
+        if tag:
+            consulta["tags"] = tag
+
+        # A lista exibe apenas as tarefas sem pai; as subtarefas são
+        # consultadas ao expandir a tarefa pai.
+        consulta.update(FILTRO_RAIZES)
+
+        # Realiza a consulta no banco de dados MongoDB usando o método 'find'.
+        # O método 'find(consulta)' retorna todos os documentos da coleção que
+        # correspondem aos critérios especificados em 'consulta'.
+        # Com o arquivo, as duas coleções são lidas em ordem de '_id' (ordem de
+        # criação) e mescladas conforme são lidas, e as tarefas arquivadas são anotadas.
+        # O instante anterior à consulta é a nova marca d'água do instantâneo.
+        # A lista não usa os anexos: nem os seus identificadores são lidos.
+        projecao = {CAMPO_ANEXOS: 0}
+
+        def consultar():
+            inicio = agora_utc()
+            arquivadas = set()
+
+            # As tarefas vencidas são uma faixa do índice (status, data_limite).
+            if somente_vencidas:
+                consulta.update(filtro_vencidas(inicio))
+            if incluir_arquivo:
+                def ler_arquivo():
+                    for tarefa in self.colecao_arquivo.find(consulta, projecao).sort("_id", 1):
+                        arquivadas.add(str(tarefa["_id"]))
+                        yield tarefa
+
+                tarefas = list(mesclar_ordenado([self.colecao.find(consulta, projecao).sort("_id", 1), ler_arquivo()],
+                                                chave=lambda tarefa: tarefa["_id"]))
+            else:
+                tarefas = list(self.colecao.find(consulta, projecao))
+            return inicio, tarefas, arquivadas
+
+        def ao_consultar(resultado):
+            if geracao != self.geracao_tarefas:
+                return
+            self.carregando_tarefas = False
+
+            # Uma atualização pedida durante a consulta torna este resultado
+            # obsoleto: ele não é exibido, e a lista é consultada novamente.
+            if self.atualizacao_pendente:
+                self.atualizacao_pendente = False
+                self.atualizacoes_evitadas += 1
+                self.executar_atualizacao()
+                return
+            self.exibir_tarefas(*resultado)
+
+        def ao_falhar(erro):
+            if geracao == self.geracao_tarefas:
+                self.carregando_tarefas = False
+                self.atualizacao_pendente = False
+            self.ao_falhar_carregamento(erro)
+
+        return self.dados.chamar(consultar), ao_consultar, ao_falhar
+
+    # Define o método 'exibir_tarefas', que preenche o Treeview com o
+    # resultado de um carregamento.
+    def exibir_tarefas(self, inicio, tarefas, arquivadas):
+
+        """
+        Este método substitui as linhas do Treeview pelas tarefas carregadas.
+        'inicio' é o instante da consulta, que passa a ser a marca d'água do
+        instantâneo, e 'arquivadas' os identificadores das tarefas arquivadas.
+        """
+
+        # Limpa todos os itens atualmente exibidos no Treeview para evitar duplicação de dados.
+        # 'get_children()' retorna todos os identificadores de itens no Treeview,
+        # e 'delete' os remove em uma única chamada ao Tcl.
+        self.arvore_tarefas.delete(*self.arvore_tarefas.get_children())
+        self.modelo.limpar()
+        self.hierarquia = {}
+        self.subtarefas_carregadas = set()
+        self.marca_carregamento = inicio
+        self.reconciliacao_pendente = False
+
+        # Itera sobre as tarefas retornadas pela consulta ao banco de dados.
+        for tarefa in tarefas:
+
+            # Insere cada tarefa no Treeview.
+            # - "" especifica que o item será inserido na raiz do Treeview, ou seja, sem um pai.
+            # - tk.END insere o item no final da lista.
+            # - 'values' define os valores a serem exibidos nas colunas do Treeview.
+            # - 'iid' atribui um identificador exclusivo ao item no Treeview,
+            # aqui convertido do '_id' do MongoDB para string.
+            # A tarefa também é guardada no modelo, e o documento é descartado.
+            tarefa_id = str(tarefa["_id"])
+            arquivada = tarefa_id in arquivadas
+            self.arvore_tarefas.insert("", tk.END,
+                                       values=self.formatar_linha_tarefa(tarefa),
+                                       iid=tarefa_id,
+                                       tags=("arquivada",) if arquivada else ())
+            self.modelo.definir(tarefa_id, tarefa, arquivada)
+
+        # Exibe sobre a lista as operações que aguardam sincronização e
+        # aplica os filtros e a ordenação da visão. O progresso das
+        # subtarefas e os bloqueios são consultados em seguida.
+        self.exibir_operacoes_pendentes()
+        self.atualizar_contagens()
+        self.atualizar_hierarquia(list(self.modelo.registros))
+
+    # Define o método 'ordenar_coluna', chamado ao clicar no cabeçalho de uma coluna.
+    def ordenar_coluna(self, coluna):
+
+        """
+        Este método ordena a lista pela coluna clicada; um novo clique na
+        mesma coluna inverte o sentido. A ordenação usa o modelo de tarefas,
+        sem consultar o banco de dados nem ler os valores do Treeview.
+        """
+
+        if coluna == self.coluna_ordenacao:
+            self.ordem_decrescente = not self.ordem_decrescente
+        else:
+            self.coluna_ordenacao = coluna
+            self.ordem_decrescente = False
+        self.aplicar_visao()
+
+    # Define o método 'agendar_visao', chamado a cada tecla digitada na busca rápida.
+    def agendar_visao(self):
+
+        """
+        Este método aplica a visão quando a janela ficar ociosa, para que uma
+        sequência de teclas digitadas rapidamente gere uma única filtragem.
+        """
+
+        if self.visao_agendada:
+            return
+        self.visao_agendada = True
+
+        def aplicar():
+            self.visao_agendada = False
+            self.aplicar_visao()
+
+        self.janela.after_idle(aplicar)
+
+    # Define o método 'aplicar_visao', que exibe as tarefas do modelo que
+    # atendem aos filtros da visão, na ordem escolhida.
+    def aplicar_visao(self):
+
+        """
+        Este método consulta o modelo de tarefas (índices por status e por
+        técnico e busca rápida no título e na descrição), ordena o resultado
+        pelas chaves do modelo e o exibe com uma única chamada a
+        'set_children': as linhas que não atendem aos filtros são apenas
+        desanexadas do Treeview, e voltam sem nova consulta ao banco de dados.
+        O cabeçalho da coluna ordenada indica o sentido da ordenação.
+        """
+
+        tecnicos = None
+        if self.visao_tecnico:
+            tecnicos = {self.visao_tecnico}
+            tecnico_id = self.diretorio_tecnicos.id_por_nome(self.visao_tecnico)
+            if tecnico_id is not None:
+                tecnicos.add(tecnico_id)
+
+        ids = self.modelo.filtrar(self.visao_status, tecnicos, self.visao_arquivo, self.entrada_localizar.get(),
+                                  agora_utc() if self.visao_vencidas else None, self.visao_tag)
+
+        if self.coluna_ordenacao:
+            chave = CHAVES_ORDENACAO.get(self.coluna_ordenacao) or (
+                lambda registro: (registro.tecnico or self.diretorio_tecnicos.nome_por_id(registro.tecnico_id)
+                                  or "").casefold())
+            ids = self.modelo.ordenar(ids, chave, self.ordem_decrescente)
+        self.arvore_tarefas.set_children("", *ids)
+
+        for coluna in self.arvore_tarefas["columns"]:
+            seta = (" ▼" if self.ordem_decrescente else " ▲") if coluna == self.coluna_ordenacao else ""
+            self.arvore_tarefas.heading(coluna, text=coluna + seta)
+
+    # Define o método 'ao_falhar_carregamento', chamado se a consulta das tarefas falhar.
+    def ao_falhar_carregamento(self, erro):
+
+        """
+        Este método mantém as linhas exibidas. Se a conexão caiu, as operações
+        pendentes continuam sendo exibidas sobre elas.
+        """
+
+        if isinstance(erro, ConnectionFailure):
+            self.ao_falhar_conexao(erro)
+            self.exibir_operacoes_pendentes()
+        else:
+            messagebox.showerror("Erro", f"Erro ao carregar as tarefas:\n\n{str(erro)}")
+
+
+    # Define o método 'adicionar_tarefa', responsável por adicionar uma
+    # nova tarefa ao banco de dados MongoDB.
+    def adicionar_tarefa(self):
+
+        """
+        Este método adiciona uma nova tarefa ao banco de dados MongoDB.
+        Ele coleta os dados inseridos pelo usuário nos campos da interface, valida o título da tarefa,
+        e insere a nova tarefa na coleção do MongoDB.
+        """
+
+        # Obtém o texto do campo de entrada do título e remove quaisquer
+        # espaços em branco no início e no final da string.
+        titulo = self.entrada_titulo.get().strip()
+
+        # Obtém o texto do campo de descrição, desde a posição "1.0" (primeira
+        # linha, primeira coluna) até o final.
+        # 'strip()' é usado para remover espaços em branco desnecessários.
+        descricao = self.texto_descricao.get("1.0", tk.END).strip()
+
+        # Obtém o valor selecionado no ComboBox de status.
+        # Este valor é gerenciado pela variável tkinter 'StringVar' associada ao ComboBox.
+        status = self.var_status.get()
+
+        # Obtém a data selecionada no campo de data.
+        # Se DateEntry estiver disponível, obtém a data como objeto datetime.
+        # Caso contrário, obtém como string e converte para datetime.
+        if DateEntry and isinstance(self.entrada_data, DateEntry):
+            # DateEntry retorna um objeto date, convertemos para datetime
+            data_selecionada = datetime.combine(self.entrada_data.get_date(), time.min)
+        else:
+            # Se for Entry comum, obtém a string e converte para datetime
+            data_str = self.entrada_data.get().strip()
+            try:
+                # Tenta converter a string no formato DD/MM/YYYY para datetime
+                data_selecionada = datetime.strptime(data_str, "%d/%m/%Y")
+            except ValueError:
+                # Se a conversão falhar, usa a data atual
+                data_selecionada = datetime.now()
+
+        # Verifica se o campo título está vazio.
+        # Se o título não for fornecido, exibe uma mensagem de aviso
+        # ao usuário usando o messagebox.
+        if not titulo:
+
+            messagebox.showwarning("Aviso", "O título da tarefa não pode estar vazio.")  # Exibe um alerta.
+            return  # Interrompe a execução do método.
+
+        # Obtém o técnico selecionado no ComboBox de técnicos.
+        # Se nenhum técnico for selecionado, o valor será uma string vazia.
+        tecnico = self.var_tecnico.get().strip()
+        if not self.validar_tecnico(tecnico):
+            return
+
+        # Obtém o prazo, opcional, convertido para UTC.
+        try:
+            data_limite = ler_prazo(self.entrada_prazo.get())
+        except ValueError:
+            messagebox.showwarning("Aviso", "O prazo deve estar no formato DD/MM/AAAA HH:MM (ou DD/MM/AAAA).")
+            return
+
+        # Cria um dicionário representando a nova tarefa, com os
+        # valores coletados dos campos de entrada.
+        # O identificador e a versão são gerados no cliente, para que a tarefa
+        # possa ser registrada no diário offline se o servidor estiver inacessível.
+        nova_tarefa = {
+            "_id": ObjectId(),  # Identificador único da tarefa.
+            "titulo": titulo,  # Atribui o valor do título inserido.
+            "descricao": descricao,  # Atribui o valor da descrição inserida.
+            "status": status,  # Atribui o status selecionado no ComboBox.
+            "data_criacao": data_selecionada.strftime("%d/%m/%Y"),  # Atribui a data de criação formatada.
+            "data_limite": data_limite,  # Prazo da tarefa, em UTC, ou None se não houver prazo.
+            "tags": ler_tags(self.entrada_tags.get()),  # Tags da tarefa, separadas por vírgulas no formulário.
+            **self.campos_tecnico(tecnico),  # Referência ('_id') ao técnico selecionado, ou None se nenhum for selecionado.
+            "atualizado_em": agora_utc()  # Versão da tarefa, usada na detecção de conflitos.
+        }
+
+        # No modo de entrada rápida, a tarefa é exibida imediatamente e
+        # gravada depois, em lote.
+        if self.var_entrada_rapida.get():
+            self.incluir_rapidamente(nova_tarefa)
+            return
+
+        # Insere o dicionário 'nova_tarefa' no banco de dados
+        # MongoDB, na coleção especificada.
+        # 'insert_one' adiciona um único documento à coleção.
+        # Sem conexão, a tarefa é gravada no diário offline.
+        # A gravação é feita em segundo plano; ao terminar, o Treeview é
+        # recarregado e o usuário é informado de que a tarefa foi adicionada
+        # ou de que ficou aguardando sincronização.
+        def ao_gravar(gravada):
+            self.carregar_tarefas()
+            if gravada:
+                messagebox.showinfo("Sucesso", "Tarefa adicionada com sucesso!")
+            else:
+                messagebox.showinfo("Aguardando sincronização",
+                                    "A tarefa foi salva localmente e será enviada ao servidor assim que possível.")
+
+        dados_diario = {chave: valor for chave, valor in nova_tarefa.items() if chave != "_id"}
+        self.executar_escrita(lambda: self.colecao.insert_one(nova_tarefa),
+                              OPERACAO_INSERIR, nova_tarefa["_id"], dados_diario,
+                              versao_nova=nova_tarefa["atualizado_em"], ao_concluir=ao_gravar)
+
+        # Limpa os campos de entrada na interface para que o usuário possa
+        # adicionar uma nova tarefa sem interferência de dados anteriores.
+        self.limpar_campos_entrada()
+
+    # Define o método 'incluir_rapidamente', a inclusão do modo de entrada rápida.
+    def incluir_rapidamente(self, tarefa):
+
+        """
+        Este método exibe a nova tarefa no fim da lista, limpa o título e a
+        descrição (o status, a data e o técnico são mantidos para a próxima
+        tarefa) e coloca a tarefa na fila de envio. O lote é enviado quando
+        fica completo ou ao fim do intervalo de [entrada_rapida]. Sem
+        conexão, a tarefa vai diretamente para o diário offline.
+        """
+
+        tarefa_id = str(tarefa["_id"])
+        if self.conectado:
+            self.fila_inclusoes.adicionar(tarefa)
+            self.exibir_linha_tarefa(tarefa_id, tarefa, tags=("enviando",))
+            self.arvore_tarefas.see(tarefa_id)
+        else:
+            self.guardar_inclusoes_no_diario([tarefa])
+            self.exibir_operacoes_pendentes()
+
+        self.entrada_titulo.delete(0, tk.END)
+        self.texto_descricao.delete("1.0", tk.END)
+        self.entrada_titulo.focus_set()
+
+        if self.fila_inclusoes.lote_completo():
+            self.enviar_inclusoes()
+        elif len(self.fila_inclusoes):
+            self.agendar_envio_inclusoes()
+
+    # Define o método 'agendar_envio_inclusoes', que envia a fila ao fim do intervalo.
+    def agendar_envio_inclusoes(self):
+        if self.envio_agendado:
+            return
+        self.envio_agendado = True
+
+        def executar():
+            self.envio_agendado = False
+            self.enviar_inclusoes()
+
+        self.janela.after(int(self.configuracao["entrada_rapida"]["intervalo_ms"]), executar)
+
+    # Define o método 'enviar_inclusoes', que grava um lote da fila em segundo plano.
+    def enviar_inclusoes(self):
+
+        """
+        Este método envia o próximo lote da fila com um único 'insert_many'.
+        Há no máximo um lote em envio: as tarefas incluídas enquanto isso
+        seguem no lote seguinte.
+        """
+
+        lote = self.fila_inclusoes.retirar_lote()
+        if lote:
+            self.executar_em_segundo_plano(lambda: inserir_lote(self.colecao, lote),
+                                           ao_concluir=self.ao_enviar_inclusoes,
+                                           ao_falhar=self.ao_falhar_envio_inclusoes)
+
+    # Define o método 'ao_enviar_inclusoes', chamado ao final do envio de um lote.
+    def ao_enviar_inclusoes(self, rejeitadas):
+
+        """
+        Este método retira o destaque das tarefas gravadas e destaca em
+        vermelho as rejeitadas, informando o motivo de cada uma. Em seguida,
+        continua o envio da fila.
+        """
+
+        lote = self.fila_inclusoes.concluir_lote()
+        ids_rejeitados = {str(tarefa["_id"]) for tarefa, _ in rejeitadas}
+        for tarefa in lote:
+            tarefa_id = str(tarefa["_id"])
+            if self.arvore_tarefas.exists(tarefa_id):
+                self.arvore_tarefas.item(tarefa_id, tags=("falha_envio",) if tarefa_id in ids_rejeitados else ())
+
+        if self.fila_inclusoes.lote_completo():
+            self.enviar_inclusoes()
+        elif len(self.fila_inclusoes):
+            self.agendar_envio_inclusoes()
+
+        if rejeitadas:
+            linhas = [f"- {tarefa['titulo']}: {motivo}" for tarefa, motivo in rejeitadas]
+            messagebox.showwarning("Falha na inclusão",
+                                   "As seguintes tarefas não foram gravadas e estão destacadas em vermelho "
+                                   "na lista:\n\n" + "\n".join(linhas))
+
+    # Define o método 'ao_falhar_envio_inclusoes', chamado se o envio de um lote falhar.
+    def ao_falhar_envio_inclusoes(self, erro):
+
+        """
+        Este método trata a falha de um lote inteiro. Se a conexão caiu, o
+        lote e o restante da fila vão para o diário offline, que os envia na
+        reconexão (as tarefas já gravadas são reconhecidas pela chave
+        duplicada). Outros erros destacam as tarefas do lote em vermelho.
+        """
+
+        lote = self.fila_inclusoes.concluir_lote()
+        if isinstance(erro, ConnectionFailure):
+            self.guardar_inclusoes_no_diario(lote + self.fila_inclusoes.esvaziar())
+            self.ao_falhar_conexao(erro)
+            self.exibir_operacoes_pendentes()
+            return
+
+        for tarefa in lote:
+            if self.arvore_tarefas.exists(str(tarefa["_id"])):
+                self.arvore_tarefas.item(str(tarefa["_id"]), tags=("falha_envio",))
+        if len(self.fila_inclusoes):
+            self.agendar_envio_inclusoes()
+        messagebox.showerror("Erro", f"Erro ao gravar {len(lote)} tarefa(s) da entrada rápida, destacadas em "
+                                     f"vermelho na lista:\n\n{str(erro)}")
+
+    # Define o método 'guardar_inclusoes_no_diario', que registra inclusões no diário offline.
+    def guardar_inclusoes_no_diario(self, tarefas):
+        for tarefa in tarefas:
+            dados = {chave: valor for chave, valor in tarefa.items() if chave != "_id"}
+            self.diario.registrar(OPERACAO_INSERIR, tarefa["_id"], dados, versao_nova=tarefa["atualizado_em"])
+
+    # Define o método 'editar_celula', que abre um editor sobre a célula clicada.
+    def editar_celula(self, evento):
+
+        """
+        Este método é chamado pelo clique duplo no Treeview. As células de
+        título, status e técnico são editadas no lugar, com um campo de texto
+        ou uma lista posicionados sobre a célula. Enter ou a saída do editor
+        confirmam a edição, e Esc a cancela. Tarefas arquivadas, excluídas
+        sem conexão ou ainda não gravadas pela entrada rápida não são editadas.
+        """
+
+        self.confirmar_edicao_celula()
+
+        arvore = self.arvore_tarefas
+        if arvore.identify_region(evento.x, evento.y) != "cell":
+            return
+        tarefa_id = arvore.identify_row(evento.y)
+        coluna = arvore.identify_column(evento.x)
+        nome_coluna = arvore.column(coluna, "id")
+        if nome_coluna not in ("Título", "Status", "Técnico") or tarefa_id not in self.modelo:
+            return
+        if self.modelo.arquivada(tarefa_id) or {"pendente_exclusao", "enviando"} & set(arvore.item(tarefa_id, "tags")):
+            return
+        caixa = arvore.bbox(tarefa_id, coluna)
+        if not caixa:
+            return
+
+        valor = arvore.set(tarefa_id, nome_coluna)
+        if nome_coluna == "Título":
+            editor = ttk.Entry(arvore, font=("Arial", 10))
+            editor.insert(0, valor)
+            editor.select_range(0, tk.END)
+        elif nome_coluna == "Status":
+            editor = ttk.Combobox(arvore, values=self.combo_status["values"], state="readonly")
+            editor.set(valor)
+            editor.bind("<<ComboboxSelected>>", lambda e: self.confirmar_edicao_celula())
+        else:
+            editor = ttk.Combobox(arvore)
+            editor.set(self.nome_tecnico(self.tarefa_da_linha(tarefa_id)))
+            self.configurar_busca_tecnicos(editor, incluir_vazio=True)
+
+        # A saída do editor é verificada depois que o foco muda: a lista
+        # suspensa do ComboBox recebe o foco, mas ainda faz parte do editor.
+        editor.bind("<Return>", lambda e: self.confirmar_edicao_celula())
+        editor.bind("<Escape>", lambda e: self.fechar_editor_celula())
+        editor.bind("<FocusOut>", lambda e: self.janela.after_idle(self.ao_sair_editor_celula))
+        editor.place(x=caixa[0], y=caixa[1], width=caixa[2], height=caixa[3])
+        editor.focus_set()
+        self.editor_celula = (editor, tarefa_id, nome_coluna)
+
+    # Define o método 'ao_sair_editor_celula', que confirma a edição quando o foco sai do editor.
+    def ao_sair_editor_celula(self):
+        if self.editor_celula is not None and not str(self.janela.tk.call("focus")).startswith(
+                str(self.editor_celula[0])):
+            self.confirmar_edicao_celula()
+
+    # Define o método 'fechar_editor_celula', que remove o editor sem gravar.
+    def fechar_editor_celula(self):
+        if self.editor_celula is not None:
+            editor = self.editor_celula[0]
+            self.editor_celula = None
+            editor.destroy()
+            self.arvore_tarefas.focus_set()
+
+    # Define o método 'confirmar_edicao_celula', que aplica o valor do editor aberto.
+    def confirmar_edicao_celula(self):
+
+        """
+        Este método fecha o editor, exibe o novo valor na linha (e no
+        formulário, se a tarefa estiver selecionada) e acumula a alteração,
+        gravada após o intervalo de [edicao] sem novas edições. Um valor igual
+        ao original não gera gravação.
+        """
+
+        if self.editor_celula is None:
+            return
+        editor, tarefa_id, coluna = self.editor_celula
+        valor = editor.get().strip()
+        self.fechar_editor_celula()
+        if tarefa_id not in self.modelo:
+            return
+
+        if coluna == "Título":
+            if not valor:
+                messagebox.showwarning("Aviso", "O título da tarefa não pode estar vazio.")
+                return
+            campos = {"titulo": valor}
+        elif coluna == "Status":
+            campos = {"status": valor}
+        else:
+            if not self.validar_tecnico(valor):
+                return
+            campos = self.campos_tecnico(valor, limpar_legado=True)
+
+        documento = self.tarefa_da_linha(tarefa_id)
+        tarefa = dict(documento, **campos)
+        self.alteracoes_celulas.registrar(tarefa_id, campos, documento)
+        self.exibir_linha_tarefa(tarefa_id, tarefa, tags=self.arvore_tarefas.item(tarefa_id, "tags"))
+
+        if tarefa_id == self.id_tarefa_selecionada:
+            self.entrada_titulo.delete(0, tk.END)
+            self.entrada_titulo.insert(tk.END, tarefa["titulo"])
+            self.var_status.set(tarefa["status"])
+            self.var_tecnico.set(self.nome_tecnico(tarefa))
+
+        if len(self.alteracoes_celulas):
+            self.agendar_gravacao_celulas()
+
+    # Define o método 'agendar_gravacao_celulas', que adia a gravação até o fim das edições.
+    def agendar_gravacao_celulas(self):
+        if self.gravacao_celulas_agendada is not None:
+            self.janela.after_cancel(self.gravacao_celulas_agendada)
+        self.gravacao_celulas_agendada = self.janela.after(int(self.configuracao["edicao"]["intervalo_ms"]),
+                                                           self.gravar_alteracoes_celulas)
+
+    # Define o método 'gravar_alteracoes_celulas', que grava as edições acumuladas em segundo plano.
+    def gravar_alteracoes_celulas(self):
+
+        """
+        Este método envia as edições acumuladas em um único 'bulk_write'.
+        Sem conexão, ou para tarefas que já têm operações no diário offline
+        (preservando a ordem das alterações), as edições vão para o diário.
+        Há no máximo uma gravação por vez: as edições feitas enquanto isso
+        são gravadas ao final dela.
+        """
+
+        self.gravacao_celulas_agendada = None
+        if not self.alteracoes_celulas.retirar_lote():
+            return
+
+        offline = self.alteracoes_celulas.separar_do_lote(
+            lambda tarefa_id: not self.conectado or self.diario.possui_pendencias(tarefa_id))
+        if offline:
+            self.guardar_alteracoes_no_diario(offline)
+            if self.conectado:
+                self.sincronizar_diario()
+            else:
+                self.ao_falhar_conexao(ConnectionFailure("Servidor indisponível."))
+            self.exibir_operacoes_pendentes()
+
+        lote = self.alteracoes_celulas.enviando
+        if lote:
+            self.executar_em_segundo_plano(lambda: gravar_alteracoes(self.colecao, lote),
+                                           ao_concluir=self.ao_gravar_alteracoes_celulas,
+                                           ao_falhar=self.ao_falhar_gravacao_celulas)
+        else:
+            self.alteracoes_celulas.concluir_lote()
+
+    # Define o método 'ao_gravar_alteracoes_celulas', chamado ao final da gravação das edições.
+    def ao_gravar_alteracoes_celulas(self, rejeitadas):
+
+        """
+        Este método atualiza a versão das tarefas gravadas e destaca em
+        vermelho as rejeitadas, informando o motivo de cada uma. Em seguida,
+        grava as edições feitas durante a gravação.
+        """
+
+        motivos = dict(rejeitadas)
+        lote = self.alteracoes_celulas.concluir_lote(motivos)
+        for tarefa_id, campos, _ in lote:
+            registro = self.modelo.obter(tarefa_id)
+            if tarefa_id in motivos:
+                if self.arvore_tarefas.exists(tarefa_id):
+                    self.arvore_tarefas.item(tarefa_id, tags=("falha_envio",))
+            elif registro is not None:
+                registro.atualizado_em = campos["atualizado_em"]
+                if tarefa_id == self.id_tarefa_selecionada:
+                    self.versao_tarefa_selecionada = campos["atualizado_em"]
+
+        if len(self.alteracoes_celulas) and self.gravacao_celulas_agendada is None:
+            self.agendar_gravacao_celulas()
+
+        if rejeitadas:
+            linhas = [f"- {self.modelo.obter(tarefa_id).titulo if tarefa_id in self.modelo else tarefa_id}: {motivo}"
+                      for tarefa_id, motivo in rejeitadas]
+            messagebox.showwarning("Falha na alteração",
+                                   "As alterações das seguintes tarefas não foram gravadas e estão destacadas "
+                                   "em vermelho na lista:\n\n" + "\n".join(linhas))
+
+    # Define o método 'ao_falhar_gravacao_celulas', chamado se a gravação das edições falhar.
+    def ao_falhar_gravacao_celulas(self, erro):
+
+        """
+        Este método trata a falha da gravação inteira. Se a conexão caiu, as
+        edições vão para o diário offline; outros erros destacam as tarefas
+        em vermelho.
+        """
+
+        if isinstance(erro, ConnectionFailure):
+            lote = self.alteracoes_celulas.concluir_lote()
+            self.guardar_alteracoes_no_diario(lote)
+            self.ao_falhar_conexao(erro)
+            self.exibir_operacoes_pendentes()
+        else:
+            lote = self.alteracoes_celulas.concluir_lote({tarefa_id for tarefa_id, _, _ in
+                                                          self.alteracoes_celulas.enviando})
+            for tarefa_id, _, _ in lote:
+                if self.arvore_tarefas.exists(tarefa_id):
+                    self.arvore_tarefas.item(tarefa_id, tags=("falha_envio",))
+            messagebox.showerror("Erro", f"Erro ao gravar as alterações de {len(lote)} tarefa(s), destacadas em "
+                                         f"vermelho na lista:\n\n{str(erro)}")
+
+        if len(self.alteracoes_celulas) and self.gravacao_celulas_agendada is None:
+            self.agendar_gravacao_celulas()
+
+    # Define o método 'guardar_alteracoes_no_diario', que registra edições de células no diário offline.
+    def guardar_alteracoes_no_diario(self, alteracoes):
+        for tarefa_id, campos, versao_base in alteracoes:
+            self.diario.registrar(OPERACAO_ATUALIZAR, tarefa_id, campos, versao_base,
+                                  versao_nova=campos["atualizado_em"])
+
+
+    # Define o método 'limpar_campos_entrada', que é usado para limpar os
+    # campos de entrada da interface.
+    # Este método é chamado após adicionar, atualizar ou excluir uma
+    # tarefa para garantir que os campos fiquem vazios
+    # e prontos para uma nova entrada de dados.
+    def limpar_campos_entrada(self):
+
+        """
+        Este método limpa os campos de entrada da interface gráfica.
+        Ele é utilizado após operações como adicionar, atualizar ou excluir uma tarefa,
+        para evitar que dados anteriores permaneçam visíveis nos campos.
+        """
+
+        # Descarta a leitura de uma tarefa selecionada ainda em andamento,
+        # que preencheria de novo os campos.
+        self.geracao_selecao += 1
+
         # Limpa o campo de entrada de texto associado ao título da tarefa.
         # 'delete(0, tk.END)' remove todo o texto do início (índice 0)
         # até o final (tk.END) do campo de entrada.
@@ -1084,6 +3402,12 @@ class GerenciadorTarefasApp:
         # Limpa o campo de técnico, redefinindo para vazio.
         self.var_tecnico.set("")
 
+        # Limpa o campo do prazo.
+        self.entrada_prazo.delete(0, tk.END)
+
+        # Limpa o campo das tags.
+        self.entrada_tags.delete(0, tk.END)
+
 
     # Define o método 'atualizar_tarefa', que é responsável por
     # atualizar as informações de uma tarefa existente no MongoDB.
@@ -1109,6 +3433,11 @@ class GerenciadorTarefasApp:
             # não há tarefa para atualizar.
             return
 
+        # Tarefas arquivadas são somente leitura.
+        if self.modelo.arquivada(self.id_tarefa_selecionada):
+            messagebox.showwarning("Aviso", "Tarefas arquivadas não podem ser alteradas.")
+            return
+
         # Obtém o valor do campo de entrada de título.
         # 'get()' recupera o texto digitado pelo usuário, enquanto 'strip()'
         # remove espaços extras no início e no final.
@@ -1151,6 +3480,15 @@ class GerenciadorTarefasApp:
         # Obtém o técnico selecionado no ComboBox de técnicos.
         # Se nenhum técnico for selecionado, o valor será uma string vazia.
         tecnico = self.var_tecnico.get().strip()
+        if not self.validar_tecnico(tecnico):
+            return
+
+        # Obtém o prazo, opcional, convertido para UTC.
+        try:
+            data_limite = ler_prazo(self.entrada_prazo.get())
+        except ValueError:
+            messagebox.showwarning("Aviso", "O prazo deve estar no formato DD/MM/AAAA HH:MM (ou DD/MM/AAAA).")
+            return
 
         # Cria um dicionário contendo os dados atualizados da tarefa.
         # O operador "$set" é utilizado no MongoDB para atualizar apenas os
@@ -1161,7 +3499,10 @@ class GerenciadorTarefasApp:
                 "descricao": descricao,  # Atualiza o campo "descricao" com o valor coletado da interface.
                 "status": status,  # Atualiza o campo "status" com o valor selecionado no ComboBox.
                 "data_criacao": data_selecionada.strftime("%d/%m/%Y"),  # Atualiza o campo "data_criacao" com a data formatada.
-                "tecnico": tecnico if tecnico else ""  # Atualiza o campo "tecnico" com o técnico selecionado.
+                "data_limite": data_limite,  # Atualiza o prazo da tarefa.
+                "tags": ler_tags(self.entrada_tags.get()),  # Atualiza as tags da tarefa.
+                **self.campos_tecnico(tecnico, limpar_legado=True),  # Atualiza a referência ao técnico selecionado.
+                "atualizado_em": agora_utc()  # Atualiza a versão da tarefa.
             }
         }
 
@@ -1170,12 +3511,28 @@ class GerenciadorTarefasApp:
         # corresponde ao filtro especificado.
         # O filtro utiliza o "_id" para identificar o documento a ser
         # atualizado, convertido para ObjectId.
-        self.colecao.update_one({"_id": ObjectId(self.id_tarefa_selecionada)}, dados_atualizacao)
+        # Sem conexão, a atualização é gravada no diário offline junto com a
+        # versão da tarefa no momento da edição.
+        # As edições de células ainda não gravadas da tarefa já estão no
+        # formulário e são substituídas por esta atualização.
+        # Ao terminar a gravação, feita em segundo plano, as tarefas exibidas
+        # no Treeview são recarregadas, refletindo os dados atualizados, e o
+        # usuário é informado de que a tarefa foi atualizada ou de que a
+        # alteração aguarda sincronização.
+        def ao_gravar(gravada):
+            self.carregar_tarefas()
+            if gravada:
+                messagebox.showinfo("Sucesso", "Tarefa atualizada com sucesso!")
+            else:
+                messagebox.showinfo("Aguardando sincronização",
+                                    "A alteração foi salva localmente e será enviada ao servidor assim que possível.")
 
-        # Recarrega as tarefas exibidas no Treeview.
-        # Isso garante que os dados atualizados sejam refletidos
-        # imediatamente na interface.
-        self.carregar_tarefas()
+        id_tarefa = self.id_tarefa_selecionada
+        self.alteracoes_celulas.descartar(id_tarefa)
+        self.executar_escrita(lambda: self.colecao.update_one({"_id": ObjectId(id_tarefa)}, dados_atualizacao),
+                              OPERACAO_ATUALIZAR, id_tarefa, dados_atualizacao["$set"],
+                              versao_base=self.versao_tarefa_selecionada,
+                              versao_nova=dados_atualizacao["$set"]["atualizado_em"], ao_concluir=ao_gravar)
 
         # Limpa os campos de entrada na interface.
         # Isso prepara os campos para que o usuário possa realizar outras
@@ -1187,10 +3544,6 @@ class GerenciadorTarefasApp:
         # após a atualização.
         self.id_tarefa_selecionada = None
 
-        # Exibe uma mensagem de sucesso ao usuário.
-        # Informa que a tarefa foi atualizada com sucesso.
-        messagebox.showinfo("Sucesso", "Tarefa atualizada com sucesso!")
-
 
     # Define o método 'excluir_tarefa', que remove uma
     # tarefa do banco de dados MongoDB.
@@ -1213,6 +3566,11 @@ class GerenciadorTarefasApp:
             # Interrompe o método, já que não há tarefa para excluir.
             return
 
+        # Tarefas arquivadas são somente leitura.
+        if self.modelo.arquivada(self.id_tarefa_selecionada):
+            messagebox.showwarning("Aviso", "Tarefas arquivadas não podem ser excluídas.")
+            return
+
         # Exibe uma mensagem de confirmação antes de prosseguir com a exclusão.
         # O 'askyesno' exibe uma caixa de diálogo com as opções "Sim" e "Não".
         # Retorna True se o usuário clicar em "Sim" e False se clicar em "Não".
@@ -1226,10 +3584,33 @@ class GerenciadorTarefasApp:
             # filtro fornecido.
             # O identificador da tarefa é convertido para ObjectId antes de
             # ser usado na consulta.
-            self.colecao.delete_one({"_id": ObjectId(self.id_tarefa_selecionada)})
+            # Sem conexão, a exclusão é gravada no diário offline. Apenas a
+            # exclusão do documento passa pelo diário: a conclusão (registro
+            # da exclusão, subtarefas e anexos) é feita depois, em segundo plano.
+            # A data de criação vai para o registro da exclusão, para o
+            # resumo mensal.
+            id_tarefa = self.id_tarefa_selecionada
+            self.alteracoes_celulas.descartar(id_tarefa)
+            registro = self.modelo.obter(id_tarefa)
+            datas_criacao = {id_tarefa: registro.data_criacao if registro else None}
+
+            # Ao terminar a exclusão, feita em segundo plano, a lista de
+            # tarefas no Treeview é recarregada para refleti-la, depois da
+            # conclusão quando a tarefa saiu do servidor (as suas subtarefas
+            # passam para a lista principal), e o usuário é informado de que a
+            # tarefa foi excluída ou de que a exclusão aguarda sincronização.
+            def ao_excluir(gravada):
+                if gravada:
+                    self.concluir_exclusoes([id_tarefa], datas_criacao)
+                    messagebox.showinfo("Sucesso", "Tarefa excluída com sucesso!")
+                else:
+                    self.carregar_tarefas()
+                    messagebox.showinfo("Aguardando sincronização",
+                                        "A exclusão foi salva localmente e será enviada ao servidor assim que possível.")
 
-            # Recarrega a lista de tarefas no Treeview para refletir a exclusão.
-            self.carregar_tarefas()
+            self.executar_escrita(lambda: self.colecao.delete_one({"_id": ObjectId(id_tarefa)}),
+                                  OPERACAO_EXCLUIR, id_tarefa, {"data_criacao": datas_criacao[id_tarefa]},
+                                  versao_base=self.versao_tarefa_selecionada, ao_concluir=ao_excluir)
 
             # Limpa os campos de entrada na interface.
             # Isso evita que informações de uma tarefa excluída permaneçam visíveis.
@@ -1239,17 +3620,17 @@ class GerenciadorTarefasApp:
             # Isso indica que nenhuma tarefa está atualmente selecionada.
             self.id_tarefa_selecionada = None
 
-            # Exibe uma mensagem de sucesso informando ao usuário que a tarefa foi excluída.
-            messagebox.showinfo("Sucesso", "Tarefa excluída com sucesso!")
-
 
     # Define o método 'aplicar_filtro', que aplica o filtro de
     # status escolhido pelo usuário.
     def aplicar_filtro(self):
 
         """
-        Este método obtém o status selecionado no ComboBox de filtros,
-        aplica o filtro de status escolhido e recarrega a lista de tarefas no Treeview.
+        Este método obtém o status selecionado no ComboBox de filtros, o
+        técnico, a tag e o texto do campo de busca, e aplica os filtros escolhidos.
+        Quando as tarefas carregadas já contêm todas as que atendem aos
+        filtros, eles são aplicados localmente, sobre o modelo de tarefas;
+        caso contrário, a lista é recarregada do banco de dados.
         """
 
         # Obtém o valor selecionado no ComboBox de filtro.
@@ -1257,13 +3638,48 @@ class GerenciadorTarefasApp:
         # contém o valor atualmente selecionado.
         filtro_escolhido = self.var_filtro.get()
 
+        # Obtém o texto de busca, removendo espaços extras.
+        texto_busca = self.entrada_busca.get().strip()
+
+        # Indica se as tarefas arquivadas devem ser incluídas.
+        incluir_arquivo = self.var_incluir_arquivo.get()
+
+        # Indica se apenas as tarefas vencidas devem ser exibidas.
+        somente_vencidas = self.var_somente_vencidas.get()
+
+        # Obtém a tag escolhida, ou None para todas as tarefas.
+        tag = self.var_filtro_tag.get().strip() or None
+
+        # Guarda os filtros da visão, aplicados localmente sobre o modelo.
+        self.visao_status = None if filtro_escolhido == "Todos" else filtro_escolhido
+        self.visao_tecnico = self.var_filtro_tecnico.get().strip()
+        self.visao_arquivo = incluir_arquivo
+        self.visao_vencidas = somente_vencidas
+        self.visao_tag = tag
+
+        # O modelo contém todas as tarefas pedidas se foi carregado com a mesma
+        # busca textual, sem filtro de status (ou com o mesmo status), sem
+        # filtro de tag (ou com a mesma tag), com as tarefas arquivadas, se
+        # elas forem pedidas, e não apenas com as vencidas (ou com elas, se
+        # elas forem pedidas). O filtro por técnico é sempre local.
+        if self.marca_carregamento is not None \
+                and (texto_busca or None) == self.texto_busca_atual \
+                and self.filtro_status_atual in (None, self.visao_status) \
+                and self.tag_atual in (None, tag) \
+                and (self.incluir_arquivo_atual or not incluir_arquivo) \
+                and (somente_vencidas or not self.vencidas_atual):
+            self.aplicar_visao()
+            self.atualizar_contagens()
+            return
+
         # Verifica se o filtro escolhido é "Todos".
-        # Se for, carrega todas as tarefas no Treeview sem aplicar nenhum filtro.
+        # Se for, carrega todas as tarefas no Treeview sem filtrar por status.
         if filtro_escolhido == "Todos":
 
-            # Chama o método 'carregar_tarefas' sem argumentos para
+            # Chama o método 'carregar_tarefas' sem filtro de status para
             # carregar todas as tarefas.
-            self.carregar_tarefas()
+            self.carregar_tarefas(texto_busca=texto_busca, incluir_arquivo=incluir_arquivo,
+                                  somente_vencidas=somente_vencidas, tag=tag)
 
         else:
 
@@ -1271,8 +3687,990 @@ class GerenciadorTarefasApp:
             # O método 'carregar_tarefas' é chamado com o argumento 'filtro_status',
             # que corresponde ao status selecionado no ComboBox (por
             # exemplo, "Pendente" ou "Concluída").
-            self.carregar_tarefas(filtro_status=filtro_escolhido)
+            self.carregar_tarefas(filtro_status=filtro_escolhido, texto_busca=texto_busca,
+                                  incluir_arquivo=incluir_arquivo, somente_vencidas=somente_vencidas, tag=tag)
+
+    # Define o método 'atualizar_contagens', que consulta as contagens do painel de filtros.
+    def atualizar_contagens(self):
+
+        """
+        Este método consulta, em segundo plano, as quantidades por status, por
+        técnico e por tag das tarefas que atendem aos filtros da visão (a
+        busca rápida, feita apenas sobre as tarefas carregadas, não é
+        considerada), com uma única agregação ('contar_facetas') por coleção,
+        e as exibe no painel de filtros. As tags oferecidas no filtro por tag
+        passam a ser as encontradas, das mais frequentes para as menos
+        frequentes. O resultado de uma consulta superada é descartado.
+        """
+
+        if not self.conectado:
+            return
+        self.geracao_contagens += 1
+        geracao = self.geracao_contagens
+
+        # Os filtros são combinados com '$and', para que o status escolhido e
+        # o das tarefas vencidas (sempre "Pendente") não se sobreponham. A
+        # busca textual fica no nível principal, como exige o MongoDB. Como
+        # na lista, apenas as tarefas sem pai são contadas.
+        condicoes = [FILTRO_RAIZES]
+        if self.visao_status:
+            condicoes.append({"status": self.visao_status})
+        if self.visao_vencidas:
+            condicoes.append(filtro_vencidas(agora_utc()))
+        if self.visao_tag:
+            condicoes.append({"tags": self.visao_tag})
+        if self.visao_tecnico:
+            alternativas = [{"tecnico": self.visao_tecnico}]
+            tecnico_id = self.diretorio_tecnicos.id_por_nome(self.visao_tecnico)
+            if tecnico_id is not None:
+                alternativas.append({"tecnico_id": tecnico_id})
+            condicoes.append({"$or": alternativas})
+        filtro = {"$and": condicoes}
+        if self.texto_busca_atual:
+            filtro["$text"] = {"$search": self.texto_busca_atual}
+        colecoes = ["tarefas", COLECAO_ARQUIVO] if self.visao_arquivo else ["tarefas"]
+
+        def consultar():
+            facetas = {"tags": {}, "status": {}, "tecnicos": {}}
+            for colecao in colecoes:
+                for faceta, contagens in self.armazenamento.contar_facetas(filtro, colecao).items():
+                    for valor, quantidade in contagens.items():
+                        facetas[faceta][valor] = facetas[faceta].get(valor, 0) + quantidade
+            return facetas
+
+        def nome_tecnico(chave):
+            if chave is None:
+                return "Sem técnico"
+            return chave if isinstance(chave, str) else self.diretorio_tecnicos.nome_por_id(chave) or "N/A"
+
+        def exibir(facetas):
+            if geracao != self.geracao_contagens:
+                return
+            tags = sorted(facetas["tags"], key=lambda tag: (-facetas["tags"][tag], tag.casefold()))
+            self.combo_filtro_tag["values"] = [""] + tags
+            partes = [f"Status: {resumir_contagens(facetas['status'], nome=lambda status: status or 'N/A')}",
+                      f"Técnicos: {resumir_contagens(facetas['tecnicos'], nome=nome_tecnico)}"]
+            if tags:
+                partes.append(f"Tags: {resumir_contagens(facetas['tags'])}")
+            self.rotulo_contagens.config(text=" | ".join(partes))
+
+        def ao_falhar(erro):
+            if geracao == self.geracao_contagens:
+                self.rotulo_contagens.config(text="")
+
+        self.dados.executar(self.dados.chamar(consultar), ao_concluir=exibir, ao_falhar=ao_falhar)
+
+
+    # Define o método 'abrir_filas_tecnicos', que abre a visão das tarefas
+    # agrupadas por técnico.
+    def abrir_filas_tecnicos(self):
+
+        """
+        Este método abre uma janela com um nó por técnico, rotulado com as
+        quantidades de tarefas pendentes e concluídas. Abrir a janela custa
+        uma única agregação ('contar_tarefas_por_tecnico'); as tarefas de um
+        técnico só são consultadas quando o seu nó é expandido, em páginas de
+        [interface] tamanho_pagina_grupo tarefas. A última linha de um grupo
+        incompleto ("Carregar mais...") busca a página seguinte.
+        """
+
+        if not self.conectado:
+            messagebox.showwarning("Aviso", "A visão por técnico exige conexão com o banco de dados.")
+            return
+
+        tamanho_pagina = int(self.configuracao["interface"]["tamanho_pagina_grupo"])
+
+        # Cria uma janela top-level (não modal), para que a lista principal
+        # continue utilizável enquanto as filas são consultadas.
+        janela_filas = tk.Toplevel(self.janela)
+        janela_filas.title("Filas por Técnico")
+        janela_filas.geometry("800x450")
+        janela_filas.configure(bg="#f0f0f0")
+        janela_filas.transient(self.janela)
+
+        quadro = tk.Frame(janela_filas, bg="#f0f0f0")
+        quadro.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        barra = ttk.Scrollbar(quadro, orient=tk.VERTICAL)
+        barra.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # A coluna da árvore (#0) mostra os técnicos; as demais, as tarefas.
+        arvore = ttk.Treeview(quadro, columns=("Título", "Descrição", "Status", "Data da Criação"),
+                              show="tree headings", yscrollcommand=barra.set)
+        barra.config(command=arvore.yview)
+        arvore.heading("#0", text="Técnico")
+        arvore.column("#0", width=230)
+        for coluna, largura in (("Título", 160), ("Descrição", 220), ("Status", 80), ("Data da Criação", 100)):
+            arvore.heading(coluna, text=coluna)
+            arvore.column(coluna, width=largura)
+        arvore.tag_configure("grupo", font=("Arial", 10, "bold"))
+        arvore.tag_configure("aviso", foreground="#757575")
+        arvore.pack(fill=tk.BOTH, expand=True)
+
+        # Estado de cada grupo, indexado pelo 'iid' do seu nó: a chave do
+        # técnico, o '_id' da última tarefa exibida e se há uma consulta em andamento.
+        grupos = {}
+
+        def exibir_aviso(grupo, sufixo, texto):
+            arvore.insert(grupo, tk.END, iid=f"{grupo}:{sufixo}", text=texto, tags=("aviso",))
+
+        def ao_contar(resultados):
+            if not janela_filas.winfo_exists():
+                return
+            contagens = {}
+            for resultado in resultados:
+                quantidades = contagens.setdefault(resultado["tecnico"], {})
+                quantidades[resultado["status"]] = quantidades.get(resultado["status"], 0) + resultado["quantidade"]
+
+            def nome_grupo(chave):
+                if chave is None:
+                    return "Sem técnico"
+                if isinstance(chave, str):
+                    return chave
+                return self.diretorio_tecnicos.nome_por_id(chave) or "N/A"
+
+            # Os técnicos são listados em ordem alfabética; as tarefas sem
+            # técnico, por último.
+            for chave in sorted(contagens, key=lambda chave: (chave is None, nome_grupo(chave).casefold())):
+                quantidades = contagens[chave]
+                grupo = arvore.insert("", tk.END, tags=("grupo",),
+                                      text=f"{nome_grupo(chave)} ({quantidades.get('Pendente', 0)} pendentes, "
+                                           f"{quantidades.get('Concluída', 0)} concluídas)")
+                grupos[grupo] = {"chave": chave, "ultimo": None, "carregando": False}
+
+                # O nó recebe um filho provisório, para ser exibido como
+                # expansível sem que as suas tarefas sejam consultadas.
+                exibir_aviso(grupo, "carregando", "Carregando...")
+
+        def carregar_pagina(grupo):
+            estado = grupos[grupo]
+            if estado["carregando"]:
+                return
+            estado["carregando"] = True
+            self.dados.executar(self.dados.chamar(listar_pagina_tecnico, self.armazenamento, estado["chave"],
+                                                  estado["ultimo"], tamanho_pagina),
+                                ao_concluir=lambda resultado: exibir_pagina(grupo, *resultado),
+                                ao_falhar=lambda erro: ao_falhar_pagina(grupo, erro))
+
+        def exibir_pagina(grupo, tarefas, ha_mais):
+            if not janela_filas.winfo_exists():
+                return
+            estado = grupos[grupo]
+            estado["carregando"] = False
+            for sufixo in ("carregando", "mais"):
+                if arvore.exists(f"{grupo}:{sufixo}"):
+                    arvore.delete(f"{grupo}:{sufixo}")
+            for tarefa in tarefas:
+                tarefa_id = str(tarefa["_id"])
+                if not arvore.exists(tarefa_id):
+                    arvore.insert(grupo, tk.END, iid=tarefa_id, values=self.formatar_linha_tarefa(tarefa)[:4])
+            if tarefas:
+                estado["ultimo"] = tarefas[-1]["_id"]
+            if ha_mais:
+                exibir_aviso(grupo, "mais", "Carregar mais...")
+
+        def ao_falhar_pagina(grupo, erro):
+            if not janela_filas.winfo_exists():
+                return
+            grupos[grupo]["carregando"] = False
+            messagebox.showerror("Erro", f"Erro ao carregar as tarefas do técnico:\n\n{erro}", parent=janela_filas)
+
+        # Expandir um grupo ainda não consultado carrega a sua primeira página.
+        def ao_expandir(evento):
+            grupo = arvore.focus()
+            if grupo in grupos and arvore.exists(f"{grupo}:carregando"):
+                carregar_pagina(grupo)
+
+        # Selecionar a linha "Carregar mais..." carrega a página seguinte.
+        def ao_selecionar(evento):
+            for iid in arvore.selection():
+                if iid.endswith(":mais"):
+                    carregar_pagina(arvore.parent(iid))
+
+        arvore.bind("<<TreeviewOpen>>", ao_expandir)
+        arvore.bind("<<TreeviewSelect>>", ao_selecionar)
+
+        def ao_falhar_contagem(erro):
+            if janela_filas.winfo_exists():
+                messagebox.showerror("Erro", f"Erro ao consultar as filas por técnico:\n\n{erro}", parent=janela_filas)
+
+        self.dados.executar(self.dados.chamar(lambda: list(self.armazenamento.contar_tarefas_por_tecnico())),
+                            ao_concluir=ao_contar, ao_falhar=ao_falhar_contagem)
+
+    # Define o método 'abrir_resumo_periodo', que abre o resumo das tarefas
+    # por mês e técnico.
+    def abrir_resumo_periodo(self):
+
+        """
+        Este método abre uma janela com as quantidades de tarefas pendentes e
+        concluídas de cada mês e técnico no período escolhido (MM/AAAA). As
+        quantidades vêm do resumo mensal: um ano custa algumas dezenas de
+        documentos, e nenhuma tarefa é lida. As tarefas de um técnico ainda
+        gravadas com o nome legado são somadas às do técnico de mesmo nome.
+        """
+
+        if not self.conectado:
+            messagebox.showwarning("Aviso", "O resumo por período exige conexão com o banco de dados.")
+            return
+
+        janela_resumo = tk.Toplevel(self.janela)
+        janela_resumo.title("Resumo por Período")
+        janela_resumo.geometry("640x420")
+        janela_resumo.configure(bg="#f0f0f0")
+        janela_resumo.transient(self.janela)
+
+        # Campos do período, preenchidos com o ano corrente até o mês atual.
+        hoje = datetime.now()
+        quadro_periodo = tk.Frame(janela_resumo, bg="#f0f0f0")
+        quadro_periodo.pack(pady=10)
+        tk.Label(quadro_periodo, text="De (MM/AAAA):", font=("Arial", 11), bg="#f0f0f0").grid(row=0, column=0, padx=5)
+        entrada_inicio = tk.Entry(quadro_periodo, width=10, font=("Arial", 11))
+        entrada_inicio.insert(0, f"01/{hoje.year}")
+        entrada_inicio.grid(row=0, column=1, padx=5)
+        tk.Label(quadro_periodo, text="Até (MM/AAAA):", font=("Arial", 11), bg="#f0f0f0").grid(row=0, column=2, padx=5)
+        entrada_fim = tk.Entry(quadro_periodo, width=10, font=("Arial", 11))
+        entrada_fim.insert(0, hoje.strftime("%m/%Y"))
+        entrada_fim.grid(row=0, column=3, padx=5)
+
+        colunas = ("Mês", "Técnico", "Pendentes", "Concluídas", "Total")
+        arvore = ttk.Treeview(janela_resumo, columns=colunas, show="headings")
+        for coluna, largura in zip(colunas, (80, 220, 90, 90, 90)):
+            arvore.heading(coluna, text=coluna)
+            arvore.column(coluna, width=largura, anchor="w" if coluna == "Técnico" else "center")
+        arvore.tag_configure("total", font=("Arial", 10, "bold"))
+        arvore.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        # Converte MM/AAAA na chave AAAA-MM do resumo, ou None se inválido.
+        def mes_digitado(entrada):
+            try:
+                return datetime.strptime(entrada.get().strip(), "%m/%Y").strftime("%Y-%m")
+            except ValueError:
+                return None
+
+        def nome_grupo(chave):
+            if chave is None:
+                return "Sem técnico"
+            if isinstance(chave, str):
+                return chave
+            return self.diretorio_tecnicos.nome_por_id(chave) or "N/A"
+
+        def exibir(documentos):
+            if not janela_resumo.winfo_exists():
+                return
+            arvore.delete(*arvore.get_children())
+
+            # Soma as quantidades de cada mês e técnico (pelo nome exibido).
+            linhas = {}
+            for documento in documentos:
+                quantidades = linhas.setdefault((documento["mes"], nome_grupo(documento["tecnico"])), {})
+                quantidades[documento["status"]] = quantidades.get(documento["status"], 0) + documento["quantidade"]
+
+            totais = {"Pendente": 0, "Concluída": 0, "Total": 0}
+            for (mes, nome), quantidades in sorted(linhas.items(), key=lambda item: (item[0][0], item[0][1].casefold())):
+                total = sum(quantidades.values())
+                arvore.insert("", tk.END, values=(f"{mes[5:]}/{mes[:4]}", nome, quantidades.get("Pendente", 0),
+                                                   quantidades.get("Concluída", 0), total))
+                totais["Pendente"] += quantidades.get("Pendente", 0)
+                totais["Concluída"] += quantidades.get("Concluída", 0)
+                totais["Total"] += total
+            arvore.insert("", tk.END, values=("Total", "", totais["Pendente"], totais["Concluída"], totais["Total"]),
+                          tags=("total",))
+
+        def ao_falhar(erro):
+            if janela_resumo.winfo_exists():
+                messagebox.showerror("Erro", f"Erro ao consultar o resumo:\n\n{erro}", parent=janela_resumo)
+
+        def consultar():
+            inicio, fim = mes_digitado(entrada_inicio), mes_digitado(entrada_fim)
+            if inicio is None or fim is None or inicio > fim:
+                messagebox.showwarning("Aviso", "Informe um período válido no formato MM/AAAA.", parent=janela_resumo)
+                return
+            self.dados.executar(self.dados.chamar(ler_resumo, self.armazenamento, inicio, fim),
+                                ao_concluir=exibir, ao_falhar=ao_falhar)
+
+        botao_consultar = tk.Button(quadro_periodo,
+                                    text="Consultar",
+                                    command=consultar,
+                                    bg="#80cbc4",
+                                    font=("Arial", 11, "bold"),
+                                    width=12)
+        botao_consultar.grid(row=0, column=4, padx=10)
+
+        consultar()
+
+    # Define o método 'abrir_anexos', que abre a janela dos anexos da tarefa selecionada.
+    def abrir_anexos(self):
+
+        """
+        Este método abre uma janela com os anexos da tarefa selecionada. A
+        lista traz apenas os dados dos anexos (nome, tamanho e data); o
+        conteúdo só é transferido ao anexar, ao salvar um anexo ou ao gerar
+        a miniatura de uma imagem que ainda não está no cache local. As
+        transferências são feitas em segundo plano, uma por vez, com o
+        progresso exibido na janela. Os anexos de tarefas arquivadas podem
+        ser salvos, mas não incluídos nem removidos.
+        """
+
+        if not self.id_tarefa_selecionada:
+            messagebox.showwarning("Aviso", "Nenhuma tarefa selecionada.")
+            return
+        if not self.conectado:
+            messagebox.showwarning("Aviso", "Os anexos exigem conexão com o banco de dados.")
+            return
+
+        tarefa_id = self.id_tarefa_selecionada
+        arquivada = self.modelo.arquivada(tarefa_id)
+        colecao = self.colecao_arquivo if arquivada else self.colecao
+        registro = self.modelo.obter(tarefa_id)
+
+        janela_anexos = tk.Toplevel(self.janela)
+        janela_anexos.title(f"Anexos - {registro.titulo if registro else tarefa_id}")
+        janela_anexos.geometry("700x400")
+        janela_anexos.configure(bg="#f0f0f0")
+        janela_anexos.transient(self.janela)
+
+        quadro = tk.Frame(janela_anexos, bg="#f0f0f0")
+        quadro.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        arvore = ttk.Treeview(quadro, columns=("Nome", "Tamanho", "Enviado em"), show="headings",
+                              selectmode="browse")
+        for coluna, largura in (("Nome", 250), ("Tamanho", 90), ("Enviado em", 130)):
+            arvore.heading(coluna, text=coluna)
+            arvore.column(coluna, width=largura)
+        arvore.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Miniatura da imagem selecionada.
+        rotulo_miniatura = tk.Label(quadro, bg="#ffffff", width=20)
+        rotulo_miniatura.pack(side=tk.RIGHT, fill=tk.Y, padx=(10, 0))
+
+        # Barra e texto do progresso das transferências.
+        quadro_progresso = tk.Frame(janela_anexos, bg="#f0f0f0")
+        quadro_progresso.pack(fill=tk.X, padx=10)
+        barra_progresso = ttk.Progressbar(quadro_progresso, mode="determinate")
+        barra_progresso.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        rotulo_progresso = tk.Label(quadro_progresso, bg="#f0f0f0", width=32, anchor="e")
+        rotulo_progresso.pack(side=tk.RIGHT)
+
+        quadro_botoes_anexos = tk.Frame(janela_anexos, bg="#f0f0f0")
+        quadro_botoes_anexos.pack(pady=10)
+
+        # Anexos exibidos, indexados pelo 'iid' da linha, se há uma
+        # transferência em andamento e a imagem da miniatura exibida (que
+        # precisa de uma referência para não ser descartada).
+        anexos_exibidos = {}
+        estado = {"transferindo": False, "miniatura": None}
+
+        def formatar_tamanho(tamanho):
+            if tamanho < 1024:
+                return f"{tamanho} B"
+            if tamanho < 1024 * 1024:
+                return f"{tamanho / 1024:.1f} KB"
+            return f"{tamanho / (1024 * 1024):.1f} MB"
+
+        def exibir_anexos(anexos):
+            if not janela_anexos.winfo_exists():
+                return
+            arvore.delete(*arvore.get_children())
+            anexos_exibidos.clear()
+            for anexo in anexos:
+                iid = str(anexo["_id"])
+                anexos_exibidos[iid] = anexo
+                enviado_em = anexo["enviado_em"].replace(tzinfo=timezone.utc).astimezone()
+                arvore.insert("", tk.END, iid=iid, values=(anexo["nome"], formatar_tamanho(anexo["tamanho"]),
+                                                           enviado_em.strftime("%d/%m/%Y %H:%M")))
+            rotulo_progresso.config(text=f"{len(anexos)} anexo(s)")
+
+        def recarregar():
+            self.executar_em_segundo_plano(lambda: listar_anexos(self.anexos, colecao, tarefa_id),
+                                           ao_concluir=exibir_anexos, ao_falhar=ao_falhar)
+
+        def ao_falhar(erro):
+            estado["transferindo"] = False
+            if janela_anexos.winfo_exists():
+                barra_progresso.config(value=0)
+                rotulo_progresso.config(text="")
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+            messagebox.showerror("Erro", f"Erro ao acessar os anexos:\n\n{str(erro)}")
+
+        # Retorna a função chamada pela thread de segundo plano a cada bloco
+        # transferido. O progresso é entregue à interface pela fila de resultados.
+        def informar_progresso(texto, total):
+            def exibir(transferidos):
+                if janela_anexos.winfo_exists():
+                    barra_progresso.config(maximum=max(total, 1), value=transferidos)
+                    rotulo_progresso.config(text=f"{texto}: {formatar_tamanho(transferidos)} de "
+                                                 f"{formatar_tamanho(total)}")
+
+            return lambda transferidos: self.fila_interface.put((exibir, transferidos))
+
+        def iniciar_transferencia():
+            if estado["transferindo"]:
+                messagebox.showwarning("Aviso", "Aguarde o fim da transferência em andamento.")
+                return False
+            estado["transferindo"] = True
+            return True
+
+        # Incluir ou remover um anexo altera a versão da tarefa.
+        def ao_alterar(versao):
+            estado["transferindo"] = False
+            registro_tarefa = self.modelo.obter(tarefa_id)
+            if registro_tarefa is not None:
+                registro_tarefa.atualizado_em = versao
+            if tarefa_id == self.id_tarefa_selecionada:
+                self.versao_tarefa_selecionada = versao
+            if janela_anexos.winfo_exists():
+                barra_progresso.config(value=0)
+                recarregar()
+
+        def anexar_arquivo():
+            caminho = filedialog.askopenfilename(parent=janela_anexos, title="Anexar Arquivo",
+                                                 filetypes=[("Imagens e PDF", "*.png *.jpg *.jpeg *.gif *.bmp *.pdf"),
+                                                            ("Todos os arquivos", "*.*")])
+            if not caminho or not iniciar_transferencia():
+                return
+            progresso = informar_progresso("Enviando", os.path.getsize(caminho))
+
+            # A miniatura de uma imagem é gerada a partir do arquivo local,
+            # sem recebê-la de volta.
+            def enviar():
+                anexo_id, versao = anexar(self.anexos, self.colecao, tarefa_id, caminho, progresso)
+                if self.cache_miniaturas and self.cache_miniaturas.suporta(tipo_arquivo(caminho)):
+                    self.cache_miniaturas.gerar(anexo_id, caminho)
+                return versao
+
+            self.executar_em_segundo_plano(enviar, ao_concluir=ao_alterar, ao_falhar=ao_falhar)
+
+        def anexo_selecionado():
+            selecao = arvore.selection()
+            if not selecao:
+                messagebox.showwarning("Aviso", "Nenhum anexo selecionado.")
+                return None
+            return anexos_exibidos[selecao[0]]
+
+        def salvar():
+            anexo = anexo_selecionado()
+            if anexo is None:
+                return
+            caminho = filedialog.asksaveasfilename(parent=janela_anexos, title="Salvar Anexo",
+                                                   initialfile=anexo["nome"])
+            if not caminho or not iniciar_transferencia():
+                return
+            progresso = informar_progresso("Recebendo", anexo["tamanho"])
+
+            def ao_salvar(caminho_salvo):
+                estado["transferindo"] = False
+                if janela_anexos.winfo_exists():
+                    barra_progresso.config(value=0)
+                    rotulo_progresso.config(text=f"Salvo: {os.path.basename(caminho_salvo)}")
+
+            self.executar_em_segundo_plano(lambda: salvar_anexo(self.anexos, anexo["_id"], caminho, progresso),
+                                           ao_concluir=ao_salvar, ao_falhar=ao_falhar)
+
+        def remover():
+            anexo = anexo_selecionado()
+            if anexo is None or not messagebox.askyesno("Confirmar Exclusão",
+                                                        f"Deseja realmente remover o anexo '{anexo['nome']}'?"):
+                return
+            if not iniciar_transferencia():
+                return
+
+            def excluir():
+                versao = remover_anexo(self.anexos, self.colecao, tarefa_id, anexo["_id"])
+                if self.cache_miniaturas:
+                    self.cache_miniaturas.remover(anexo["_id"])
+                return versao
+
+            self.executar_em_segundo_plano(excluir, ao_concluir=ao_alterar, ao_falhar=ao_falhar)
+
+        def exibir_miniatura(iid, caminho):
+            if not janela_anexos.winfo_exists() or arvore.selection() != (iid,):
+                return
+            estado["miniatura"] = None
+            if caminho:
+                try:
+                    estado["miniatura"] = tk.PhotoImage(file=caminho)
+                except tk.TclError:
+                    pass
+            rotulo_miniatura.config(image=estado["miniatura"] or "", text="" if estado["miniatura"] else "Sem miniatura")
+
+        # Ao selecionar uma imagem, exibe a miniatura do cache ou a gera em segundo plano.
+        def ao_selecionar(evento):
+            selecao = arvore.selection()
+            if not selecao:
+                return
+            anexo = anexos_exibidos[selecao[0]]
+            if not self.cache_miniaturas or not self.cache_miniaturas.suporta(anexo["tipo"]):
+                exibir_miniatura(selecao[0], None)
+            elif self.cache_miniaturas.obter(anexo["_id"]):
+                exibir_miniatura(selecao[0], self.cache_miniaturas.obter(anexo["_id"]))
+            else:
+                estado["miniatura"] = None
+                rotulo_miniatura.config(image="", text="Gerando miniatura...")
+                self.executar_em_segundo_plano(lambda: obter_miniatura(self.anexos, self.cache_miniaturas, anexo),
+                                               ao_concluir=lambda caminho: exibir_miniatura(selecao[0], caminho),
+                                               ao_falhar=lambda erro: exibir_miniatura(selecao[0], None))
+
+        arvore.bind("<<TreeviewSelect>>", ao_selecionar)
+
+        estado_edicao = tk.DISABLED if arquivada else tk.NORMAL
+        for coluna, (texto, comando, cor, estado_botao) in enumerate((
+                ("Anexar...", anexar_arquivo, "#a5d6a7", estado_edicao),
+                ("Salvar como...", salvar, "#90caf9", tk.NORMAL),
+                ("Remover", remover, "#ef9a9a", estado_edicao))):
+            tk.Button(quadro_botoes_anexos, text=texto, command=comando, bg=cor, font=("Arial", 11, "bold"),
+                      width=14, state=estado_botao).grid(row=0, column=coluna, padx=10)
+
+        recarregar()
+
+    # Define o método 'abrir_recorrentes', que abre a janela dos modelos de
+    # tarefas recorrentes.
+    def abrir_recorrentes(self):
+
+        """
+        Este método abre uma janela com os modelos de recorrência, onde eles
+        podem ser incluídos e removidos. Um modelo incluído gera as suas
+        ocorrências desde a data de início imediatamente. Remover um modelo
+        não exclui as tarefas já geradas.
+        """
+
+        if not self.conectado:
+            messagebox.showwarning("Aviso", "As tarefas recorrentes exigem conexão com o banco de dados.")
+            return
+
+        colecao_modelos = self.armazenamento.colecao(COLECAO_MODELOS)
+
+        janela_recorrentes = tk.Toplevel(self.janela)
+        janela_recorrentes.title("Tarefas Recorrentes")
+        janela_recorrentes.geometry("760x480")
+        janela_recorrentes.configure(bg="#f0f0f0")
+        janela_recorrentes.transient(self.janela)
+
+        quadro = tk.Frame(janela_recorrentes, bg="#f0f0f0")
+        quadro.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        arvore = ttk.Treeview(quadro, columns=("Título", "Regra", "Técnico", "Gerado até"), show="headings",
+                              selectmode="browse")
+        for coluna, largura in (("Título", 260), ("Regra", 160), ("Técnico", 150), ("Gerado até", 100)):
+            arvore.heading(coluna, text=coluna)
+            arvore.column(coluna, width=largura)
+        arvore.pack(fill=tk.BOTH, expand=True)
+
+        # Formulário de um novo modelo.
+        quadro_modelo = tk.Frame(janela_recorrentes, bg="#f0f0f0")
+        quadro_modelo.pack(padx=10)
+
+        def rotulo(texto, linha, coluna):
+            tk.Label(quadro_modelo, text=texto, font=("Arial", 11), bg="#f0f0f0").grid(
+                row=linha, column=coluna, sticky='e', padx=5, pady=3)
+
+        rotulo("Título:", 0, 0)
+        entrada_titulo = tk.Entry(quadro_modelo, width=30, font=("Arial", 11))
+        entrada_titulo.grid(row=0, column=1, sticky='w', padx=5, pady=3)
+
+        rotulo("Descrição:", 0, 2)
+        entrada_descricao = tk.Entry(quadro_modelo, width=30, font=("Arial", 11))
+        entrada_descricao.grid(row=0, column=3, sticky='w', padx=5, pady=3)
+
+        rotulo("Regra:", 1, 0)
+        nomes_regras = {nome: regra for regra, nome in NOMES_REGRAS.items()}
+        combo_regra = ttk.Combobox(quadro_modelo, values=list(nomes_regras), state="readonly", width=12,
+                                   font=("Arial", 11))
+        combo_regra.grid(row=1, column=1, sticky='w', padx=5, pady=3)
+
+        rotulo("Dia:", 1, 2)
+        combo_dia = ttk.Combobox(quadro_modelo, state="disabled", width=12, font=("Arial", 11))
+        combo_dia.grid(row=1, column=3, sticky='w', padx=5, pady=3)
+
+        rotulo("Técnico:", 2, 0)
+        combo_tecnico = ttk.Combobox(quadro_modelo, font=("Arial", 11), width=28)
+        combo_tecnico.grid(row=2, column=1, sticky='w', padx=5, pady=3)
+        self.configurar_busca_tecnicos(combo_tecnico, incluir_vazio=True)
+
+        rotulo("Início:", 2, 2)
+        entrada_inicio = tk.Entry(quadro_modelo, width=12, font=("Arial", 11))
+        entrada_inicio.insert(0, datetime.now().strftime("%d/%m/%Y"))
+        entrada_inicio.grid(row=2, column=3, sticky='w', padx=5, pady=3)
+
+        # O dia é o dia da semana na regra semanal e o dia do mês na mensal.
+        def ao_escolher_regra(_=None):
+            regra = nomes_regras.get(combo_regra.get())
+            if regra == REGRA_SEMANAL:
+                combo_dia.config(values=DIAS_SEMANA, state="readonly")
+                combo_dia.set(DIAS_SEMANA[0])
+            elif regra == REGRA_MENSAL:
+                combo_dia.config(values=[str(dia) for dia in range(1, 32)], state="readonly")
+                combo_dia.set("1")
+            else:
+                combo_dia.set("")
+                combo_dia.config(state="disabled")
+
+        combo_regra.bind("<<ComboboxSelected>>", ao_escolher_regra)
+        combo_regra.set(NOMES_REGRAS[REGRA_DIARIA])
+        ao_escolher_regra()
+
+        modelos_exibidos = {}
+
+        def descrever_regra(modelo):
+            nome = NOMES_REGRAS.get(modelo["regra"], modelo["regra"])
+            if modelo["regra"] == REGRA_SEMANAL:
+                return f"{nome} ({DIAS_SEMANA[modelo['dia']]})"
+            if modelo["regra"] == REGRA_MENSAL:
+                return f"{nome} (dia {modelo['dia']})"
+            return nome
+
+        def exibir_modelos(modelos):
+            if not janela_recorrentes.winfo_exists():
+                return
+            arvore.delete(*arvore.get_children())
+            modelos_exibidos.clear()
+            for modelo in modelos:
+                iid = str(modelo["_id"])
+                modelos_exibidos[iid] = modelo
+                gerado_ate = datetime.strptime(modelo["gerado_ate"], FORMATO_PERIODO).strftime("%d/%m/%Y")
+                arvore.insert("", tk.END, iid=iid, values=(modelo["titulo"], descrever_regra(modelo),
+                                                           self.nome_tecnico(modelo) or "N/A", gerado_ate))
+
+        def ao_falhar(erro):
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+            messagebox.showerror("Erro", f"Erro ao acessar as tarefas recorrentes:\n\n{str(erro)}")
+
+        def recarregar(_=None):
+            self.executar_em_segundo_plano(lambda: list(colecao_modelos.find().sort("titulo", 1)),
+                                           ao_concluir=exibir_modelos, ao_falhar=ao_falhar)
+
+        def adicionar():
+            titulo = entrada_titulo.get().strip()
+            if not titulo:
+                messagebox.showwarning("Aviso", "O título da tarefa não pode estar vazio.", parent=janela_recorrentes)
+                return
+            tecnico = combo_tecnico.get().strip()
+            if not self.validar_tecnico(tecnico):
+                return
+            regra = nomes_regras[combo_regra.get()]
+            dia = DIAS_SEMANA.index(combo_dia.get()) if regra == REGRA_SEMANAL else \
+                int(combo_dia.get()) if regra == REGRA_MENSAL else None
+            try:
+                inicio = datetime.strptime(entrada_inicio.get().strip(), "%d/%m/%Y").date()
+                modelo = novo_modelo(titulo, entrada_descricao.get().strip(),
+                                     self.diretorio_tecnicos.id_por_nome(tecnico) if tecnico else None,
+                                     regra, dia, inicio)
+            except ValueError as erro:
+                messagebox.showwarning("Aviso", f"Dados inválidos:\n\n{str(erro)}", parent=janela_recorrentes)
+                return
+
+            # As ocorrências do novo modelo são geradas logo após a inclusão.
+            def ao_incluir(_):
+                entrada_titulo.delete(0, tk.END)
+                entrada_descricao.delete(0, tk.END)
+                self.gerar_recorrentes(ao_concluir=recarregar)
+                recarregar()
+
+            self.executar_em_segundo_plano(lambda: colecao_modelos.insert_one(modelo),
+                                           ao_concluir=ao_incluir, ao_falhar=ao_falhar)
+
+        def remover():
+            selecao = arvore.selection()
+            if not selecao:
+                messagebox.showwarning("Aviso", "Nenhum modelo selecionado.", parent=janela_recorrentes)
+                return
+            modelo = modelos_exibidos[selecao[0]]
+            if not messagebox.askyesno("Confirmação", f"Remover o modelo '{modelo['titulo']}'? As tarefas já "
+                                       "geradas são mantidas.", parent=janela_recorrentes):
+                return
+            self.executar_em_segundo_plano(lambda: colecao_modelos.delete_one({"_id": modelo["_id"]}),
+                                           ao_concluir=recarregar, ao_falhar=ao_falhar)
+
+        quadro_botoes_recorrentes = tk.Frame(janela_recorrentes, bg="#f0f0f0")
+        quadro_botoes_recorrentes.pack(pady=10)
+        for coluna, (texto, comando, cor) in enumerate((
+                ("Adicionar", adicionar, "#a5d6a7"),
+                ("Remover", remover, "#ef9a9a"),
+                ("Gerar agora", lambda: self.gerar_recorrentes(ao_concluir=recarregar), "#90caf9"))):
+            tk.Button(quadro_botoes_recorrentes, text=texto, command=comando, bg=cor, font=("Arial", 11, "bold"),
+                      width=14).grid(row=0, column=coluna, padx=10)
+
+        recarregar()
+
+    # Define o método 'abrir_conflitos', que abre a janela das operações do
+    # diário offline que não foram aplicadas por conflito.
+    def abrir_conflitos(self):
+
+        """
+        Este método lista as operações em conflito do diário offline, com o
+        título atual da tarefa no servidor (quando há conexão) e o motivo do
+        conflito. As operações selecionadas podem ser reaplicadas sobre a
+        versão atual da tarefa, sobrescrevendo as alterações feitas em outra
+        estação, ou descartadas, mantendo essas alterações.
+        """
+
+        janela_conflitos = tk.Toplevel(self.janela)
+        janela_conflitos.title("Conflitos de Sincronização")
+        janela_conflitos.geometry("760x400")
+        janela_conflitos.configure(bg="#f0f0f0")
+        janela_conflitos.transient(self.janela)
+
+        quadro = tk.Frame(janela_conflitos, bg="#f0f0f0")
+        quadro.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        arvore = ttk.Treeview(quadro, columns=("Operação", "Tarefa", "Alteração", "Motivo"), show="headings")
+        for coluna, largura in (("Operação", 90), ("Tarefa", 200), ("Alteração", 200), ("Motivo", 250)):
+            arvore.heading(coluna, text=coluna)
+            arvore.column(coluna, width=largura)
+        arvore.pack(fill=tk.BOTH, expand=True)
+
+        nomes_operacoes = {OPERACAO_INSERIR: "Inclusão", OPERACAO_ATUALIZAR: "Alteração", OPERACAO_EXCLUIR: "Exclusão"}
+
+        # Os títulos são lidos do servidor em uma única consulta, pois as
+        # alterações guardam apenas os campos alterados.
+        def consultar():
+            conflitos = self.diario.conflitos()
+            titulos = {}
+            if self.conectado and conflitos:
+                ids = list({ObjectId(operacao.tarefa_id) for operacao, _ in conflitos})
+                titulos = {str(tarefa["_id"]): tarefa.get("titulo", "")
+                           for tarefa in self.colecao.find({"_id": {"$in": ids}}, {"titulo": 1})}
+            return conflitos, titulos
+
+        def exibir(resultado):
+            if not janela_conflitos.winfo_exists():
+                return
+            conflitos, titulos = resultado
+            arvore.delete(*arvore.get_children())
+            for operacao, motivo in conflitos:
+                dados = operacao.dados or {}
+                alteracao = ", ".join(f"{campo}: {valor}" for campo, valor in dados.items()
+                                      if campo in ("titulo", "descricao", "status"))
+                arvore.insert("", tk.END, iid=str(operacao.sequencia),
+                              values=(nomes_operacoes.get(operacao.operacao, operacao.operacao),
+                                      titulos.get(operacao.tarefa_id, dados.get("titulo", operacao.tarefa_id)),
+                                      alteracao, motivo or ""))
+
+        def ao_falhar(erro):
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+            messagebox.showerror("Erro", f"Erro ao acessar os conflitos:\n\n{str(erro)}", parent=janela_conflitos)
+
+        def recarregar(_=None):
+            self.executar_em_segundo_plano(consultar, ao_concluir=exibir, ao_falhar=ao_falhar)
+
+        def selecionadas():
+            selecao = [int(iid) for iid in arvore.selection()]
+            if not selecao:
+                messagebox.showwarning("Aviso", "Nenhuma operação selecionada.", parent=janela_conflitos)
+            return selecao
+
+        # As operações reaplicadas voltam a ser pendentes e são enviadas
+        # pela próxima sincronização.
+        def reaplicar():
+            sequencias = selecionadas()
+            if not sequencias:
+                return
+            if not self.conectado:
+                messagebox.showwarning("Aviso", "Reaplicar exige conexão com o banco de dados.",
+                                       parent=janela_conflitos)
+                return
+            if not messagebox.askyesno("Confirmação", "Reaplicar as operações selecionadas? As alterações feitas "
+                                       "em outra estação serão sobrescritas.", parent=janela_conflitos):
+                return
+
+            def ao_reaplicar(mantidas):
+                recarregar()
+                self.sincronizar_diario()
+                if mantidas:
+                    messagebox.showwarning("Aviso", f"{len(mantidas)} operação(ões) não foram reaplicadas, pois "
+                                           "a tarefa não existe mais. Descarte-as.", parent=janela_conflitos)
+
+            self.executar_em_segundo_plano(lambda: self.diario.reaplicar(self.colecao, sequencias),
+                                           ao_concluir=ao_reaplicar, ao_falhar=ao_falhar)
+
+        def descartar():
+            sequencias = selecionadas()
+            if not sequencias:
+                return
+            if not messagebox.askyesno("Confirmação", "Descartar as operações selecionadas? Elas não serão "
+                                       "enviadas ao servidor.", parent=janela_conflitos):
+                return
+            self.diario.descartar(sequencias)
+            recarregar()
+
+        quadro_botoes_conflitos = tk.Frame(janela_conflitos, bg="#f0f0f0")
+        quadro_botoes_conflitos.pack(pady=10)
+        for coluna, (texto, comando, cor) in enumerate((
+                ("Reaplicar", reaplicar, "#a5d6a7"),
+                ("Descartar", descartar, "#ef9a9a"))):
+            tk.Button(quadro_botoes_conflitos, text=texto, command=comando, bg=cor, font=("Arial", 11, "bold"),
+                      width=14).grid(row=0, column=coluna, padx=10)
+
+        recarregar()
+
+    # Define o método 'abrir_vinculos', que abre a janela da tarefa pai e das
+    # dependências da tarefa selecionada.
+    def abrir_vinculos(self):
+
+        """
+        Este método abre uma janela com a tarefa pai e as dependências da
+        tarefa selecionada, onde elas podem ser alteradas, e com a cadeia de
+        bloqueio (as dependências diretas e indiretas ainda pendentes) e o
+        progresso das subtarefas, calculados no banco de dados. As tarefas
+        são escolhidas pelo título; vínculos que formariam um ciclo são
+        recusados.
+        """
+
+        if not self.id_tarefa_selecionada:
+            messagebox.showwarning("Aviso", "Nenhuma tarefa selecionada.")
+            return
+        if self.modelo.arquivada(self.id_tarefa_selecionada):
+            messagebox.showwarning("Aviso", "Tarefas arquivadas não podem ser alteradas.")
+            return
+        if not self.conectado:
+            messagebox.showwarning("Aviso", "Os vínculos entre tarefas exigem conexão com o banco de dados.")
+            return
+
+        tarefa_id = ObjectId(self.id_tarefa_selecionada)
+
+        janela_vinculos = tk.Toplevel(self.janela)
+        janela_vinculos.title("Vínculos da Tarefa")
+        janela_vinculos.geometry("640x560")
+        janela_vinculos.configure(bg="#f0f0f0")
+        janela_vinculos.transient(self.janela)
+
+        rotulo_tarefa = tk.Label(janela_vinculos, font=("Arial", 12, "bold"), bg="#f0f0f0")
+        rotulo_tarefa.pack(padx=10, pady=(10, 5), anchor='w')
+
+        # Tarefa pai: um título vazio torna a tarefa uma tarefa sem pai.
+        quadro_pai = tk.Frame(janela_vinculos, bg="#f0f0f0")
+        quadro_pai.pack(fill=tk.X, padx=10, pady=5)
+        tk.Label(quadro_pai, text="Tarefa pai:", font=("Arial", 11), bg="#f0f0f0").pack(side=tk.LEFT, padx=5)
+        entrada_pai = tk.Entry(quadro_pai, width=40, font=("Arial", 11))
+        entrada_pai.pack(side=tk.LEFT, padx=5)
+
+        # Dependências diretas da tarefa.
+        tk.Label(janela_vinculos, text="Depende de:", font=("Arial", 11), bg="#f0f0f0").pack(padx=10, anchor='w')
+        arvore = ttk.Treeview(janela_vinculos, columns=("Título", "Status"), show="headings", selectmode="browse",
+                              height=6)
+        for coluna, largura in (("Título", 440), ("Status", 140)):
+            arvore.heading(coluna, text=coluna)
+            arvore.column(coluna, width=largura)
+        arvore.pack(fill=tk.X, padx=10)
+
+        quadro_dependencia = tk.Frame(janela_vinculos, bg="#f0f0f0")
+        quadro_dependencia.pack(fill=tk.X, padx=10, pady=5)
+        entrada_dependencia = tk.Entry(quadro_dependencia, width=40, font=("Arial", 11))
+        entrada_dependencia.pack(side=tk.LEFT, padx=5)
+
+        # Cadeia de bloqueio e progresso das subtarefas.
+        tk.Label(janela_vinculos, text="Cadeia de bloqueio:", font=("Arial", 11), bg="#f0f0f0").pack(
+            padx=10, anchor='w')
+        lista_bloqueios = tk.Listbox(janela_vinculos, height=6, font=("Arial", 10))
+        lista_bloqueios.pack(fill=tk.BOTH, expand=True, padx=10)
+        rotulo_progresso = tk.Label(janela_vinculos, font=("Arial", 11), bg="#f0f0f0")
+        rotulo_progresso.pack(padx=10, pady=(5, 10), anchor='w')
+
+        def consultar():
+            tarefa = self.colecao.find_one({"_id": tarefa_id}, {"titulo": 1, CAMPO_PAI: 1, CAMPO_DEPENDENCIAS: 1})
+            if tarefa is None:
+                return None
+            pai = None
+            if tarefa.get(CAMPO_PAI) is not None:
+                pai = self.colecao.find_one({"_id": tarefa[CAMPO_PAI]}, {"titulo": 1})
+            dependencias = list(self.colecao.find({"_id": {"$in": list(tarefa.get(CAMPO_DEPENDENCIAS) or ())}},
+                                                  {"titulo": 1, "status": 1}).sort("titulo", 1))
+            resumo = self.armazenamento.resumir_hierarquia([tarefa_id]).get(tarefa_id)
+            return tarefa, pai, dependencias, resumo
+
+        def exibir(resultado):
+            if not janela_vinculos.winfo_exists():
+                return
+            if resultado is None:
+                messagebox.showwarning("Aviso", "A tarefa não existe mais.", parent=janela_vinculos)
+                janela_vinculos.destroy()
+                return
+            tarefa, pai, dependencias, resumo = resultado
+            rotulo_tarefa.config(text=f"Tarefa: {tarefa['titulo']}")
+            entrada_pai.delete(0, tk.END)
+            if pai is not None:
+                entrada_pai.insert(0, pai["titulo"])
+            arvore.delete(*arvore.get_children())
+            for dependencia in dependencias:
+                arvore.insert("", tk.END, iid=str(dependencia["_id"]),
+                              values=(dependencia["titulo"], dependencia.get("status", "")))
+            lista_bloqueios.delete(0, tk.END)
+            for bloqueio in (resumo or {}).get("bloqueios", ()):
+                lista_bloqueios.insert(tk.END, f"nível {bloqueio['nivel'] + 1}: {bloqueio['titulo']}")
+            if lista_bloqueios.size() == 0:
+                lista_bloqueios.insert(tk.END, "Nenhuma dependência pendente.")
+            rotulo_progresso.config(text="Progresso das subtarefas: " + (formatar_progresso(resumo) or "sem subtarefas"))
+
+        def ao_falhar(erro):
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+            if isinstance(erro, ValueError):
+                messagebox.showwarning("Aviso", str(erro), parent=janela_vinculos)
+            else:
+                messagebox.showerror("Erro", f"Erro ao acessar os vínculos da tarefa:\n\n{str(erro)}",
+                                     parent=janela_vinculos)
+
+        def recarregar(_=None):
+            self.executar_em_segundo_plano(consultar, ao_concluir=exibir, ao_falhar=ao_falhar)
+
+        # Depois de uma alteração, a janela e a lista principal são recarregadas.
+        def ao_alterar(_):
+            recarregar()
+            self.carregar_tarefas(self.filtro_status_atual, self.texto_busca_atual, self.incluir_arquivo_atual,
+                                  self.vencidas_atual, self.tag_atual)
+
+        # Localiza pelo título a tarefa escolhida, que deve ser única.
+        def localizar(titulo):
+            encontradas = list(self.colecao.find({"titulo": titulo}, {"_id": 1}).limit(2))
+            if not encontradas:
+                raise ValueError(f"Nenhuma tarefa com o título '{titulo}'.")
+            if len(encontradas) > 1:
+                raise ValueError(f"Há mais de uma tarefa com o título '{titulo}'.")
+            return encontradas[0]["_id"]
+
+        def definir_pai():
+            titulo = entrada_pai.get().strip()
+
+            def gravar():
+                if titulo:
+                    vincular(self.armazenamento, tarefa_id, localizar(titulo), CAMPO_PAI)
+                else:
+                    self.colecao.update_one({"_id": tarefa_id}, {"$set": {CAMPO_PAI: None, "atualizado_em": agora_utc()}})
+
+            self.executar_em_segundo_plano(gravar, ao_concluir=ao_alterar, ao_falhar=ao_falhar)
+
+        def adicionar_dependencia():
+            titulo = entrada_dependencia.get().strip()
+            if not titulo:
+                messagebox.showwarning("Aviso", "Informe o título da tarefa.", parent=janela_vinculos)
+                return
+
+            def gravar():
+                vincular(self.armazenamento, tarefa_id, localizar(titulo), CAMPO_DEPENDENCIAS)
+
+            def ao_adicionar(resultado):
+                entrada_dependencia.delete(0, tk.END)
+                ao_alterar(resultado)
+
+            self.executar_em_segundo_plano(gravar, ao_concluir=ao_adicionar, ao_falhar=ao_falhar)
+
+        def remover_dependencia():
+            selecao = arvore.selection()
+            if not selecao:
+                messagebox.showwarning("Aviso", "Nenhuma dependência selecionada.", parent=janela_vinculos)
+                return
+            dependencia_id = ObjectId(selecao[0])
+            self.executar_em_segundo_plano(
+                lambda: self.colecao.update_one({"_id": tarefa_id}, {"$pull": {CAMPO_DEPENDENCIAS: dependencia_id},
+                                                                     "$set": {"atualizado_em": agora_utc()}}),
+                ao_concluir=ao_alterar, ao_falhar=ao_falhar)
+
+        tk.Button(quadro_pai, text="Definir pai", command=definir_pai, bg="#90caf9", font=("Arial", 11, "bold"),
+                  width=12).pack(side=tk.LEFT, padx=5)
+        for texto, comando, cor in (("Adicionar", adicionar_dependencia, "#a5d6a7"),
+                                    ("Remover", remover_dependencia, "#ef9a9a")):
+            tk.Button(quadro_dependencia, text=texto, command=comando, bg=cor, font=("Arial", 11, "bold"),
+                      width=12).pack(side=tk.LEFT, padx=5)
 
+        recarregar()
 
     # Define o método 'selecionar_tipo_relatorio', que abre uma janela
     # para o usuário escolher entre relatório geral ou por técnico.
@@ -1280,13 +4678,14 @@ class GerenciadorTarefasApp:
 
         """
         Este método abre uma janela de diálogo para o usuário escolher
-        o tipo de relatório: geral (todas as tarefas) ou por técnico.
+        o tipo de relatório: geral (todas as tarefas), por técnico ou o
+        pacote completo (geral, por técnico, por status e CSV).
         """
 
         # Cria uma janela top-level (popup) para seleção do tipo de relatório.
         janela_selecao = tk.Toplevel(self.janela)
         janela_selecao.title("Tipo de Relatório")
-        janela_selecao.geometry("400x200")
+        janela_selecao.geometry("420x290")
         janela_selecao.configure(bg="#f0f0f0")
         janela_selecao.transient(self.janela)  # Mantém a janela acima da principal
         janela_selecao.grab_set()  # Torna a janela modal
@@ -1319,37 +4718,40 @@ class GerenciadorTarefasApp:
                                       bg="#f0f0f0")
         radio_tecnico.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky='w')
 
+        # Cria um botão de rádio para o pacote completo de relatórios.
+        radio_pacote = tk.Radiobutton(janela_selecao,
+                                      text="Pacote completo (geral, por técnico, por status e CSV)",
+                                      variable=tipo_relatorio,
+                                      value="pacote",
+                                      font=("Arial", 11),
+                                      bg="#f0f0f0")
+        radio_pacote.grid(row=3, column=0, columnspan=2, padx=10, pady=(0, 10), sticky='w')
+
         # Cria um rótulo para o ComboBox de técnicos.
         rotulo_tecnico = tk.Label(janela_selecao,
                                   text="Selecione o técnico:",
                                   font=("Arial", 11),
                                   bg="#f0f0f0")
-        rotulo_tecnico.grid(row=3, column=0, padx=10, pady=10, sticky='e')
+        rotulo_tecnico.grid(row=4, column=0, padx=10, pady=10, sticky='e')
 
         # Cria uma variável para o técnico selecionado.
         var_tecnico_selecao = tk.StringVar()
 
         # Cria um ComboBox para selecionar o técnico.
+        # A lista vem do diretório de técnicos em memória e é filtrada
+        # conforme o usuário digita.
         combo_tecnico_selecao = ttk.Combobox(janela_selecao,
                                              textvariable=var_tecnico_selecao,
-                                             state='readonly',
                                              font=("Arial", 11),
                                              width=25)
+        self.configurar_busca_tecnicos(combo_tecnico_selecao)
 
-        # Carrega a lista de técnicos.
-        try:
-            tecnicos = self.colecao_tecnicos.find().sort("nome", 1)
-            lista_tecnicos = [tecnico["nome"] for tecnico in tecnicos]
-            combo_tecnico_selecao['values'] = lista_tecnicos
-        except:
-            combo_tecnico_selecao['values'] = []
-
-        combo_tecnico_selecao.grid(row=3, column=1, padx=10, pady=10, sticky='w')
+        combo_tecnico_selecao.grid(row=4, column=1, padx=10, pady=10, sticky='w')
 
         # Função para habilitar/desabilitar o ComboBox de técnicos.
         def atualizar_combo():
             if tipo_relatorio.get() == "tecnico":
-                combo_tecnico_selecao.config(state='readonly')
+                combo_tecnico_selecao.config(state='normal')
             else:
                 combo_tecnico_selecao.config(state='disabled')
                 var_tecnico_selecao.set("")
@@ -1357,10 +4759,20 @@ class GerenciadorTarefasApp:
         # Vincula a função aos botões de rádio.
         radio_geral.config(command=atualizar_combo)
         radio_tecnico.config(command=atualizar_combo)
+        radio_pacote.config(command=atualizar_combo)
 
         # Inicializa o estado do ComboBox.
         atualizar_combo()
 
+        # Cria uma caixa de seleção para incluir as tarefas arquivadas.
+        var_incluir_arquivo = tk.BooleanVar(value=False)
+        caixa_arquivo = tk.Checkbutton(janela_selecao,
+                                       text="Incluir tarefas arquivadas",
+                                       variable=var_incluir_arquivo,
+                                       font=("Arial", 11),
+                                       bg="#f0f0f0")
+        caixa_arquivo.grid(row=5, column=0, columnspan=2, padx=10, sticky='w')
+
         # Função para gerar o relatório.
         def gerar_relatorio():
             tipo = tipo_relatorio.get()
@@ -1371,12 +4783,20 @@ class GerenciadorTarefasApp:
                 if not tecnico_selecionado:
                     messagebox.showwarning("Aviso", "Por favor, selecione um técnico.")
                     return
+                if not self.validar_tecnico(tecnico_selecionado):
+                    return
 
             # Fecha a janela de seleção.
             janela_selecao.destroy()
 
+            # O pacote completo gera todos os relatórios em uma única leitura.
+            if tipo == "pacote":
+                self.gerar_pacote_relatorios(incluir_arquivo=var_incluir_arquivo.get())
+                return
+
             # Chama o método de geração de PDF com o filtro apropriado.
-            self.gerar_relatorio_pdf(tecnico_filtro=tecnico_selecionado)
+            self.gerar_relatorio_pdf(tecnico_filtro=tecnico_selecionado,
+                                     incluir_arquivo=var_incluir_arquivo.get())
 
         # Cria um botão para gerar o relatório.
         botao_gerar = tk.Button(janela_selecao,
@@ -1385,13 +4805,67 @@ class GerenciadorTarefasApp:
                                bg="#90caf9",
                                font=("Arial", 11, "bold"),
                                width=15)
-        botao_gerar.grid(row=4, column=0, columnspan=2, pady=20)
+        botao_gerar.grid(row=6, column=0, columnspan=2, pady=20)
+
+
+    # Define o método 'ler_tarefas_relatorio', que lê as tarefas dos relatórios.
+    def ler_tarefas_relatorio(self, consulta, incluir_arquivo):
+
+        """
+        Este método retorna as tarefas que atendem à consulta, já com o nome
+        do técnico, ordenadas por data de criação (como a coluna da lista,
+        com 'chave_data') e pelo '_id'. Com o arquivo, as duas fontes já vêm
+        nessa ordem do banco de dados e são mescladas conforme são lidas, sem
+        ordenar o conjunto inteiro na memória.
+        """
+
+        fontes = [self.armazenamento.listar_tarefas_com_tecnico(consulta, ordenar_por_data=True)]
+        if incluir_arquivo:
+            fontes.append(self.armazenamento.listar_tarefas_com_tecnico(consulta, ordenar_por_data=True,
+                                                                        colecao=COLECAO_ARQUIVO))
+        return mesclar_ordenado(fontes, chave=lambda tarefa: (chave_data(tarefa.get("data_criacao")), tarefa["_id"]))
+
+    # Define o método 'gerar_pacote_relatorios', que gera todos os
+    # relatórios em uma única leitura das tarefas.
+    def gerar_pacote_relatorios(self, incluir_arquivo=False):
+
+        """
+        Este método gera, no diretório escolhido pelo usuário, o relatório
+        geral, um relatório por técnico, um por status e a exportação CSV.
+        As tarefas são lidas uma única vez, em segundo plano, e cada uma é
+        entregue a todos os relatórios em que aparece.
+        """
+
+        if not REPORTLAB_AVAILABLE:
+            messagebox.showerror("Erro", 
+                                "A biblioteca reportlab não está instalada.\n\n"
+                                "Para instalar, execute: pip install reportlab")
+            return
+
+        diretorio = filedialog.askdirectory(title="Diretório dos Relatórios")
+        if not diretorio:
+            return
+
+        def gerar():
+            return PacoteRelatorios(diretorio).processar(self.ler_tarefas_relatorio({}, incluir_arquivo))
+
+        def ao_gerar(resultado):
+            quantidade, arquivos = resultado
+            if not quantidade:
+                messagebox.showwarning("Aviso", "Não há tarefas para gerar o relatório.")
+                return
+            messagebox.showinfo("Sucesso",
+                                f"{len(arquivos)} arquivos gerados a partir de {quantidade} tarefas.\n\n"
+                                f"Arquivos salvos em:\n{diretorio}")
 
+        self.dados.executar(self.dados.chamar(gerar), ao_concluir=ao_gerar,
+                            ao_falhar=lambda erro: messagebox.showerror(
+                                "Erro", f"Erro ao gerar os relatórios:\n\n{str(erro)}"))
 
     # Define o método 'gerar_relatorio_pdf', que é responsável por
     # gerar um relatório em PDF com todas as tarefas do banco de dados
     # ou filtrado por técnico.
-    def gerar_relatorio_pdf(self, tecnico_filtro=None):
+    def gerar_relatorio_pdf(self, tecnico_filtro=None, incluir_arquivo=False):
 
         """
         Este método gera um relatório em PDF contendo as tarefas
@@ -1401,6 +4875,15 @@ class GerenciadorTarefasApp:
         Parâmetros:
         - tecnico_filtro: Nome do técnico para filtrar as tarefas (opcional).
                          Se None, gera relatório com todas as tarefas.
+        - incluir_arquivo: Se True, inclui as tarefas arquivadas, mescladas às
+                         ativas pela data de criação.
+
+        O filtro usa o '_id' do técnico, e os nomes são obtidos pelo
+        armazenamento em uma única consulta ('$lookup' no MongoDB e JOIN no SQLite).
+
+        Se um relatório com o mesmo tipo e filtros já foi gerado e as tarefas
+        não mudaram desde então (mesma quantidade e mesma data de alteração
+        mais recente), ele é copiado do cache de relatórios.
         """
 
         # Verifica se o reportlab está disponível.
@@ -1426,17 +4909,44 @@ class GerenciadorTarefasApp:
             # Cria a consulta para buscar as tarefas.
             consulta = {}
             
-            # Se houver filtro por técnico, adiciona à consulta.
+            # Se houver filtro por técnico, adiciona à consulta a referência
+            # ao técnico, obtida do diretório em memória.
+            if tecnico_filtro:
+                consulta["tecnico_id"] = self.diretorio_tecnicos.id_por_nome(tecnico_filtro)
+                if consulta["tecnico_id"] is None:
+                    messagebox.showwarning("Aviso", f"O técnico '{tecnico_filtro}' não está cadastrado.")
+                    return
+
+            # Consulta o cache de relatórios. A chave inclui a impressão digital
+            # das tarefas, calculada com duas consultas indexadas por coleção.
+            chave_cache = None
+            if self.cache_relatorios:
+                colecoes = ["tarefas", COLECAO_ARQUIVO] if incluir_arquivo else ["tarefas"]
+                chave_cache = self.cache_relatorios.chave(
+                    "tecnico" if tecnico_filtro else "geral",
+                    {"tecnico": tecnico_filtro, "tecnico_id": consulta.get("tecnico_id"), "incluir_arquivo": incluir_arquivo},
+                    impressao_tarefas(self.armazenamento, consulta, colecoes))
+                if self.cache_relatorios.obter(chave_cache, arquivo_pdf):
+                    messagebox.showinfo("Sucesso",
+                                        f"As tarefas não mudaram desde a última geração deste relatório, "
+                                        f"que foi copiado do cache.\n\n"
+                                        f"Arquivo salvo em:\n{arquivo_pdf}\n\n"
+                                        f"{self.cache_relatorios.descricao_taxa()}")
+                    return
+
+            # Define o título do relatório conforme o tipo.
             if tecnico_filtro:
-                consulta["tecnico"] = tecnico_filtro
+                titulo_texto = f"Relatório de Tarefas - {tecnico_filtro}"
+            else:
+                titulo_texto = "Relatório de Tarefas - Geral"
 
-            # Busca as tarefas do banco de dados MongoDB.
-            # Ordena por data de criação (1 = ascendente).
-            # Se não houver campo data_criacao, a ordenação será ignorada.
-            tarefas = list(self.colecao.find(consulta).sort("data_criacao", 1))
+            # Percorre as tarefas uma única vez, desenhando cada uma no PDF
+            # assim que é lida. O arquivo só é criado se houver tarefas.
+            relatorio = RelatorioPDF(arquivo_pdf, titulo_texto)
+            distribuir(self.ler_tarefas_relatorio(consulta, incluir_arquivo), lambda tarefa: (relatorio,))
 
             # Verifica se há tarefas para incluir no relatório.
-            if not tarefas:
+            if not relatorio.fechar():
                 if tecnico_filtro:
                     messagebox.showwarning("Aviso", 
                                          f"Não há tarefas para o técnico '{tecnico_filtro}'.")
@@ -1444,141 +4954,19 @@ class GerenciadorTarefasApp:
                     messagebox.showwarning("Aviso", "Não há tarefas para gerar o relatório.")
                 return
 
-            # Cria o documento PDF usando SimpleDocTemplate.
-            # 'arquivo_pdf' é o caminho onde o PDF será salvo.
-            # 'pagesize=A4' define o tamanho da página como A4.
-            doc = SimpleDocTemplate(arquivo_pdf, pagesize=A4)
-
-            # Lista que armazenará os elementos do PDF (tabelas, parágrafos, etc.).
-            elementos = []
-
-            # Obtém estilos de texto pré-definidos.
-            estilos = getSampleStyleSheet()
-
-            # Cria um estilo personalizado para o título do relatório.
-            estilo_titulo = ParagraphStyle(
-                'TituloCustomizado',
-                parent=estilos['Heading1'],
-                fontSize=20,
-                textColor=colors.HexColor('#1976d2'),
-                spaceAfter=30,
-                alignment=1  # Centralizado
-            )
-
-            # Define o título do relatório conforme o tipo.
-            if tecnico_filtro:
-                titulo_texto = f"Relatório de Tarefas - {tecnico_filtro}"
-            else:
-                titulo_texto = "Relatório de Tarefas - Geral"
-
-            # Adiciona o título do relatório ao PDF.
-            titulo = Paragraph(titulo_texto, estilo_titulo)
-            elementos.append(titulo)
-
-            # Adiciona a data de geração do relatório.
-            data_geracao = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-            estilo_data = ParagraphStyle(
-                'DataCustomizada',
-                parent=estilos['Normal'],
-                fontSize=10,
-                textColor=colors.HexColor('#666666'),
-                alignment=1  # Centralizado
-            )
-            data_paragrafo = Paragraph(f"Gerado em: {data_geracao}", estilo_data)
-            elementos.append(data_paragrafo)
-            elementos.append(Spacer(1, 0.3 * inch))
-
-            # Prepara os dados para a tabela.
-            # Cabeçalho da tabela.
-            dados_tabela = [['Título', 'Descrição', 'Status', 'Data de Criação', 'Técnico']]
-
-            # Adiciona cada tarefa como uma linha na tabela.
-            for tarefa in tarefas:
-                # Obtém os dados da tarefa, tratando valores ausentes.
-                titulo_tarefa = tarefa.get("titulo", "N/A")
-                descricao_tarefa = tarefa.get("descricao", "N/A")
-                # Limita o tamanho da descrição para não quebrar o layout
-                if len(descricao_tarefa) > 40:
-                    descricao_tarefa = descricao_tarefa[:37] + "..."
-                status_tarefa = tarefa.get("status", "N/A")
-
-                # Formata a data de criação.
-                if "data_criacao" in tarefa:
-                    data_criacao = tarefa["data_criacao"]
-                    if isinstance(data_criacao, datetime):
-                        data_formatada = data_criacao.strftime("%d/%m/%Y")
-                    else:
-                        data_formatada = str(data_criacao)
-                else:
-                    data_formatada = "N/A"
-
-                # Obtém o nome do técnico responsável.
-                tecnico_tarefa = tarefa.get("tecnico", "N/A")
-                if not tecnico_tarefa:
-                    tecnico_tarefa = "N/A"
-
-                # Adiciona a linha da tarefa aos dados da tabela.
-                dados_tabela.append([titulo_tarefa, descricao_tarefa, status_tarefa, data_formatada, tecnico_tarefa])
-
-            # Cria a tabela com os dados.
-            # Ajusta as larguras das colunas para caber na página A4 (largura útil ~7.5 inch).
-            # Título: 1.5 inch, Descrição: 2.2 inch, Status: 0.9 inch, Data: 1.2 inch, Técnico: 1.2 inch
-            tabela = Table(dados_tabela, colWidths=[1.5*inch, 2.2*inch, 0.9*inch, 1.4*inch, 1.3*inch])
-
-            # Define o estilo da tabela.
-            estilo_tabela = TableStyle([
-                # Estilo do cabeçalho
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976d2')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('TOPPADDING', (0, 0), (-1, 0), 12),
-                # Estilo das linhas de dados
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
-            ])
-
-            # Aplica o estilo à tabela.
-            tabela.setStyle(estilo_tabela)
-
-            # Adiciona a tabela aos elementos do PDF.
-            elementos.append(tabela)
-
-            # Adiciona informações de resumo no final do relatório.
-            elementos.append(Spacer(1, 0.3 * inch))
-            total_tarefas = len(tarefas)
-            pendentes = sum(1 for t in tarefas if t.get("status") == "Pendente")
-            concluidas = sum(1 for t in tarefas if t.get("status") == "Concluída")
-
-            estilo_resumo = ParagraphStyle(
-                'ResumoCustomizado',
-                parent=estilos['Normal'],
-                fontSize=11,
-                textColor=colors.HexColor('#333333'),
-                spaceAfter=10
-            )
-
-            resumo = Paragraph(
-                f"<b>Resumo:</b><br/>"
-                f"Total de tarefas: {total_tarefas}<br/>"
-                f"Pendentes: {pendentes}<br/>"
-                f"Concluídas: {concluidas}",
-                estilo_resumo
-            )
-            elementos.append(resumo)
-
-            # Constrói o PDF com todos os elementos adicionados.
-            doc.build(elementos)
+            # Guarda o relatório no cache. Uma falha ao gravar no cache não
+            # afeta o relatório já salvo.
+            if chave_cache:
+                try:
+                    self.cache_relatorios.guardar(chave_cache, arquivo_pdf)
+                except OSError:
+                    pass
 
             # Exibe mensagem de sucesso ao usuário.
             messagebox.showinfo("Sucesso", 
                               f"Relatório PDF gerado com sucesso!\n\n"
-                              f"Arquivo salvo em:\n{arquivo_pdf}")
+                              f"Arquivo salvo em:\n{arquivo_pdf}"
+                              + (f"\n\n{self.cache_relatorios.descricao_taxa()}" if self.cache_relatorios else ""))
 
         except Exception as e:
             # Em caso de erro, exibe uma mensagem de erro ao usuário.
@@ -1594,8 +4982,10 @@ class GerenciadorTarefasApp:
 
         """
         Este método é executado ao selecionar uma tarefa no Treeview.
-        Ele carrega os dados da tarefa selecionada nos campos de entrada da interface,
-        permitindo que o usuário visualize ou edite as informações.
+        Ele lê os dados completos da tarefa selecionada em segundo plano e,
+        se ela ainda estiver selecionada ao fim da leitura, os carrega nos
+        campos de entrada da interface ('preencher_formulario'), permitindo
+        que o usuário visualize ou edite as informações.
         """
 
         # Obtém a seleção atual no Treeview.
@@ -1604,88 +4994,162 @@ class GerenciadorTarefasApp:
         selecionado = self.arvore_tarefas.selection()
 
         # Verifica se há algum item selecionado no Treeview.
-        if selecionado:
-
-            # Define 'id_tarefa_selecionada' como o identificador do
-            # primeiro item selecionado.
-            # Neste caso, o identificador corresponde ao '_id' do
-            # MongoDB convertido para string.
-            self.id_tarefa_selecionada = selecionado[0]
-
-            # Busca os dados completos da tarefa no banco de dados
-            # MongoDB usando o identificador '_id'.
-            # 'find_one' retorna o documento correspondente ao filtro fornecido.
-            # 'ObjectId' é usado para converter o identificador string de
-            # volta para o formato de objeto do MongoDB.
-            dados_tarefa = self.colecao.find_one({"_id": ObjectId(self.id_tarefa_selecionada)})
-
-            # Verifica se a tarefa foi encontrada no banco de dados.
-            if dados_tarefa:
-
-                # Limpa o campo de entrada do título, removendo qualquer
-                # texto anteriormente inserido.
-                self.entrada_titulo.delete(0, tk.END)
-
-                # Insere o título da tarefa encontrada no campo de entrada.
-                self.entrada_titulo.insert(tk.END, dados_tarefa["titulo"])
-
-                # Limpa o campo de texto da descrição, removendo qualquer
-                # texto previamente inserido.
-                self.texto_descricao.delete("1.0", tk.END)
-
-                # Insere a descrição da tarefa encontrada no campo de texto.
-                self.texto_descricao.insert(tk.END, dados_tarefa["descricao"])
-
-                # Define o status da tarefa no ComboBox, atualizando a
-                # seleção para o status da tarefa carregada.
-                self.var_status.set(dados_tarefa["status"])
-
-                # Define o técnico da tarefa no ComboBox, atualizando a
-                # seleção para o técnico da tarefa carregada.
-                tecnico_tarefa = dados_tarefa.get("tecnico", "")
-                self.var_tecnico.set(tecnico_tarefa if tecnico_tarefa else "")
-
-                # Define a data da tarefa no campo de data.
-                # Se a tarefa tiver uma data de criação, carrega essa data.
-                # Caso contrário, usa a data atual.
-                if "data_criacao" in dados_tarefa:
-                    data_tarefa = dados_tarefa["data_criacao"]
-                    # Se a data estiver como string, converte para datetime
-                    if isinstance(data_tarefa, str):
-                        try:
-                            data_obj = datetime.strptime(data_tarefa, "%d/%m/%Y")
-                        except ValueError:
-                            data_obj = datetime.now()
-                    else:
-                        data_obj = data_tarefa
-                else:
-                    data_obj = datetime.now()
+        # A linha provisória das subtarefas não é uma tarefa.
+        if not selecionado or selecionado[0] not in self.modelo:
+            return
+
+        # O identificador corresponde ao '_id' do MongoDB convertido para string.
+        tarefa_id = selecionado[0]
+        self.geracao_selecao += 1
+        geracao = self.geracao_selecao
+
+        # Sem conexão, ou se a leitura falhar ou não encontrar a tarefa (ainda
+        # não sincronizada), os dados são obtidos do modelo de tarefas em memória.
+        def ao_ler(dados_tarefa):
+            if geracao == self.geracao_selecao:
+                self.preencher_formulario(tarefa_id, dados_tarefa or self.tarefa_da_linha(tarefa_id))
+
+        def ao_falhar(erro):
+            if isinstance(erro, ConnectionFailure):
+                self.ao_falhar_conexao(erro)
+            ao_ler(None)
+
+        if not self.conectado:
+            ao_ler(None)
+            return
+
+        # Busca os dados completos da tarefa no banco de dados
+        # MongoDB usando o identificador '_id'.
+        # 'find_one' retorna o documento correspondente ao filtro fornecido.
+        # 'ObjectId' é usado para converter o identificador string de
+        # volta para o formato de objeto do MongoDB.
+        # Tarefas arquivadas são lidas da coleção de arquivo.
+        colecao = self.colecao_arquivo if self.modelo.arquivada(tarefa_id) else self.colecao
+        self.dados.executar(self.dados.chamar(colecao.find_one, {"_id": ObjectId(tarefa_id)}),
+                            ao_concluir=ao_ler, ao_falhar=ao_falhar)
 
-                # Atualiza o campo de data com a data da tarefa.
-                if DateEntry and isinstance(self.entrada_data, DateEntry):
-                    # DateEntry: define a data usando set_date
-                    self.entrada_data.set_date(data_obj.date())
+    # Define o método 'preencher_formulario', que exibe a tarefa selecionada
+    # nos campos de entrada da interface.
+    def preencher_formulario(self, tarefa_id, dados_tarefa):
+
+        """
+        Este método torna 'tarefa_id' a tarefa selecionada e carrega os seus
+        dados nos campos de entrada, com as alterações que ainda aguardam
+        sincronização e as edições de células ainda não gravadas.
+        """
+
+        # Define 'id_tarefa_selecionada' como o identificador da tarefa
+        # lida. Até aqui, o formulário e a versão guardada ainda são os da
+        # tarefa selecionada anteriormente.
+        self.id_tarefa_selecionada = tarefa_id
+
+        # Aplica as alterações que ainda aguardam sincronização.
+        # Tarefas excluídas sem conexão não podem mais ser editadas.
+        pendente = self.diario.estado_pendente().get(self.id_tarefa_selecionada)
+        if pendente:
+            if pendente[0] == OPERACAO_EXCLUIR:
+                self.id_tarefa_selecionada = None
+                return
+            dados_tarefa = dict(dados_tarefa, **pendente[1])
+
+        # Aplica as edições de células ainda não gravadas.
+        dados_tarefa = dict(dados_tarefa, **self.alteracoes_celulas.campos(self.id_tarefa_selecionada))
+
+        # Guarda a versão da tarefa, usada na detecção de conflitos.
+        self.versao_tarefa_selecionada = dados_tarefa.get("atualizado_em")
+
+        # Verifica se a tarefa foi encontrada no banco de dados.
+        if dados_tarefa:
+
+            # Limpa o campo de entrada do título, removendo qualquer
+            # texto anteriormente inserido.
+            self.entrada_titulo.delete(0, tk.END)
+
+            # Insere o título da tarefa encontrada no campo de entrada.
+            self.entrada_titulo.insert(tk.END, dados_tarefa["titulo"])
+
+            # Limpa o campo de texto da descrição, removendo qualquer
+            # texto previamente inserido.
+            self.texto_descricao.delete("1.0", tk.END)
+
+            # Insere a descrição da tarefa encontrada no campo de texto.
+            self.texto_descricao.insert(tk.END, dados_tarefa["descricao"])
+
+            # Define o status da tarefa no ComboBox, atualizando a
+            # seleção para o status da tarefa carregada.
+            self.var_status.set(dados_tarefa["status"])
+
+            # Define o técnico da tarefa no ComboBox, atualizando a
+            # seleção para o técnico da tarefa carregada.
+            self.var_tecnico.set(self.nome_tecnico(dados_tarefa))
+
+            # Define a data da tarefa no campo de data.
+            # Se a tarefa tiver uma data de criação, carrega essa data.
+            # Caso contrário, usa a data atual.
+            if "data_criacao" in dados_tarefa:
+                data_tarefa = dados_tarefa["data_criacao"]
+                # Se a data estiver como string, converte para datetime
+                if isinstance(data_tarefa, str):
+                    try:
+                        data_obj = datetime.strptime(data_tarefa, "%d/%m/%Y")
+                    except ValueError:
+                        data_obj = datetime.now()
                 else:
-                    # Entry comum: limpa e insere a data formatada
-                    self.entrada_data.delete(0, tk.END)
-                    self.entrada_data.insert(0, data_obj.strftime("%d/%m/%Y"))
-
-
-# Cria a janela principal da aplicação.
-# 'tk.Tk()' inicializa a instância principal da janela Tkinter, que
-        # será usada como o contêiner principal da interface gráfica.
-janela_principal = tk.Tk()
-
-# Cria uma instância da classe 'GerenciadorTarefasApp'.
-# A janela principal criada anteriormente ('janela_principal') é
-        # passada como argumento para o construtor da classe.
-# Isso permite que a interface gráfica definida na classe 'GerenciadorTarefasApp'
-        # seja exibida na janela principal.
-app = GerenciadorTarefasApp(janela_principal)
-
-# Inicia o loop principal da interface gráfica.
-# 'mainloop()' é um método do Tkinter que mantém a janela
-        # aberta e responsiva a interações do usuário,
-# como cliques, entradas de dados e comandos. Ele monitora eventos e
-        # atualiza a interface constantemente.
-janela_principal.mainloop()
\ No newline at end of file
+                    data_obj = data_tarefa
+            else:
+                data_obj = datetime.now()
+
+            # Atualiza o campo de data com a data da tarefa.
+            if DateEntry and isinstance(self.entrada_data, DateEntry):
+                # DateEntry: define a data usando set_date
+                self.entrada_data.set_date(data_obj.date())
+            else:
+                # Entry comum: limpa e insere a data formatada
+                self.entrada_data.delete(0, tk.END)
+                self.entrada_data.insert(0, data_obj.strftime("%d/%m/%Y"))
+
+            # Exibe o prazo da tarefa em horário local.
+            self.entrada_prazo.delete(0, tk.END)
+            self.entrada_prazo.insert(0, formatar_prazo(dados_tarefa.get("data_limite")))
+
+            # Exibe as tags da tarefa, separadas por vírgulas.
+            self.entrada_tags.delete(0, tk.END)
+            self.entrada_tags.insert(0, formatar_tags(dados_tarefa.get("tags")))
+
+
+# Executa a aplicação apenas quando o arquivo é executado diretamente,
+# permitindo que a classe seja importada por outros módulos.
+if __name__ == "__main__":
+
+    # Lê as opções de linha de comando.
+    # - '--config' indica um arquivo de configuração alternativo.
+    # - '--armazenamento' escolhe o armazenamento ('mongodb' ou 'sqlite'),
+    #   sobrescrevendo o valor do arquivo de configuração.
+    leitor_argumentos = argparse.ArgumentParser(description="Gerenciador de Tarefas")
+    leitor_argumentos.add_argument("--config", help="caminho do arquivo de configuração")
+    leitor_argumentos.add_argument("--armazenamento", choices=["mongodb", "sqlite"],
+                                   help="armazenamento das tarefas")
+    argumentos = leitor_argumentos.parse_args()
+
+    configuracao = carregar_configuracao(argumentos.config)
+    if argumentos.armazenamento:
+        configuracao["armazenamento"]["tipo"] = argumentos.armazenamento
+
+    # Cria a janela principal da aplicação.
+    # 'tk.Tk()' inicializa a instância principal da janela Tkinter, que
+    # será usada como o contêiner principal da interface gráfica.
+    janela_principal = tk.Tk()
+
+    # Cria uma instância da classe 'GerenciadorTarefasApp'.
+    # A janela principal criada anteriormente ('janela_principal') é
+    # passada como argumento para o construtor da classe.
+    # Isso permite que a interface gráfica definida na classe 'GerenciadorTarefasApp'
+    # seja exibida na janela principal.
+    app = GerenciadorTarefasApp(janela_principal, configuracao)
+
+    # Inicia o loop principal da interface gráfica.
+    # 'mainloop()' é um método do Tkinter que mantém a janela
+    # aberta e responsiva a interações do usuário,
+    # como cliques, entradas de dados e comandos. Ele monitora eventos e
+    # atualiza a interface constantemente.
+    janela_principal.mainloop()
@@ -0,0 +1,435 @@
+# Módulo dos anexos de tarefas do Gerenciador de Tarefas.
+# Fotos e PDFs anexados às tarefas são guardados fora dos documentos das
+# tarefas: no MongoDB, no GridFS (balde 'anexos'); no SQLite, em duas tabelas
+# equivalentes, uma com os dados de cada anexo e outra com os seus blocos.
+# A tarefa guarda apenas a lista dos '_id' dos anexos (campo 'anexos'), de
+# modo que as consultas da lista nunca leem o conteúdo dos arquivos. O envio
+# e o recebimento são feitos em blocos, com o progresso informado a cada
+# bloco, e as miniaturas das imagens são geradas uma única vez e guardadas
+# em um diretório local.
+
+# Importa o io, que guarda em memória as imagens usadas nas miniaturas.
+import io
+
+# Importa o mimetypes, que identifica o tipo do arquivo pela extensão.
+import mimetypes
+
+# Importa o módulo os, usado nos caminhos e tamanhos dos arquivos.
+import os
+
+# Importa a classe datetime, que restaura as datas gravadas no SQLite.
+from datetime import datetime
+
+# Importa o GridFS do pymongo.
+from gridfs import GridFSBucket
+from gridfs.errors import NoFile
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa a função que fornece o instante atual com a precisão do MongoDB.
+from utilitarios import agora_utc
+
+# Importa o Pillow, usado para gerar as miniaturas das imagens.
+# Se o Pillow não estiver instalado, os anexos funcionam sem miniaturas.
+# Para instalá-lo: pip install pillow
+try:
+    from PIL import Image
+    PILLOW_DISPONIVEL = True
+except ImportError:
+    PILLOW_DISPONIVEL = False
+
+
+# Nome do balde do GridFS (coleções 'anexos.files' e 'anexos.chunks') e
+# prefixo das tabelas equivalentes no SQLite.
+BALDE_ANEXOS = "anexos"
+
+# Campo da tarefa com a lista dos '_id' dos seus anexos.
+CAMPO_ANEXOS = "anexos"
+
+
+# Define a classe 'AnexosGridFS', o armazenamento de anexos do MongoDB.
+class AnexosGridFS:
+
+    """
+    Esta classe guarda os anexos no GridFS. Os dados de cada anexo (nome,
+    tamanho, tipo e tarefa) ficam em 'anexos.files', e o conteúdo, em
+    blocos de 'tamanho_bloco' bytes, em 'anexos.chunks'.
+    """
+
+    def __init__(self, bd, tamanho_bloco):
+        self.tamanho_bloco = tamanho_bloco
+        self.balde = GridFSBucket(bd, bucket_name=BALDE_ANEXOS, chunk_size_bytes=tamanho_bloco)
+        self.arquivos = bd[BALDE_ANEXOS + ".files"]
+
+    # Define o método 'enviar', que grava um anexo a partir de um arquivo aberto.
+    def enviar(self, arquivo, nome, tipo, tarefa_id, ao_progredir=None):
+
+        """
+        Este método lê o arquivo em blocos e os grava no GridFS, chamando
+        'ao_progredir(bytes enviados)' a cada bloco. Em caso de erro, os
+        blocos já gravados são removidos. Retorna o '_id' do anexo.
+        """
+
+        envio = self.balde.open_upload_stream(nome, metadata={"tipo": tipo, "tarefa_id": ObjectId(tarefa_id)})
+        try:
+            enviados = 0
+            while bloco := arquivo.read(self.tamanho_bloco):
+                envio.write(bloco)
+                enviados += len(bloco)
+                if ao_progredir:
+                    ao_progredir(enviados)
+        except BaseException:
+            envio.abort()
+            raise
+        envio.close()
+        return envio._id
+
+    # Define o método 'receber', que copia o conteúdo de um anexo para um arquivo aberto.
+    def receber(self, anexo_id, arquivo, ao_progredir=None):
+
+        """
+        Este método lê o anexo em blocos, gravando-os no arquivo e chamando
+        'ao_progredir(bytes recebidos)' a cada bloco. Gera FileNotFoundError
+        se o anexo não existir.
+        """
+
+        try:
+            leitura = self.balde.open_download_stream(ObjectId(anexo_id))
+        except NoFile:
+            raise FileNotFoundError(f"Anexo não encontrado: {anexo_id}")
+        with leitura:
+            recebidos = 0
+            while bloco := leitura.read(self.tamanho_bloco):
+                arquivo.write(bloco)
+                recebidos += len(bloco)
+                if ao_progredir:
+                    ao_progredir(recebidos)
+
+    # Define o método 'listar', que retorna os dados dos anexos, sem o conteúdo.
+    def listar(self, ids):
+        documentos = self.arquivos.find({"_id": {"$in": [ObjectId(anexo_id) for anexo_id in ids]}},
+                                        {"filename": 1, "length": 1, "uploadDate": 1, "metadata": 1})
+        return [{"_id": documento["_id"], "nome": documento["filename"], "tamanho": documento["length"],
+                 "tipo": (documento.get("metadata") or {}).get("tipo"), "enviado_em": documento["uploadDate"]}
+                for documento in documentos]
+
+    # Define o método 'excluir', que remove um anexo e os seus blocos.
+    def excluir(self, anexo_id):
+        try:
+            self.balde.delete(ObjectId(anexo_id))
+        except NoFile:
+            pass
+
+    # Define o método 'excluir_das_tarefas', que remove os anexos de tarefas excluídas.
+    def excluir_das_tarefas(self, tarefa_ids):
+
+        """
+        Este método localiza os anexos pela tarefa a que pertencem (campo
+        'metadata.tarefa_id', indexado), e não pelo campo 'anexos' da
+        tarefa, de modo que funciona depois de a tarefa ter sido excluída.
+        Retorna os '_id' dos anexos removidos.
+        """
+
+        filtro = {"metadata.tarefa_id": {"$in": [ObjectId(tarefa_id) for tarefa_id in tarefa_ids]}}
+        removidos = [documento["_id"] for documento in self.arquivos.find(filtro, {"_id": 1})]
+        for anexo_id in removidos:
+            self.excluir(anexo_id)
+        return removidos
+
+
+# Define a classe 'AnexosSQLite', o armazenamento de anexos do SQLite.
+class AnexosSQLite:
+
+    """
+    Esta classe guarda os anexos em duas tabelas do arquivo SQLite, como o
+    GridFS: 'anexos_arquivos', com os dados de cada anexo, e 'anexos_blocos',
+    com o conteúdo em blocos. Cada bloco é gravado em uma transação curta,
+    para que outras threads possam usar o banco durante o envio; o anexo
+    só passa a existir quando o seu registro em 'anexos_arquivos' é gravado,
+    depois do último bloco.
+    """
+
+    def __init__(self, armazenamento, tamanho_bloco):
+        self.tamanho_bloco = tamanho_bloco
+        self.conexao = armazenamento.conexao
+        self.trava = armazenamento.trava
+        with self.trava, self.conexao:
+            self.conexao.execute(f"CREATE TABLE IF NOT EXISTS {BALDE_ANEXOS}_arquivos (id TEXT PRIMARY KEY, "
+                                 "nome TEXT NOT NULL, tamanho INTEGER NOT NULL, tipo TEXT, tarefa_id TEXT, "
+                                 "enviado_em TEXT NOT NULL)")
+            self.conexao.execute(f"CREATE TABLE IF NOT EXISTS {BALDE_ANEXOS}_blocos (anexo_id TEXT NOT NULL, "
+                                 "n INTEGER NOT NULL, dados BLOB NOT NULL, PRIMARY KEY (anexo_id, n))")
+            self.conexao.execute(f"CREATE INDEX IF NOT EXISTS {BALDE_ANEXOS}_arquivos_tarefa "
+                                 f"ON {BALDE_ANEXOS}_arquivos (tarefa_id)")
+
+    # Define o método 'enviar', que grava um anexo a partir de um arquivo aberto.
+    def enviar(self, arquivo, nome, tipo, tarefa_id, ao_progredir=None):
+
+        """
+        Este método lê o arquivo em blocos e grava cada um em 'anexos_blocos',
+        chamando 'ao_progredir(bytes enviados)' a cada bloco, e por fim grava
+        o registro do anexo em 'anexos_arquivos'. Em caso de erro, os blocos
+        já gravados são removidos. Retorna o '_id' do anexo.
+        """
+
+        anexo_id = ObjectId()
+        try:
+            enviados = 0
+            numero = 0
+            while bloco := arquivo.read(self.tamanho_bloco):
+                with self.trava, self.conexao:
+                    self.conexao.execute(f"INSERT INTO {BALDE_ANEXOS}_blocos (anexo_id, n, dados) VALUES (?, ?, ?)",
+                                         (str(anexo_id), numero, bloco))
+                numero += 1
+                enviados += len(bloco)
+                if ao_progredir:
+                    ao_progredir(enviados)
+            with self.trava, self.conexao:
+                self.conexao.execute(f"INSERT INTO {BALDE_ANEXOS}_arquivos (id, nome, tamanho, tipo, tarefa_id, "
+                                     "enviado_em) VALUES (?, ?, ?, ?, ?, ?)",
+                                     (str(anexo_id), nome, enviados, tipo, str(tarefa_id), agora_utc().isoformat()))
+        except BaseException:
+            self.excluir(anexo_id)
+            raise
+        return anexo_id
+
+    # Define o método 'receber', que copia o conteúdo de um anexo para um arquivo aberto.
+    def receber(self, anexo_id, arquivo, ao_progredir=None):
+
+        """
+        Este método lê os blocos do anexo em ordem, gravando-os no arquivo e
+        chamando 'ao_progredir(bytes recebidos)' a cada bloco. Gera
+        FileNotFoundError se o anexo não existir.
+        """
+
+        with self.trava:
+            existe = self.conexao.execute(f"SELECT 1 FROM {BALDE_ANEXOS}_arquivos WHERE id = ?",
+                                          (str(anexo_id),)).fetchone()
+        if not existe:
+            raise FileNotFoundError(f"Anexo não encontrado: {anexo_id}")
+
+        # Os blocos são lidos um a um, sem manter a trava durante a gravação no arquivo.
+        recebidos = 0
+        numero = 0
+        while True:
+            with self.trava:
+                linha = self.conexao.execute(f"SELECT dados FROM {BALDE_ANEXOS}_blocos WHERE anexo_id = ? AND n = ?",
+                                             (str(anexo_id), numero)).fetchone()
+            if linha is None:
+                break
+            arquivo.write(linha[0])
+            numero += 1
+            recebidos += len(linha[0])
+            if ao_progredir:
+                ao_progredir(recebidos)
+
+    # Define o método 'listar', que retorna os dados dos anexos, sem o conteúdo.
+    def listar(self, ids):
+
+        """
+        Este método retorna os dados dos anexos informados, com as mesmas
+        chaves de 'AnexosGridFS.listar', em uma única consulta.
+        """
+
+        ids = [str(anexo_id) for anexo_id in ids]
+        if not ids:
+            return []
+        with self.trava:
+            linhas = self.conexao.execute(f"SELECT id, nome, tamanho, tipo, enviado_em FROM {BALDE_ANEXOS}_arquivos "
+                                          f"WHERE id IN ({', '.join('?' * len(ids))})", ids).fetchall()
+        return [{"_id": ObjectId(anexo_id), "nome": nome, "tamanho": tamanho, "tipo": tipo,
+                 "enviado_em": datetime.fromisoformat(enviado_em)} for anexo_id, nome, tamanho, tipo, enviado_em in linhas]
+
+    # Define o método 'excluir', que remove um anexo e os seus blocos.
+    def excluir(self, anexo_id):
+
+        """
+        Este método remove o registro e os blocos do anexo em uma única
+        transação. Um anexo inexistente é ignorado.
+        """
+
+        with self.trava, self.conexao:
+            self.conexao.execute(f"DELETE FROM {BALDE_ANEXOS}_arquivos WHERE id = ?", (str(anexo_id),))
+            self.conexao.execute(f"DELETE FROM {BALDE_ANEXOS}_blocos WHERE anexo_id = ?", (str(anexo_id),))
+
+    # Define o método 'excluir_das_tarefas', que remove os anexos de tarefas excluídas.
+    def excluir_das_tarefas(self, tarefa_ids):
+
+        """
+        Este método localiza os anexos pela coluna 'tarefa_id' (indexada),
+        como 'AnexosGridFS.excluir_das_tarefas', e os remove. Retorna os
+        '_id' dos anexos removidos.
+        """
+
+        tarefa_ids = [str(tarefa_id) for tarefa_id in tarefa_ids]
+        if not tarefa_ids:
+            return []
+        with self.trava:
+            linhas = self.conexao.execute(f"SELECT id FROM {BALDE_ANEXOS}_arquivos "
+                                          f"WHERE tarefa_id IN ({', '.join('?' * len(tarefa_ids))})",
+                                          tarefa_ids).fetchall()
+        removidos = [ObjectId(anexo_id) for anexo_id, in linhas]
+        for anexo_id in removidos:
+            self.excluir(anexo_id)
+        return removidos
+
+
+# Define a função 'tipo_arquivo', que identifica o tipo de um arquivo pelo nome.
+def tipo_arquivo(nome):
+    return mimetypes.guess_type(nome)[0] or "application/octet-stream"
+
+
+# Define a função 'anexar', executada em segundo plano.
+def anexar(anexos, colecao, tarefa_id, caminho, ao_progredir=None):
+
+    """
+    Esta função envia o arquivo do caminho informado como anexo da tarefa e
+    acrescenta o seu '_id' ao campo 'anexos' da tarefa, com uma nova versão
+    ('atualizado_em'). Se a tarefa não existir (por exemplo, se foi excluída
+    em outra estação), o anexo é removido e é gerado LookupError.
+    Retorna a tupla (_id do anexo, nova versão da tarefa).
+    """
+
+    nome = os.path.basename(caminho)
+    with open(caminho, "rb") as arquivo:
+        anexo_id = anexos.enviar(arquivo, nome, tipo_arquivo(nome), tarefa_id, ao_progredir)
+
+    versao = agora_utc()
+    resultado = colecao.update_one({"_id": ObjectId(tarefa_id)},
+                                   {"$push": {CAMPO_ANEXOS: anexo_id}, "$set": {"atualizado_em": versao}})
+    if not resultado.matched_count:
+        anexos.excluir(anexo_id)
+        raise LookupError("A tarefa não existe mais ou ainda não foi gravada no servidor.")
+    return anexo_id, versao
+
+
+# Define a função 'remover_anexo', executada em segundo plano.
+def remover_anexo(anexos, colecao, tarefa_id, anexo_id):
+
+    """
+    Esta função retira o anexo da lista da tarefa e o exclui. Retorna a nova
+    versão da tarefa.
+    """
+
+    versao = agora_utc()
+    colecao.update_one({"_id": ObjectId(tarefa_id)},
+                       {"$pull": {CAMPO_ANEXOS: ObjectId(anexo_id)}, "$set": {"atualizado_em": versao}})
+    anexos.excluir(anexo_id)
+    return versao
+
+
+# Define a função 'listar_anexos', executada em segundo plano.
+def listar_anexos(anexos, colecao, tarefa_id):
+
+    """
+    Esta função retorna os dados dos anexos da tarefa (nome, tamanho, tipo e
+    data de envio), na ordem em que foram anexados, sem ler o seu conteúdo.
+    Apenas o campo 'anexos' da tarefa é lido.
+    """
+
+    tarefa = colecao.find_one({"_id": ObjectId(tarefa_id)}, {CAMPO_ANEXOS: 1}) or {}
+    ids = tarefa.get(CAMPO_ANEXOS, [])
+    dados = {documento["_id"]: documento for documento in anexos.listar(ids)} if ids else {}
+    return [dados[anexo_id] for anexo_id in ids if anexo_id in dados]
+
+
+# Define a classe 'CacheMiniaturas', que guarda as miniaturas das imagens anexadas.
+class CacheMiniaturas:
+
+    """
+    Esta classe guarda as miniaturas em PNG no diretório 'diretorio', uma por
+    anexo ('<_id>.png'), com no máximo 'tamanho' pixels de largura e altura.
+    O conteúdo de um anexo nunca muda (um novo envio gera um novo '_id'),
+    então uma miniatura gerada não precisa ser invalidada.
+    """
+
+    def __init__(self, diretorio, tamanho):
+        self.diretorio = diretorio
+        self.tamanho = tamanho
+        os.makedirs(diretorio, exist_ok=True)
+
+    # Define o método 'suporta', que indica se o tipo de arquivo tem miniatura.
+    def suporta(self, tipo):
+        return PILLOW_DISPONIVEL and bool(tipo) and tipo.startswith("image/")
+
+    # Define o método 'caminho', que retorna o arquivo da miniatura de um anexo.
+    def caminho(self, anexo_id):
+        return os.path.join(self.diretorio, f"{anexo_id}.png")
+
+    # Define o método 'obter', que retorna a miniatura guardada, ou None.
+    def obter(self, anexo_id):
+        caminho = self.caminho(anexo_id)
+        return caminho if os.path.exists(caminho) else None
+
+    # Define o método 'gerar', que cria e guarda a miniatura de uma imagem.
+    def gerar(self, anexo_id, origem):
+
+        """
+        Este método gera a miniatura a partir de 'origem' (um caminho ou um
+        arquivo aberto) e retorna o seu caminho, ou None se a imagem não puder
+        ser lida. A miniatura é gravada em um arquivo temporário e renomeada,
+        para que uma gravação interrompida não deixe um arquivo incompleto.
+        """
+
+        caminho = self.caminho(anexo_id)
+        temporario = caminho + ".tmp"
+        try:
+            with Image.open(origem) as imagem:
+                imagem.thumbnail((self.tamanho, self.tamanho))
+                imagem.convert("RGBA").save(temporario, "PNG")
+            os.replace(temporario, caminho)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return None
+        return caminho
+
+    # Define o método 'remover', que descarta a miniatura de um anexo excluído.
+    def remover(self, anexo_id):
+        try:
+            os.remove(self.caminho(anexo_id))
+        except FileNotFoundError:
+            pass
+
+
+# Define a função 'obter_miniatura', executada em segundo plano.
+def obter_miniatura(anexos, cache, anexo):
+
+    """
+    Esta função retorna o caminho da miniatura do anexo, ou None se o seu
+    tipo não tiver miniatura. Uma miniatura ainda não guardada (por exemplo,
+    de um anexo enviado por outra estação) é gerada uma única vez, a partir
+    do conteúdo recebido em blocos.
+    """
+
+    if not cache.suporta(anexo["tipo"]):
+        return None
+    caminho = cache.obter(anexo["_id"])
+    if caminho:
+        return caminho
+    conteudo = io.BytesIO()
+    anexos.receber(anexo["_id"], conteudo)
+    conteudo.seek(0)
+    return cache.gerar(anexo["_id"], conteudo)
+
+
+# Define a função 'salvar_anexo', executada em segundo plano.
+def salvar_anexo(anexos, anexo_id, caminho, ao_progredir=None):
+
+    """
+    Esta função recebe o anexo em blocos e o grava no caminho informado. O
+    conteúdo é gravado em um arquivo temporário, renomeado ao final, para
+    que uma transferência interrompida não deixe um arquivo incompleto.
+    """
+
+    temporario = caminho + ".parcial"
+    try:
+        with open(temporario, "wb") as arquivo:
+            anexos.receber(anexo_id, arquivo, ao_progredir)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return caminho
@@ -0,0 +1,451 @@
+# Módulo de armazenamento do Gerenciador de Tarefas.
+# Define os armazenamentos disponíveis (MongoDB e SQLite) e a função que
+# escolhe um deles conforme a configuração. Os dois oferecem as mesmas
+# coleções, com a mesma API do pymongo, de modo que a interface gráfica
+# não precisa saber qual está em uso.
+
+# Importa as operações em lote e as exceções de operação do pymongo.
+from pymongo import UpdateOne, UpdateMany
+from pymongo.errors import OperationFailure, BulkWriteError
+
+# Importa as funções de configuração da aplicação.
+from configuracao import criar_cliente_mongo, caminho_local
+
+# Importa o armazenamento SQLite, usado em instalações de uma única estação.
+from armazenamento_sqlite import ArmazenamentoSQLite
+
+# Importa a função que fornece o instante atual usado como versão dos documentos.
+from utilitarios import agora_utc
+
+# Importa o nome da coleção de tarefas arquivadas.
+from arquivamento import COLECAO_ARQUIVO
+
+# Importa a coleção de registros de exclusão e a sua validade.
+from instantaneo import COLECAO_EXCLUSOES, VALIDADE_DIAS
+
+# Importa o nome da coleção do resumo mensal.
+from resumo_mensal import COLECAO_RESUMO
+
+# Importa o armazenamento de anexos do MongoDB (GridFS).
+from anexos import AnexosGridFS, BALDE_ANEXOS
+
+# Importa o nome da coleção dos modelos de tarefas recorrentes.
+from recorrencia import COLECAO_MODELOS
+
+# Importa os campos das subtarefas e dependências e a profundidade máxima percorrida.
+from hierarquia import CAMPO_DEPENDENCIAS, CAMPO_PAI, PROFUNDIDADE_MAXIMA
+
+
+# Tipos de armazenamento aceitos na opção [armazenamento] tipo.
+TIPO_MONGODB = "mongodb"
+TIPO_SQLITE = "sqlite"
+
+# Índices comuns às tarefas ativas e arquivadas, usados pelos filtros, pelos
+# relatórios e pela busca textual. O índice (tecnico_id, _id) também percorre,
+# página a página, as tarefas de um técnico na visão agrupada. O índice de
+# 'tags', uma lista, é multichave: cada tag da tarefa é uma entrada. Os
+# índices de 'pai_id' e de 'depende_de' (também multichave) atendem às
+# subtarefas e aos '$graphLookup' das hierarquias e cadeias de bloqueio.
+INDICES_TAREFAS = [
+    {"chaves": [("status", 1)]},
+    {"chaves": [("tecnico", 1)]},
+    {"chaves": [("tecnico_id", 1), ("_id", 1)]},
+    {"chaves": [("data_criacao", 1)]},
+    {"chaves": [("tags", 1)]},
+    {"chaves": [(CAMPO_PAI, 1)]},
+    {"chaves": [(CAMPO_DEPENDENCIAS, 1)]},
+    {"chaves": [("titulo", "text"), ("descricao", "text")]},
+]
+
+# Índices criados em cada coleção ao conectar. O formato é o mesmo do
+# 'create_index' do pymongo, e o armazenamento SQLite os converte em índices
+# de expressão (ou em uma tabela FTS5, no caso de índices de texto).
+# 'opcoes' são repassadas ao 'create_index' (o SQLite as ignora).
+INDICES = {
+    # O índice (status, atualizado_em) seleciona as tarefas a arquivar, o
+    # índice (atualizado_em) as tarefas alteradas desde o instantâneo local, e
+    # o índice (status, data_limite) as tarefas pendentes vencidas. O índice
+    # único (modelo_id, periodo), apenas das tarefas geradas por um modelo de
+    # recorrência, impede que uma ocorrência seja criada duas vezes.
+    "tarefas": INDICES_TAREFAS + [
+        {"chaves": [("status", 1), ("atualizado_em", 1)]},
+        {"chaves": [("atualizado_em", 1)]},
+        {"chaves": [("status", 1), ("data_limite", 1)]},
+        {"chaves": [("modelo_id", 1), ("periodo", 1)], "unique": True,
+         "opcoes": {"partialFilterExpression": {"modelo_id": {"$exists": True}}}},
+    ],
+    COLECAO_ARQUIVO: INDICES_TAREFAS,
+    # Os registros de exclusão expiram sozinhos (índice TTL).
+    COLECAO_EXCLUSOES: [
+        {"chaves": [("excluido_em", 1)], "opcoes": {"expireAfterSeconds": VALIDADE_DIAS * 24 * 60 * 60}},
+    ],
+    "tecnicos": [
+        {"chaves": [("nome", 1)], "unique": True},
+        {"chaves": [("atualizado_em", 1)]},
+    ],
+    # Os relatórios por período leem o resumo por intervalo de meses.
+    COLECAO_RESUMO: [
+        {"chaves": [("mes", 1)]},
+    ],
+    # O gerador de ocorrências lê os modelos atrasados por 'gerado_ate'.
+    COLECAO_MODELOS: [
+        {"chaves": [("gerado_ate", 1)]},
+    ],
+}
+
+# Filtro das tarefas que ainda guardam o nome do técnico no campo legado
+# 'tecnico'. A comparação '$gte: ""' seleciona apenas valores de texto, o que
+# permite usar o índice do campo sem percorrer as tarefas já migradas.
+FILTRO_TECNICO_LEGADO = {"tecnico": {"$gte": ""}}
+
+# Expressão de agregação da chave do técnico de uma tarefa: o nome legado,
+# quando preenchido, ou a referência 'tecnico_id'. É a mesma regra de
+# precedência usada para exibir o nome do técnico.
+EXPRESSAO_CHAVE_TECNICO = {"$cond": [{"$gt": ["$tecnico", ""]}, "$tecnico", "$tecnico_id"]}
+
+# Expressão de agregação do mês de criação de uma tarefa (AAAA-MM), para a
+# data gravada como texto (DD/MM/AAAA) ou como data. Outros valores resultam
+# em None.
+EXPRESSAO_MES = {"$switch": {
+    "branches": [
+        {"case": {"$eq": [{"$type": "$data_criacao"}, "date"]},
+         "then": {"$dateToString": {"format": "%Y-%m", "date": "$data_criacao"}}},
+        {"case": {"$eq": [{"$type": "$data_criacao"}, "string"]},
+         "then": {"$concat": [{"$substrCP": ["$data_criacao", 6, 4]}, "-", {"$substrCP": ["$data_criacao", 3, 2]}]}},
+    ],
+    "default": None,
+}}
+
+# Expressão de agregação da data de criação de uma tarefa como o inteiro
+# AAAAMMDD de 'modelo_tarefas.chave_data', para a data gravada como texto
+# (DD/MM/AAAA) ou como data. Datas ausentes ou inválidas resultam em 0. A
+# data gravada como texto não pode ser ordenada diretamente.
+EXPRESSAO_CHAVE_DATA = {"$switch": {
+    "branches": [
+        {"case": {"$eq": [{"$type": "$data_criacao"}, "date"]},
+         "then": {"$toInt": {"$dateToString": {"format": "%Y%m%d", "date": "$data_criacao"}}}},
+        {"case": {"$and": [{"$eq": [{"$type": "$data_criacao"}, "string"]},
+                           {"$regexMatch": {"input": "$data_criacao", "regex": r"^\d{2}/\d{2}/\d{4}$"}}]},
+         "then": {"$toInt": {"$concat": [{"$substrCP": ["$data_criacao", 6, 4]}, {"$substrCP": ["$data_criacao", 3, 2]},
+                                         {"$substrCP": ["$data_criacao", 0, 2]}]}}},
+    ],
+    "default": 0,
+}}
+
+
+# Define a classe 'ArmazenamentoMongo', que fornece as coleções do MongoDB.
+class ArmazenamentoMongo:
+
+    """
+    Esta classe encapsula o MongoClient e o banco de dados configurado.
+    As coleções retornadas são as próprias coleções do pymongo.
+    """
+
+    # Indica que o armazenamento depende de um servidor remoto, cuja
+    # conexão pode cair a qualquer momento.
+    remoto = True
+
+    def __init__(self, configuracao):
+        self.cliente = criar_cliente_mongo(configuracao)
+        self.bd = self.cliente[configuracao["mongodb"]["banco"]]
+
+    def colecao(self, nome):
+        return self.bd[nome]
+
+    # Permite acessar as coleções como no pymongo: armazenamento["tarefas"].
+    __getitem__ = colecao
+
+    def verificar_conexao(self):
+        self.cliente.admin.command("ping")
+
+    def anexos(self, tamanho_bloco):
+
+        """
+        Este método retorna o armazenamento dos anexos das tarefas, no GridFS
+        do banco configurado, com blocos de 'tamanho_bloco' bytes.
+        """
+
+        return AnexosGridFS(self.bd, tamanho_bloco)
+
+    def listar_tarefas_com_tecnico(self, filtro, ordenar_por_data=False, colecao="tarefas"):
+
+        """
+        Este método retorna as tarefas (da coleção 'colecao') que atendem ao
+        filtro, com o nome do técnico responsável no campo 'tecnico_nome'.
+        O nome é obtido com um '$lookup' pelo '_id' do técnico, em uma única
+        agregação no servidor. Com 'ordenar_por_data', as tarefas vêm
+        ordenadas por (EXPRESSAO_CHAVE_DATA, '_id'), a mesma ordem de
+        (modelo_tarefas.chave_data, '_id'); a ordenação pode usar o disco.
+        """
+
+        pipeline = [{"$match": filtro}]
+        if ordenar_por_data:
+            pipeline += [{"$addFields": {"_chave_data": EXPRESSAO_CHAVE_DATA}},
+                         {"$sort": {"_chave_data": 1, "_id": 1}}]
+        pipeline += [
+            {"$lookup": {"from": "tecnicos", "localField": "tecnico_id", "foreignField": "_id", "as": "_tecnico"}},
+            # O nome legado, quando presente, é a alteração mais recente
+            # ainda não migrada e tem precedência sobre a referência.
+            {"$addFields": {"tecnico_nome": {"$ifNull": ["$tecnico", {"$arrayElemAt": ["$_tecnico.nome", 0]}]}}},
+            {"$project": {"_tecnico": 0, "_chave_data": 0}},
+        ]
+        return self.bd[colecao].aggregate(pipeline, allowDiskUse=ordenar_por_data)
+
+    def contar_tarefas_por_tecnico(self, colecao="tarefas"):
+
+        """
+        Este método retorna a quantidade de tarefas de cada técnico em cada
+        status, em uma única agregação no servidor. Cada resultado tem os
+        campos 'tecnico' (a chave do técnico: ObjectId, nome legado ou None),
+        'status' e 'quantidade'.
+        """
+
+        return self.bd[colecao].aggregate([
+            {"$group": {"_id": {"tecnico": EXPRESSAO_CHAVE_TECNICO, "status": "$status"},
+                        "quantidade": {"$sum": 1}}},
+            {"$project": {"_id": 0, "tecnico": "$_id.tecnico", "status": "$_id.status", "quantidade": 1}},
+        ])
+
+    def contar_facetas(self, filtro, colecao="tarefas"):
+
+        """
+        Este método retorna, em uma única agregação com '$facet', a
+        quantidade das tarefas que atendem ao filtro por tag, por status e
+        por técnico: o dicionário {"tags": {...}, "status": {...},
+        "tecnicos": {...}}, em que cada faceta associa o valor (a chave do
+        técnico, no caso dos técnicos) à sua quantidade.
+        """
+
+        resultado = next(self.bd[colecao].aggregate([
+            {"$match": filtro},
+            {"$facet": {
+                "tags": [{"$unwind": "$tags"}, {"$sortByCount": "$tags"}],
+                "status": [{"$sortByCount": "$status"}],
+                "tecnicos": [{"$sortByCount": EXPRESSAO_CHAVE_TECNICO}],
+            }},
+        ]), {})
+        return {faceta: {item["_id"]: item["count"] for item in resultado.get(faceta, ())}
+                for faceta in ("tags", "status", "tecnicos")}
+
+    def resumir_hierarquia(self, ids, colecao="tarefas"):
+
+        """
+        Este método retorna, em uma única agregação, o resumo das tarefas
+        informadas que têm subtarefas ou dependências pendentes: o dicionário
+        {_id: {"subtarefas", "concluidas", "bloqueios"}}. 'subtarefas' e
+        'concluidas' contam todas as descendentes (um '$graphLookup' por
+        'pai_id'), e 'bloqueios' lista, do mais próximo ao mais distante
+        ('nivel' 0 é uma dependência direta), as dependências diretas e
+        indiretas ainda não concluídas, com '_id' e 'titulo' (um
+        '$graphLookup' por 'depende_de').
+        """
+
+        resultado = {}
+        for documento in self.bd[colecao].aggregate([
+            {"$match": {"_id": {"$in": list(ids)}}},
+            {"$graphLookup": {"from": colecao, "startWith": "$_id", "connectFromField": "_id",
+                              "connectToField": CAMPO_PAI, "as": "descendentes",
+                              "maxDepth": PROFUNDIDADE_MAXIMA}},
+            {"$graphLookup": {"from": colecao, "startWith": f"${CAMPO_DEPENDENCIAS}",
+                              "connectFromField": CAMPO_DEPENDENCIAS, "connectToField": "_id",
+                              "as": "dependencias", "maxDepth": PROFUNDIDADE_MAXIMA, "depthField": "nivel"}},
+            {"$project": {
+                "subtarefas": {"$size": "$descendentes"},
+                "concluidas": {"$size": {"$filter": {"input": "$descendentes",
+                                                     "cond": {"$eq": ["$$this.status", "Concluída"]}}}},
+                "bloqueios": {"$map": {
+                    "input": {"$filter": {"input": "$dependencias", "cond": {"$ne": ["$$this.status", "Concluída"]}}},
+                    "in": {"_id": "$$this._id", "titulo": "$$this.titulo", "nivel": "$$this.nivel"}}},
+            }},
+            {"$match": {"$or": [{"subtarefas": {"$gt": 0}}, {"bloqueios": {"$ne": []}}]}},
+        ]):
+            documento["bloqueios"].sort(key=lambda bloqueio: bloqueio["nivel"])
+            resultado[documento.pop("_id")] = documento
+        return resultado
+
+    def seguir_vinculos(self, tarefa_id, campo, colecao="tarefas"):
+
+        """
+        Este método retorna o conjunto dos '_id' alcançados a partir da
+        tarefa seguindo o campo informado: os ancestrais, com 'pai_id', ou
+        as dependências diretas e indiretas, com 'depende_de'. É um único
+        '$graphLookup'.
+        """
+
+        documento = next(self.bd[colecao].aggregate([
+            {"$match": {"_id": tarefa_id}},
+            {"$graphLookup": {"from": colecao, "startWith": f"${campo}", "connectFromField": campo,
+                              "connectToField": "_id", "as": "alcancadas", "maxDepth": PROFUNDIDADE_MAXIMA}},
+            {"$project": {"alcancadas": "$alcancadas._id"}},
+        ]), None)
+        return set(documento["alcancadas"]) if documento else set()
+
+    def recalcular_resumo_mensal(self, filtro, calculado_em, origens, destino):
+
+        """
+        Este método conta as tarefas das coleções 'origens' que atendem ao
+        filtro por mês de criação, técnico e status, e grava o resultado na
+        coleção 'destino' com '$merge', sem trazer as tarefas nem as
+        contagens para a aplicação. As coleções são reunidas com '$unionWith'.
+        """
+
+        pipeline = [{"$match": filtro}]
+        for origem in origens[1:]:
+            pipeline.append({"$unionWith": {"coll": origem, "pipeline": [{"$match": filtro}]}})
+        pipeline += [
+            {"$project": {"mes": EXPRESSAO_MES, "tecnico": EXPRESSAO_CHAVE_TECNICO, "status": 1}},
+            {"$match": {"mes": {"$regex": r"^\d{4}-\d{2}$"}}},
+            {"$group": {"_id": {"mes": "$mes", "tecnico": "$tecnico", "status": "$status"}, "quantidade": {"$sum": 1}}},
+            {"$addFields": {"mes": "$_id.mes", "tecnico": "$_id.tecnico", "status": "$_id.status",
+                            "calculado_em": calculado_em}},
+            {"$merge": {"into": destino, "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}},
+        ]
+        self.bd[origens[0]].aggregate(pipeline)
+
+    def fechar(self):
+        self.cliente.close()
+
+
+# Define a função 'criar_indices', que garante os índices das coleções.
+def criar_indices(armazenamento):
+
+    """
+    Esta função cria os índices definidos em INDICES. A operação é
+    idempotente: índices já existentes não são recriados. Um índice que não
+    pode ser criado (por exemplo, um índice único sobre dados duplicados)
+    não impede a criação dos demais nem o uso da aplicação. No MongoDB, os
+    anexos do GridFS também são indexados pela tarefa, para que sejam
+    localizados quando ela é excluída (no SQLite, a tabela dos anexos cria o
+    seu próprio índice).
+    """
+
+    for nome, indices in INDICES.items():
+        colecao = armazenamento.colecao(nome)
+        for indice in indices:
+            try:
+                colecao.create_index(indice["chaves"], unique=indice.get("unique", False),
+                                     **indice.get("opcoes", {}))
+            except OperationFailure:
+                continue
+    if armazenamento.remoto:
+        armazenamento.colecao(BALDE_ANEXOS + ".files").create_index([("metadata.tarefa_id", 1)])
+
+
+# Define a função 'migrar_tecnicos', que converte os nomes de técnicos
+# gravados nas tarefas em referências ao '_id' do técnico.
+def migrar_tecnicos(armazenamento, tamanho_lote=100):
+
+    """
+    Esta função substitui o campo legado 'tecnico' (o nome do técnico) pelo
+    campo 'tecnico_id' (o '_id' do técnico na coleção 'tecnicos').
+    - Cada nome distinto vira uma única operação UpdateMany, e as operações
+      são enviadas em lotes de 'bulk_write' com 'tamanho_lote' nomes.
+    - Nomes que não estão cadastrados são incluídos na coleção 'tecnicos'.
+    - A versão ('atualizado_em') das tarefas não é alterada: o técnico
+      continua o mesmo, e edições offline pendentes não viram conflitos.
+    A função é idempotente e roda a cada conexão, pois estações ainda não
+    atualizadas podem continuar gravando nomes. Sem nada a migrar, custa
+    uma consulta indexada por coleção de tarefas (ativas e arquivadas).
+    Retorna a quantidade de tarefas migradas.
+    """
+
+    migradas = 0
+    for nome_colecao in ("tarefas", COLECAO_ARQUIVO):
+        migradas += _migrar_tecnicos_colecao(armazenamento, armazenamento.colecao(nome_colecao), tamanho_lote)
+    return migradas
+
+
+# Define a função '_migrar_tecnicos_colecao', que migra uma coleção de tarefas.
+def _migrar_tecnicos_colecao(armazenamento, tarefas, tamanho_lote):
+    tecnicos = armazenamento.colecao("tecnicos")
+
+    nomes = tarefas.distinct("tecnico", FILTRO_TECNICO_LEGADO)
+    if not nomes:
+        return 0
+
+    # Cadastra os nomes que ainda não existem na coleção de técnicos. Se outra
+    # estação cadastrar o mesmo nome ao mesmo tempo, o índice único rejeita a
+    # duplicata e o técnico cadastrado por ela é usado.
+    nomes_preenchidos = [nome for nome in nomes if nome.strip()]
+    if nomes_preenchidos:
+        try:
+            tecnicos.bulk_write([UpdateOne({"nome": nome}, {"$setOnInsert": {"atualizado_em": agora_utc()}}, upsert=True)
+                                 for nome in nomes_preenchidos], ordered=False)
+        except BulkWriteError:
+            pass
+    ids = {tecnico["nome"]: tecnico["_id"]
+           for tecnico in tecnicos.find({"nome": {"$in": nomes_preenchidos}}, {"nome": 1})}
+
+    # Tarefas sem técnico (nome vazio) ficam com 'tecnico_id' nulo.
+    requisicoes = [UpdateMany({"tecnico": nome}, {"$set": {"tecnico_id": ids.get(nome)}, "$unset": {"tecnico": ""}})
+                   for nome in nomes if nome in ids or not nome.strip()]
+
+    migradas = 0
+    for inicio in range(0, len(requisicoes), tamanho_lote):
+        resultado = tarefas.bulk_write(requisicoes[inicio:inicio + tamanho_lote], ordered=False)
+        migradas += resultado.modified_count
+    return migradas
+
+
+# Define a função 'filtro_tecnico', que seleciona as tarefas de um grupo da
+# visão agrupada por técnico.
+def filtro_tecnico(chave):
+
+    """
+    Esta função retorna o filtro das tarefas cuja chave do técnico (veja
+    EXPRESSAO_CHAVE_TECNICO) é 'chave': um nome legado, uma referência
+    'tecnico_id' ou None (tarefas sem técnico).
+    """
+
+    if isinstance(chave, str):
+        return {"tecnico": chave}
+    return {"tecnico_id": chave, "tecnico": {"$in": [None, ""]}}
+
+
+# Define a função 'listar_pagina_tecnico', que lê uma página das tarefas de um técnico.
+def listar_pagina_tecnico(armazenamento, chave, apos=None, tamanho_pagina=100, colecao="tarefas"):
+
+    """
+    Esta função retorna a tupla (tarefas, ha_mais) com até 'tamanho_pagina'
+    tarefas do técnico 'chave', em ordem de '_id', a partir da tarefa
+    seguinte a 'apos'. A página seguinte começa após o '_id' da última
+    tarefa retornada, e não com 'skip': cada página custa o mesmo, seja qual
+    for a sua posição no grupo. Uma tarefa a mais é lida para saber se há
+    outra página.
+    """
+
+    filtro = filtro_tecnico(chave)
+    if apos is not None:
+        filtro["_id"] = {"$gt": apos}
+    tarefas = list(armazenamento.colecao(colecao).find(filtro).sort("_id", 1).limit(tamanho_pagina + 1))
+    return tarefas[:tamanho_pagina], len(tarefas) > tamanho_pagina
+
+
+# Define a função 'conectar', executada em segundo plano ao iniciar a aplicação.
+def conectar(armazenamento):
+
+    """
+    Esta função verifica se o armazenamento está acessível, garante os
+    índices e migra as tarefas que ainda guardam o nome do técnico.
+    """
+
+    armazenamento.verificar_conexao()
+    criar_indices(armazenamento)
+    migrar_tecnicos(armazenamento)
+
+
+# Define a função 'criar_armazenamento', que escolhe o armazenamento
+# conforme a opção [armazenamento] tipo.
+def criar_armazenamento(configuracao):
+
+    """
+    Esta função cria o armazenamento configurado: 'mongodb' (padrão) ou
+    'sqlite', este último em um arquivo no diretório local da aplicação.
+    """
+
+    tipo = configuracao["armazenamento"]["tipo"].strip().lower()
+    if tipo == TIPO_SQLITE:
+        return ArmazenamentoSQLite(caminho_local(configuracao, configuracao["armazenamento"]["arquivo_sqlite"]))
+    if tipo == TIPO_MONGODB:
+        return ArmazenamentoMongo(configuracao)
+    raise ValueError(f"Tipo de armazenamento desconhecido: {tipo}")
@@ -0,0 +1,928 @@
+# Módulo do armazenamento SQLite do Gerenciador de Tarefas.
+# Implementa, sobre um único arquivo SQLite, o subconjunto da API de coleções
+# do pymongo usado pela aplicação (find, insert_one, update_one, bulk_write,
+# create_index etc.). Assim, a interface gráfica funciona da mesma forma com
+# o MongoDB ou com o SQLite, sem precisar de um servidor 'mongod'.
+#
+# Cada coleção é uma tabela com duas colunas: 'id' (o '_id' do documento) e
+# 'doc' (o documento em JSON). Os filtros são traduzidos para SQL usando
+# 'json_extract', e os índices são criados como índices de expressão sobre
+# as mesmas expressões, para que o SQLite possa usá-los nas consultas.
+
+# Importa o sqlite3, banco de dados embutido na biblioteca padrão do Python.
+import sqlite3
+
+# Importa o json para converter documentos em texto e vice-versa.
+import json
+
+# Importa o re para validar nomes e implementar o operador $regex.
+import re
+
+# Importa o threading para proteger o acesso concorrente à conexão.
+import threading
+
+# Importa a classe datetime para codificar e decodificar datas.
+from datetime import datetime
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa as operações em lote, os resultados e os erros do pymongo, para
+# que o código da aplicação trate os dois armazenamentos da mesma forma.
+from pymongo import InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany
+from pymongo.results import InsertOneResult, InsertManyResult, UpdateResult, DeleteResult, BulkWriteResult
+from pymongo.errors import DuplicateKeyError, BulkWriteError, OperationFailure
+
+# Importa o armazenamento de anexos equivalente ao GridFS.
+from anexos import AnexosSQLite
+
+# Importa os campos das subtarefas e dependências e a profundidade máxima percorrida.
+from hierarquia import CAMPO_DEPENDENCIAS, CAMPO_PAI, PROFUNDIDADE_MAXIMA
+
+
+# Prefixos usados para guardar datas e ObjectId dentro do JSON.
+# As datas usam um formato ISO de largura fixa, para que a comparação de
+# textos no SQLite tenha o mesmo resultado da comparação de datas.
+PREFIXO_DATA = "$date:"
+PREFIXO_OID = "$oid:"
+FORMATO_DATA = "%Y-%m-%dT%H:%M:%S.%f"
+
+# Código de erro de chave duplicada, o mesmo usado pelo MongoDB.
+CODIGO_CHAVE_DUPLICADA = 11000
+
+# Campos que guardam listas em cada coleção. Para esses campos, um filtro
+# de igualdade é satisfeito se qualquer elemento da lista for igual ao valor,
+# como no MongoDB. Os elementos ficam também na tabela auxiliar
+# '<coleção>_valores' (campo, valor, id), o equivalente ao índice multichave
+# do MongoDB: um índice criado sobre um desses campos é criado nessa tabela.
+CAMPOS_LISTA = {"tarefas": {"tags", CAMPO_DEPENDENCIAS}, "tarefas_arquivo": {"tags", CAMPO_DEPENDENCIAS}}
+
+# Expressão usada para validar nomes de coleções e índices.
+NOME_VALIDO = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+# Funções de codificação dos valores guardados no JSON.
+def _codificar(valor):
+    if isinstance(valor, datetime):
+        return PREFIXO_DATA + valor.strftime(FORMATO_DATA)
+    if isinstance(valor, ObjectId):
+        return PREFIXO_OID + str(valor)
+    if isinstance(valor, dict):
+        return {chave: _codificar(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_codificar(item) for item in valor]
+    return valor
+
+
+def _decodificar(valor):
+    if isinstance(valor, str):
+        if valor.startswith(PREFIXO_DATA):
+            return datetime.strptime(valor[len(PREFIXO_DATA):], FORMATO_DATA)
+        if valor.startswith(PREFIXO_OID):
+            return ObjectId(valor[len(PREFIXO_OID):])
+        return valor
+    if isinstance(valor, dict):
+        return {chave: _decodificar(item) for chave, item in valor.items()}
+    if isinstance(valor, list):
+        return [_decodificar(item) for item in valor]
+    return valor
+
+
+def _chave_id(valor):
+    """Converte um '_id' no texto guardado na coluna 'id'."""
+    codificado = _codificar(valor)
+    if isinstance(codificado, (dict, list)):
+        return json.dumps(codificado, sort_keys=True, ensure_ascii=False)
+    return codificado
+
+
+def _parametro(valor):
+    """Converte um valor de filtro no parâmetro SQL correspondente."""
+    codificado = _codificar(valor)
+    if isinstance(codificado, (dict, list)):
+        return json.dumps(codificado, ensure_ascii=False)
+    return codificado
+
+
+def _caminho_json(campo):
+    """Converte 'a.b' no caminho JSON '$."a"."b"' usado pelo SQLite."""
+    return "$" + "".join('."' + parte.replace('"', '""') + '"' for parte in campo.split("."))
+
+
+# Funções que leem e alteram campos (inclusive com ponto, como 'a.b') de um documento.
+def _obter(documento, campo, padrao=None):
+    atual = documento
+    for parte in campo.split("."):
+        if not isinstance(atual, dict) or parte not in atual:
+            return padrao
+        atual = atual[parte]
+    return atual
+
+
+def _definir(documento, campo, valor):
+    partes = campo.split(".")
+    atual = documento
+    for parte in partes[:-1]:
+        atual = atual.setdefault(parte, {})
+    atual[partes[-1]] = valor
+
+
+def _remover(documento, campo):
+    partes = campo.split(".")
+    atual = documento
+    for parte in partes[:-1]:
+        atual = atual.get(parte)
+        if not isinstance(atual, dict):
+            return
+    atual.pop(partes[-1], None)
+
+
+def _aplicar_atualizacao(documento, atualizacao, inserindo=False):
+
+    """
+    Esta função aplica ao documento os operadores de atualização do MongoDB
+    suportados ($set, $unset, $inc, $push, $addToSet, $pull e $setOnInsert).
+    Uma atualização sem operadores substitui o documento, mantendo o '_id'.
+    """
+
+    if not any(chave.startswith("$") for chave in atualizacao):
+        return dict(atualizacao, _id=documento["_id"])
+
+    for operador, campos in atualizacao.items():
+        for campo, valor in campos.items():
+            if operador == "$set" or (operador == "$setOnInsert" and inserindo):
+                _definir(documento, campo, valor)
+            elif operador == "$setOnInsert":
+                continue
+            elif operador == "$unset":
+                _remover(documento, campo)
+            elif operador == "$inc":
+                _definir(documento, campo, _obter(documento, campo, 0) + valor)
+            elif operador in ("$push", "$addToSet"):
+                lista = list(_obter(documento, campo, []))
+                novos = valor["$each"] if isinstance(valor, dict) and "$each" in valor else [valor]
+                for item in novos:
+                    if operador == "$push" or item not in lista:
+                        lista.append(item)
+                _definir(documento, campo, lista)
+            elif operador == "$pull":
+                removidos = valor["$in"] if isinstance(valor, dict) and "$in" in valor else [valor]
+                _definir(documento, campo, [item for item in _obter(documento, campo, []) if item not in removidos])
+            else:
+                raise OperationFailure(f"Operador de atualização não suportado: {operador}")
+    return documento
+
+
+def _projetar(documento, projecao):
+
+    """
+    Esta função aplica uma projeção de inclusão ({'campo': 1}) ou de
+    exclusão ({'campo': 0}) ao documento, como o MongoDB.
+    """
+
+    if not projecao:
+        return documento
+    if isinstance(projecao, (list, tuple)):
+        projecao = {campo: 1 for campo in projecao}
+
+    inclusao = any(valor for campo, valor in projecao.items() if campo != "_id")
+    if inclusao:
+        resultado = {}
+        for campo, valor in projecao.items():
+            if valor and _obter(documento, campo) is not None:
+                _definir(resultado, campo, _obter(documento, campo))
+        if projecao.get("_id", 1):
+            resultado["_id"] = documento["_id"]
+        return resultado
+
+    resultado = dict(documento)
+    for campo, valor in projecao.items():
+        if not valor:
+            _remover(resultado, campo)
+    return resultado
+
+
+# Define a classe 'CursorSQLite', equivalente ao cursor do pymongo.
+class CursorSQLite:
+
+    """
+    Esta classe representa o resultado de um 'find'. Como no pymongo, a
+    consulta só é executada quando o cursor é percorrido, permitindo
+    encadear 'sort', 'skip' e 'limit'.
+    """
+
+    def __init__(self, colecao, filtro, projecao):
+        self._colecao = colecao
+        self._filtro = filtro or {}
+        self._projecao = projecao
+        self._ordenacao = []
+        self._limite = 0
+        self._salto = 0
+
+    def sort(self, chave, direcao=1):
+        if isinstance(chave, (list, tuple)):
+            self._ordenacao.extend(chave)
+        else:
+            self._ordenacao.append((chave, direcao))
+        return self
+
+    def limit(self, limite):
+        self._limite = limite
+        return self
+
+    def skip(self, salto):
+        self._salto = salto
+        return self
+
+    def batch_size(self, tamanho):
+        return self
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        linhas = self._colecao._consultar(self._filtro, self._ordenacao, self._limite, self._salto)
+        for identificador, texto in linhas:
+            yield _projetar(self._colecao._documento(identificador, texto), self._projecao)
+
+
+# Define a classe 'ColecaoSQLite', equivalente a uma coleção do pymongo.
+class ColecaoSQLite:
+
+    """
+    Esta classe implementa sobre uma tabela SQLite as operações de coleção
+    usadas pela aplicação. Filtros são traduzidos para SQL; operadores de
+    atualização são aplicados em Python e o documento é regravado.
+    """
+
+    def __init__(self, armazenamento, nome):
+        if not NOME_VALIDO.match(nome):
+            raise ValueError(f"Nome de coleção inválido: {nome}")
+        self.armazenamento = armazenamento
+        self.name = nome
+        self.conexao = armazenamento.conexao
+        self.trava = armazenamento.trava
+        self.campos_lista = CAMPOS_LISTA.get(nome, set())
+
+        with self.trava, self.conexao:
+            self.conexao.execute(f"CREATE TABLE IF NOT EXISTS {nome} (id TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+            if self.campos_lista:
+                self._criar_tabela_valores()
+
+    # Cria a tabela auxiliar dos elementos dos campos de lista e, se ela
+    # ainda não existia, preenche-a com os documentos já gravados.
+    def _criar_tabela_valores(self):
+        existe = self.conexao.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                      (f"{self.name}_valores",)).fetchone()
+        if existe:
+            return
+        self.conexao.execute(f"CREATE TABLE {self.name}_valores (campo TEXT NOT NULL, valor, id TEXT NOT NULL)")
+        self.conexao.execute(f"CREATE INDEX {self.name}_valores_id ON {self.name}_valores (id)")
+        for campo in sorted(self.campos_lista):
+            self.conexao.execute(f"INSERT INTO {self.name}_valores (campo, valor, id) "
+                                 f"SELECT ?, value, {self.name}.id FROM {self.name}, json_each(doc, '{_caminho_json(campo)}')",
+                                 (campo,))
+
+    # Campos indexados pela busca textual (FTS5), gravados na tabela de metadados.
+    @property
+    def campos_texto(self):
+        return self.armazenamento.campos_texto(self.name)
+
+    # ------------------------------------------------------------------
+    # Tradução de filtros para SQL
+    # ------------------------------------------------------------------
+
+    def _expressao(self, campo):
+        if campo == "_id":
+            return "id"
+        return f"json_extract(doc, '{_caminho_json(campo)}')"
+
+    def _traduzir(self, filtro, parametros):
+        partes = []
+        for chave, condicao in filtro.items():
+            if chave in ("$and", "$or", "$nor"):
+                subpartes = [self._traduzir(item, parametros) for item in condicao] or ["1"]
+                juncao = " AND " if chave == "$and" else " OR "
+                sql = "(" + juncao.join(subpartes) + ")"
+                partes.append(f"NOT {sql}" if chave == "$nor" else sql)
+            elif chave == "$text":
+                partes.append(self._condicao_texto(condicao["$search"], parametros))
+            elif isinstance(condicao, dict) and condicao and all(operador.startswith("$") for operador in condicao):
+                for operador, argumento in condicao.items():
+                    if operador != "$options":
+                        partes.append(self._condicao(chave, operador, argumento, condicao.get("$options", ""), parametros))
+            else:
+                partes.append(self._condicao(chave, "$eq", condicao, "", parametros))
+        return "(" + " AND ".join(partes) + ")" if partes else "1"
+
+    def _condicao_texto(self, termo, parametros):
+        if not self.campos_texto:
+            raise OperationFailure("A busca textual exige um índice de texto na coleção.")
+        # Cada palavra vira um termo entre aspas com busca por prefixo, o que
+        # evita que caracteres especiais sejam interpretados pelo FTS5.
+        palavras = [palavra.replace('"', '""') for palavra in termo.split()]
+        parametros.append(" ".join(f'"{palavra}"*' for palavra in palavras) or '""')
+        return f"id IN (SELECT id FROM {self.name}_fts WHERE {self.name}_fts MATCH ?)"
+
+    def _condicao(self, campo, operador, argumento, opcoes, parametros):
+        expressao = self._expressao(campo)
+
+        # Campos que guardam listas são comparados elemento a elemento, pela
+        # tabela auxiliar dos elementos (e pelo seu índice, se houver).
+        if campo in self.campos_lista and operador in ("$eq", "$ne", "$in", "$nin", "$all"):
+            elementos = f"id IN (SELECT id FROM {self.name}_valores WHERE campo = ? AND valor"
+            if operador in ("$eq", "$ne"):
+                parametros.extend([campo, _parametro(argumento)])
+                sql = f"{elementos} = ?)"
+                return f"NOT {sql}" if operador == "$ne" else sql
+            if operador == "$all":
+                partes = []
+                for item in argumento:
+                    parametros.extend([campo, _parametro(item)])
+                    partes.append(f"{elementos} = ?)")
+                return "(" + " AND ".join(partes or ["1"]) + ")"
+            parametros.append(campo)
+            parametros.extend(_parametro(item) for item in argumento)
+            marcadores = ", ".join("?" for _ in argumento) or "NULL"
+            sql = f"{elementos} IN ({marcadores}))"
+            return f"NOT {sql}" if operador == "$nin" else sql
+
+        if operador == "$eq":
+            if argumento is None:
+                return f"{expressao} IS NULL"
+            parametros.append(_parametro(argumento) if campo != "_id" else _chave_id(argumento))
+            return f"{expressao} = ?"
+        if operador == "$ne":
+            if argumento is None:
+                return f"{expressao} IS NOT NULL"
+            parametros.append(_parametro(argumento) if campo != "_id" else _chave_id(argumento))
+            return f"({expressao} IS NULL OR {expressao} <> ?)"
+        if operador in ("$gt", "$gte", "$lt", "$lte"):
+            simbolo = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}[operador]
+            parametros.append(_parametro(argumento) if campo != "_id" else _chave_id(argumento))
+            return f"{expressao} {simbolo} ?"
+        if operador in ("$in", "$nin"):
+            valores = [item for item in argumento if item is not None]
+            converter = _chave_id if campo == "_id" else _parametro
+            parametros.extend(converter(item) for item in valores)
+            marcadores = ", ".join("?" for _ in valores) or "NULL"
+            sql = f"({expressao} IN ({marcadores})"
+            sql += f" OR {expressao} IS NULL)" if None in argumento else ")"
+            if operador == "$nin":
+                return f"NOT COALESCE({sql}, 0)"
+            return sql
+        if operador == "$exists":
+            if campo == "_id":
+                return "1" if argumento else "0"
+            sql = f"json_type(doc, '{_caminho_json(campo)}') IS NOT NULL"
+            return sql if argumento else f"NOT {sql}"
+        if operador == "$regex":
+            padrao = argumento.pattern if hasattr(argumento, "pattern") else argumento
+            if "i" in opcoes:
+                padrao = "(?i)" + padrao
+            parametros.append(padrao)
+            return f"{expressao} REGEXP ?"
+        raise OperationFailure(f"Operador de consulta não suportado: {operador}")
+
+    def _ordem_sql(self, ordenacao):
+        if not ordenacao:
+            return "rowid"
+        return ", ".join(f"{self._expressao(campo)} {'DESC' if direcao == -1 else 'ASC'}"
+                         for campo, direcao in ordenacao)
+
+    def _consultar(self, filtro, ordenacao=(), limite=0, salto=0, colunas="id, doc"):
+        parametros = []
+        sql = f"SELECT {colunas} FROM {self.name} WHERE {self._traduzir(filtro, parametros)}"
+        sql += f" ORDER BY {self._ordem_sql(ordenacao)}"
+        if limite or salto:
+            sql += " LIMIT ? OFFSET ?"
+            parametros.extend([limite or -1, salto])
+        with self.trava:
+            return self.conexao.execute(sql, parametros).fetchall()
+
+    def _documento(self, identificador, texto):
+        documento = _decodificar(json.loads(texto))
+        documento["_id"] = _decodificar(identificador) if not identificador.startswith(("{", "[")) \
+            else _decodificar(json.loads(identificador))
+        return documento
+
+    # ------------------------------------------------------------------
+    # Escrita de documentos (chamadas sempre com a trava adquirida)
+    # ------------------------------------------------------------------
+
+    def _texto_documento(self, documento):
+        return json.dumps(_codificar({chave: valor for chave, valor in documento.items() if chave != "_id"}),
+                          ensure_ascii=False)
+
+    def _gravar_inserir(self, documento):
+        if "_id" not in documento:
+            documento["_id"] = ObjectId()
+        try:
+            self.conexao.execute(f"INSERT INTO {self.name} (id, doc) VALUES (?, ?)",
+                                 (_chave_id(documento["_id"]), self._texto_documento(documento)))
+        except sqlite3.IntegrityError as erro:
+            raise DuplicateKeyError(f"Chave duplicada: {erro}", CODIGO_CHAVE_DUPLICADA)
+        self._indexar_texto(documento)
+        self._indexar_valores(documento)
+        return documento["_id"]
+
+    def _gravar_substituir(self, documento):
+        try:
+            self.conexao.execute(f"UPDATE {self.name} SET doc = ? WHERE id = ?",
+                                 (self._texto_documento(documento), _chave_id(documento["_id"])))
+        except sqlite3.IntegrityError as erro:
+            raise DuplicateKeyError(f"Chave duplicada: {erro}", CODIGO_CHAVE_DUPLICADA)
+        self._indexar_texto(documento)
+        self._indexar_valores(documento)
+
+    def _gravar_excluir(self, identificador):
+        self.conexao.execute(f"DELETE FROM {self.name} WHERE id = ?", (identificador,))
+        if self.campos_texto:
+            self.conexao.execute(f"DELETE FROM {self.name}_fts WHERE id = ?", (identificador,))
+        if self.campos_lista:
+            self.conexao.execute(f"DELETE FROM {self.name}_valores WHERE id = ?", (identificador,))
+
+    def _indexar_texto(self, documento):
+        campos = self.campos_texto
+        if not campos:
+            return
+        identificador = _chave_id(documento["_id"])
+        self.conexao.execute(f"DELETE FROM {self.name}_fts WHERE id = ?", (identificador,))
+        self.conexao.execute(f"INSERT INTO {self.name}_fts (id, {', '.join(campos)}) VALUES (?{', ?' * len(campos)})",
+                             [identificador] + [str(documento.get(campo, "") or "") for campo in campos])
+
+    def _indexar_valores(self, documento):
+        if not self.campos_lista:
+            return
+        identificador = _chave_id(documento["_id"])
+        self.conexao.execute(f"DELETE FROM {self.name}_valores WHERE id = ?", (identificador,))
+        valores = []
+        for campo in self.campos_lista:
+            lista = _obter(documento, campo)
+            if isinstance(lista, (list, tuple)):
+                valores.extend((campo, _parametro(item), identificador) for item in lista)
+        if valores:
+            self.conexao.executemany(f"INSERT INTO {self.name}_valores (campo, valor, id) VALUES (?, ?, ?)", valores)
+
+    def _selecionar(self, filtro, limite=0, ordenacao=()):
+        parametros = []
+        sql = f"SELECT id, doc FROM {self.name} WHERE {self._traduzir(filtro, parametros)}"
+        if ordenacao:
+            sql += f" ORDER BY {self._ordem_sql(ordenacao)}"
+        if limite:
+            sql += f" LIMIT {int(limite)}"
+        return self.conexao.execute(sql, parametros).fetchall()
+
+    def _documento_upsert(self, filtro, atualizacao):
+        documento = {chave: valor for chave, valor in filtro.items()
+                     if not chave.startswith("$") and not (isinstance(valor, dict) and
+                                                           any(op.startswith("$") for op in valor))}
+        documento.setdefault("_id", ObjectId())
+        return _aplicar_atualizacao(documento, atualizacao, inserindo=True)
+
+    def _atualizar(self, filtro, atualizacao, upsert, multiplos):
+        linhas = self._selecionar(filtro, limite=0 if multiplos else 1)
+        modificados = 0
+        for identificador, texto in linhas:
+            documento = self._documento(identificador, texto)
+            original = json.dumps(_codificar(documento), sort_keys=True)
+            documento = _aplicar_atualizacao(documento, atualizacao)
+            if json.dumps(_codificar(documento), sort_keys=True) != original:
+                self._gravar_substituir(documento)
+                modificados += 1
+        inserido = None
+        if not linhas and upsert:
+            inserido = self._gravar_inserir(self._documento_upsert(filtro, atualizacao))
+        return {"n": len(linhas) + (1 if inserido is not None else 0), "nModified": modificados,
+                "upserted": inserido}
+
+    def _remover_documentos(self, filtro, multiplos):
+        linhas = self._selecionar(filtro, limite=0 if multiplos else 1)
+        for identificador, _ in linhas:
+            self._gravar_excluir(identificador)
+        return len(linhas)
+
+    # ------------------------------------------------------------------
+    # API compatível com o pymongo
+    # ------------------------------------------------------------------
+
+    def find(self, filtro=None, projecao=None):
+        return CursorSQLite(self, filtro, projecao)
+
+    def find_one(self, filtro=None, projecao=None, sort=None):
+        cursor = self.find(filtro, projecao).limit(1)
+        if sort:
+            cursor.sort(sort)
+        return next(iter(cursor), None)
+
+    def count_documents(self, filtro):
+        parametros = []
+        sql = f"SELECT COUNT(*) FROM {self.name} WHERE {self._traduzir(filtro, parametros)}"
+        with self.trava:
+            return self.conexao.execute(sql, parametros).fetchone()[0]
+
+    def estimated_document_count(self):
+        return self.count_documents({})
+
+    def distinct(self, campo, filtro=None):
+        valores = []
+        for documento in self.find(filtro, {campo: 1}):
+            valor = _obter(documento, campo)
+            for item in (valor if isinstance(valor, list) else [valor]):
+                if item is not None and item not in valores:
+                    valores.append(item)
+        return valores
+
+    def insert_one(self, documento):
+        with self.trava, self.conexao:
+            return InsertOneResult(self._gravar_inserir(documento), True)
+
+    def insert_many(self, documentos, ordered=True):
+        resultado = self.bulk_write([InsertOne(documento) for documento in documentos], ordered=ordered)
+        return InsertManyResult([documento["_id"] for documento in documentos if "_id" in documento][:resultado.inserted_count], True)
+
+    def update_one(self, filtro, atualizacao, upsert=False):
+        with self.trava, self.conexao:
+            return UpdateResult(self._atualizar(filtro, atualizacao, upsert, multiplos=False), True)
+
+    def update_many(self, filtro, atualizacao, upsert=False):
+        with self.trava, self.conexao:
+            return UpdateResult(self._atualizar(filtro, atualizacao, upsert, multiplos=True), True)
+
+    def replace_one(self, filtro, documento, upsert=False):
+        return self.update_one(filtro, documento, upsert=upsert)
+
+    def delete_one(self, filtro):
+        with self.trava, self.conexao:
+            return DeleteResult({"n": self._remover_documentos(filtro, multiplos=False)}, True)
+
+    def delete_many(self, filtro):
+        with self.trava, self.conexao:
+            return DeleteResult({"n": self._remover_documentos(filtro, multiplos=True)}, True)
+
+    def bulk_write(self, requisicoes, ordered=True):
+
+        """
+        Este método executa uma lista de operações InsertOne, UpdateOne,
+        UpdateMany, ReplaceOne, DeleteOne e DeleteMany do pymongo.
+        Como no MongoDB, um lote ordenado para no primeiro erro, mantendo as
+        operações anteriores; um lote não ordenado tenta todas as operações.
+        """
+
+        totais = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0, "upserted": []}
+        erros = []
+
+        # Os atributos das operações do pymongo ('_doc', '_filter', '_upsert')
+        # são os mesmos desde a versão 3 e são lidos diretamente.
+        with self.trava, self.conexao:
+            for indice, requisicao in enumerate(requisicoes):
+                try:
+                    if isinstance(requisicao, InsertOne):
+                        self._gravar_inserir(requisicao._doc)
+                        totais["nInserted"] += 1
+                    elif isinstance(requisicao, (UpdateOne, UpdateMany, ReplaceOne)):
+                        resultado = self._atualizar(requisicao._filter, requisicao._doc, requisicao._upsert,
+                                                    multiplos=isinstance(requisicao, UpdateMany))
+                        if resultado["upserted"] is not None:
+                            totais["nUpserted"] += 1
+                            totais["upserted"].append({"index": indice, "_id": resultado["upserted"]})
+                        else:
+                            totais["nMatched"] += resultado["n"]
+                        totais["nModified"] += resultado["nModified"]
+                    elif isinstance(requisicao, (DeleteOne, DeleteMany)):
+                        totais["nRemoved"] += self._remover_documentos(requisicao._filter,
+                                                                       multiplos=isinstance(requisicao, DeleteMany))
+                    else:
+                        raise OperationFailure(f"Operação não suportada: {type(requisicao).__name__}")
+                except DuplicateKeyError as erro:
+                    erros.append({"index": indice, "code": CODIGO_CHAVE_DUPLICADA, "errmsg": str(erro),
+                                  "op": getattr(requisicao, "_doc", None)})
+                    if ordered:
+                        break
+
+        if erros:
+            raise BulkWriteError(dict(totais, writeErrors=erros, writeConcernErrors=[]))
+        return BulkWriteResult(totais, True)
+
+    def create_index(self, chaves, unique=False, name=None, **opcoes):
+
+        """
+        Este método cria um índice de expressão equivalente ao índice do
+        MongoDB. Um índice de texto ('text') cria uma tabela FTS5 mantida
+        a cada escrita. Um índice sobre um campo de lista (multichave) é
+        criado na tabela auxiliar dos elementos.
+        """
+
+        if isinstance(chaves, str):
+            chaves = [(chaves, 1)]
+
+        campos_texto = [campo for campo, tipo in chaves if tipo == "text"]
+        if campos_texto:
+            self.armazenamento.criar_indice_texto(self.name, campos_texto)
+            return f"{self.name}_fts"
+
+        if len(chaves) == 1 and chaves[0][0] in self.campos_lista:
+            nome = re.sub(r"[^A-Za-z0-9_]", "_", f"{self.name}_valores_{chaves[0][0]}")
+            with self.trava, self.conexao:
+                self.conexao.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {self.name}_valores (campo, valor)")
+            return nome
+
+        nome = name or "_".join(f"{campo}_{direcao}" for campo, direcao in chaves)
+        nome = re.sub(r"[^A-Za-z0-9_]", "_", f"{self.name}_{nome}")
+        colunas = ", ".join(f"{self._expressao(campo)} {'DESC' if direcao == -1 else 'ASC'}"
+                            for campo, direcao in chaves)
+        try:
+            with self.trava, self.conexao:
+                self.conexao.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {nome} "
+                                     f"ON {self.name} ({colunas})")
+        except sqlite3.IntegrityError as erro:
+            raise DuplicateKeyError(f"Chave duplicada: {erro}", CODIGO_CHAVE_DUPLICADA)
+        return nome
+
+    def drop(self):
+        with self.trava, self.conexao:
+            self.conexao.execute(f"DROP TABLE IF EXISTS {self.name}")
+            self.conexao.execute(f"DROP TABLE IF EXISTS {self.name}_fts")
+            self.conexao.execute(f"DROP TABLE IF EXISTS {self.name}_valores")
+            self.conexao.execute("DELETE FROM _indices_texto WHERE colecao = ?", (self.name,))
+
+
+# Define a classe 'ArmazenamentoSQLite', que representa o banco SQLite inteiro.
+class ArmazenamentoSQLite:
+
+    """
+    Esta classe abre o arquivo SQLite em modo WAL e fornece as coleções.
+    Uma única conexão é compartilhada entre as threads da aplicação,
+    protegida por uma trava reentrante.
+    """
+
+    # Indica que o armazenamento é local: não há servidor a aguardar nem
+    # perda de conexão a tratar.
+    remoto = False
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.trava = threading.RLock()
+        self._colecoes = {}
+        self._campos_texto = {}
+
+        # Função usada pelo operador REGEXP do SQLite, que não tem
+        # implementação própria.
+        self.conexao.create_function("REGEXP", 2,
+                                     lambda padrao, valor: valor is not None and re.search(padrao, str(valor)) is not None,
+                                     deterministic=True)
+
+        with self.trava, self.conexao:
+            # O modo WAL permite leituras simultâneas a uma escrita e reduz
+            # o custo de cada transação.
+            self.conexao.execute("PRAGMA journal_mode=WAL")
+            self.conexao.execute("PRAGMA synchronous=NORMAL")
+            self.conexao.execute("CREATE TABLE IF NOT EXISTS _indices_texto "
+                                 "(colecao TEXT PRIMARY KEY, campos TEXT NOT NULL)")
+            for colecao, campos in self.conexao.execute("SELECT colecao, campos FROM _indices_texto"):
+                self._campos_texto[colecao] = json.loads(campos)
+
+    def colecao(self, nome):
+        if nome not in self._colecoes:
+            self._colecoes[nome] = ColecaoSQLite(self, nome)
+        return self._colecoes[nome]
+
+    # Permite acessar as coleções como no pymongo: armazenamento["tarefas"].
+    __getitem__ = colecao
+
+    def anexos(self, tamanho_bloco):
+
+        """
+        Este método retorna o armazenamento dos anexos das tarefas, nas
+        tabelas equivalentes ao GridFS deste arquivo.
+        """
+
+        return AnexosSQLite(self, tamanho_bloco)
+
+    def campos_texto(self, nome):
+        return self._campos_texto.get(nome)
+
+    def criar_indice_texto(self, nome, campos):
+
+        """
+        Este método cria a tabela FTS5 de uma coleção e indexa os documentos
+        já existentes.
+        """
+
+        if self._campos_texto.get(nome) == campos:
+            return
+        colecao = self.colecao(nome)
+        with self.trava, self.conexao:
+            self.conexao.execute(f"DROP TABLE IF EXISTS {nome}_fts")
+            self.conexao.execute(f"CREATE VIRTUAL TABLE {nome}_fts USING fts5(id UNINDEXED, {', '.join(campos)}, "
+                                 f"tokenize='unicode61 remove_diacritics 2')")
+            self.conexao.execute("INSERT OR REPLACE INTO _indices_texto (colecao, campos) VALUES (?, ?)",
+                                 (nome, json.dumps(campos)))
+            self._campos_texto[nome] = campos
+            for identificador, texto in self.conexao.execute(f"SELECT id, doc FROM {nome}").fetchall():
+                colecao._indexar_texto(colecao._documento(identificador, texto))
+
+    def listar_tarefas_com_tecnico(self, filtro, ordenar_por_data=False, colecao="tarefas"):
+
+        """
+        Este método retorna as tarefas (da tabela 'colecao') que atendem ao
+        filtro, com o nome do técnico responsável no campo 'tecnico_nome',
+        obtido com um LEFT JOIN pela chave primária da tabela 'tecnicos'.
+        É o equivalente ao '$lookup' do armazenamento MongoDB, inclusive na
+        ordem por data de criação e '_id' de 'ordenar_por_data'.
+        """
+
+        tarefas = self.colecao(colecao)
+        self.colecao("tecnicos")
+        parametros = []
+        sql = (f"SELECT id, doc, tecnico_nome FROM {tarefas.name} "
+               f"LEFT JOIN (SELECT id AS tecnico_chave, json_extract(doc, '$.\"nome\"') AS tecnico_nome FROM tecnicos) "
+               f"ON tecnico_chave = json_extract(doc, '$.\"tecnico_id\"') "
+               f"WHERE {tarefas._traduzir(filtro, parametros)} ORDER BY "
+               f"{self._expressao_chave_data(tarefas) + ', id' if ordenar_por_data else tarefas.name + '.rowid'}")
+        with self.trava:
+            linhas = self.conexao.execute(sql, parametros).fetchall()
+
+        resultado = []
+        for identificador, texto, nome in linhas:
+            documento = tarefas._documento(identificador, texto)
+            # O nome legado, quando presente, tem precedência sobre a referência.
+            documento["tecnico_nome"] = documento["tecnico"] if documento.get("tecnico") is not None else nome
+            resultado.append(documento)
+        return resultado
+
+    def contar_tarefas_por_tecnico(self, colecao="tarefas"):
+
+        """
+        Este método retorna a quantidade de tarefas de cada técnico em cada
+        status, com um único GROUP BY. Cada resultado tem os campos 'tecnico'
+        (ObjectId, nome legado ou None), 'status' e 'quantidade', como no
+        armazenamento MongoDB.
+        """
+
+        tarefas = self.colecao(colecao)
+        sql = (f"SELECT {self._expressao_chave_tecnico(tarefas)} AS chave, {tarefas._expressao('status')} AS status, "
+               f"COUNT(*) FROM {tarefas.name} GROUP BY chave, status")
+        with self.trava:
+            linhas = self.conexao.execute(sql).fetchall()
+        return [{"tecnico": _decodificar(chave), "status": status, "quantidade": quantidade}
+                for chave, status, quantidade in linhas]
+
+    def contar_facetas(self, filtro, colecao="tarefas"):
+
+        """
+        Este método retorna, em uma única consulta, a quantidade das tarefas
+        que atendem ao filtro por tag, por status e por técnico: o dicionário
+        {"tags": {...}, "status": {...}, "tecnicos": {...}}, em que cada
+        faceta associa o valor à sua quantidade. As tarefas filtradas são
+        selecionadas uma vez (WITH) e agrupadas três vezes (UNION ALL). É o
+        equivalente ao '$facet' do armazenamento MongoDB.
+        """
+
+        tarefas = self.colecao(colecao)
+        parametros = []
+        sql = (f"WITH filtradas AS (SELECT id, doc FROM {tarefas.name} WHERE {tarefas._traduzir(filtro, parametros)}) "
+               f"SELECT 'tags', valor, COUNT(*) FROM {tarefas.name}_valores "
+               f"WHERE campo = 'tags' AND id IN (SELECT id FROM filtradas) GROUP BY valor "
+               f"UNION ALL SELECT 'status', {tarefas._expressao('status')} AS chave, COUNT(*) FROM filtradas GROUP BY chave "
+               f"UNION ALL SELECT 'tecnicos', {self._expressao_chave_tecnico(tarefas)} AS chave, COUNT(*) "
+               f"FROM filtradas GROUP BY chave")
+        with self.trava:
+            linhas = self.conexao.execute(sql, parametros).fetchall()
+
+        facetas = {"tags": {}, "status": {}, "tecnicos": {}}
+        for faceta, chave, quantidade in linhas:
+            facetas[faceta][_decodificar(chave)] = quantidade
+        return facetas
+
+    def resumir_hierarquia(self, ids, colecao="tarefas"):
+
+        """
+        Este método retorna o resumo das tarefas informadas que têm
+        subtarefas ou dependências pendentes, no mesmo formato do
+        armazenamento MongoDB. As descendentes e as cadeias de dependências
+        são percorridas por consultas recursivas (WITH RECURSIVE), pelo
+        índice de 'pai_id' e pela tabela dos elementos de 'depende_de'. É o
+        equivalente aos '$graphLookup' do armazenamento MongoDB.
+        """
+
+        tarefas = self.colecao(colecao)
+        raizes = json.dumps([_chave_id(identificador) for identificador in ids])
+        pai = tarefas._expressao(CAMPO_PAI)
+        status = tarefas._expressao("status")
+
+        # O '+' retira a afinidade de texto da coluna 'id' da consulta
+        # recursiva; sem ele, o SQLite converteria a expressão de 'pai_id' e
+        # não usaria o seu índice.
+        sql_descendentes = (
+            f"WITH RECURSIVE descendentes(raiz, id, nivel) AS ("
+            f"SELECT {pai}, id, 0 FROM {tarefas.name} WHERE {pai} IN (SELECT value FROM json_each(?)) "
+            f"UNION SELECT descendentes.raiz, {tarefas.name}.id, descendentes.nivel + 1 "
+            f"FROM descendentes JOIN {tarefas.name} ON {pai} = +descendentes.id WHERE descendentes.nivel < ?) "
+            f"SELECT raiz, COUNT(DISTINCT descendentes.id), "
+            f"COUNT(DISTINCT CASE WHEN {status} = 'Concluída' THEN descendentes.id END) "
+            f"FROM descendentes JOIN {tarefas.name} ON {tarefas.name}.id = descendentes.id GROUP BY raiz")
+        sql_bloqueios = (
+            f"WITH RECURSIVE cadeia(raiz, id, nivel) AS ("
+            f"SELECT id, valor, 0 FROM {tarefas.name}_valores "
+            f"WHERE campo = ? AND id IN (SELECT value FROM json_each(?)) "
+            f"UNION SELECT cadeia.raiz, valores.valor, cadeia.nivel + 1 FROM cadeia "
+            f"JOIN {tarefas.name}_valores AS valores ON valores.id = cadeia.id AND valores.campo = ? "
+            f"WHERE cadeia.nivel < ?) "
+            f"SELECT raiz, cadeia.id, MIN(nivel) AS menor_nivel, {tarefas._expressao('titulo')} "
+            f"FROM cadeia JOIN {tarefas.name} ON {tarefas.name}.id = cadeia.id "
+            f"WHERE COALESCE({status}, '') <> 'Concluída' GROUP BY raiz, cadeia.id ORDER BY menor_nivel")
+        with self.trava:
+            descendentes = self.conexao.execute(sql_descendentes, (raizes, PROFUNDIDADE_MAXIMA)).fetchall()
+            bloqueios = self.conexao.execute(sql_bloqueios, (CAMPO_DEPENDENCIAS, raizes, CAMPO_DEPENDENCIAS,
+                                                             PROFUNDIDADE_MAXIMA)).fetchall()
+
+        resultado = {}
+        for raiz, subtarefas, concluidas in descendentes:
+            resultado[_decodificar(raiz)] = {"subtarefas": subtarefas, "concluidas": concluidas, "bloqueios": []}
+        for raiz, identificador, nivel, titulo in bloqueios:
+            resumo = resultado.setdefault(_decodificar(raiz), {"subtarefas": 0, "concluidas": 0, "bloqueios": []})
+            resumo["bloqueios"].append({"_id": _decodificar(identificador), "titulo": titulo, "nivel": nivel})
+        return resultado
+
+    def seguir_vinculos(self, tarefa_id, campo, colecao="tarefas"):
+
+        """
+        Este método retorna o conjunto dos '_id' alcançados a partir da
+        tarefa seguindo o campo informado ('pai_id' ou 'depende_de'), com uma
+        consulta recursiva. É o equivalente ao '$graphLookup' do
+        armazenamento MongoDB.
+        """
+
+        tarefas = self.colecao(colecao)
+        if campo in tarefas.campos_lista:
+            passo = (f"SELECT valores.valor, alcancadas.nivel + 1 FROM alcancadas "
+                     f"JOIN {tarefas.name}_valores AS valores ON valores.id = alcancadas.id AND valores.campo = ?")
+            parametros = [_chave_id(tarefa_id), campo, PROFUNDIDADE_MAXIMA]
+        else:
+            expressao = tarefas._expressao(campo)
+            passo = (f"SELECT {expressao}, alcancadas.nivel + 1 FROM alcancadas "
+                     f"JOIN {tarefas.name} ON {tarefas.name}.id = alcancadas.id AND {expressao} IS NOT NULL")
+            parametros = [_chave_id(tarefa_id), PROFUNDIDADE_MAXIMA]
+        sql = (f"WITH RECURSIVE alcancadas(id, nivel) AS (SELECT ?, 0 UNION {passo} WHERE alcancadas.nivel < ?) "
+               f"SELECT DISTINCT id FROM alcancadas WHERE nivel > 0")
+        with self.trava:
+            linhas = self.conexao.execute(sql, parametros).fetchall()
+        return {_decodificar(identificador) for identificador, in linhas}
+
+    def recalcular_resumo_mensal(self, filtro, calculado_em, origens, destino):
+
+        """
+        Este método conta as tarefas das tabelas 'origens' que atendem ao
+        filtro por mês de criação, técnico e status (UNION ALL e GROUP BY) e
+        grava as contagens na coleção 'destino', substituindo as anteriores.
+        É o equivalente à agregação com '$merge' do armazenamento MongoDB.
+        """
+
+        parametros = []
+        consultas = []
+        for origem in origens:
+            tarefas = self.colecao(origem)
+            data = tarefas._expressao("data_criacao")
+            consultas.append(
+                f"SELECT CASE WHEN {data} LIKE '{PREFIXO_DATA}%' THEN substr({data}, {len(PREFIXO_DATA) + 1}, 7) "
+                f"ELSE substr({data}, 7, 4) || '-' || substr({data}, 4, 2) END AS mes, "
+                f"{self._expressao_chave_tecnico(tarefas)} AS chave, {tarefas._expressao('status')} AS status "
+                f"FROM {tarefas.name} WHERE {tarefas._traduzir(filtro, parametros)}")
+        sql = (f"SELECT mes, chave, status, COUNT(*) FROM ({' UNION ALL '.join(consultas)}) "
+               f"WHERE mes GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]' GROUP BY mes, chave, status")
+        with self.trava:
+            linhas = self.conexao.execute(sql, parametros).fetchall()
+
+        requisicoes = []
+        for mes, chave, status, quantidade in linhas:
+            tecnico = _decodificar(chave)
+            identificador = {"mes": mes, "tecnico": tecnico, "status": status}
+            requisicoes.append(ReplaceOne({"_id": identificador},
+                                          dict(identificador, _id=identificador, quantidade=quantidade,
+                                               calculado_em=calculado_em), upsert=True))
+        if requisicoes:
+            self.colecao(destino).bulk_write(requisicoes, ordered=False)
+
+    # Expressão SQL da chave do técnico de uma tarefa: o nome legado, quando
+    # preenchido, ou a referência 'tecnico_id' (como no armazenamento MongoDB).
+    def _expressao_chave_tecnico(self, tarefas):
+        legado = tarefas._expressao("tecnico")
+        return f"CASE WHEN {legado} > '' THEN {legado} ELSE {tarefas._expressao('tecnico_id')} END"
+
+    def _expressao_chave_data(self, tarefas):
+        data = tarefas._expressao("data_criacao")
+        inicio = len(PREFIXO_DATA) + 1
+        return (f"CASE WHEN {data} LIKE '{PREFIXO_DATA}%' THEN CAST(substr({data}, {inicio}, 4) || "
+                f"substr({data}, {inicio + 5}, 2) || substr({data}, {inicio + 8}, 2) AS INTEGER) "
+                f"WHEN {data} GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]' THEN CAST(substr({data}, 7, 4) || "
+                f"substr({data}, 4, 2) || substr({data}, 1, 2) AS INTEGER) ELSE 0 END")
+
+    def verificar_conexao(self):
+        with self.trava:
+            self.conexao.execute("SELECT 1")
+
+    def fechar(self):
+        with self.trava:
+            self.conexao.close()
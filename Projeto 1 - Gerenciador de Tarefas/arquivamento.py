@@ -0,0 +1,133 @@
+# Módulo de arquivamento do Gerenciador de Tarefas.
+# Move as tarefas concluídas há muito tempo da coleção 'tarefas' para a
+# coleção 'tarefas_arquivo'. Assim, a lista principal e os filtros consultam
+# apenas as tarefas em andamento e as concluídas recentemente, enquanto os
+# relatórios e a busca podem incluir o arquivo quando o usuário pedir.
+
+# Importa o heapq, que mescla sequências já ordenadas sem carregá-las inteiras.
+import heapq
+
+# Importa a classe timedelta para calcular a data limite do arquivamento.
+from datetime import timedelta
+
+# Importa as operações em lote do pymongo.
+from pymongo import ReplaceOne, DeleteOne
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa a função que fornece o instante atual em UTC.
+from utilitarios import agora_utc
+
+# Importa a função que registra as tarefas removidas da coleção principal.
+from instantaneo import COLECAO_EXCLUSOES, registrar_exclusoes
+
+# Importa a função que passa para a lista principal as subtarefas de tarefas removidas.
+from hierarquia import liberar_subtarefas
+
+
+# Nome da coleção que guarda as tarefas arquivadas.
+COLECAO_ARQUIVO = "tarefas_arquivo"
+
+# Status das tarefas que podem ser arquivadas.
+STATUS_ARQUIVAVEL = "Concluída"
+
+
+# Define a função 'filtro_arquivaveis', que seleciona as tarefas a arquivar.
+def filtro_arquivaveis(limite):
+
+    """
+    Esta função retorna o filtro das tarefas concluídas cuja última
+    alteração ('atualizado_em') é anterior a 'limite'. Tarefas sem versão
+    foram gravadas antes da detecção de conflitos; para elas, vale o
+    instante de criação do '_id'. O filtro usa o índice composto
+    (status, atualizado_em).
+    """
+
+    return {"status": STATUS_ARQUIVAVEL,
+            "$or": [{"atualizado_em": {"$lt": limite}},
+                    {"atualizado_em": None, "_id": {"$lt": ObjectId.from_datetime(limite)}}]}
+
+
+# Define a função 'arquivar_concluidas', executada periodicamente em segundo plano.
+def arquivar_concluidas(armazenamento, idade_dias, tamanho_lote=500):
+
+    """
+    Esta função move para a coleção de arquivo as tarefas concluídas há mais
+    de 'idade_dias' dias, em lotes de 'tamanho_lote' tarefas:
+    1. O lote é copiado com ReplaceOne (upsert), o que torna a cópia
+       idempotente caso uma execução anterior tenha sido interrompida.
+    2. Cada tarefa só é removida da coleção principal se a sua versão não
+       mudou desde a leitura. Se outra estação a alterou nesse intervalo
+       (por exemplo, reabrindo-a), ela fica na coleção principal e a cópia
+       arquivada é descartada. Se menos tarefas foram removidas do que as
+       que saíram da coleção, outra estação excluiu algumas delas: as que
+       têm um registro de exclusão que não é de arquivamento também perdem
+       a cópia arquivada. Uma exclusão registrada depois dessa verificação
+       remove a cópia por conta própria ('exclusao.concluir_exclusao').
+    3. As tarefas movidas recebem um registro de exclusão, para que as
+       outras estações as removam do instantâneo local, e as suas
+       subtarefas que continuam na coleção principal passam a ser tarefas
+       sem pai (senão deixariam de aparecer na lista).
+    Várias estações podem executar o arquivamento ao mesmo tempo.
+    Retorna a quantidade de tarefas arquivadas.
+    """
+
+    if idade_dias <= 0:
+        return 0
+
+    tarefas = armazenamento.colecao("tarefas")
+    arquivo = armazenamento.colecao(COLECAO_ARQUIVO)
+    filtro = filtro_arquivaveis(agora_utc() - timedelta(days=idade_dias))
+
+    arquivadas = 0
+    while True:
+        lote = list(tarefas.find(filtro).sort("_id", 1).limit(tamanho_lote))
+        if not lote:
+            break
+
+        arquivo.bulk_write([ReplaceOne({"_id": tarefa["_id"]}, tarefa, upsert=True) for tarefa in lote],
+                           ordered=False)
+        resultado = tarefas.bulk_write([DeleteOne({"_id": tarefa["_id"], "atualizado_em": tarefa.get("atualizado_em")})
+                                        for tarefa in lote], ordered=False)
+        arquivadas += resultado.deleted_count
+
+        descartadas = set()
+        if resultado.deleted_count < len(lote):
+            ids = [tarefa["_id"] for tarefa in lote]
+            descartadas = {tarefa["_id"] for tarefa in tarefas.find({"_id": {"$in": ids}}, {"_id": 1})}
+            # Tarefas que saíram da coleção sem ser removidas por esta
+            # execução foram excluídas ou arquivadas por outra estação.
+            if resultado.deleted_count < len(lote) - len(descartadas):
+                ausentes = [tarefa_id for tarefa_id in ids if tarefa_id not in descartadas]
+                excluidas = armazenamento.colecao(COLECAO_EXCLUSOES).find(
+                    {"_id": {"$in": ausentes}, "arquivada": {"$ne": True}}, {"_id": 1})
+                descartadas |= {registro["_id"] for registro in excluidas}
+            arquivo.delete_many({"_id": {"$in": list(descartadas)}})
+
+        # As tarefas movidas saem da lista principal das outras estações, e
+        # as suas subtarefas ativas passam para a lista principal.
+        movidas = [str(tarefa["_id"]) for tarefa in lote if tarefa["_id"] not in descartadas]
+        registrar_exclusoes(armazenamento, movidas,
+                            {str(tarefa["_id"]): tarefa.get("data_criacao") for tarefa in lote}, arquivadas=True)
+        liberar_subtarefas(tarefas, movidas)
+
+        # Um lote incompleto é o último; um lote sem remoções indica que as
+        # tarefas restantes estão sendo alteradas e ficam para a próxima execução.
+        if len(lote) < tamanho_lote or not resultado.deleted_count:
+            break
+
+    return arquivadas
+
+
+# Define a função 'mesclar_ordenado', que combina tarefas ativas e arquivadas.
+def mesclar_ordenado(fontes, chave):
+
+    """
+    Esta função mescla cursores (ou listas) já ordenados pela mesma chave em
+    uma única sequência ordenada. Os documentos são lidos conforme a
+    sequência é consumida, sem carregar nenhuma das fontes inteira na memória.
+    Em caso de empate, os documentos da primeira fonte vêm primeiro.
+    """
+
+    return heapq.merge(*fontes, key=chave)
@@ -0,0 +1,175 @@
+# Módulo do cache de relatórios do Gerenciador de Tarefas.
+# Guarda os relatórios PDF gerados em um diretório local, cada um em um
+# arquivo cujo nome é o resumo (SHA-256) do tipo do relatório, dos filtros e
+# de uma impressão digital das tarefas incluídas: a quantidade de tarefas e
+# a maior data de alteração. Um relatório pedido de novo, sem alterações nas
+# tarefas, é entregue copiando o arquivo guardado, sem consultar as tarefas
+# nem montar o PDF.
+
+# Importa o hashlib, que calcula a chave de cada relatório.
+import hashlib
+
+# Importa o json, usado para serializar a chave e as estatísticas do cache.
+import json
+
+# Importa o módulo os para listar, datar e remover os arquivos do cache.
+import os
+
+# Importa o shutil, que copia os arquivos de e para o cache.
+import shutil
+
+# Importa o time para calcular a idade dos arquivos.
+import time
+
+# Importa a coleção de registros de exclusão, cuja data mais recente indica
+# se alguma tarefa saiu da coleção 'tarefas'.
+from instantaneo import COLECAO_EXCLUSOES
+
+
+# Versão do leiaute dos relatórios. Deve ser alterada sempre que o conteúdo
+# gerado mudar, para que os relatórios guardados não sejam mais usados.
+VERSAO_RELATORIO = 2
+
+# Extensão dos arquivos guardados e nome do arquivo de estatísticas.
+EXTENSAO = ".pdf"
+ARQUIVO_ESTATISTICAS = "estatisticas.json"
+
+
+# Define a função '_mais_recente', que lê o maior valor de um campo de data.
+def _mais_recente(colecao, filtro, campo):
+    documento = colecao.find_one(filtro, {campo: 1}, sort=[(campo, -1)])
+    return documento.get(campo) if documento else None
+
+
+# Define a função 'impressao_tarefas', que resume o estado das tarefas de um relatório.
+def impressao_tarefas(armazenamento, consulta, colecoes):
+
+    """
+    Esta função retorna uma impressão digital barata das tarefas que atendem
+    à consulta nas coleções informadas: a quantidade e a maior data de
+    alteração ('atualizado_em') em cada coleção. Também entram a data da
+    exclusão mais recente, pois excluir uma tarefa pode não mudar as outras
+    duas, e a quantidade e a data de alteração mais recente dos técnicos,
+    cujos nomes aparecem no relatório.
+    """
+
+    impressao = []
+    for nome in colecoes:
+        colecao = armazenamento.colecao(nome)
+        impressao.append([nome, colecao.count_documents(consulta), _mais_recente(colecao, consulta, "atualizado_em")])
+    impressao.append([COLECAO_EXCLUSOES, _mais_recente(armazenamento.colecao(COLECAO_EXCLUSOES), {}, "excluido_em")])
+    tecnicos = armazenamento.colecao("tecnicos")
+    impressao.append(["tecnicos", tecnicos.count_documents({}), _mais_recente(tecnicos, {}, "atualizado_em")])
+    return impressao
+
+
+# Define a classe 'CacheRelatorios', que guarda e entrega os relatórios gerados.
+class CacheRelatorios:
+
+    """
+    Esta classe mantém os relatórios no diretório 'diretorio'. Arquivos
+    com mais de 'idade_maxima_dias' dias são descartados e, se o total
+    passar de 'tamanho_maximo' bytes, os menos usados recentemente também
+    (a data de modificação é renovada a cada uso). 'origem' identifica o
+    armazenamento, para que bancos diferentes não compartilhem relatórios.
+    As quantidades de acertos e de falhas são gravadas no próprio diretório.
+    """
+
+    def __init__(self, diretorio, origem, tamanho_maximo, idade_maxima_dias):
+        self.diretorio = diretorio
+        self.origem = origem
+        self.tamanho_maximo = tamanho_maximo
+        self.idade_maxima = idade_maxima_dias * 24 * 60 * 60
+        os.makedirs(diretorio, exist_ok=True)
+        self.estatisticas = self._ler_estatisticas()
+
+    # Define o método 'chave', que calcula o nome do arquivo de um relatório.
+    def chave(self, tipo, filtros, impressao):
+        conteudo = json.dumps([VERSAO_RELATORIO, self.origem, tipo, filtros, impressao],
+                              sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + EXTENSAO)
+
+    # Define o método 'obter', que entrega um relatório guardado.
+    def obter(self, chave, destino):
+
+        """
+        Este método copia o relatório da chave informada para 'destino' e
+        retorna True, ou retorna False se ele não estiver no cache.
+        """
+
+        caminho = self._caminho(chave)
+        try:
+            shutil.copyfile(caminho, destino)
+            os.utime(caminho)
+            acerto = True
+        except OSError:
+            acerto = False
+        self._contar(acerto)
+        return acerto
+
+    # Define o método 'guardar', chamado depois que um relatório é gerado.
+    def guardar(self, chave, origem):
+
+        """
+        Este método copia o relatório gerado para o cache, por meio de um
+        arquivo temporário, para que um arquivo pela metade nunca seja
+        entregue, e depois aplica os limites de idade e tamanho.
+        """
+
+        temporario = self._caminho(chave) + ".tmp"
+        shutil.copyfile(origem, temporario)
+        os.replace(temporario, self._caminho(chave))
+        self.despejar()
+
+    # Define o método 'despejar', que aplica os limites de idade e tamanho.
+    def despejar(self):
+        agora = time.time()
+        arquivos = []
+        for entrada in os.scandir(self.diretorio):
+            if not entrada.name.endswith(EXTENSAO):
+                continue
+            informacoes = entrada.stat()
+            if agora - informacoes.st_mtime > self.idade_maxima:
+                os.remove(entrada.path)
+            else:
+                arquivos.append((informacoes.st_mtime, informacoes.st_size, entrada.path))
+
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.tamanho_maximo:
+                break
+            os.remove(caminho)
+            total -= tamanho
+
+    # Define o método 'taxa_acertos', que retorna a fração dos pedidos
+    # atendidos pelo cache (ou None, antes do primeiro pedido).
+    def taxa_acertos(self):
+        pedidos = self.estatisticas["acertos"] + self.estatisticas["falhas"]
+        return self.estatisticas["acertos"] / pedidos if pedidos else None
+
+    # Define o método 'descricao_taxa', usado nas mensagens da interface.
+    def descricao_taxa(self):
+        taxa = self.taxa_acertos()
+        if taxa is None:
+            return ""
+        pedidos = self.estatisticas["acertos"] + self.estatisticas["falhas"]
+        return f"Cache de relatórios: {taxa:.0%} de acertos em {pedidos} pedidos."
+
+    def _ler_estatisticas(self):
+        try:
+            with open(os.path.join(self.diretorio, ARQUIVO_ESTATISTICAS), encoding="utf-8") as arquivo:
+                estatisticas = json.load(arquivo)
+            return {"acertos": int(estatisticas["acertos"]), "falhas": int(estatisticas["falhas"])}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {"acertos": 0, "falhas": 0}
+
+    def _contar(self, acerto):
+        self.estatisticas["acertos" if acerto else "falhas"] += 1
+        try:
+            with open(os.path.join(self.diretorio, ARQUIVO_ESTATISTICAS), "w", encoding="utf-8") as arquivo:
+                json.dump(self.estatisticas, arquivo)
+        except OSError:
+            pass
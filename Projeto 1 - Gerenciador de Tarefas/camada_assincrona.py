@@ -0,0 +1,76 @@
+# Módulo da camada de dados assíncrona do Gerenciador de Tarefas.
+# Mantém um laço de eventos asyncio em uma thread própria, ao lado do laço
+# do tkinter. As consultas são escritas como corrotinas: as chamadas ao
+# pymongo (ou ao armazenamento SQLite) rodam em um executor do tamanho do
+# pool de conexões, de modo que consultas independentes, reunidas com
+# 'asyncio.gather', usam conexões diferentes do pool ao mesmo tempo. Os
+# resultados voltam à interface pela fila da interface. É o único meio de
+# execução em segundo plano da janela: 'executar_em_segundo_plano' é um
+# atalho para uma única chamada bloqueante.
+
+# Importa o asyncio, que fornece o laço de eventos e as corrotinas.
+import asyncio
+
+# Importa o functools para repassar argumentos nomeados ao executor.
+import functools
+
+# Importa o threading para executar o laço de eventos em segundo plano.
+import threading
+
+# Importa o executor de threads que executa as chamadas bloqueantes.
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Define a classe 'CamadaAssincrona', que integra o asyncio ao tkinter.
+class CamadaAssincrona:
+
+    """
+    Esta classe executa corrotinas em um laço asyncio dedicado.
+    - 'chamar' aguarda uma função bloqueante executada no executor.
+    - 'executar' agenda uma corrotina a partir da thread da interface e
+      entrega o resultado (ou o erro) aos callbacks, que rodam na thread
+      do tkinter, sem bloquear o redesenho da janela.
+    """
+
+    def __init__(self, fila_interface, max_chamadas=None):
+        self.fila_interface = fila_interface
+        self.executor = ThreadPoolExecutor(max_workers=max_chamadas, thread_name_prefix="dados")
+        self.laco = asyncio.new_event_loop()
+        self.laco.set_default_executor(self.executor)
+        threading.Thread(target=self.laco.run_forever, daemon=True).start()
+
+    # Define o método 'chamar', que aguarda uma chamada bloqueante.
+    async def chamar(self, funcao, *argumentos, **opcoes):
+
+        """
+        Esta corrotina executa 'funcao' no executor e retorna o seu resultado,
+        liberando o laço de eventos para as demais consultas.
+        """
+
+        return await self.laco.run_in_executor(None, functools.partial(funcao, *argumentos, **opcoes))
+
+    # Define o método 'executar', chamado a partir da thread da interface.
+    def executar(self, corrotina, ao_concluir=None, ao_falhar=None):
+
+        """
+        Este método agenda 'corrotina' no laço de eventos. Ao terminar,
+        'ao_concluir' recebe o valor retornado; em caso de exceção,
+        'ao_falhar' recebe o erro. Os dois callbacks rodam na thread da interface.
+        """
+
+        def entregar(futuro):
+            try:
+                resultado = futuro.result()
+            except Exception as erro:
+                self.fila_interface.put((ao_falhar, erro))
+            else:
+                self.fila_interface.put((ao_concluir, resultado))
+
+        futuro = asyncio.run_coroutine_threadsafe(corrotina, self.laco)
+        futuro.add_done_callback(entregar)
+        return futuro
+
+    # Define o método 'fechar', chamado ao encerrar a aplicação.
+    def fechar(self):
+        self.laco.call_soon_threadsafe(self.laco.stop)
+        self.executor.shutdown(wait=False)
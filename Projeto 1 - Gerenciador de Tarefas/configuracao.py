@@ -0,0 +1,210 @@
+# Módulo de configuração do Gerenciador de Tarefas.
+# Centraliza a leitura das configurações da aplicação a partir de um
+# arquivo INI e de variáveis de ambiente, além da criação do cliente MongoDB.
+
+# Importa o configparser, usado para ler arquivos de configuração no formato INI.
+import configparser
+
+# Importa o módulo os para acessar variáveis de ambiente e caminhos de arquivos.
+import os
+
+# Importa o importlib.util para verificar se os módulos opcionais de
+# compressão (zstandard e snappy) estão instalados.
+import importlib.util
+
+# Importa a classe MongoClient do módulo pymongo.
+from pymongo import MongoClient
+
+
+# Diretório onde este arquivo está localizado. O arquivo de configuração
+# padrão é procurado neste mesmo diretório.
+DIRETORIO_APLICACAO = os.path.dirname(os.path.abspath(__file__))
+
+# Caminho padrão do arquivo de configuração.
+# Pode ser substituído pela variável de ambiente GERENCIADOR_CONFIG.
+ARQUIVO_CONFIGURACAO_PADRAO = os.path.join(DIRETORIO_APLICACAO, "gerenciador.ini")
+
+# Prefixo das variáveis de ambiente que sobrescrevem o arquivo de configuração.
+# O nome da variável é formado por PREFIXO + SEÇÃO + CHAVE, em maiúsculas.
+# Exemplo: GERENCIADOR_MONGODB_URI sobrescreve a chave 'uri' da seção [mongodb].
+PREFIXO_AMBIENTE = "GERENCIADOR_"
+
+# Valores padrão usados quando nem o arquivo nem o ambiente definem a chave.
+CONFIGURACAO_PADRAO = {
+    "mongodb": {
+        "uri": "mongodb://localhost:27017/",
+        "banco": "gerenciador_tarefas_db",
+        "max_pool_size": "10",
+        "min_pool_size": "0",
+        "server_selection_timeout_ms": "3000",
+        "connect_timeout_ms": "3000",
+        "socket_timeout_ms": "10000",
+        "compressores": "zstd,snappy",
+        "read_preference": "primaryPreferred",
+        "intervalo_reconexao_ms": "5000",
+    },
+    "armazenamento": {
+        "tipo": "mongodb",
+        "arquivo_sqlite": "tarefas.sqlite3",
+    },
+    "tecnicos": {
+        "intervalo_verificacao_ms": "60000",
+    },
+    "local": {
+        "diretorio": os.path.join("~", ".gerenciador_tarefas"),
+    },
+    "offline": {
+        "arquivo_diario": "diario_offline.sqlite3",
+        "tamanho_lote": "100",
+        "intervalo_sincronizacao_ms": "15000",
+    },
+    "arquivo": {
+        "idade_dias": "90",
+        "tamanho_lote": "500",
+        "intervalo_ms": "3600000",
+    },
+    "interface": {
+        "intervalo_atualizacao_ms": "30",
+        "tamanho_pagina_grupo": "100",
+    },
+    "instantaneo": {
+        "arquivo": "instantaneo_tarefas.json",
+    },
+    "resumo": {
+        "intervalo_ms": "600000",
+    },
+    "relatorios": {
+        "diretorio_cache": "cache_relatorios",
+        "tamanho_maximo_mb": "200",
+        "idade_maxima_dias": "30",
+    },
+    "entrada_rapida": {
+        "tamanho_lote": "50",
+        "intervalo_ms": "2000",
+    },
+    "anexos": {
+        "tamanho_bloco_kb": "255",
+        "diretorio_miniaturas": "miniaturas",
+        "tamanho_miniatura": "128",
+    },
+    "edicao": {
+        "intervalo_ms": "1500",
+    },
+    "recorrencia": {
+        "intervalo_ms": "3600000",
+    },
+    "api": {
+        "endereco": "127.0.0.1",
+        "porta": "8080",
+        "tamanho_pagina": "50",
+        "tamanho_pagina_maximo": "500",
+    },
+}
+
+# Módulos Python exigidos por cada compressor do protocolo do MongoDB.
+# O zlib faz parte da biblioteca padrão e está sempre disponível.
+MODULOS_COMPRESSORES = {
+    "zstd": "zstandard",
+    "snappy": "snappy",
+    "zlib": "zlib",
+}
+
+
+# Define a função 'carregar_configuracao', que monta o dicionário de
+# configurações combinando valores padrão, arquivo INI e ambiente.
+def carregar_configuracao(caminho=None):
+
+    """
+    Esta função carrega as configurações da aplicação.
+    A precedência é: variáveis de ambiente, arquivo INI e valores padrão.
+    Retorna um dicionário de seções, cada uma com um dicionário de chaves.
+    """
+
+    # Inicia com uma cópia dos valores padrão.
+    configuracao = {secao: dict(valores) for secao, valores in CONFIGURACAO_PADRAO.items()}
+
+    # Define o caminho do arquivo: argumento, variável de ambiente ou padrão.
+    caminho = caminho or os.environ.get(PREFIXO_AMBIENTE + "CONFIG", ARQUIVO_CONFIGURACAO_PADRAO)
+
+    # Lê o arquivo INI, se existir. Seções e chaves desconhecidas também
+    # são mantidas, para que outros módulos possam usá-las.
+    leitor = configparser.ConfigParser()
+    if os.path.exists(caminho):
+        leitor.read(caminho, encoding="utf-8")
+    for secao in leitor.sections():
+        configuracao.setdefault(secao, {}).update(leitor[secao])
+
+    # Aplica as variáveis de ambiente por último, pois têm a maior precedência.
+    for secao, valores in configuracao.items():
+        for chave in valores:
+            variavel = f"{PREFIXO_AMBIENTE}{secao}_{chave}".upper()
+            if variavel in os.environ:
+                valores[chave] = os.environ[variavel]
+
+    return configuracao
+
+
+# Define a função 'compressores_disponiveis', que filtra a lista de
+# compressores configurados, mantendo apenas os que podem ser usados.
+def compressores_disponiveis(compressores):
+
+    """
+    Esta função recebe uma string como 'zstd,snappy' e retorna apenas os
+    compressores cujos módulos estão instalados, na mesma ordem de preferência.
+    """
+
+    disponiveis = []
+    for nome in compressores.split(","):
+        nome = nome.strip().lower()
+        modulo = MODULOS_COMPRESSORES.get(nome)
+        if modulo and importlib.util.find_spec(modulo) is not None:
+            disponiveis.append(nome)
+    return disponiveis
+
+
+# Define a função 'criar_cliente_mongo', que cria o MongoClient a partir
+# da seção [mongodb] da configuração.
+def criar_cliente_mongo(configuracao):
+
+    """
+    Esta função cria um MongoClient com pool de conexões, timeouts,
+    compressão e preferência de leitura configuráveis.
+    A conexão não é aberta aqui (connect=False): ela é estabelecida na
+    primeira operação, permitindo que a interface seja exibida imediatamente.
+    """
+
+    mongo = configuracao["mongodb"]
+
+    # Monta os parâmetros opcionais do cliente.
+    parametros = {
+        "maxPoolSize": int(mongo["max_pool_size"]),
+        "minPoolSize": int(mongo["min_pool_size"]),
+        "serverSelectionTimeoutMS": int(mongo["server_selection_timeout_ms"]),
+        "connectTimeoutMS": int(mongo["connect_timeout_ms"]),
+        "socketTimeoutMS": int(mongo["socket_timeout_ms"]),
+        "readPreference": mongo["read_preference"],
+        "appname": "GerenciadorDeTarefas",
+        "connect": False,
+    }
+
+    # Só ativa a compressão se ao menos um compressor estiver disponível.
+    compressores = compressores_disponiveis(mongo["compressores"])
+    if compressores:
+        parametros["compressors"] = ",".join(compressores)
+
+    return MongoClient(mongo["uri"], **parametros)
+
+
+# Define a função 'caminho_local', que resolve o caminho de um arquivo
+# dentro do diretório de dados locais da aplicação.
+def caminho_local(configuracao, nome_arquivo):
+
+    """
+    Esta função retorna o caminho absoluto de 'nome_arquivo' dentro do
+    diretório local configurado em [local] diretorio, criando-o se necessário.
+    Caminhos absolutos em 'nome_arquivo' são mantidos como estão.
+    """
+
+    diretorio = os.path.expanduser(configuracao["local"]["diretorio"])
+    os.makedirs(diretorio, exist_ok=True)
+    return os.path.join(diretorio, os.path.expanduser(nome_arquivo))
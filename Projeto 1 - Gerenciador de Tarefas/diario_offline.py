@@ -0,0 +1,522 @@
+# Módulo do diário offline do Gerenciador de Tarefas.
+# Quando o servidor MongoDB está inacessível, as operações de inclusão,
+# atualização e exclusão de tarefas são gravadas em um diário local (SQLite).
+# Quando a conexão volta, o diário é reproduzido na coleção 'tarefas' em
+# lotes ordenados de 'bulk_write', com detecção de conflitos.
+
+# Importa o sqlite3, banco de dados embutido usado para o diário local.
+import sqlite3
+
+# Importa o json para serializar os dados das operações.
+import json
+
+# Importa o threading para proteger o acesso concorrente à conexão SQLite.
+import threading
+
+# Importa a classe datetime para serializar e restaurar datas.
+from datetime import datetime
+
+# Importa as operações em lote e os erros do pymongo.
+from pymongo import InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa a função que fornece o instante atual com a precisão do MongoDB.
+from utilitarios import agora_utc
+
+
+# Operações aceitas pelo diário.
+OPERACAO_INSERIR = "inserir"
+OPERACAO_ATUALIZAR = "atualizar"
+OPERACAO_EXCLUIR = "excluir"
+
+# Estados de uma operação no diário.
+ESTADO_PENDENTE = "pendente"
+ESTADO_CONFLITO = "conflito"
+
+# Código de erro do MongoDB para chave duplicada.
+CODIGO_CHAVE_DUPLICADA = 11000
+
+# Prefixos usados para marcar datas e ObjectId dentro do JSON do diário.
+PREFIXO_DATA = "$data:"
+PREFIXO_OID = "$oid:"
+
+
+# Funções auxiliares de serialização. O JSON não tem tipo de data nem de
+# ObjectId, então esses valores são gravados como texto com um prefixo.
+def _serializar_valor(valor):
+    if isinstance(valor, datetime):
+        return PREFIXO_DATA + valor.isoformat()
+    if isinstance(valor, ObjectId):
+        return PREFIXO_OID + str(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def _restaurar_valor(valor):
+    if isinstance(valor, str) and valor.startswith(PREFIXO_DATA):
+        return datetime.fromisoformat(valor[len(PREFIXO_DATA):])
+    if isinstance(valor, str) and valor.startswith(PREFIXO_OID):
+        return ObjectId(valor[len(PREFIXO_OID):])
+    if isinstance(valor, dict):
+        return {chave: _restaurar_valor(item) for chave, item in valor.items()}
+    if isinstance(valor, list):
+        return [_restaurar_valor(item) for item in valor]
+    return valor
+
+
+def _para_json(valor):
+    return json.dumps(valor, default=_serializar_valor, ensure_ascii=False)
+
+
+def _de_json(texto):
+    return _restaurar_valor(json.loads(texto)) if texto else None
+
+
+# Define a classe 'OperacaoDiario', que representa uma linha do diário.
+class OperacaoDiario:
+
+    """
+    Esta classe representa uma operação registrada no diário offline.
+    - 'versao_base' é o 'atualizado_em' da tarefa quando o usuário a editou.
+    - 'versao_nova' é o 'atualizado_em' atribuído localmente pela operação.
+    - 'versao_envio' é o 'atualizado_em' usado na última tentativa de envio,
+      que permite reconhecer um envio interrompido antes da confirmação.
+    """
+
+    __slots__ = ("sequencia", "operacao", "tarefa_id", "dados", "versao_base", "versao_nova", "versao_envio")
+
+    def __init__(self, sequencia, operacao, tarefa_id, dados, versao_base, versao_nova, versao_envio):
+        self.sequencia = sequencia
+        self.operacao = operacao
+        self.tarefa_id = tarefa_id
+        self.dados = dados
+        self.versao_base = versao_base
+        self.versao_nova = versao_nova
+        self.versao_envio = versao_envio
+
+
+# Define a classe 'DiarioOffline', responsável por gravar e reproduzir
+# as operações feitas sem conexão com o servidor.
+class DiarioOffline:
+
+    """
+    Esta classe mantém o diário de operações offline em um arquivo SQLite.
+    O diário é durável: operações gravadas sobrevivem ao fechamento do
+    aplicativo e são reproduzidas na próxima vez que a conexão estiver disponível.
+    """
+
+    def __init__(self, caminho):
+
+        # A conexão é compartilhada entre a thread da interface e a thread
+        # de sincronização, por isso o acesso é protegido por uma trava.
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.trava = threading.Lock()
+
+        with self.trava, self.conexao:
+            self.conexao.execute("PRAGMA journal_mode=WAL")
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS operacoes (
+                    sequencia INTEGER PRIMARY KEY AUTOINCREMENT,
+                    operacao TEXT NOT NULL,
+                    tarefa_id TEXT NOT NULL,
+                    dados TEXT,
+                    versao_base TEXT,
+                    versao_nova TEXT,
+                    versao_envio TEXT,
+                    estado TEXT NOT NULL DEFAULT 'pendente',
+                    erro TEXT
+                )
+            """)
+
+    # Define o método 'registrar', que grava uma nova operação no diário.
+    def registrar(self, operacao, tarefa_id, dados=None, versao_base=None, versao_nova=None):
+
+        """
+        Este método grava uma operação pendente no diário.
+        - Para 'inserir', 'dados' é o documento completo da tarefa.
+        - Para 'atualizar', 'dados' contém os campos alterados ($set).
+        - Para 'excluir', 'dados' pode trazer a data de criação da tarefa
+          ({"data_criacao": ...}), usada no registro da exclusão.
+        """
+
+        with self.trava, self.conexao:
+            self.conexao.execute(
+                "INSERT INTO operacoes (operacao, tarefa_id, dados, versao_base, versao_nova) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (operacao, str(tarefa_id), _para_json(dados), _para_json(versao_base), _para_json(versao_nova)))
+
+    # Define o método 'pendentes', que retorna as operações ainda não enviadas.
+    def pendentes(self, limite=None):
+
+        """
+        Este método retorna as operações pendentes em ordem de registro.
+        """
+
+        sql = ("SELECT sequencia, operacao, tarefa_id, dados, versao_base, versao_nova, versao_envio "
+               "FROM operacoes WHERE estado = ? ORDER BY sequencia")
+        parametros = [ESTADO_PENDENTE]
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+
+        with self.trava:
+            linhas = self.conexao.execute(sql, parametros).fetchall()
+
+        return [OperacaoDiario(sequencia, operacao, tarefa_id, _de_json(dados),
+                               _de_json(base), _de_json(nova), _de_json(envio))
+                for sequencia, operacao, tarefa_id, dados, base, nova, envio in linhas]
+
+    # Define o método 'quantidade_pendente', usado na barra de status.
+    def quantidade_pendente(self):
+
+        """
+        Este método retorna o número de operações pendentes no diário.
+        """
+
+        with self.trava:
+            return self.conexao.execute("SELECT COUNT(*) FROM operacoes WHERE estado = ?",
+                                        (ESTADO_PENDENTE,)).fetchone()[0]
+
+    # Define o método 'possui_pendencias', que indica se uma tarefa tem
+    # operações aguardando envio.
+    def possui_pendencias(self, tarefa_id):
+
+        """
+        Este método retorna True se a tarefa tiver operações pendentes no diário.
+        Novas operações sobre essa tarefa também devem passar pelo diário,
+        para que sejam aplicadas no servidor na ordem em que foram feitas.
+        """
+
+        with self.trava:
+            return self.conexao.execute("SELECT 1 FROM operacoes WHERE tarefa_id = ? AND estado = ? LIMIT 1",
+                                        (str(tarefa_id), ESTADO_PENDENTE)).fetchone() is not None
+
+    # Define o método 'conflitos', que retorna as operações em conflito.
+    def conflitos(self):
+
+        """
+        Este método retorna, em ordem de registro, as operações que não foram
+        aplicadas por conflito, como pares (OperacaoDiario, motivo). Elas
+        ficam no diário até serem reaplicadas ou descartadas.
+        """
+
+        with self.trava:
+            linhas = self.conexao.execute(
+                "SELECT sequencia, operacao, tarefa_id, dados, versao_base, versao_nova, versao_envio, erro "
+                "FROM operacoes WHERE estado = ? ORDER BY sequencia", (ESTADO_CONFLITO,)).fetchall()
+
+        return [(OperacaoDiario(sequencia, operacao, tarefa_id, _de_json(dados),
+                                _de_json(base), _de_json(nova), _de_json(envio)), erro)
+                for sequencia, operacao, tarefa_id, dados, base, nova, envio, erro in linhas]
+
+    # Define o método 'descartar', que remove operações em conflito do diário.
+    def descartar(self, sequencias):
+
+        """
+        Este método remove do diário as operações em conflito informadas,
+        mantendo no servidor a versão gravada pela outra estação.
+        """
+
+        with self.trava, self.conexao:
+            self.conexao.executemany("DELETE FROM operacoes WHERE sequencia = ? AND estado = ?",
+                                     [(sequencia, ESTADO_CONFLITO) for sequencia in sequencias])
+
+    # Define o método 'reaplicar', que devolve operações em conflito à fila.
+    def reaplicar(self, colecao, sequencias):
+
+        """
+        Este método torna pendentes as operações em conflito informadas, para
+        que a próxima reprodução as aplique sobre a versão atual das tarefas
+        (sobrescrevendo as alterações feitas em outra estação). A primeira
+        operação reaplicada de cada tarefa passa a ter como base a versão lida
+        agora do servidor; as seguintes mantêm a base, que já é a versão local
+        da anterior. Operações sobre tarefas que não existem mais continuam
+        em conflito e são retornadas.
+        """
+
+        sequencias = set(sequencias)
+        operacoes = [operacao for operacao, _ in self.conflitos() if operacao.sequencia in sequencias]
+        ids = list({ObjectId(operacao.tarefa_id) for operacao in operacoes})
+        versoes = {str(documento["_id"]): documento.get("atualizado_em")
+                   for documento in colecao.find({"_id": {"$in": ids}}, {"atualizado_em": 1})} if ids else {}
+
+        reaplicadas = []
+        mantidas = []
+        tarefas_vistas = set()
+        for operacao in operacoes:
+            if operacao.operacao != OPERACAO_INSERIR and operacao.tarefa_id not in versoes:
+                mantidas.append(operacao)
+                continue
+            base = operacao.versao_base
+            if operacao.tarefa_id not in tarefas_vistas:
+                tarefas_vistas.add(operacao.tarefa_id)
+                base = versoes.get(operacao.tarefa_id)
+            reaplicadas.append((ESTADO_PENDENTE, _para_json(base), operacao.sequencia, ESTADO_CONFLITO))
+
+        with self.trava, self.conexao:
+            self.conexao.executemany("UPDATE operacoes SET estado = ?, erro = NULL, versao_envio = NULL, "
+                                     "versao_base = ? WHERE sequencia = ? AND estado = ?", reaplicadas)
+        return mantidas
+
+    # Define o método 'estado_pendente', que combina as operações pendentes
+    # de cada tarefa para exibição no Treeview.
+    def estado_pendente(self):
+
+        """
+        Este método retorna um dicionário {tarefa_id: (operacao, campos)} com o
+        efeito combinado das operações pendentes de cada tarefa.
+        A operação resultante é 'inserir' se a tarefa foi criada offline,
+        'excluir' se foi excluída e 'atualizar' nos demais casos.
+        """
+
+        estado = {}
+        for operacao in self.pendentes():
+            anterior = estado.get(operacao.tarefa_id)
+            if operacao.operacao == OPERACAO_INSERIR:
+                estado[operacao.tarefa_id] = (OPERACAO_INSERIR, dict(operacao.dados))
+            elif operacao.operacao == OPERACAO_ATUALIZAR:
+                if anterior:
+                    anterior[1].update(operacao.dados)
+                else:
+                    estado[operacao.tarefa_id] = (OPERACAO_ATUALIZAR, dict(operacao.dados))
+            elif anterior and anterior[0] == OPERACAO_INSERIR:
+                # Uma tarefa criada e excluída offline não precisa ser exibida.
+                del estado[operacao.tarefa_id]
+            else:
+                estado[operacao.tarefa_id] = (OPERACAO_EXCLUIR, {})
+        return estado
+
+    # Define o método '_marcar_envio', que grava a versão usada no envio de
+    # um lote antes de enviá-lo ao servidor.
+    def _marcar_envio(self, operacoes, versao):
+        with self.trava, self.conexao:
+            self.conexao.executemany("UPDATE operacoes SET versao_envio = ? WHERE sequencia = ?",
+                                     [(_para_json(versao), operacao.sequencia) for operacao in operacoes])
+
+    # Define o método '_finalizar', que remove do diário as operações aplicadas
+    # e marca as operações em conflito.
+    def _finalizar(self, aplicadas, conflitos):
+        with self.trava, self.conexao:
+            self.conexao.executemany("DELETE FROM operacoes WHERE sequencia = ?",
+                                     [(operacao.sequencia,) for operacao in aplicadas])
+            self.conexao.executemany("UPDATE operacoes SET estado = ?, erro = ? WHERE sequencia = ?",
+                                     [(ESTADO_CONFLITO, motivo, operacao.sequencia) for operacao, motivo in conflitos])
+
+    # Define o método 'reproduzir', que envia as operações pendentes ao servidor.
+    def reproduzir(self, colecao, tamanho_lote=100, ao_excluir=None):
+
+        """
+        Este método reproduz o diário na coleção informada em lotes ordenados
+        de 'bulk_write'. Antes de cada lote, as versões atuais das tarefas
+        envolvidas são lidas em uma única consulta; operações sobre tarefas
+        alteradas ou excluídas em outro lugar desde a edição offline são
+        marcadas como conflito e não são aplicadas. A exclusão de uma tarefa
+        que já não existe no servidor é considerada aplicada.
+        Se informada, a função 'ao_excluir' recebe, a cada lote, os
+        identificadores das tarefas excluídas e as suas datas de criação
+        conhecidas ({identificador: data}); ela é chamada antes de o lote
+        sair do diário, para que uma falha a repita na próxima reprodução.
+        Retorna uma tupla (quantidade aplicada, lista de conflitos), em que
+        cada conflito é um par (OperacaoDiario, motivo).
+        """
+
+        total_aplicadas = 0
+        todos_conflitos = []
+
+        # Versão que cada tarefa terá no servidor após as operações já
+        # planejadas nesta reprodução.
+        versao_esperada = {}
+
+        # Versão local atribuída pela última operação planejada de cada tarefa,
+        # usada para reconhecer sequências de edições feitas offline.
+        ultima_versao_local = {}
+
+        # Data de criação das tarefas, lida do servidor ou das operações,
+        # entregue a 'ao_excluir' com as tarefas excluídas.
+        datas_criacao = {}
+
+        while True:
+            lote = self.pendentes(limite=tamanho_lote)
+            if not lote:
+                break
+
+            # Todas as operações do lote recebem o mesmo carimbo de atualização,
+            # para que outros clientes percebam a mudança a partir de agora.
+            agora = agora_utc()
+
+            # Lê em uma única consulta as versões atuais das tarefas do lote
+            # que ainda não foram tocadas por esta reprodução.
+            ids_consulta = {ObjectId(operacao.tarefa_id) for operacao in lote
+                            if operacao.tarefa_id not in versao_esperada}
+            versoes_servidor = {}
+            if ids_consulta:
+                for documento in colecao.find({"_id": {"$in": list(ids_consulta)}},
+                                              {"atualizado_em": 1, "data_criacao": 1}):
+                    versoes_servidor[str(documento["_id"])] = documento.get("atualizado_em")
+                    if documento.get("data_criacao") is not None:
+                        datas_criacao[str(documento["_id"])] = documento["data_criacao"]
+
+            requisicoes = []
+            planejadas = []
+            conflitos = []
+            ja_aplicadas = []
+
+            for operacao in lote:
+                tarefa_id = operacao.tarefa_id
+                filtro_id = {"_id": ObjectId(tarefa_id)}
+
+                if operacao.operacao == OPERACAO_INSERIR:
+                    documento = dict(operacao.dados, _id=ObjectId(tarefa_id), atualizado_em=agora)
+                    requisicoes.append(InsertOne(documento))
+                    versao_esperada[tarefa_id] = agora
+                    if documento.get("data_criacao") is not None:
+                        datas_criacao[tarefa_id] = documento["data_criacao"]
+                    ultima_versao_local[tarefa_id] = operacao.versao_nova
+                    planejadas.append(operacao)
+                    continue
+
+                if operacao.operacao == OPERACAO_EXCLUIR and (operacao.dados or {}).get("data_criacao") is not None:
+                    datas_criacao.setdefault(tarefa_id, operacao.dados["data_criacao"])
+
+                # Descobre a versão que o servidor deve ter para que a operação
+                # seja aplicada sem sobrescrever alterações de outra estação.
+                if tarefa_id in versao_esperada:
+                    existe = versao_esperada[tarefa_id] is not None
+                    versao_atual = versao_esperada[tarefa_id]
+                    encadeada = ultima_versao_local.get(tarefa_id) == operacao.versao_base
+                else:
+                    existe = tarefa_id in versoes_servidor
+                    versao_atual = versoes_servidor.get(tarefa_id)
+                    encadeada = versao_atual == operacao.versao_base
+
+                # A exclusão de uma tarefa que já saiu do servidor (em um envio
+                # anterior interrompido, em uma exclusão cuja conclusão falhou
+                # ou em outra estação) já tem o efeito desejado: não é
+                # reenviada, mas passa por 'ao_excluir' como as demais.
+                if operacao.operacao == OPERACAO_EXCLUIR and not existe:
+                    versao_esperada[tarefa_id] = None
+                    ultima_versao_local.pop(tarefa_id, None)
+                    ja_aplicadas.append(operacao)
+                    continue
+
+                # Uma operação cujo envio anterior foi interrompido pode já ter
+                # sido gravada no servidor: nesse caso não é reenviada.
+                if operacao.versao_envio is not None and tarefa_id not in versao_esperada and \
+                        existe and versao_atual == operacao.versao_envio:
+                    versao_esperada[tarefa_id] = versao_atual
+                    ultima_versao_local[tarefa_id] = operacao.versao_nova
+                    ja_aplicadas.append(operacao)
+                    continue
+
+                if not existe:
+                    conflitos.append((operacao, "A tarefa foi excluída em outra estação."))
+                    continue
+                if not encadeada:
+                    conflitos.append((operacao, "A tarefa foi alterada em outra estação."))
+                    continue
+
+                filtro = dict(filtro_id, atualizado_em=versao_atual)
+                if operacao.operacao == OPERACAO_ATUALIZAR:
+                    requisicoes.append(UpdateOne(filtro, {"$set": dict(operacao.dados, atualizado_em=agora)}))
+                    versao_esperada[tarefa_id] = agora
+                    ultima_versao_local[tarefa_id] = operacao.versao_nova
+                    if operacao.dados.get("data_criacao") is not None:
+                        datas_criacao[tarefa_id] = operacao.dados["data_criacao"]
+                else:
+                    requisicoes.append(DeleteOne(filtro))
+                    versao_esperada[tarefa_id] = None
+                    ultima_versao_local.pop(tarefa_id, None)
+                planejadas.append(operacao)
+
+            self._marcar_envio(planejadas, agora)
+            aplicadas = ja_aplicadas + self._executar_lote(colecao, requisicoes, planejadas, conflitos, agora)
+
+            excluidas = [operacao.tarefa_id for operacao in aplicadas if operacao.operacao == OPERACAO_EXCLUIR]
+            if ao_excluir and excluidas:
+                ao_excluir(excluidas, {tarefa_id: datas_criacao[tarefa_id]
+                                       for tarefa_id in excluidas if tarefa_id in datas_criacao})
+
+            self._finalizar(aplicadas, conflitos)
+            total_aplicadas += len(aplicadas)
+            todos_conflitos.extend(conflitos)
+
+        return total_aplicadas, todos_conflitos
+
+    # Define o método '_executar_lote', que envia um lote ordenado ao servidor.
+    def _executar_lote(self, colecao, requisicoes, planejadas, conflitos, versao):
+
+        """
+        Este método executa o lote com 'bulk_write' ordenado e retorna as
+        operações efetivamente aplicadas. Inclusões que falham por chave
+        duplicada já foram aplicadas em uma sincronização anterior interrompida
+        e são consideradas concluídas; o restante do lote é reenviado.
+        Atualizações e exclusões que não encontram a versão esperada (porque a
+        tarefa mudou entre a leitura das versões e a escrita) viram conflito,
+        inclusive as que antecedem uma inclusão duplicada.
+        """
+
+        aplicadas = []
+        inicio = 0
+        while inicio < len(requisicoes):
+            parte = requisicoes[inicio:]
+            try:
+                resultado = colecao.bulk_write(parte, ordered=True)
+            except BulkWriteError as erro:
+                falha = erro.details["writeErrors"][0]
+                if falha["code"] != CODIGO_CHAVE_DUPLICADA:
+                    raise
+
+                # As requisições anteriores à falha foram executadas, mas
+                # também podem não ter encontrado a versão esperada.
+                indice = falha["index"]
+                alteradas = erro.details["nMatched"] + erro.details["nRemoved"]
+                aplicadas.extend(self._conferir_parte(colecao, parte[:indice], planejadas[inicio:inicio + indice],
+                                                      conflitos, versao, alteradas))
+                aplicadas.append(planejadas[inicio + indice])
+                inicio += indice + 1
+                continue
+
+            alteradas = resultado.matched_count + resultado.deleted_count
+            aplicadas.extend(self._conferir_parte(colecao, parte, planejadas[inicio:], conflitos, versao, alteradas))
+            break
+
+        return aplicadas
+
+    # Define o método '_conferir_parte', que confere as requisições executadas
+    # de um lote.
+    def _conferir_parte(self, colecao, requisicoes, planejadas, conflitos, versao, alteradas):
+
+        """
+        Este método compara a quantidade de atualizações e exclusões das
+        requisições com a quantidade de documentos efetivamente alterados
+        ('alteradas'). Se forem iguais, todas as operações foram aplicadas;
+        senão, os conflitos são separados com '_separar_conflitos'.
+        """
+
+        esperadas = sum(1 for requisicao in requisicoes if not isinstance(requisicao, InsertOne))
+        if alteradas == esperadas:
+            return list(planejadas)
+        return self._separar_conflitos(colecao, requisicoes, planejadas, conflitos, versao)
+
+    # Define o método '_separar_conflitos', usado quando parte de um lote
+    # não encontrou a versão esperada no servidor.
+    def _separar_conflitos(self, colecao, requisicoes, planejadas, conflitos, versao):
+        ids = [ObjectId(operacao.tarefa_id) for operacao in planejadas]
+        versoes = {str(documento["_id"]): documento.get("atualizado_em")
+                   for documento in colecao.find({"_id": {"$in": ids}}, {"atualizado_em": 1})}
+        aplicadas = []
+        for requisicao, operacao in zip(requisicoes, planejadas):
+            if isinstance(requisicao, InsertOne):
+                aplicadas.append(operacao)
+            elif isinstance(requisicao, DeleteOne):
+                if operacao.tarefa_id in versoes:
+                    conflitos.append((operacao, "A tarefa foi alterada em outra estação."))
+                else:
+                    aplicadas.append(operacao)
+            elif versoes.get(operacao.tarefa_id) == versao:
+                aplicadas.append(operacao)
+            else:
+                conflitos.append((operacao, "A tarefa foi alterada em outra estação."))
+        return aplicadas
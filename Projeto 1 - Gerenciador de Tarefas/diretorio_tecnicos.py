@@ -0,0 +1,195 @@
+# Módulo do diretório de técnicos do Gerenciador de Tarefas.
+# Mantém em memória a lista de técnicos, carregada uma única vez do banco
+# de dados e compartilhada por todos os ComboBox da aplicação. A lista fica
+# ordenada, o que permite buscar por prefixo com busca binária enquanto o
+# usuário digita, sem consultar o banco de dados.
+
+# Importa o bisect, que faz buscas binárias e inserções em listas ordenadas.
+import bisect
+
+# Importa o threading para proteger a troca do conteúdo do diretório.
+import threading
+
+# Importa o unicodedata para remover acentos na comparação de nomes.
+import unicodedata
+
+
+# Define a função 'normalizar_nome', que gera a chave de ordenação e de busca.
+def normalizar_nome(nome):
+
+    """
+    Esta função converte o nome para minúsculas e remove os acentos, para
+    que "joao" encontre "João" e a ordenação não dependa de acentuação.
+    """
+
+    decomposto = unicodedata.normalize("NFKD", nome.casefold())
+    return "".join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+
+
+# Define a classe 'DiretorioTecnicos', o cache compartilhado de técnicos.
+class DiretorioTecnicos:
+
+    """
+    Esta classe guarda os técnicos ordenados pela chave normalizada do nome.
+    - 'carregar' consulta o banco uma única vez.
+    - 'adicionar' inclui um técnico recém-cadastrado sem nova consulta.
+    - 'buscar_prefixo' responde à digitação nos ComboBox com busca binária.
+    - 'renomear' altera o nome de um técnico já carregado.
+    - 'mudou' compara uma impressão barata da coleção (quantidade de
+      documentos, maior '_id' e maior 'atualizado_em') para detectar
+      cadastros e renomeações feitos por outras estações.
+    """
+
+    def __init__(self, colecao):
+        self.colecao = colecao
+        self.trava = threading.Lock()
+
+        # Listas paralelas, ordenadas pela chave normalizada.
+        self.chaves = []
+        self.nomes = []
+        self.ids = []
+
+        # Mapeamento do identificador de cada técnico para o seu nome.
+        self.nomes_por_id = {}
+
+        # Impressão da coleção no último carregamento.
+        self.impressao = None
+
+    # Indica se o diretório já foi carregado ao menos uma vez.
+    @property
+    def carregado(self):
+        return self.impressao is not None
+
+    # Define o método '_impressao_atual', que lê a impressão da coleção.
+    def _impressao_atual(self):
+        ultimo = self.colecao.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        alterado = self.colecao.find_one({}, {"atualizado_em": 1}, sort=[("atualizado_em", -1)])
+        return (self.colecao.count_documents({}),
+                ultimo["_id"] if ultimo else None,
+                alterado.get("atualizado_em") if alterado else None)
+
+    # Define o método 'carregar', que lê todos os técnicos do banco de dados.
+    def carregar(self):
+
+        """
+        Este método carrega todos os técnicos em uma única consulta e
+        substitui o conteúdo do diretório. Pode ser chamado em segundo plano.
+        """
+
+        impressao = self._impressao_atual()
+        entradas = sorted((normalizar_nome(tecnico["nome"]), tecnico["nome"], tecnico["_id"])
+                          for tecnico in self.colecao.find({}, {"nome": 1}))
+
+        with self.trava:
+            self.chaves = [chave for chave, _, _ in entradas]
+            self.nomes = [nome for _, nome, _ in entradas]
+            self.ids = [identificador for _, _, identificador in entradas]
+            self.nomes_por_id = dict(zip(self.ids, self.nomes))
+            self.impressao = impressao
+
+    # Define o método 'mudou', que indica se a coleção foi alterada.
+    def mudou(self):
+
+        """
+        Este método retorna True se técnicos foram cadastrados, renomeados ou
+        removidos desde o último carregamento. Custa três consultas indexadas.
+        """
+
+        return self._impressao_atual() != self.impressao
+
+    # Define o método 'adicionar', chamado após cadastrar um técnico.
+    def adicionar(self, nome, identificador, versao=None):
+
+        """
+        Este método insere o técnico na posição correta da lista ordenada.
+        'versao' é o 'atualizado_em' gravado no cadastro, se houver.
+        """
+
+        chave = normalizar_nome(nome)
+        with self.trava:
+            posicao = bisect.bisect_left(self.chaves, chave)
+            self.chaves.insert(posicao, chave)
+            self.nomes.insert(posicao, nome)
+            self.ids.insert(posicao, identificador)
+            self.nomes_por_id[identificador] = nome
+            if self.impressao is not None:
+                quantidade, maior_id, alterado = self.impressao
+                if versao is not None:
+                    alterado = max(alterado, versao) if alterado else versao
+                self.impressao = (quantidade + 1, max(maior_id, identificador) if maior_id else identificador, alterado)
+
+    # Define o método 'renomear', chamado após renomear um técnico.
+    def renomear(self, identificador, nome, versao):
+
+        """
+        Este método move o técnico para a posição do novo nome na lista
+        ordenada. 'versao' é o 'atualizado_em' gravado na renomeação, que
+        passa a fazer parte da impressão para não provocar um recarregamento.
+        """
+
+        with self.trava:
+            if identificador in self.nomes_por_id:
+                posicao = self.ids.index(identificador)
+                del self.chaves[posicao], self.nomes[posicao], self.ids[posicao]
+            chave = normalizar_nome(nome)
+            posicao = bisect.bisect_left(self.chaves, chave)
+            self.chaves.insert(posicao, chave)
+            self.nomes.insert(posicao, nome)
+            self.ids.insert(posicao, identificador)
+            self.nomes_por_id[identificador] = nome
+            if self.impressao is not None:
+                quantidade, maior_id, alterado = self.impressao
+                self.impressao = (quantidade, maior_id, max(alterado, versao) if alterado else versao)
+
+    # Define o método 'nome_por_id', que resolve a referência de uma tarefa.
+    def nome_por_id(self, identificador):
+
+        """
+        Este método retorna o nome do técnico com o '_id' informado, ou None.
+        """
+
+        return self.nomes_por_id.get(identificador)
+
+    # Define o método 'buscar_prefixo', usado pela busca incremental.
+    def buscar_prefixo(self, prefixo, limite=200):
+
+        """
+        Este método retorna até 'limite' nomes que começam com 'prefixo',
+        ignorando maiúsculas e acentos. Com prefixo vazio, retorna os
+        primeiros nomes em ordem alfabética.
+        """
+
+        chave = normalizar_nome(prefixo.strip())
+        with self.trava:
+            inicio = bisect.bisect_left(self.chaves, chave)
+            resultado = []
+            for posicao in range(inicio, min(inicio + limite, len(self.chaves))):
+                if not self.chaves[posicao].startswith(chave):
+                    break
+                resultado.append(self.nomes[posicao])
+            return resultado
+
+    # Define o método 'contem', que verifica se um nome está cadastrado.
+    def contem(self, nome):
+
+        """
+        Este método retorna True se existir um técnico com exatamente esse nome.
+        """
+
+        return self.id_por_nome(nome) is not None
+
+    # Define o método 'id_por_nome', que localiza o identificador de um técnico.
+    def id_por_nome(self, nome):
+
+        """
+        Este método retorna o '_id' do técnico com o nome informado, ou None.
+        """
+
+        chave = normalizar_nome(nome)
+        with self.trava:
+            posicao = bisect.bisect_left(self.chaves, chave)
+            while posicao < len(self.chaves) and self.chaves[posicao] == chave:
+                if self.nomes[posicao] == nome:
+                    return self.ids[posicao]
+                posicao += 1
+        return None
@@ -0,0 +1,197 @@
+# Módulo da edição de células do Gerenciador de Tarefas.
+# As células de título, status e técnico podem ser editadas diretamente no
+# Treeview. As alterações são acumuladas por tarefa: editar o mesmo campo
+# várias vezes mantém apenas o último valor, e um campo que volta ao valor
+# original deixa de ser alterado. Após um intervalo sem edições, as tarefas
+# alteradas são gravadas com um 'bulk_write' não ordenado, com um '$set'
+# apenas dos campos que mudaram, condicionado à versão da tarefa editada.
+
+# Importa a operação de atualização e os erros do pymongo.
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa a função que fornece o instante atual com a precisão do MongoDB.
+from utilitarios import agora_utc
+
+
+# Define a classe 'AlteracoesCelulas', que acumula as edições ainda não gravadas.
+class AlteracoesCelulas:
+
+    """
+    Esta classe guarda, por tarefa, os campos alterados ('pendentes'), os
+    valores que eles tinham antes da primeira edição e a versão da tarefa
+    nesse momento, usada na detecção de conflitos da gravação e do diário
+    offline. As alterações em gravação ficam em 'enviando', e há no máximo
+    uma gravação por vez. É usada apenas pela thread da interface.
+    """
+
+    def __init__(self):
+        self.pendentes = {}
+        self.originais = {}
+        self.versoes = {}
+        self.enviando = []
+
+    def __len__(self):
+        return len(self.pendentes)
+
+    # Define o método 'registrar', que acumula a edição de uma tarefa.
+    def registrar(self, tarefa_id, campos, documento):
+
+        """
+        Este método registra os novos valores dos campos da tarefa. O
+        'documento' tem os valores exibidos antes da edição; na primeira
+        edição de cada campo, o seu valor é guardado como original. Campos
+        iguais ao original são descartados, e a tarefa sem campos alterados
+        deixa de ser gravada. Retorna True se a tarefa ainda tem alterações.
+        A versão base é a da tarefa exibida ou, se ela estiver em gravação, a
+        versão que essa gravação atribui.
+        """
+
+        originais = self.originais.setdefault(tarefa_id, {})
+        alterados = self.pendentes.setdefault(tarefa_id, {})
+        versao = documento.get("atualizado_em")
+        for enviada_id, enviados, _ in self.enviando:
+            if enviada_id == tarefa_id:
+                versao = enviados["atualizado_em"]
+        self.versoes.setdefault(tarefa_id, versao)
+
+        for campo, valor in campos.items():
+            if originais.setdefault(campo, documento.get(campo)) == valor:
+                alterados.pop(campo, None)
+            else:
+                alterados[campo] = valor
+
+        if not alterados:
+            self.descartar(tarefa_id)
+            return False
+        return True
+
+    # Define o método 'descartar', que esquece as edições de uma tarefa.
+    def descartar(self, tarefa_id):
+        self.pendentes.pop(tarefa_id, None)
+        self.originais.pop(tarefa_id, None)
+        self.versoes.pop(tarefa_id, None)
+
+    # Define o método 'campos', que retorna os campos alterados de uma tarefa.
+    def campos(self, tarefa_id):
+
+        """
+        Este método retorna os valores ainda não confirmados da tarefa: os da
+        gravação em andamento, sobrepostos pelas edições mais recentes.
+        """
+
+        campos = {}
+        for enviada_id, enviados, _ in self.enviando:
+            if enviada_id == tarefa_id:
+                campos.update(enviados)
+        campos.update(self.pendentes.get(tarefa_id, {}))
+        return campos
+
+    # Define o método 'tarefas', que retorna as tarefas com alterações não confirmadas.
+    def tarefas(self):
+        return {tarefa_id for tarefa_id, _, _ in self.enviando} | set(self.pendentes)
+
+    # Define o método 'retirar_lote', que inicia a gravação das alterações.
+    def retirar_lote(self):
+
+        """
+        Este método retorna a lista de tuplas (tarefa_id, campos, versao_base)
+        a gravar, com a nova versão da tarefa ('atualizado_em') incluída nos
+        campos, ou uma lista vazia se não houver alterações ou se outra
+        gravação ainda estiver em andamento.
+        """
+
+        if self.enviando or not self.pendentes:
+            return []
+        agora = agora_utc()
+        self.enviando = [(tarefa_id, dict(campos, atualizado_em=agora), self.versoes[tarefa_id])
+                         for tarefa_id, campos in self.pendentes.items()]
+        self.pendentes, self.originais, self.versoes = {}, {}, {}
+        return self.enviando
+
+    # Define o método 'separar_do_lote', que retira tarefas da gravação em andamento.
+    def separar_do_lote(self, condicao):
+
+        """
+        Este método retira do lote em gravação as alterações das tarefas que
+        atendem a 'condicao' (por exemplo, as que devem passar pelo diário
+        offline) e as retorna.
+        """
+
+        separadas = [alteracao for alteracao in self.enviando if condicao(alteracao[0])]
+        self.enviando = [alteracao for alteracao in self.enviando if not condicao(alteracao[0])]
+        return separadas
+
+    # Define o método 'concluir_lote', chamado ao final da gravação.
+    def concluir_lote(self, rejeitadas=()):
+
+        """
+        Este método encerra a gravação em andamento e retorna o seu lote. As
+        edições feitas durante a gravação de uma tarefa rejeitada partiram da
+        versão que ela atribuiria, e voltam à versão anterior.
+        """
+
+        lote, self.enviando = self.enviando, []
+        for tarefa_id, campos, versao_base in lote:
+            if tarefa_id in rejeitadas and self.versoes.get(tarefa_id) == campos["atualizado_em"]:
+                self.versoes[tarefa_id] = versao_base
+        return lote
+
+    # Define o método 'esvaziar', que retira todas as alterações não confirmadas.
+    def esvaziar(self):
+
+        """
+        Este método retorna as alterações em gravação e as pendentes (estas
+        já com a nova versão), usado ao fechar a janela.
+        """
+
+        lote = self.concluir_lote()
+        self.retirar_lote()
+        return lote + self.concluir_lote()
+
+
+# Define a função 'gravar_alteracoes', executada em segundo plano.
+def gravar_alteracoes(colecao, alteracoes):
+
+    """
+    Esta função grava as alterações com um único 'bulk_write' não ordenado,
+    uma operação '$set' por tarefa, filtrada pela versão em que a tarefa foi
+    editada, e retorna a lista de tuplas (tarefa_id, mensagem) das
+    alterações rejeitadas: por erro (por exemplo, um título repetido) ou
+    porque a tarefa foi alterada ou excluída em outra estação. Falhas de
+    conexão são repassadas a quem chamou.
+    """
+
+    requisicoes = [UpdateOne({"_id": ObjectId(tarefa_id), "atualizado_em": versao_base}, {"$set": campos})
+                   for tarefa_id, campos, versao_base in alteracoes]
+    rejeitadas = []
+    try:
+        alteradas = colecao.bulk_write(requisicoes, ordered=False).matched_count
+    except BulkWriteError as erro:
+        rejeitadas = [(alteracoes[falha["index"]][0], falha.get("errmsg", ""))
+                      for falha in erro.details.get("writeErrors", ())]
+        alteradas = erro.details.get("nMatched", 0)
+
+    if alteradas < len(alteracoes) - len(rejeitadas):
+        rejeitadas.extend(_separar_conflitos(colecao, alteracoes, {tarefa_id for tarefa_id, _ in rejeitadas}))
+    return rejeitadas
+
+
+# Define a função '_separar_conflitos', usada quando parte das alterações
+# não encontrou a versão esperada.
+def _separar_conflitos(colecao, alteracoes, com_erro):
+    ids = [ObjectId(tarefa_id) for tarefa_id, _, _ in alteracoes if tarefa_id not in com_erro]
+    versoes = {str(documento["_id"]): documento.get("atualizado_em")
+               for documento in colecao.find({"_id": {"$in": ids}}, {"atualizado_em": 1})}
+    conflitos = []
+    for tarefa_id, campos, _ in alteracoes:
+        if tarefa_id in com_erro:
+            continue
+        if tarefa_id not in versoes:
+            conflitos.append((tarefa_id, "A tarefa foi excluída em outra estação."))
+        elif versoes[tarefa_id] != campos["atualizado_em"]:
+            conflitos.append((tarefa_id, "A tarefa foi alterada em outra estação."))
+    return conflitos
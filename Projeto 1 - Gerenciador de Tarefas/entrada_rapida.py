@@ -0,0 +1,94 @@
+# Módulo da entrada rápida do Gerenciador de Tarefas.
+# No modo de entrada rápida, as tarefas incluídas aparecem na lista assim que
+# são digitadas e são guardadas em uma fila em memória; a fila é enviada ao
+# banco de dados em segundo plano, com um único 'insert_many' por lote,
+# quando atinge o tamanho do lote ou quando o intervalo configurado termina.
+# Os erros são informados por tarefa: um lote não ordenado grava todas as
+# tarefas válidas, mesmo que algumas sejam rejeitadas.
+
+# Importa os erros do pymongo.
+from pymongo.errors import BulkWriteError
+
+# Importa o código de erro de chave duplicada.
+from diario_offline import CODIGO_CHAVE_DUPLICADA
+
+
+# Define a classe 'FilaInclusoes', que guarda as tarefas ainda não enviadas.
+class FilaInclusoes:
+
+    """
+    Esta classe mantém, na ordem de inclusão, as tarefas aguardando envio
+    ('pendentes') e as do lote em envio ('enviando'). Há no máximo um lote
+    em envio por vez. É usada apenas pela thread da interface.
+    """
+
+    def __init__(self, tamanho_lote):
+        self.tamanho_lote = tamanho_lote
+        self.pendentes = []
+        self.enviando = []
+
+    def __len__(self):
+        return len(self.pendentes) + len(self.enviando)
+
+    # Define o método 'tarefas', que retorna todas as tarefas não confirmadas.
+    def tarefas(self):
+        return self.enviando + self.pendentes
+
+    # Define o método 'adicionar', que inclui uma tarefa no fim da fila.
+    def adicionar(self, tarefa):
+        self.pendentes.append(tarefa)
+
+    # Define o método 'lote_completo', que indica se já há um lote inteiro a enviar.
+    def lote_completo(self):
+        return len(self.pendentes) >= self.tamanho_lote
+
+    # Define o método 'retirar_lote', que inicia o envio de um lote.
+    def retirar_lote(self):
+
+        """
+        Este método retorna as próximas tarefas a enviar (no máximo um lote),
+        ou uma lista vazia se não houver tarefas ou se outro lote ainda
+        estiver em envio.
+        """
+
+        if self.enviando or not self.pendentes:
+            return []
+        self.enviando = self.pendentes[:self.tamanho_lote]
+        del self.pendentes[:self.tamanho_lote]
+        return self.enviando
+
+    # Define o método 'concluir_lote', chamado ao final do envio.
+    def concluir_lote(self):
+        lote, self.enviando = self.enviando, []
+        return lote
+
+    # Define o método 'esvaziar', que retira todas as tarefas não confirmadas.
+    def esvaziar(self):
+        tarefas = self.tarefas()
+        self.enviando, self.pendentes = [], []
+        return tarefas
+
+
+# Define a função 'inserir_lote', executada em segundo plano.
+def inserir_lote(colecao, tarefas):
+
+    """
+    Esta função grava as tarefas com um único 'insert_many' não ordenado e
+    retorna a lista de tuplas (tarefa, mensagem) das tarefas rejeitadas. Uma
+    chave duplicada em uma tarefa cujo '_id' já existe indica que ela já foi
+    gravada (por exemplo, por um envio anterior interrompido) e não é um
+    erro. Falhas de conexão são repassadas a quem chamou.
+    """
+
+    try:
+        colecao.insert_many(tarefas, ordered=False)
+    except BulkWriteError as erro:
+        falhas = [(tarefas[falha["index"]], falha.get("code"), falha.get("errmsg", ""))
+                  for falha in erro.details.get("writeErrors", ())]
+    else:
+        return []
+
+    duplicadas = [tarefa["_id"] for tarefa, codigo, _ in falhas if codigo == CODIGO_CHAVE_DUPLICADA]
+    gravadas = {tarefa["_id"] for tarefa in colecao.find({"_id": {"$in": duplicadas}}, {"_id": 1})} \
+        if duplicadas else set()
+    return [(tarefa, mensagem) for tarefa, _, mensagem in falhas if tarefa["_id"] not in gravadas]
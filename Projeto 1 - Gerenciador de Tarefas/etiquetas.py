@@ -0,0 +1,55 @@
+# Módulo das tags do Gerenciador de Tarefas.
+# Cada tarefa pode ter uma lista de tags ('tags'), digitadas no formulário
+# separadas por vírgulas. O campo tem um índice multichave (uma entrada por
+# tag), usado pelo filtro por tag e pelas contagens por tag do painel de
+# filtros, calculadas no banco de dados junto com as contagens por status e
+# por técnico ('contar_facetas').
+
+# Importa a normalização de nomes (minúsculas, sem acentos) usada para
+# reconhecer tags repetidas.
+from diretorio_tecnicos import normalizar_nome
+
+
+# Separador das tags no formulário e na coluna "Tags" do Treeview.
+SEPARADOR_TAGS = ", "
+
+
+# Define a função 'ler_tags', que converte o texto do formulário na lista de tags.
+def ler_tags(texto):
+
+    """
+    Esta função separa o texto digitado nas vírgulas e retorna a lista de
+    tags, sem espaços nas pontas, sem tags vazias e sem repetições (sem
+    diferenciar maiúsculas e acentos), na ordem em que foram digitadas.
+    """
+
+    tags = []
+    vistas = set()
+    for tag in texto.split(","):
+        tag = " ".join(tag.split())
+        chave = normalizar_nome(tag)
+        if tag and chave not in vistas:
+            vistas.add(chave)
+            tags.append(tag)
+    return tags
+
+
+# Define a função 'formatar_tags', que exibe a lista de tags de uma tarefa.
+def formatar_tags(tags):
+    return SEPARADOR_TAGS.join(tags or ())
+
+
+# Define a função 'resumir_contagens', que monta o texto das contagens do painel de filtros.
+def resumir_contagens(contagens, nome=str, limite=5):
+
+    """
+    Esta função recebe uma faceta de 'contar_facetas' (valor -> quantidade)
+    e retorna o texto "valor (quantidade), ..." dos 'limite' valores mais
+    frequentes, com os nomes obtidos por 'nome'.
+    """
+
+    mais_frequentes = sorted(contagens.items(), key=lambda item: (-item[1], str(item[0])))
+    partes = [f"{nome(valor)} ({quantidade})" for valor, quantidade in mais_frequentes[:limite]]
+    if len(mais_frequentes) > limite:
+        partes.append("...")
+    return ", ".join(partes)
@@ -0,0 +1,75 @@
+# Módulo da exclusão de tarefas do Gerenciador de Tarefas.
+# A exclusão de uma tarefa, feita pela interface, pela reprodução do diário
+# offline ou pelo serviço HTTP, termina sempre com 'concluir_exclusao', que
+# registra a exclusão para os instantâneos das outras estações, passa as
+# subtarefas da tarefa para a lista principal e exclui os anexos da tarefa
+# (e a cópia que o arquivamento possa ter gravado ao mesmo tempo).
+# Essas etapas são idempotentes e não leem o documento excluído (os anexos
+# são localizados pela tarefa a que pertencem): podem ser repetidas depois de
+# uma falha e executadas depois de a tarefa ter saído da coleção.
+
+# Importa a operação de exclusão em lote do pymongo.
+from pymongo import DeleteOne
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa a função que registra as tarefas removidas da coleção principal.
+from instantaneo import registrar_exclusoes
+
+# Importa a função que passa para a lista principal as subtarefas de tarefas removidas.
+from hierarquia import liberar_subtarefas
+
+# Importa o nome da coleção de arquivo.
+from arquivamento import COLECAO_ARQUIVO
+
+
+# Define a função 'concluir_exclusao', chamada depois da exclusão de tarefas.
+def concluir_exclusao(armazenamento, anexos, ids, cache_miniaturas=None, datas_criacao=None):
+
+    """
+    Esta função conclui a exclusão das tarefas informadas: grava os
+    registros de exclusão (com as datas de criação conhecidas em
+    'datas_criacao', {identificador: data}), torna as suas subtarefas
+    tarefas sem pai, exclui os anexos das tarefas (e as suas miniaturas, se
+    houver um cache de miniaturas) e remove as cópias das tarefas gravadas
+    por um arquivamento que as leu antes da exclusão: a tarefa excluída
+    não volta como tarefa arquivada.
+    """
+
+    if not ids:
+        return
+    registrar_exclusoes(armazenamento, ids, datas_criacao)
+    liberar_subtarefas(armazenamento.colecao("tarefas"), ids)
+    armazenamento.colecao(COLECAO_ARQUIVO).delete_many({"_id": {"$in": [ObjectId(tarefa_id) for tarefa_id in ids]}})
+    for anexo_id in anexos.excluir_das_tarefas(ids):
+        if cache_miniaturas is not None:
+            cache_miniaturas.remover(anexo_id)
+
+
+# Define a função 'excluir_tarefas', usada pelo serviço HTTP.
+def excluir_tarefas(armazenamento, anexos, filtros):
+
+    """
+    Esta função exclui as tarefas dos filtros informados (cada um com o
+    '_id' da tarefa e, opcionalmente, a versão esperada em 'atualizado_em')
+    com um único 'bulk_write' não ordenado, e conclui a exclusão das que
+    saíram da coleção. Retorna a lista dos '_id' das tarefas excluídas.
+    """
+
+    if not filtros:
+        return []
+    tarefas = armazenamento.colecao("tarefas")
+    ids = [filtro["_id"] for filtro in filtros]
+    datas_criacao = {tarefa["_id"]: tarefa.get("data_criacao")
+                     for tarefa in tarefas.find({"_id": {"$in": ids}}, {"data_criacao": 1})}
+    existentes = set(datas_criacao)
+    resultado = tarefas.bulk_write([DeleteOne(filtro) for filtro in filtros], ordered=False)
+
+    # Tarefas que continuam na coleção tinham outra versão.
+    restantes = set()
+    if resultado.deleted_count < len(existentes):
+        restantes = {tarefa["_id"] for tarefa in tarefas.find({"_id": {"$in": ids}}, {"_id": 1})}
+    excluidas = [tarefa_id for tarefa_id in dict.fromkeys(ids) if tarefa_id in existentes - restantes]
+    concluir_exclusao(armazenamento, anexos, excluidas, datas_criacao=datas_criacao)
+    return excluidas
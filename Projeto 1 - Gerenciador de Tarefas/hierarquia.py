@@ -0,0 +1,118 @@
+# Módulo das subtarefas e dependências do Gerenciador de Tarefas.
+# Uma tarefa pode ter uma tarefa pai ('pai_id') e depender de outras tarefas
+# ('depende_de', a lista dos seus '_id'). A lista principal exibe apenas as
+# tarefas sem pai; as subtarefas de uma tarefa são consultadas quando ela é
+# expandida no Treeview. O progresso das subtarefas (todas as descendentes,
+# em qualquer nível) e a cadeia de bloqueio (as dependências diretas e
+# indiretas ainda não concluídas) são calculados no banco de dados, com
+# '$graphLookup' no MongoDB ou consultas recursivas no SQLite, em uma única
+# consulta para todas as tarefas exibidas ('resumir_hierarquia').
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa a função que fornece o instante atual usado como versão das tarefas.
+from utilitarios import agora_utc
+
+
+# Campos da tarefa pai e das dependências de uma tarefa.
+CAMPO_PAI = "pai_id"
+CAMPO_DEPENDENCIAS = "depende_de"
+
+# Profundidade máxima percorrida nas hierarquias e nas cadeias de
+# dependências, que também limita o custo de um ciclo gravado por engano.
+PROFUNDIDADE_MAXIMA = 50
+
+# Filtro das tarefas exibidas na lista principal: as que não têm pai.
+FILTRO_RAIZES = {CAMPO_PAI: None}
+
+
+# Define a função 'filtro_subtarefas', a consulta das subtarefas diretas de uma tarefa.
+def filtro_subtarefas(tarefa_id):
+    return {CAMPO_PAI: ObjectId(tarefa_id)}
+
+
+# Define a função 'formatar_progresso', que exibe o progresso das subtarefas.
+def formatar_progresso(resumo):
+
+    """
+    Esta função recebe o resumo de uma tarefa ('resumir_hierarquia') e
+    retorna o texto "percentual (concluídas/total)" das suas subtarefas, ou
+    um texto vazio se a tarefa não tiver subtarefas.
+    """
+
+    if not resumo or not resumo["subtarefas"]:
+        return ""
+    return f"{100 * resumo['concluidas'] // resumo['subtarefas']}% ({resumo['concluidas']}/{resumo['subtarefas']})"
+
+
+# Define a função 'validar_vinculo', que impede a criação de ciclos.
+def validar_vinculo(armazenamento, tarefa_id, alvo_id, campo):
+
+    """
+    Esta função verifica se a tarefa 'tarefa_id' pode passar a ter 'alvo_id'
+    como pai (campo CAMPO_PAI) ou como dependência (CAMPO_DEPENDENCIAS):
+    o alvo não pode ser a própria tarefa nem alcançá-la pelo mesmo campo
+    (um ancestral do alvo, ou uma dependência indireta dele). Um vínculo
+    inválido lança ValueError.
+    """
+
+    if alvo_id == tarefa_id:
+        raise ValueError("Uma tarefa não pode ser vinculada a ela mesma.")
+    if tarefa_id in armazenamento.seguir_vinculos(alvo_id, campo):
+        if campo == CAMPO_PAI:
+            raise ValueError("A tarefa escolhida é uma subtarefa desta tarefa.")
+        raise ValueError("A tarefa escolhida já depende desta tarefa.")
+
+
+# Define a função 'vincular', que grava um vínculo validado sem permitir ciclos.
+def vincular(armazenamento, tarefa_id, alvo_id, campo):
+
+    """
+    Esta função grava 'alvo_id' como pai (CAMPO_PAI) ou como dependência
+    (CAMPO_DEPENDENCIAS) da tarefa, depois de validá-lo com
+    'validar_vinculo'. Outra estação pode gravar ao mesmo tempo um vínculo
+    que, somado a este, fecha um ciclo sem que nenhuma das validações o
+    veja; por isso o vínculo é validado de novo depois de gravado e, se a
+    tarefa passou a ser alcançada pelo alvo, é desfeito e ValueError é
+    lançado. A última estação a gravar um vínculo do ciclo sempre o
+    encontra nessa segunda validação.
+    """
+
+    validar_vinculo(armazenamento, tarefa_id, alvo_id, campo)
+    colecao = armazenamento.colecao("tarefas")
+    if campo == CAMPO_PAI:
+        anterior = colecao.find_one({"_id": tarefa_id}, {CAMPO_PAI: 1})
+        if anterior is None:
+            raise ValueError("A tarefa foi excluída em outra estação.")
+        colecao.update_one({"_id": tarefa_id}, {"$set": {CAMPO_PAI: alvo_id, "atualizado_em": agora_utc()}})
+        desfazer = {"$set": {CAMPO_PAI: anterior.get(CAMPO_PAI), "atualizado_em": agora_utc()}}
+    else:
+        # Uma dependência já existente não é gravada, nem desfeita.
+        resultado = colecao.update_one({"_id": tarefa_id, CAMPO_DEPENDENCIAS: {"$ne": alvo_id}},
+                                       {"$addToSet": {CAMPO_DEPENDENCIAS: alvo_id},
+                                        "$set": {"atualizado_em": agora_utc()}})
+        if not resultado.matched_count:
+            return
+        desfazer = {"$pull": {CAMPO_DEPENDENCIAS: alvo_id}, "$set": {"atualizado_em": agora_utc()}}
+    try:
+        validar_vinculo(armazenamento, tarefa_id, alvo_id, campo)
+    except ValueError:
+        # Só desfaz o vínculo se ele ainda for o gravado por esta função.
+        colecao.update_one({"_id": tarefa_id, campo: alvo_id}, desfazer)
+        raise
+
+
+# Define a função 'liberar_subtarefas', chamada depois da exclusão de tarefas.
+def liberar_subtarefas(colecao, ids):
+
+    """
+    Esta função torna as subtarefas diretas das tarefas excluídas tarefas
+    sem pai, com uma única atualização, para que continuem na lista
+    principal.
+    """
+
+    if not ids:
+        return
+    colecao.update_many({CAMPO_PAI: {"$in": [ObjectId(identificador) for identificador in ids]}},
+                        {"$set": {CAMPO_PAI: None, "atualizado_em": agora_utc()}})
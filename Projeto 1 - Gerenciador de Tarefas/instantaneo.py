@@ -0,0 +1,182 @@
+# Módulo do instantâneo local do Gerenciador de Tarefas.
+# Ao fechar a aplicação, as linhas exibidas no Treeview são gravadas em um
+# arquivo local, junto com uma marca d'água: o instante do último
+# carregamento completo da lista. Na abertura seguinte, as linhas são
+# exibidas imediatamente e a lista é reconciliada em segundo plano, buscando
+# apenas as tarefas alteradas ('atualizado_em') ou excluídas (registros na
+# coleção 'tarefas_excluidas') depois da marca d'água.
+
+# Importa o hashlib, usado para identificar a origem sem gravar a URI.
+import hashlib
+
+# Importa o json, formato do arquivo do instantâneo.
+import json
+
+# Importa o módulo os para substituir o arquivo de forma atômica.
+import os
+
+# Importa as classes de data usadas na marca d'água.
+from datetime import datetime, timedelta
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa a operação em lote usada para gravar os registros de exclusão.
+from pymongo import UpdateOne
+
+# Importa a função que fornece o instante atual em UTC.
+from utilitarios import agora_utc
+
+
+# Nome da coleção que registra as tarefas excluídas da coleção 'tarefas'
+# (por exclusão ou arquivamento), para que outras estações as removam do
+# instantâneo sem recarregar a lista inteira.
+COLECAO_EXCLUSOES = "tarefas_excluidas"
+
+# Os registros de exclusão expiram após esta quantidade de dias (índice TTL
+# no MongoDB). Um instantâneo mais antigo que isso é descartado, e a lista é
+# carregada por completo.
+VALIDADE_DIAS = 30
+
+# Margem subtraída da marca d'água ao buscar alterações, para tolerar
+# diferenças de relógio entre as estações que gravam 'atualizado_em'.
+# Buscar uma tarefa a mais não causa problema, pois a reconciliação é idempotente.
+MARGEM_RELOGIO = timedelta(minutes=5)
+
+# Versão do formato do arquivo. Arquivos de outro formato são ignorados.
+VERSAO_FORMATO = 3
+
+
+# Define a função 'origem_configurada', que identifica o armazenamento em uso.
+def origem_configurada(configuracao):
+
+    """
+    Esta função retorna um resumo (SHA-256) do tipo de armazenamento, da URI
+    e do banco do MongoDB e do arquivo SQLite configurados. O resumo é
+    gravado no instantâneo no lugar da URI, que pode conter uma senha.
+    """
+
+    partes = (configuracao["armazenamento"]["tipo"], configuracao["mongodb"]["uri"],
+              configuracao["mongodb"]["banco"], configuracao["armazenamento"]["arquivo_sqlite"])
+    return hashlib.sha256("\n".join(partes).encode("utf-8")).hexdigest()
+
+
+# Define a função 'registrar_exclusoes', chamada sempre que tarefas saem da
+# coleção 'tarefas'.
+def registrar_exclusoes(armazenamento, ids, datas_criacao=None, arquivadas=False):
+
+    """
+    Esta função grava (ou renova) um registro de exclusão para cada
+    identificador informado, em uma única operação 'bulk_write'. Se
+    'datas_criacao' ({identificador: data}) trouxer a data de criação da
+    tarefa, ela também é gravada, para que o resumo mensal saiba o mês da
+    tarefa excluída. O campo 'arquivada' distingue as tarefas movidas para
+    o arquivo ('arquivadas') das excluídas pelo usuário: o registro de uma
+    exclusão prevalece sobre o do arquivamento, nunca o contrário.
+    """
+
+    if not ids:
+        return
+    agora = agora_utc()
+    datas_criacao = {str(identificador): data for identificador, data in (datas_criacao or {}).items()
+                     if data is not None}
+    requisicoes = []
+    for identificador in ids:
+        campos = {"excluido_em": agora}
+        if str(identificador) in datas_criacao:
+            campos["data_criacao"] = datas_criacao[str(identificador)]
+        atualizacao = {"$set": campos}
+        if arquivadas:
+            atualizacao["$setOnInsert"] = {"arquivada": True}
+        else:
+            campos["arquivada"] = False
+        requisicoes.append(UpdateOne({"_id": ObjectId(identificador)}, atualizacao, upsert=True))
+    armazenamento.colecao(COLECAO_EXCLUSOES).bulk_write(requisicoes, ordered=False)
+
+
+# Define a função 'buscar_alteracoes', usada na reconciliação em segundo plano.
+def buscar_alteracoes(armazenamento, desde):
+
+    """
+    Esta função retorna as tarefas alteradas e os identificadores das tarefas
+    excluídas depois de 'desde' (menos a margem de relógio). As duas
+    consultas usam índices sobre as datas.
+    """
+
+    limite = desde - MARGEM_RELOGIO
+    alteradas = list(armazenamento.colecao("tarefas").find({"atualizado_em": {"$gt": limite}}))
+    excluidas = [str(registro["_id"]) for registro in
+                 armazenamento.colecao(COLECAO_EXCLUSOES).find({"excluido_em": {"$gt": limite}}, {"_id": 1})]
+    return alteradas, excluidas
+
+
+# Define a classe 'InstantaneoTarefas', que grava e lê o arquivo do instantâneo.
+class InstantaneoTarefas:
+
+    """
+    Esta classe guarda o instantâneo em um arquivo JSON compacto. Cada linha
+    é a lista [iid, valores exibidos, versão, técnico, prazo]. 'origem'
+    identifica o armazenamento de onde as linhas vieram; um instantâneo de
+    outra origem é ignorado.
+    """
+
+    def __init__(self, caminho, origem):
+        self.caminho = caminho
+        self.origem = origem
+
+    # Define o método 'salvar', chamado ao fechar a aplicação.
+    def salvar(self, marca, filtro_status, linhas):
+
+        """
+        Este método grava o instantâneo. 'linhas' é uma lista de tuplas
+        (iid, valores, versão, tecnico_id, data_limite). O arquivo é escrito
+        em um arquivo temporário e depois substituído, para nunca ficar pela
+        metade.
+        """
+
+        conteudo = {
+            "formato": VERSAO_FORMATO,
+            "origem": self.origem,
+            "marca": marca.isoformat(),
+            "filtro_status": filtro_status,
+            "linhas": [[iid, list(valores), versao.isoformat() if versao else None,
+                        str(tecnico_id) if tecnico_id else None, data_limite.isoformat() if data_limite else None]
+                       for iid, valores, versao, tecnico_id, data_limite in linhas],
+        }
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(conteudo, arquivo, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporario, self.caminho)
+
+    # Define o método 'carregar', chamado ao abrir a aplicação.
+    def carregar(self):
+
+        """
+        Este método retorna a tupla (marca, filtro_status, linhas), ou None se
+        não houver instantâneo utilizável: arquivo ausente ou corrompido, de
+        outro formato ou origem, ou mais antigo que a validade dos registros
+        de exclusão.
+        """
+
+        try:
+            with open(self.caminho, encoding="utf-8") as arquivo:
+                conteudo = json.load(arquivo)
+            if conteudo.get("formato") != VERSAO_FORMATO or conteudo.get("origem") != self.origem:
+                return None
+            marca = datetime.fromisoformat(conteudo["marca"])
+            if agora_utc() - marca > timedelta(days=VALIDADE_DIAS):
+                return None
+            linhas = [(iid, tuple(valores), datetime.fromisoformat(versao) if versao else None,
+                       ObjectId(tecnico_id) if tecnico_id else None,
+                       datetime.fromisoformat(data_limite) if data_limite else None)
+                      for iid, valores, versao, tecnico_id, data_limite in conteudo["linhas"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return marca, conteudo.get("filtro_status"), linhas
+
+    # Define o método 'descartar', que remove o instantâneo.
+    def descartar(self):
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,65 @@
+# Módulo dos prazos e lembretes do Gerenciador de Tarefas.
+# Cada tarefa pode ter um prazo ('data_limite'), gravado em UTC, sem fuso
+# horário, como as demais datas. Os prazos das tarefas pendentes carregadas
+# ficam em uma fila de prioridade (heap) no modelo de tarefas; a interface
+# mantém um único temporizador, agendado para o prazo mais próximo, em vez
+# de verificar as tarefas periodicamente. As tarefas vencidas são
+# consultadas no banco de dados pelo índice (status, data_limite).
+
+# Importa as classes de data e fuso horário.
+from datetime import datetime, time, timedelta, timezone
+
+
+# Formatos aceitos no campo "Prazo" do formulário, em horário local. Sem a
+# hora, o prazo é o fim do dia.
+FORMATO_PRAZO = "%d/%m/%Y %H:%M"
+FORMATO_DIA = "%d/%m/%Y"
+
+# Espera máxima do temporizador dos lembretes. Um prazo mais distante é
+# reagendado ao fim da espera, o que corrige desvios do relógio (por
+# exemplo, após o computador ser suspenso).
+ESPERA_MAXIMA = timedelta(hours=1)
+
+
+# Define a função 'ler_prazo', que converte o texto do formulário em um prazo.
+def ler_prazo(texto):
+
+    """
+    Esta função converte o prazo digitado (DD/MM/AAAA HH:MM ou DD/MM/AAAA,
+    em horário local) no instante em UTC, sem fuso horário. Um texto vazio
+    resulta em None. Um texto inválido lança ValueError.
+    """
+
+    texto = texto.strip()
+    if not texto:
+        return None
+    try:
+        prazo = datetime.strptime(texto, FORMATO_PRAZO)
+    except ValueError:
+        prazo = datetime.combine(datetime.strptime(texto, FORMATO_DIA).date(), time(23, 59))
+    return prazo.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# Define a função 'formatar_prazo', que exibe um prazo em horário local.
+def formatar_prazo(data_limite):
+    if not isinstance(data_limite, datetime):
+        return ""
+    return data_limite.replace(tzinfo=timezone.utc).astimezone().strftime(FORMATO_PRAZO)
+
+
+# Define a função 'filtro_vencidas', a consulta das tarefas vencidas.
+def filtro_vencidas(agora):
+
+    """
+    Esta função retorna o filtro das tarefas pendentes com o prazo anterior
+    a 'agora', atendido por uma faixa do índice (status, data_limite).
+    Tarefas sem prazo não são selecionadas.
+    """
+
+    return {"status": "Pendente", "data_limite": {"$lt": agora}}
+
+
+# Define a função 'vencida', a mesma condição aplicada a um documento em memória.
+def vencida(tarefa, agora):
+    data_limite = tarefa.get("data_limite")
+    return tarefa.get("status") == "Pendente" and isinstance(data_limite, datetime) and data_limite < agora
@@ -0,0 +1,354 @@
+# Módulo do modelo de tarefas do Gerenciador de Tarefas.
+# Guarda em memória as tarefas carregadas no Treeview, em registros compactos
+# (com __slots__, sem o dicionário de atributos de cada objeto) indexados
+# pelo '_id'. Os textos que se repetem entre muitas tarefas (status, datas,
+# nomes de técnicos) e as referências aos técnicos são compartilhados por
+# todos os registros, e a chave de ordenação da data é calculada uma única
+# vez, ao carregar a tarefa. Índices por status, por técnico e por tag
+# permitem filtrar o conjunto carregado sem consultar o banco de dados, e uma fila de
+# prioridade (heap) ordena os prazos das tarefas pendentes. As subtarefas
+# carregadas ao expandir uma tarefa ficam no modelo, mas fora da lista principal.
+
+# Importa o heapq, que mantém a fila dos prazos.
+import heapq
+
+# Importa o módulo sys, que fornece a função 'intern'.
+import sys
+
+# Importa a classe datetime, usada nas datas gravadas como data e hora.
+from datetime import datetime
+
+# Importa a normalização de nomes (minúsculas, sem acentos) usada na busca rápida.
+from diretorio_tecnicos import normalizar_nome
+
+
+# Define a função 'chave_data', que converte a data de criação em um inteiro
+# que ordena corretamente (AAAAMMDD).
+def chave_data(data_criacao):
+
+    """
+    Esta função aceita a data no formato DD/MM/AAAA, gravado pela aplicação,
+    ou como datetime. Datas ausentes ou inválidas ficam no início da ordem.
+    """
+
+    if isinstance(data_criacao, datetime):
+        return data_criacao.year * 10000 + data_criacao.month * 100 + data_criacao.day
+    try:
+        dia, mes, ano = data_criacao.split("/")
+        return int(ano) * 10000 + int(mes) * 100 + int(dia)
+    except (AttributeError, ValueError):
+        return 0
+
+
+# Define a classe 'RegistroTarefa', a representação compacta de uma tarefa.
+class RegistroTarefa:
+
+    """
+    Esta classe guarda os campos de uma tarefa usados pela interface.
+    'tecnico' é o nome legado, ainda não migrado para 'tecnico_id'.
+    'pai_id' é a tarefa pai, e 'depende_de' as tarefas de que ela depende.
+    """
+
+    __slots__ = ("titulo", "descricao", "status", "data_criacao", "tecnico", "tecnico_id",
+                 "atualizado_em", "data_limite", "tags", "pai_id", "depende_de", "arquivada", "chave_data", "ordem")
+
+    def __init__(self, titulo, descricao, status, data_criacao, tecnico, tecnico_id, atualizado_em, data_limite,
+                 tags, pai_id, depende_de, arquivada, ordem):
+        self.titulo = titulo
+        self.descricao = descricao
+        self.status = status
+        self.data_criacao = data_criacao
+        self.tecnico = tecnico
+        self.tecnico_id = tecnico_id
+        self.atualizado_em = atualizado_em
+        self.data_limite = data_limite
+        self.tags = tags
+        self.pai_id = pai_id
+        self.depende_de = depende_de
+        self.arquivada = arquivada
+        self.chave_data = chave_data(data_criacao)
+
+        # Posição da tarefa na ordem de carregamento.
+        self.ordem = ordem
+
+    # Define a propriedade 'chave_tecnico', usada no índice por técnico: o
+    # nome legado, se houver, ou a referência ao técnico.
+    @property
+    def chave_tecnico(self):
+        return self.tecnico or self.tecnico_id
+
+    # Define o método 'como_documento', que reconstrói os campos da tarefa.
+    def como_documento(self):
+
+        """
+        Este método retorna um dicionário com os mesmos campos do documento
+        da tarefa no banco de dados.
+        """
+
+        documento = {
+            "titulo": self.titulo,
+            "descricao": self.descricao,
+            "status": self.status,
+            "data_criacao": self.data_criacao,
+            "tecnico_id": self.tecnico_id,
+            "atualizado_em": self.atualizado_em,
+        }
+        if self.tecnico:
+            documento["tecnico"] = self.tecnico
+        if self.data_limite is not None:
+            documento["data_limite"] = self.data_limite
+        if self.tags:
+            documento["tags"] = list(self.tags)
+        if self.pai_id is not None:
+            documento["pai_id"] = self.pai_id
+        if self.depende_de:
+            documento["depende_de"] = list(self.depende_de)
+        return documento
+
+
+# Chaves de ordenação das colunas do Treeview. A coluna "Técnico" depende do
+# diretório de técnicos e é ordenada pela interface.
+CHAVES_ORDENACAO = {
+    "Título": lambda registro: registro.titulo.casefold(),
+    "Descrição": lambda registro: registro.descricao.casefold(),
+    "Status": lambda registro: registro.status,
+    "Data da Criação": lambda registro: registro.chave_data,
+    "Prazo": lambda registro: (registro.data_limite is None, registro.data_limite or datetime.min),
+    "Tags": lambda registro: [tag.casefold() for tag in registro.tags],
+}
+
+
+# Define a classe 'ModeloTarefas', o conjunto de tarefas carregadas.
+class ModeloTarefas:
+
+    """
+    Esta classe mantém os registros das tarefas carregadas, indexados pelo
+    '_id' (como string, o mesmo 'iid' do Treeview), com consulta em tempo
+    constante, e responde localmente aos filtros por status, técnico, tag
+    e texto ('filtrar'). É usada apenas pela thread da interface.
+
+    Os prazos das tarefas pendentes ficam em um heap de tuplas
+    (data_limite, tarefa_id). As entradas não são retiradas quando a tarefa
+    muda ou sai do modelo: elas são descartadas ao chegar ao topo, se não
+    corresponderem mais ao registro ('_prazo_valido').
+    """
+
+    def __init__(self):
+        self.versao = 0
+        self.limpar()
+
+    def __len__(self):
+        return len(self.registros)
+
+    def __contains__(self, tarefa_id):
+        return tarefa_id in self.registros
+
+    # Define o método '_compartilhar', que reaproveita textos repetidos.
+    def _compartilhar(self, texto):
+        return sys.intern(texto) if isinstance(texto, str) else texto
+
+    # Define o método 'definir', que inclui ou substitui uma tarefa.
+    def definir(self, tarefa_id, documento, arquivada=False):
+
+        """
+        Este método cria o registro da tarefa a partir do seu documento (ou
+        dos campos equivalentes) e o retorna.
+        """
+
+        tecnico_id = documento.get("tecnico_id")
+        if tecnico_id is not None:
+            tecnico_id = self.referencias.setdefault(tecnico_id, tecnico_id)
+
+        # Uma tarefa já carregada mantém a sua posição na lista.
+        anterior = self.registros.get(tarefa_id)
+        if anterior is not None:
+            self._desindexar(tarefa_id, anterior)
+            ordem = anterior.ordem
+        else:
+            ordem = self.proxima_ordem
+            self.proxima_ordem += 1
+
+        registro = RegistroTarefa(documento.get("titulo", ""), documento.get("descricao", ""),
+                                  self._compartilhar(documento.get("status")),
+                                  self._compartilhar(documento.get("data_criacao")),
+                                  self._compartilhar(documento.get("tecnico") or None), tecnico_id,
+                                  documento.get("atualizado_em"), documento.get("data_limite"),
+                                  tuple(self._compartilhar(tag) for tag in documento.get("tags") or ()),
+                                  documento.get("pai_id"), tuple(documento.get("depende_de") or ()), arquivada, ordem)
+        self.registros[tarefa_id] = registro
+        if registro.pai_id is not None:
+            self.subtarefas.add(tarefa_id)
+        self.por_status.setdefault(registro.status, set()).add(tarefa_id)
+        self.por_tecnico.setdefault(registro.chave_tecnico, set()).add(tarefa_id)
+        for tag in registro.tags:
+            self.por_tag.setdefault(tag, set()).add(tarefa_id)
+        if registro.status == "Pendente" and registro.data_limite is not None:
+            self._incluir_prazo(tarefa_id, registro.data_limite)
+        self.versao += 1
+        return registro
+
+    # Define o método '_incluir_prazo', que coloca um prazo na fila.
+    def _incluir_prazo(self, tarefa_id, data_limite):
+
+        """
+        Este método inclui o prazo no heap. Quando as entradas descartadas
+        passam a ser a maioria, o heap é reconstruído a partir dos registros.
+        """
+
+        heapq.heappush(self.prazos, (data_limite, tarefa_id))
+        if len(self.prazos) > 2 * len(self.registros) + 64:
+            self.prazos = [(registro.data_limite, iid) for iid, registro in self.registros.items()
+                           if registro.status == "Pendente" and registro.data_limite is not None]
+            heapq.heapify(self.prazos)
+
+    # Define o método '_prazo_valido', que verifica uma entrada do heap.
+    def _prazo_valido(self, tarefa_id, data_limite):
+        registro = self.registros.get(tarefa_id)
+        return registro is not None and registro.status == "Pendente" and registro.data_limite == data_limite
+
+    # Define o método 'proximo_prazo', que retorna o prazo mais próximo, ou None.
+    def proximo_prazo(self):
+        while self.prazos and not self._prazo_valido(self.prazos[0][1], self.prazos[0][0]):
+            heapq.heappop(self.prazos)
+        return self.prazos[0][0] if self.prazos else None
+
+    # Define o método 'retirar_prazos', que retira da fila os prazos que chegaram.
+    def retirar_prazos(self, agora):
+
+        """
+        Este método retira do heap os prazos anteriores ou iguais a 'agora' e
+        retorna a lista de tuplas (tarefa_id, data_limite) das tarefas ainda
+        pendentes com esses prazos, sem repetições.
+        """
+
+        vencidos = {}
+        while self.prazos and self.prazos[0][0] <= agora:
+            data_limite, tarefa_id = heapq.heappop(self.prazos)
+            if self._prazo_valido(tarefa_id, data_limite):
+                vencidos[tarefa_id] = data_limite
+        return list(vencidos.items())
+
+    # Define o método '_desindexar', que retira uma tarefa dos índices.
+    def _desindexar(self, tarefa_id, registro):
+        self.por_status.get(registro.status, set()).discard(tarefa_id)
+        self.por_tecnico.get(registro.chave_tecnico, set()).discard(tarefa_id)
+        for tag in registro.tags:
+            self.por_tag.get(tag, set()).discard(tarefa_id)
+        self.subtarefas.discard(tarefa_id)
+
+    # Define o método 'obter', que retorna o registro de uma tarefa, ou None.
+    def obter(self, tarefa_id):
+        return self.registros.get(tarefa_id)
+
+    # Define o método 'remover', que retira uma tarefa do modelo.
+    def remover(self, tarefa_id):
+        registro = self.registros.pop(tarefa_id, None)
+        if registro is not None:
+            self._desindexar(tarefa_id, registro)
+            self.versao += 1
+
+    # Define o método 'limpar', chamado antes de um carregamento completo.
+    def limpar(self):
+        self.registros = {}
+
+        # Uma única instância de cada referência de técnico.
+        self.referencias = {}
+
+        # Índices: status -> identificadores, técnico (referência ou nome
+        # legado) -> identificadores, e tag -> identificadores.
+        self.por_status = {}
+        self.por_tecnico = {}
+        self.por_tag = {}
+
+        # Identificadores das subtarefas carregadas (as tarefas com pai).
+        self.subtarefas = set()
+
+        # Heap dos prazos das tarefas pendentes: tuplas (data_limite, tarefa_id).
+        self.prazos = []
+
+        # Próxima posição na ordem de carregamento, versão do conteúdo (alterada
+        # a cada inclusão ou remoção) e último resultado da busca rápida.
+        self.proxima_ordem = 0
+        self.versao += 1
+        self.ultima_busca = None
+
+    # Define o método 'arquivada', que indica se a tarefa veio do arquivo.
+    def arquivada(self, tarefa_id):
+        registro = self.registros.get(tarefa_id)
+        return registro is not None and registro.arquivada
+
+    # Define o método 'filtrar', o mecanismo de consulta local.
+    def filtrar(self, status=None, tecnicos=None, incluir_arquivadas=True, texto="", vencidas_ate=None, tag=None):
+
+        """
+        Este método retorna, na ordem de carregamento, os identificadores das
+        tarefas que atendem a todos os filtros informados:
+        - 'status': usa o índice por status;
+        - 'tecnicos': chaves aceitas no índice por técnico (a referência e o
+          nome legado do técnico escolhido);
+        - 'incluir_arquivadas': com False, as tarefas arquivadas são ocultadas;
+        - 'vencidas_ate': apenas as tarefas pendentes com prazo anterior a
+          esse instante (as vencidas);
+        - 'tag': usa o índice por tag;
+        - 'texto': busca rápida no título e na descrição, sem diferenciar
+          maiúsculas e acentos.
+        As subtarefas, exibidas sob a tarefa pai, não fazem parte do
+        resultado. Os índices restringem os candidatos antes de qualquer
+        registro ser lido. Se o texto apenas acrescenta caracteres ao da busca anterior,
+        com os mesmos filtros, a busca é feita sobre o resultado anterior.
+        """
+
+        conjuntos = []
+        if status is not None:
+            conjuntos.append(self.por_status.get(status, set()))
+        if tecnicos is not None:
+            conjuntos.append(set().union(*(self.por_tecnico.get(chave, ()) for chave in tecnicos)))
+        if tag is not None:
+            conjuntos.append(self.por_tag.get(tag, set()))
+        if vencidas_ate is not None:
+            conjuntos.append({tarefa_id for tarefa_id in self.por_status.get("Pendente", ())
+                              if self.registros[tarefa_id].data_limite is not None
+                              and self.registros[tarefa_id].data_limite < vencidas_ate})
+
+        if conjuntos:
+            conjuntos.sort(key=len)
+            candidatos = conjuntos[0].intersection(*conjuntos[1:])
+            ids = sorted(candidatos, key=lambda tarefa_id: self.registros[tarefa_id].ordem)
+        else:
+            ids = list(self.registros)
+
+        if self.subtarefas:
+            ids = [tarefa_id for tarefa_id in ids if tarefa_id not in self.subtarefas]
+        if not incluir_arquivadas:
+            ids = [tarefa_id for tarefa_id in ids if not self.registros[tarefa_id].arquivada]
+
+        texto = normalizar_nome(texto.strip())
+        if not texto:
+            return ids
+
+        filtros = (self.versao, status, frozenset(tecnicos) if tecnicos is not None else None, incluir_arquivadas,
+                   vencidas_ate, tag)
+        if self.ultima_busca and self.ultima_busca[0] == filtros and texto.startswith(self.ultima_busca[1]):
+            ids = self.ultima_busca[2]
+
+        encontrados = []
+        for tarefa_id in ids:
+            registro = self.registros[tarefa_id]
+            if texto in normalizar_nome(registro.titulo) or texto in normalizar_nome(registro.descricao):
+                encontrados.append(tarefa_id)
+        self.ultima_busca = (filtros, texto, encontrados)
+        return encontrados
+
+    # Define o método 'ordenar', usado ao clicar no cabeçalho de uma coluna.
+    def ordenar(self, ids, chave, decrescente=False):
+
+        """
+        Este método retorna os identificadores informados ordenados pela
+        função 'chave', aplicada aos registros. Identificadores sem registro
+        vão para o fim da lista.
+        """
+
+        presentes = [tarefa_id for tarefa_id in ids if tarefa_id in self.registros]
+        ausentes = [tarefa_id for tarefa_id in ids if tarefa_id not in self.registros]
+        presentes.sort(key=lambda tarefa_id: chave(self.registros[tarefa_id]), reverse=decrescente)
+        return presentes + ausentes
@@ -0,0 +1,156 @@
+# Módulo das tarefas recorrentes do Gerenciador de Tarefas.
+# Um modelo de recorrência (coleção 'modelos_recorrentes') descreve uma
+# tarefa que se repete: todos os dias, toda semana (em um dia da semana) ou
+# todo mês (em um dia do mês). O gerador cria as ocorrências de todos os
+# modelos que chegaram ao dia atual com um único 'bulk_write' de upserts,
+# chaveados por (modelo_id, periodo) e protegidos por um índice único:
+# executar o gerador de novo (em outra estação, ou depois de uma execução
+# interrompida) não duplica tarefas. Depois de um longo período sem conexão,
+# todas as ocorrências atrasadas são criadas no mesmo lote.
+
+# Importa o calendar, que informa o último dia de cada mês.
+import calendar
+
+# Importa as classes de data.
+from datetime import date, datetime, timedelta
+
+# Importa a operação de atualização e os erros do pymongo.
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa o código de erro de chave duplicada.
+from diario_offline import CODIGO_CHAVE_DUPLICADA
+
+# Importa a função que fornece o instante atual usado como versão das tarefas.
+from utilitarios import agora_utc
+
+
+# Nome da coleção dos modelos de recorrência.
+COLECAO_MODELOS = "modelos_recorrentes"
+
+# Regras de recorrência e os nomes exibidos na interface.
+REGRA_DIARIA = "diaria"
+REGRA_SEMANAL = "semanal"
+REGRA_MENSAL = "mensal"
+NOMES_REGRAS = {REGRA_DIARIA: "Diária", REGRA_SEMANAL: "Semanal", REGRA_MENSAL: "Mensal"}
+
+# Dias da semana da regra semanal, na numeração de 'date.weekday'.
+DIAS_SEMANA = ("Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo")
+
+# Formato do período de uma ocorrência (a sua data), que também ordena as
+# datas como texto.
+FORMATO_PERIODO = "%Y-%m-%d"
+
+
+# Define a função 'novo_modelo', que monta o documento de um modelo de recorrência.
+def novo_modelo(titulo, descricao, tecnico_id, regra, dia, inicio):
+
+    """
+    Esta função valida a regra e o dia (de 0, segunda-feira, a 6 na regra
+    semanal; de 1 a 31 na regra mensal; ignorado na regra diária) e retorna
+    o documento do modelo. A primeira ocorrência é a primeira data da regra a
+    partir de 'inicio'. Dados inválidos lançam ValueError.
+    """
+
+    if regra not in NOMES_REGRAS:
+        raise ValueError(f"Regra de recorrência desconhecida: {regra}.")
+    if regra == REGRA_SEMANAL and not 0 <= dia <= 6:
+        raise ValueError("O dia da semana deve estar entre 0 (segunda-feira) e 6 (domingo).")
+    if regra == REGRA_MENSAL and not 1 <= dia <= 31:
+        raise ValueError("O dia do mês deve estar entre 1 e 31.")
+
+    return {
+        "_id": ObjectId(),
+        "titulo": titulo,
+        "descricao": descricao,
+        "tecnico_id": tecnico_id,
+        "regra": regra,
+        "dia": dia if regra != REGRA_DIARIA else None,
+        # Último período já gerado: o dia anterior ao início.
+        "gerado_ate": (inicio - timedelta(days=1)).strftime(FORMATO_PERIODO),
+        "atualizado_em": agora_utc(),
+    }
+
+
+# Define a função 'ocorrencias', que enumera as datas das ocorrências de um modelo.
+def ocorrencias(modelo, desde, ate):
+
+    """
+    Esta função retorna, em ordem, as datas das ocorrências do modelo entre
+    'desde' e 'ate' (inclusive). Na regra mensal, um dia que não existe no
+    mês (por exemplo, 31 em abril) vira o último dia do mês.
+    """
+
+    regra = modelo["regra"]
+    if regra == REGRA_DIARIA:
+        return [desde + timedelta(days=dias) for dias in range((ate - desde).days + 1)]
+
+    if regra == REGRA_SEMANAL:
+        primeira = desde + timedelta(days=(modelo["dia"] - desde.weekday()) % 7)
+        return [primeira + timedelta(days=dias) for dias in range(0, (ate - primeira).days + 1, 7)]
+
+    datas = []
+    ano, mes = desde.year, desde.month
+    while date(ano, mes, 1) <= ate:
+        data = date(ano, mes, min(modelo["dia"], calendar.monthrange(ano, mes)[1]))
+        if desde <= data <= ate:
+            datas.append(data)
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+    return datas
+
+
+# Define a função 'materializar_recorrentes', executada periodicamente em segundo plano.
+def materializar_recorrentes(armazenamento, hoje=None):
+
+    """
+    Esta função cria as tarefas de todas as ocorrências, até 'hoje' (por
+    padrão, a data local), que ainda não foram geradas:
+    1. Os modelos atrasados são lidos com uma consulta indexada por
+       'gerado_ate'.
+    2. Cada ocorrência vira um upsert com '$setOnInsert', filtrado por
+       (modelo_id, periodo), e todas são enviadas em um único 'bulk_write'
+       não ordenado. Uma ocorrência já existente não é alterada; uma chave
+       duplicada (outra estação criou a mesma ocorrência ao mesmo tempo)
+       não é um erro.
+    3. 'gerado_ate' dos modelos avança para 'hoje', também em um único
+       'bulk_write'. Se a execução for interrompida antes disso, a próxima
+       refaz os upserts sem duplicar tarefas.
+    Ocorrências excluídas pelo usuário não são recriadas, pois ficam antes
+    de 'gerado_ate'. Retorna a quantidade de tarefas criadas.
+    """
+
+    hoje = hoje or date.today()
+    limite = hoje.strftime(FORMATO_PERIODO)
+    colecao_modelos = armazenamento.colecao(COLECAO_MODELOS)
+    atrasados = list(colecao_modelos.find({"gerado_ate": {"$lt": limite}}))
+    if not atrasados:
+        return 0
+
+    agora = agora_utc()
+    requisicoes = []
+    for modelo in atrasados:
+        desde = datetime.strptime(modelo["gerado_ate"], FORMATO_PERIODO).date() + timedelta(days=1)
+        for data in ocorrencias(modelo, desde, hoje):
+            requisicoes.append(UpdateOne(
+                {"modelo_id": modelo["_id"], "periodo": data.strftime(FORMATO_PERIODO)},
+                {"$setOnInsert": {"titulo": modelo["titulo"], "descricao": modelo.get("descricao", ""),
+                                  "status": "Pendente", "data_criacao": data.strftime("%d/%m/%Y"),
+                                  "tecnico_id": modelo.get("tecnico_id"), "atualizado_em": agora}},
+                upsert=True))
+
+    criadas = 0
+    if requisicoes:
+        try:
+            criadas = armazenamento.colecao("tarefas").bulk_write(requisicoes, ordered=False).upserted_count
+        except BulkWriteError as erro:
+            if any(falha.get("code") != CODIGO_CHAVE_DUPLICADA for falha in erro.details.get("writeErrors", ())):
+                raise
+            criadas = erro.details.get("nUpserted", 0)
+
+    colecao_modelos.bulk_write([UpdateOne({"_id": modelo["_id"], "gerado_ate": {"$lt": limite}},
+                                          {"$set": {"gerado_ate": limite}}) for modelo in atrasados],
+                               ordered=False)
+    return criadas
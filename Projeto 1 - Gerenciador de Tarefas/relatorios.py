@@ -0,0 +1,297 @@
+# Módulo de relatórios do Gerenciador de Tarefas.
+# Gera os relatórios a partir de uma única leitura das tarefas: cada tarefa
+# lida é entregue a um ou mais destinos (relatório geral, por técnico, por
+# status, arquivo CSV), e cada destino a grava assim que a recebe. Assim,
+# N relatórios custam uma única consulta ao banco de dados, e nenhum deles
+# precisa guardar a lista de tarefas inteira na memória.
+
+# Importa o csv, formato da exportação das tarefas.
+import csv
+
+# Importa o módulo os para montar os caminhos dos arquivos do pacote.
+import os
+
+# Importa o re para formar nomes de arquivo a partir dos nomes dos técnicos.
+import re
+
+# Importa a classe datetime para formatar as datas.
+from datetime import datetime
+
+# Importa os módulos para geração de PDF.
+# Se o reportlab não estiver instalado, será necessário instalá-lo com: pip install reportlab
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen.canvas import Canvas
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+
+# Colunas dos relatórios PDF e as suas larguras, em polegadas.
+COLUNAS = ("Título", "Descrição", "Status", "Data de Criação", "Técnico")
+LARGURAS = (1.5, 2.2, 0.9, 1.4, 1.3)
+
+# Tamanho máximo da descrição exibida no relatório PDF.
+TAMANHO_DESCRICAO = 40
+
+
+# Define a função 'linha_relatorio', que formata uma tarefa para o relatório PDF.
+def linha_relatorio(tarefa):
+
+    """
+    Esta função retorna os textos das colunas do relatório para a tarefa,
+    que deve trazer o nome do técnico no campo 'tecnico_nome'.
+    """
+
+    descricao = tarefa.get("descricao", "N/A")
+    if len(descricao) > TAMANHO_DESCRICAO:
+        descricao = descricao[:TAMANHO_DESCRICAO - 3] + "..."
+
+    data_criacao = tarefa.get("data_criacao")
+    if isinstance(data_criacao, datetime):
+        data_formatada = data_criacao.strftime("%d/%m/%Y")
+    else:
+        data_formatada = str(data_criacao) if "data_criacao" in tarefa else "N/A"
+
+    return (tarefa.get("titulo", "N/A"), descricao, tarefa.get("status", "N/A"), data_formatada,
+            tarefa.get("tecnico_nome") or "N/A")
+
+
+# Define a classe 'RelatorioPDF', um destino que desenha o relatório linha a linha.
+class RelatorioPDF:
+
+    """
+    Esta classe desenha o relatório diretamente no canvas do reportlab:
+    cada tarefa recebida vira uma linha da tabela, e uma nova página (com o
+    cabeçalho da tabela repetido) é iniciada quando a atual se completa. O
+    arquivo só é criado quando a primeira tarefa é recebida; 'fechar'
+    acrescenta o resumo, grava o arquivo e retorna a quantidade de tarefas.
+    """
+
+    MARGEM = inch
+    ALTURA_CABECALHO = 30
+    ALTURA_LINHA = 18
+    RECUO = 6
+
+    def __init__(self, caminho, titulo):
+        if not REPORTLAB_AVAILABLE:
+            raise RuntimeError("A biblioteca reportlab não está instalada.")
+        self.caminho = caminho
+        self.titulo = titulo
+        self.canvas = None
+        self.quantidade = 0
+        self.pendentes = 0
+        self.concluidas = 0
+        self.largura_pagina, self.altura_pagina = A4
+        self.larguras = [largura * inch for largura in LARGURAS]
+
+        # A tabela é centralizada na página.
+        self.esquerda = (self.largura_pagina - sum(self.larguras)) / 2
+
+    # Define o método 'adicionar', que desenha a linha de uma tarefa.
+    def adicionar(self, tarefa):
+        if self.canvas is None:
+            self._iniciar()
+        if self.y - self.ALTURA_LINHA < self.MARGEM:
+            self._nova_pagina()
+
+        fundo = colors.white if self.quantidade % 2 == 0 else colors.HexColor("#f5f5f5")
+        self._desenhar_linha(linha_relatorio(tarefa), self.ALTURA_LINHA, fundo, colors.black, "Helvetica", 10)
+
+        self.quantidade += 1
+        if tarefa.get("status") == "Pendente":
+            self.pendentes += 1
+        elif tarefa.get("status") == "Concluída":
+            self.concluidas += 1
+
+    # Define o método 'fechar', que conclui e grava o relatório.
+    def fechar(self):
+        if self.canvas is None:
+            return 0
+
+        # O resumo precisa de quatro linhas de texto abaixo da tabela.
+        self.y -= 0.3 * inch
+        if self.y - 4 * 14 < self.MARGEM:
+            self.canvas.showPage()
+            self.y = self.altura_pagina - self.MARGEM
+        self.canvas.setFillColor(colors.HexColor("#333333"))
+        for indice, (fonte, texto) in enumerate((("Helvetica-Bold", "Resumo:"),
+                                                 ("Helvetica", f"Total de tarefas: {self.quantidade}"),
+                                                 ("Helvetica", f"Pendentes: {self.pendentes}"),
+                                                 ("Helvetica", f"Concluídas: {self.concluidas}"))):
+            self.canvas.setFont(fonte, 11)
+            self.canvas.drawString(self.esquerda, self.y - 11 - indice * 14, texto)
+
+        self.canvas.save()
+        self.canvas = None
+        return self.quantidade
+
+    def _iniciar(self):
+        self.canvas = Canvas(self.caminho, pagesize=A4)
+        self.canvas.setTitle(self.titulo)
+        centro = self.largura_pagina / 2
+        self.y = self.altura_pagina - self.MARGEM
+
+        # Título e data de geração, centralizados.
+        self.canvas.setFillColor(colors.HexColor("#1976d2"))
+        self.canvas.setFont("Helvetica-Bold", 20)
+        self.y -= 20
+        self.canvas.drawCentredString(centro, self.y, self.titulo)
+        self.y -= 30 + 10
+        self.canvas.setFillColor(colors.HexColor("#666666"))
+        self.canvas.setFont("Helvetica", 10)
+        self.canvas.drawCentredString(centro, self.y, f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+        self.y -= 0.3 * inch
+
+        self._desenhar_cabecalho()
+
+    def _nova_pagina(self):
+        self.canvas.showPage()
+        self.y = self.altura_pagina - self.MARGEM
+        self._desenhar_cabecalho()
+
+    def _desenhar_cabecalho(self):
+        self._desenhar_linha(COLUNAS, self.ALTURA_CABECALHO, colors.HexColor("#1976d2"), colors.whitesmoke,
+                             "Helvetica-Bold", 11)
+
+    # Desenha uma linha da tabela: o fundo, os textos e a grade, trocando
+    # a cor e a fonte do canvas uma única vez por linha.
+    def _desenhar_linha(self, textos, altura, fundo, cor_texto, fonte, tamanho):
+        base = self.y - altura
+        self.canvas.setFillColor(fundo)
+        self.canvas.rect(self.esquerda, base, sum(self.larguras), altura, stroke=0, fill=1)
+
+        self.canvas.setFillColor(cor_texto)
+        self.canvas.setFont(fonte, tamanho)
+        x = self.esquerda
+        for texto, largura in zip(textos, self.larguras):
+            self.canvas.drawString(x + self.RECUO, base + (altura - tamanho) / 2 + 2,
+                                   self._ajustar(str(texto), fonte, tamanho, largura - 2 * self.RECUO))
+            x += largura
+
+        self.canvas.setStrokeColor(colors.grey)
+        x = self.esquerda
+        for largura in self.larguras:
+            self.canvas.rect(x, base, largura, altura, stroke=1, fill=0)
+            x += largura
+        self.y = base
+
+    # Corta o texto que não cabe na coluna, terminando-o com reticências. O
+    # corte parte de uma estimativa proporcional à largura medida.
+    def _ajustar(self, texto, fonte, tamanho, largura):
+        medida = stringWidth(texto, fonte, tamanho)
+        if medida <= largura:
+            return texto
+        texto = texto[:int(len(texto) * largura / medida) + 1]
+        while texto and stringWidth(texto + "...", fonte, tamanho) > largura:
+            texto = texto[:-1]
+        return texto + "..."
+
+
+# Define a classe 'RelatorioCSV', um destino que exporta as tarefas em CSV.
+class RelatorioCSV:
+
+    """
+    Esta classe grava uma linha por tarefa, com os textos completos, separados
+    por ponto e vírgula e com a marca de ordem de bytes do UTF-8, formato que
+    as planilhas em português abrem diretamente.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.arquivo = None
+        self.quantidade = 0
+
+    def adicionar(self, tarefa):
+        if self.arquivo is None:
+            self.arquivo = open(self.caminho, "w", encoding="utf-8-sig", newline="")
+            self.escritor = csv.writer(self.arquivo, delimiter=";")
+            self.escritor.writerow(("ID", "Título", "Descrição", "Status", "Data de Criação", "Técnico"))
+        titulo, _, status, data_criacao, tecnico = linha_relatorio(tarefa)
+        self.escritor.writerow((str(tarefa.get("_id", "")), titulo, tarefa.get("descricao", ""), status,
+                                data_criacao, tecnico))
+        self.quantidade += 1
+
+    def fechar(self):
+        if self.arquivo is not None:
+            self.arquivo.close()
+            self.arquivo = None
+        return self.quantidade
+
+
+# Define a função 'distribuir', o laço único do pipeline de relatórios.
+def distribuir(tarefas, destinos_da_tarefa):
+
+    """
+    Esta função percorre as tarefas uma única vez e entrega cada uma aos
+    destinos retornados por 'destinos_da_tarefa'. Retorna a quantidade de
+    tarefas lidas.
+    """
+
+    quantidade = 0
+    for tarefa in tarefas:
+        for destino in destinos_da_tarefa(tarefa):
+            destino.adicionar(tarefa)
+        quantidade += 1
+    return quantidade
+
+
+# Define a classe 'PacoteRelatorios', que gera todos os relatórios de uma vez.
+class PacoteRelatorios:
+
+    """
+    Esta classe gera, no diretório informado, o relatório geral, um
+    relatório por técnico, um por status e a exportação CSV, a partir de uma
+    única leitura das tarefas ('processar'). Os relatórios por técnico e por
+    status são criados conforme aparecem tarefas de cada um.
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self.nomes_usados = set()
+        self.geral = RelatorioPDF(self._caminho("Relatorio_Geral", ".pdf"), "Relatório de Tarefas - Geral")
+        self.csv = RelatorioCSV(self._caminho("Tarefas", ".csv"))
+        self.por_tecnico = {}
+        self.por_status = {}
+
+    # Forma um nome de arquivo único a partir de um texto livre.
+    def _caminho(self, nome, extensao):
+        base = re.sub(r"[^\w-]+", "_", nome).strip("_") or "Relatorio"
+        nome, numero = base, 2
+        while nome.casefold() in self.nomes_usados:
+            nome, numero = f"{base}_{numero}", numero + 1
+        self.nomes_usados.add(nome.casefold())
+        return os.path.join(self.diretorio, nome + extensao)
+
+    def destinos(self, tarefa):
+        tecnico = tarefa.get("tecnico_nome") or "Sem técnico"
+        if tecnico not in self.por_tecnico:
+            self.por_tecnico[tecnico] = RelatorioPDF(self._caminho(f"Relatorio_Tecnico_{tecnico}", ".pdf"),
+                                                     f"Relatório de Tarefas - {tecnico}")
+        status = tarefa.get("status") or "Sem status"
+        if status not in self.por_status:
+            self.por_status[status] = RelatorioPDF(self._caminho(f"Relatorio_Status_{status}", ".pdf"),
+                                                   f"Relatório de Tarefas - {status}")
+        return self.geral, self.csv, self.por_tecnico[tecnico], self.por_status[status]
+
+    # Define o método 'processar', que lê as tarefas e grava os relatórios.
+    def processar(self, tarefas):
+
+        """
+        Este método distribui as tarefas aos relatórios, fecha todos eles e
+        retorna a tupla (quantidade de tarefas, caminhos dos arquivos gerados).
+        """
+
+        try:
+            quantidade = distribuir(tarefas, self.destinos)
+        except BaseException:
+            self.csv.fechar()
+            raise
+        arquivos = []
+        for destino in [self.geral, self.csv, *self.por_tecnico.values(), *self.por_status.values()]:
+            if destino.fechar():
+                arquivos.append(destino.caminho)
+        return quantidade, arquivos
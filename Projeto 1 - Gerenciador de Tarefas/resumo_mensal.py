@@ -0,0 +1,162 @@
+# Módulo do resumo mensal do Gerenciador de Tarefas.
+# Mantém a coleção 'resumo_mensal', com a quantidade de tarefas (ativas e
+# arquivadas) de cada mês de criação, técnico e status. Os relatórios por
+# período leem o resumo: um ano custa algumas dezenas de documentos, e não
+# todas as tarefas do ano. O resumo é atualizado de forma incremental: a cada
+# execução, apenas os meses das tarefas alteradas ou excluídas desde a
+# execução anterior são recalculados, por uma agregação com '$merge' (ou o
+# equivalente no SQLite).
+
+# Importa as classes de data usadas para montar os filtros de cada mês.
+from datetime import datetime, timedelta
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa a função que fornece o instante atual em UTC.
+from utilitarios import agora_utc
+
+# Importa a coleção de registros de exclusão e a margem de relógio entre as estações.
+from instantaneo import COLECAO_EXCLUSOES, MARGEM_RELOGIO
+
+# Importa o nome da coleção de tarefas arquivadas, que também entram no resumo.
+from arquivamento import COLECAO_ARQUIVO
+
+
+# Nome da coleção do resumo. Cada documento tem como '_id' a combinação
+# {mes, tecnico, status} e guarda a 'quantidade' de tarefas e o instante
+# do cálculo ('calculado_em').
+COLECAO_RESUMO = "resumo_mensal"
+
+# Coleção de controle e documento que guarda a marca d'água do resumo.
+COLECAO_CONTROLE = "controle"
+CONTROLE_RESUMO = "resumo_mensal"
+
+
+# Define a função 'chave_mes', que converte uma data de criação no mês do resumo.
+def chave_mes(data_criacao):
+
+    """
+    Esta função retorna o mês no formato AAAA-MM para a data no formato
+    DD/MM/AAAA, gravado pela aplicação, ou como datetime, e None para datas
+    ausentes ou inválidas. O texto AAAA-MM ordena corretamente.
+    """
+
+    if isinstance(data_criacao, datetime):
+        return data_criacao.strftime("%Y-%m")
+    try:
+        _, mes, ano = data_criacao.split("/")
+        return f"{int(ano):04d}-{int(mes):02d}"
+    except (AttributeError, ValueError):
+        return None
+
+
+# Define a função '_limites_mes', que retorna o primeiro instante do mês e do mês seguinte.
+def _limites_mes(mes):
+    ano, numero = (int(parte) for parte in mes.split("-"))
+    inicio = datetime(ano, numero, 1)
+    fim = datetime(ano + numero // 12, numero % 12 + 1, 1)
+    return inicio, fim
+
+
+# Define a função 'filtro_meses', que seleciona as tarefas criadas nos meses informados.
+def filtro_meses(meses):
+
+    """
+    Esta função retorna o filtro das tarefas cuja data de criação pertence
+    a um dos meses (AAAA-MM) informados. As datas gravadas como texto são
+    comparadas com a lista dos dias de cada mês ('$in'), e as gravadas como
+    data, com o intervalo do mês; as duas condições usam o índice de
+    'data_criacao'.
+    """
+
+    dias = []
+    condicoes = []
+    for mes in sorted(meses):
+        inicio, fim = _limites_mes(mes)
+        dias += [(inicio + timedelta(days=deslocamento)).strftime("%d/%m/%Y")
+                 for deslocamento in range((fim - inicio).days)]
+        condicoes.append({"data_criacao": {"$gte": inicio, "$lt": fim}})
+    return {"$or": [{"data_criacao": {"$in": dias}}] + condicoes}
+
+
+# Define a função 'meses_alterados', que identifica os meses a recalcular.
+def meses_alterados(armazenamento, desde):
+
+    """
+    Esta função retorna os meses das tarefas alteradas ('atualizado_em') ou
+    excluídas (registros de exclusão) depois de 'desde', menos a margem de
+    relógio. O mês de uma tarefa excluída vem da data de criação gravada no
+    registro de exclusão. Nos registros sem essa data (gravados antes dela
+    ou por uma exclusão que não a conhecia), o mês é deduzido do instante
+    de criação do '_id': os meses da véspera e do dia seguinte são
+    recalculados, cobrindo a diferença de fuso horário entre o '_id' (UTC)
+    e a data de criação (horário local).
+    """
+
+    limite = desde - MARGEM_RELOGIO
+    meses = set()
+    for tarefa in armazenamento.colecao("tarefas").find({"atualizado_em": {"$gt": limite}}, {"data_criacao": 1}):
+        meses.add(chave_mes(tarefa.get("data_criacao")))
+    for registro in armazenamento.colecao(COLECAO_EXCLUSOES).find({"excluido_em": {"$gt": limite}},
+                                                                  {"data_criacao": 1}):
+        mes = chave_mes(registro.get("data_criacao"))
+        if mes:
+            meses.add(mes)
+        elif isinstance(registro["_id"], ObjectId):
+            criacao = registro["_id"].generation_time.replace(tzinfo=None)
+            meses.add(chave_mes(criacao - timedelta(days=1)))
+            meses.add(chave_mes(criacao + timedelta(days=1)))
+    meses.discard(None)
+    return meses
+
+
+# Define a função 'atualizar_resumo_mensal', executada periodicamente em segundo plano.
+def atualizar_resumo_mensal(armazenamento):
+
+    """
+    Esta função atualiza o resumo mensal e retorna a quantidade de meses
+    recalculados (ou None, se o resumo foi recalculado por completo):
+    1. Na primeira execução, sem marca d'água, todos os meses são calculados.
+    2. Nas seguintes, apenas os meses de 'meses_alterados'. Recalcular o mês
+       inteiro, em vez de somar diferenças, trata da mesma forma as tarefas
+       reatribuídas, concluídas e excluídas, cujo estado anterior não é
+       conhecido, e torna a atualização idempotente.
+    3. As quantidades dos meses recalculados são zeradas antes da agregação,
+       para que combinações que deixaram de existir não fiquem no resumo.
+    4. A marca d'água é o instante do início da execução.
+    Várias estações podem executar a atualização ao mesmo tempo.
+    """
+
+    controle = armazenamento.colecao(COLECAO_CONTROLE)
+    inicio = agora_utc()
+    estado = controle.find_one({"_id": CONTROLE_RESUMO})
+
+    if estado is None or estado.get("marca") is None:
+        meses = None
+        filtro = {}
+    else:
+        meses = meses_alterados(armazenamento, estado["marca"])
+        if not meses:
+            controle.update_one({"_id": CONTROLE_RESUMO}, {"$set": {"marca": inicio}}, upsert=True)
+            return 0
+        filtro = filtro_meses(meses)
+
+    resumo = armazenamento.colecao(COLECAO_RESUMO)
+    resumo.update_many({} if meses is None else {"mes": {"$in": sorted(meses)}}, {"$set": {"quantidade": 0}})
+    armazenamento.recalcular_resumo_mensal(filtro, inicio, ["tarefas", COLECAO_ARQUIVO], COLECAO_RESUMO)
+    controle.update_one({"_id": CONTROLE_RESUMO}, {"$set": {"marca": inicio}}, upsert=True)
+    return None if meses is None else len(meses)
+
+
+# Define a função 'ler_resumo', usada pelos relatórios por período.
+def ler_resumo(armazenamento, mes_inicial, mes_final):
+
+    """
+    Esta função retorna os documentos do resumo entre os meses (AAAA-MM)
+    informados, inclusive, sem as combinações zeradas, ordenados por mês.
+    """
+
+    return list(armazenamento.colecao(COLECAO_RESUMO)
+                .find({"mes": {"$gte": mes_inicial, "$lte": mes_final}, "quantidade": {"$gt": 0}})
+                .sort("mes", 1))
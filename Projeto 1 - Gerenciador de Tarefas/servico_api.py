@@ -0,0 +1,740 @@
+# Módulo do serviço HTTP do Gerenciador de Tarefas.
+# Expõe, em uma API JSON, as mesmas operações de tarefas e técnicos da
+# interface gráfica: listagem paginada e filtrada, inclusão, alteração e
+# exclusão, as versões em lote dessas operações e o cadastro de técnicos.
+# O serviço é opcional e usa apenas a biblioteca padrão: um servidor asyncio
+# atende as conexões, e as chamadas ao armazenamento (MongoDB ou SQLite)
+# rodam em um executor do tamanho do pool de conexões, compartilhado por
+# todas as requisições. As respostas de leitura trazem um ETag, e um GET com
+# 'If-None-Match' igual recebe 304 sem corpo; um PATCH ou DELETE com
+# 'If-Match' só é aplicado se a tarefa não foi alterada desde a leitura.
+#
+# Uso: python servico_api.py [--config ARQUIVO] [--porta 8080] [--memoria]
+# Com '--memoria', as tarefas ficam em um banco SQLite em memória, útil para
+# testes sem servidor MongoDB.
+
+# Importa o argparse, usado para ler as opções de linha de comando.
+import argparse
+
+# Importa o asyncio, que fornece o servidor e o laço de eventos.
+import asyncio
+
+# Importa o functools para repassar argumentos ao executor.
+import functools
+
+# Importa o hashlib, que calcula o ETag das listagens.
+import hashlib
+
+# Importa o json, formato das requisições e respostas.
+import json
+
+# Importa o logging, que registra os erros inesperados dos tratadores.
+import logging
+
+# Importa o re, usado nas rotas.
+import re
+
+# Importa as classes de data.
+from datetime import datetime
+
+# Importa o executor de threads que executa as chamadas bloqueantes.
+from concurrent.futures import ThreadPoolExecutor
+
+# Importa as descrições dos códigos de estado HTTP.
+from http import HTTPStatus
+
+# Importa a decodificação dos parâmetros da URL.
+from urllib.parse import urlsplit, parse_qs
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+# Importa as operações em lote e as exceções do pymongo.
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, ConnectionFailure
+
+# Importa as funções de configuração da aplicação.
+from configuracao import carregar_configuracao
+
+# Importa a criação do armazenamento, a preparação do banco e o filtro por técnico.
+from armazenamento import criar_armazenamento, conectar, filtro_tecnico
+
+# Importa o armazenamento SQLite, usado com a opção '--memoria'.
+from armazenamento_sqlite import ArmazenamentoSQLite
+
+# Importa o nome da coleção de tarefas arquivadas.
+from arquivamento import COLECAO_ARQUIVO
+
+# Importa a exclusão de tarefas, que também registra as exclusões e exclui os anexos.
+from exclusao import excluir_tarefas
+
+# Importa a função que fornece o instante atual usado como versão dos documentos.
+from utilitarios import agora_utc
+
+
+# Status aceitos nas tarefas, os mesmos do formulário da interface.
+STATUS_TAREFA = ("Pendente", "Concluída")
+
+# Campos de uma tarefa que podem ser enviados nas inclusões e alterações.
+CAMPOS_TAREFA = ("titulo", "descricao", "status", "data_criacao", "tecnico", "tecnico_id")
+
+# Tamanho máximo do corpo de uma requisição, em bytes.
+TAMANHO_MAXIMO_CORPO = 10 * 1024 * 1024
+
+# Registro dos erros do serviço.
+registro = logging.getLogger("servico_api")
+
+
+# Define a classe 'ErroApi', lançada para responder com um código de erro.
+class ErroApi(Exception):
+
+    """
+    Esta exceção interrompe o tratamento da requisição; o serviço responde
+    com o código 'estado' e o corpo {"erro": mensagem}.
+    """
+
+    def __init__(self, estado, mensagem):
+        super().__init__(mensagem)
+        self.estado = estado
+        self.mensagem = mensagem
+
+
+# Define a função 'para_json', que converte os valores do BSON em JSON.
+def para_json(valor):
+    if isinstance(valor, ObjectId):
+        return str(valor)
+    if isinstance(valor, datetime):
+        return valor.isoformat(timespec="milliseconds")
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+# Define a função 'ler_id', que converte o identificador recebido em ObjectId.
+def ler_id(texto, campo="_id"):
+    try:
+        return ObjectId(texto)
+    except (InvalidId, TypeError):
+        raise ErroApi(400, f"Identificador inválido em '{campo}': {texto!r}")
+
+
+# Define a função 'etag_versao', que forma o ETag de uma tarefa ou técnico.
+def etag_versao(documento):
+
+    """
+    Esta função retorna o ETag de um documento a partir da sua versão
+    ('atualizado_em'), a mesma usada pela interface na detecção de conflitos.
+    """
+
+    versao = documento.get("atualizado_em")
+    return f'"{versao.isoformat(timespec="milliseconds")}"' if isinstance(versao, datetime) else '"0"'
+
+
+# Define a função 'versao_etag', que converte o ETag de 'If-Match' em versão.
+def versao_etag(etag):
+    try:
+        return datetime.fromisoformat(etag.strip().removeprefix("W/").strip('"'))
+    except (AttributeError, ValueError):
+        raise ErroApi(412, "ETag inválido em 'If-Match'.")
+
+
+# Define a função 'etag_conteudo', que forma o ETag de uma listagem.
+def etag_conteudo(corpo):
+    return '"' + hashlib.sha256(corpo).hexdigest()[:32] + '"'
+
+
+# Define a função 'ler_tecnico', que valida o nome de técnico de uma tarefa enviada.
+def ler_tecnico(dados):
+    tecnico = dados.get("tecnico")
+    if tecnico is not None and not isinstance(tecnico, str):
+        raise ErroApi(422, "O campo 'tecnico' deve ser o nome do técnico.")
+    return tecnico
+
+
+# Define a função 'tecnico_enviado', que retorna o nome de técnico de uma tarefa enviada.
+def tecnico_enviado(dados):
+    return [ler_tecnico(dados)] if isinstance(dados, dict) else []
+
+
+# Define a função 'validar_data', que confere o formato DD/MM/AAAA.
+def validar_data(texto):
+    try:
+        return datetime.strptime(texto, "%d/%m/%Y").strftime("%d/%m/%Y")
+    except (TypeError, ValueError):
+        raise ErroApi(422, f"Data inválida: {texto!r} (use DD/MM/AAAA).")
+
+
+# Define a classe 'ServicoApi', que trata as requisições HTTP.
+class ServicoApi:
+
+    """
+    Esta classe atende as requisições da API sobre um único armazenamento,
+    cujo pool de conexões é compartilhado por todas as conexões HTTP. As
+    chamadas ao armazenamento rodam em 'executor', com no máximo uma chamada
+    por conexão do pool, e o laço de eventos continua atendendo as demais
+    requisições enquanto elas aguardam o banco de dados.
+    """
+
+    def __init__(self, armazenamento, configuracao):
+        self.armazenamento = armazenamento
+        self.tarefas = armazenamento.colecao("tarefas")
+        self.arquivo = armazenamento.colecao(COLECAO_ARQUIVO)
+        self.tecnicos = armazenamento.colecao("tecnicos")
+        self.anexos = armazenamento.anexos(int(configuracao["anexos"]["tamanho_bloco_kb"]) * 1024)
+        self.executor = ThreadPoolExecutor(max_workers=int(configuracao["mongodb"]["max_pool_size"]),
+                                           thread_name_prefix="api")
+        self.tamanho_pagina = int(configuracao["api"]["tamanho_pagina"])
+        self.tamanho_pagina_maximo = int(configuracao["api"]["tamanho_pagina_maximo"])
+
+        # Rotas: (método, expressão do caminho, tratador). Os grupos da
+        # expressão são repassados ao tratador.
+        self.rotas = [
+            ("GET", r"/tarefas", self.listar_tarefas),
+            ("POST", r"/tarefas", self.incluir_tarefa),
+            ("POST", r"/tarefas/lote", self.incluir_tarefas),
+            ("PATCH", r"/tarefas/lote", self.alterar_tarefas),
+            ("POST", r"/tarefas/lote/excluir", self.excluir_tarefas),
+            ("GET", r"/tarefas/([0-9a-fA-F]{24})", self.obter_tarefa),
+            ("PATCH", r"/tarefas/([0-9a-fA-F]{24})", self.alterar_tarefa),
+            ("DELETE", r"/tarefas/([0-9a-fA-F]{24})", self.excluir_tarefa),
+            ("GET", r"/tecnicos", self.listar_tecnicos),
+            ("POST", r"/tecnicos", self.incluir_tecnico),
+            ("GET", r"/tecnicos/contagens", self.contar_tarefas),
+            ("PATCH", r"/tecnicos/([0-9a-fA-F]{24})", self.renomear_tecnico),
+        ]
+
+    # Define o método 'chamar', que aguarda uma chamada bloqueante no executor.
+    async def chamar(self, funcao, *argumentos, **opcoes):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(funcao, *argumentos, **opcoes))
+
+    # Define o método 'atender', chamado pelo servidor a cada conexão.
+    async def atender(self, leitor, escritor):
+
+        """
+        Este método lê as requisições da conexão, uma de cada vez, e escreve
+        as respostas. A conexão é mantida aberta entre as requisições
+        (HTTP/1.1), a menos que o cliente peça o contrário.
+        """
+
+        try:
+            while True:
+                try:
+                    requisicao = await self.ler_requisicao(leitor)
+                except ErroApi as erro:
+                    # O corpo de uma requisição recusada não foi lido, e a
+                    # conexão não pode ser reaproveitada.
+                    self.escrever_resposta(escritor, erro.estado, self.corpo({"erro": erro.mensagem}), {}, False)
+                    await escritor.drain()
+                    break
+                if requisicao is None:
+                    break
+                metodo, alvo, cabecalhos, corpo, manter = requisicao
+                estado, resposta, extras = await self.tratar(metodo, alvo, cabecalhos, corpo)
+                self.escrever_resposta(escritor, estado, resposta, extras, manter)
+                await escritor.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    # Define o método 'ler_requisicao', um leitor mínimo de HTTP/1.1.
+    async def ler_requisicao(self, leitor):
+
+        """
+        Este método retorna a tupla (método, alvo, cabeçalhos, corpo,
+        manter_conexao), ou None se o cliente fechou a conexão. Cabeçalhos
+        têm os nomes em minúsculas. Apenas corpos com 'Content-Length' são
+        aceitos; um 'Content-Length' inválido ou acima do tamanho máximo
+        lança ErroApi (400 ou 413).
+        """
+
+        linha = await leitor.readline()
+        if not linha.strip():
+            return None
+        try:
+            metodo, alvo, versao = linha.decode("latin-1").split()
+        except ValueError:
+            return None
+
+        cabecalhos = {}
+        while True:
+            linha = await leitor.readline()
+            if linha in (b"\r\n", b"\n", b""):
+                break
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        try:
+            tamanho = int(cabecalhos.get("content-length") or 0)
+        except ValueError:
+            tamanho = -1
+        if tamanho < 0:
+            raise ErroApi(400, "Cabeçalho 'Content-Length' inválido.")
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            raise ErroApi(413, f"O corpo da requisição excede {TAMANHO_MAXIMO_CORPO} bytes.")
+        corpo = await leitor.readexactly(tamanho) if tamanho else b""
+
+        conexao = cabecalhos.get("connection", "").lower()
+        manter = conexao != "close" if versao == "HTTP/1.1" else conexao == "keep-alive"
+        return metodo.upper(), alvo, cabecalhos, corpo, manter
+
+    # Define o método 'escrever_resposta', que serializa a resposta HTTP.
+    def escrever_resposta(self, escritor, estado, corpo, extras, manter):
+        linhas = [f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}",
+                  f"Content-Length: {len(corpo)}",
+                  f"Connection: {'keep-alive' if manter else 'close'}"]
+        if corpo:
+            linhas.append("Content-Type: application/json; charset=utf-8")
+        linhas += [f"{nome}: {valor}" for nome, valor in extras.items()]
+        escritor.write(("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1") + corpo)
+
+    # Define o método 'tratar', que encaminha a requisição ao seu tratador.
+    async def tratar(self, metodo, alvo, cabecalhos, corpo):
+
+        """
+        Este método retorna a tupla (estado, corpo, cabeçalhos extras). Os
+        tratadores retornam (estado, dados) ou (estado, dados, cabeçalhos).
+        As respostas de GET com código 200 recebem um ETag (o da versão do
+        documento, quando informado pelo tratador, ou o resumo do corpo), e
+        são trocadas por 304 se o cliente já tiver a mesma representação.
+        Um erro inesperado de um tratador é registrado e respondido com 500,
+        sem fechar a conexão.
+        """
+
+        partes = urlsplit(alvo)
+        parametros = {chave: valores[-1] for chave, valores in parse_qs(partes.query).items()}
+        metodos_caminho = []
+        try:
+            for metodo_rota, expressao, tratador in self.rotas:
+                encontrado = re.fullmatch(expressao, partes.path.rstrip("/") or "/")
+                if not encontrado:
+                    continue
+                metodos_caminho.append(metodo_rota)
+                if metodo_rota == metodo:
+                    dados = json.loads(corpo) if corpo else None
+                    resultado = await tratador(*encontrado.groups(), parametros=parametros, dados=dados,
+                                               cabecalhos=cabecalhos)
+                    break
+            else:
+                if metodos_caminho:
+                    return 405, self.corpo({"erro": "Método não permitido."}), {"Allow": ", ".join(metodos_caminho)}
+                raise ErroApi(404, "Recurso não encontrado.")
+        except ErroApi as erro:
+            return erro.estado, self.corpo({"erro": erro.mensagem}), {}
+        except json.JSONDecodeError:
+            return 400, self.corpo({"erro": "O corpo da requisição não é um JSON válido."}), {}
+        except ConnectionFailure:
+            return 503, self.corpo({"erro": "O banco de dados está inacessível."}), {}
+        except Exception:
+            registro.exception("Erro ao tratar %s %s", metodo, alvo)
+            return 500, self.corpo({"erro": "Erro interno do serviço."}), {}
+
+        estado, dados, extras = resultado if len(resultado) == 3 else (*resultado, {})
+        resposta = self.corpo(dados) if dados is not None else b""
+        if metodo == "GET" and estado == 200:
+            extras.setdefault("ETag", etag_conteudo(resposta))
+            if extras["ETag"] in (etag.strip() for etag in cabecalhos.get("if-none-match", "").split(",")):
+                return 304, b"", extras
+        return estado, resposta, extras
+
+    def corpo(self, dados):
+        return json.dumps(dados, default=para_json, ensure_ascii=False).encode("utf-8")
+
+    # Define o método 'resolver_tecnicos', que converte nomes de técnicos em referências.
+    def resolver_tecnicos(self, nomes):
+
+        """
+        Este método retorna o dicionário nome -> '_id' dos técnicos
+        informados, com uma única consulta, e rejeita nomes não cadastrados,
+        como o formulário da interface.
+        """
+
+        nomes = {nome for nome in nomes if isinstance(nome, str) and nome}
+        if not nomes:
+            return {}
+        ids = {tecnico["nome"]: tecnico["_id"] for tecnico in self.tecnicos.find({"nome": {"$in": sorted(nomes)}})}
+        ausentes = nomes - ids.keys()
+        if ausentes:
+            raise ErroApi(422, f"O técnico '{sorted(ausentes)[0]}' não está cadastrado.")
+        return ids
+
+    # Define o método 'campos_tarefa', que valida os campos enviados de uma tarefa.
+    def campos_tarefa(self, dados, inclusao, ids_tecnicos):
+
+        """
+        Este método retorna os campos a gravar a partir do objeto JSON
+        recebido. Na inclusão, o título é obrigatório e os demais campos
+        recebem os mesmos valores padrão do formulário. O técnico pode ser
+        informado pelo nome ('tecnico') ou pela referência ('tecnico_id'); o
+        campo legado 'tecnico' é sempre anulado, como na interface. Os campos
+        de texto devem ser enviados como texto.
+        """
+
+        if not isinstance(dados, dict):
+            raise ErroApi(400, "Cada tarefa deve ser um objeto JSON.")
+        desconhecidos = set(dados) - set(CAMPOS_TAREFA) - {"_id"}
+        if desconhecidos:
+            raise ErroApi(422, f"Campo desconhecido: '{sorted(desconhecidos)[0]}'.")
+        for campo in ("titulo", "descricao"):
+            if dados.get(campo) is not None and not isinstance(dados[campo], str):
+                raise ErroApi(422, f"O campo '{campo}' deve ser um texto.")
+
+        campos = {}
+        if "titulo" in dados or inclusao:
+            titulo = str(dados.get("titulo") or "").strip()
+            if not titulo:
+                raise ErroApi(422, "O título da tarefa não pode estar vazio.")
+            campos["titulo"] = titulo
+        if "descricao" in dados or inclusao:
+            campos["descricao"] = str(dados.get("descricao") or "").strip()
+        if "status" in dados or inclusao:
+            status = dados.get("status", STATUS_TAREFA[0])
+            if status not in STATUS_TAREFA:
+                raise ErroApi(422, f"Status inválido: {status!r}.")
+            campos["status"] = status
+        if "data_criacao" in dados:
+            campos["data_criacao"] = validar_data(dados["data_criacao"])
+        elif inclusao:
+            campos["data_criacao"] = datetime.now().strftime("%d/%m/%Y")
+
+        if "tecnico_id" in dados:
+            campos["tecnico_id"] = ler_id(dados["tecnico_id"], "tecnico_id") if dados["tecnico_id"] else None
+        elif "tecnico" in dados:
+            tecnico = ler_tecnico(dados)
+            campos["tecnico_id"] = ids_tecnicos.get(tecnico) if tecnico else None
+        elif inclusao:
+            campos["tecnico_id"] = None
+        if "tecnico_id" in campos and not inclusao:
+            campos["tecnico"] = None
+
+        campos["atualizado_em"] = agora_utc()
+        return campos
+
+    # Define o método 'documentos_resposta', que prepara as tarefas para o JSON.
+    def documentos_resposta(self, tarefas):
+
+        """
+        Este método acrescenta às tarefas o nome do técnico ('tecnico_nome'),
+        lido com uma única consulta aos técnicos referenciados. O nome legado,
+        quando presente, tem precedência, como na interface.
+        """
+
+        referencias = {tarefa.get("tecnico_id") for tarefa in tarefas} - {None}
+        nomes = {}
+        if referencias:
+            nomes = {tecnico["_id"]: tecnico["nome"]
+                     for tecnico in self.tecnicos.find({"_id": {"$in": list(referencias)}}, {"nome": 1})}
+        for tarefa in tarefas:
+            tarefa["tecnico_nome"] = tarefa.pop("tecnico", None) or nomes.get(tarefa.get("tecnico_id"))
+        return tarefas
+
+    # Define o método 'listar_tarefas', tratador de GET /tarefas.
+    async def listar_tarefas(self, parametros, **_):
+
+        """
+        Este método retorna uma página de tarefas, em ordem de '_id', com os
+        filtros 'status', 'tecnico_id' ('nenhum' para as tarefas sem técnico),
+        'busca' (busca textual) e 'arquivo' (1 para consultar as tarefas
+        arquivadas). A paginação é feita pelo '_id' da última tarefa
+        retornada ('apos'), e não com 'skip', e a resposta traz em 'proxima'
+        o valor de 'apos' da página seguinte (ou null, na última página).
+        """
+
+        consulta = {}
+        if parametros.get("status"):
+            if parametros["status"] not in STATUS_TAREFA:
+                raise ErroApi(400, f"Status inválido: {parametros['status']!r}.")
+            consulta["status"] = parametros["status"]
+        if parametros.get("tecnico_id"):
+            chave = None if parametros["tecnico_id"] == "nenhum" else ler_id(parametros["tecnico_id"], "tecnico_id")
+            consulta.update(filtro_tecnico(chave))
+        if parametros.get("busca"):
+            consulta["$text"] = {"$search": parametros["busca"]}
+        if parametros.get("apos"):
+            consulta["_id"] = {"$gt": ler_id(parametros["apos"], "apos")}
+
+        try:
+            limite = int(parametros.get("limite") or self.tamanho_pagina)
+        except ValueError:
+            raise ErroApi(400, "O parâmetro 'limite' deve ser um número inteiro.")
+        limite = max(1, min(limite, self.tamanho_pagina_maximo))
+        colecao = self.arquivo if parametros.get("arquivo") in ("1", "true") else self.tarefas
+
+        # Uma tarefa a mais é lida para saber se há outra página.
+        def consultar():
+            tarefas = list(colecao.find(consulta).sort("_id", 1).limit(limite + 1))
+            return self.documentos_resposta(tarefas[:limite]), len(tarefas) > limite
+
+        tarefas, ha_mais = await self.chamar(consultar)
+        return 200, {"tarefas": tarefas, "proxima": str(tarefas[-1]["_id"]) if ha_mais else None}
+
+    # Define o método 'ler_tarefa', que lê uma tarefa ou responde 404.
+    def ler_tarefa(self, tarefa_id):
+        tarefa = self.tarefas.find_one({"_id": tarefa_id})
+        if tarefa is None:
+            raise ErroApi(404, "Tarefa não encontrada.")
+        return self.documentos_resposta([tarefa])[0]
+
+    # Define o método 'obter_tarefa', tratador de GET /tarefas/<id>.
+    async def obter_tarefa(self, tarefa_id, **_):
+        tarefa = await self.chamar(self.ler_tarefa, ObjectId(tarefa_id))
+        return 200, tarefa, {"ETag": etag_versao(tarefa)}
+
+    # Define o método 'incluir_tarefa', tratador de POST /tarefas.
+    async def incluir_tarefa(self, dados, **_):
+
+        def incluir():
+            campos = self.campos_tarefa(dados, True, self.resolver_tecnicos(tecnico_enviado(dados)))
+            tarefa = {"_id": ObjectId(), **campos}
+            self.tarefas.insert_one(tarefa)
+            return self.documentos_resposta([tarefa])[0]
+
+        tarefa = await self.chamar(incluir)
+        return 201, tarefa, {"ETag": etag_versao(tarefa), "Location": f"/tarefas/{tarefa['_id']}"}
+
+    # Define o método 'filtro_versao', que acrescenta a condição de 'If-Match' ao filtro.
+    def filtro_versao(self, tarefa_id, cabecalhos):
+
+        """
+        Este método retorna o filtro da tarefa e, se o cliente enviou
+        'If-Match', a versão esperada: a gravação só é aplicada se a tarefa
+        não tiver sido alterada por outra estação desde a leitura.
+        """
+
+        filtro = {"_id": tarefa_id}
+        etag = cabecalhos.get("if-match")
+        if etag and etag != "*":
+            filtro["atualizado_em"] = versao_etag(etag)
+        return filtro
+
+    # Define o método 'conferir_ausencia', chamado quando nenhuma tarefa foi afetada.
+    def conferir_ausencia(self, tarefa_id):
+        if self.tarefas.count_documents({"_id": tarefa_id}):
+            raise ErroApi(412, "A tarefa foi alterada por outra estação desde a leitura.")
+        raise ErroApi(404, "Tarefa não encontrada.")
+
+    # Define o método 'alterar_tarefa', tratador de PATCH /tarefas/<id>.
+    async def alterar_tarefa(self, tarefa_id, dados, cabecalhos, **_):
+        tarefa_id = ObjectId(tarefa_id)
+
+        def alterar():
+            campos = self.campos_tarefa(dados, False, self.resolver_tecnicos(tecnico_enviado(dados)))
+            resultado = self.tarefas.update_one(self.filtro_versao(tarefa_id, cabecalhos), {"$set": campos})
+            if not resultado.matched_count:
+                self.conferir_ausencia(tarefa_id)
+            return self.ler_tarefa(tarefa_id)
+
+        tarefa = await self.chamar(alterar)
+        return 200, tarefa, {"ETag": etag_versao(tarefa)}
+
+    # Define o método 'excluir_tarefa', tratador de DELETE /tarefas/<id>.
+    # A exclusão é concluída como na interface: com o registro da exclusão
+    # e a exclusão dos anexos.
+    async def excluir_tarefa(self, tarefa_id, cabecalhos, **_):
+        tarefa_id = ObjectId(tarefa_id)
+
+        def excluir():
+            if not excluir_tarefas(self.armazenamento, self.anexos, [self.filtro_versao(tarefa_id, cabecalhos)]):
+                self.conferir_ausencia(tarefa_id)
+
+        await self.chamar(excluir)
+        return 204, None
+
+    # Define o método 'incluir_tarefas', tratador de POST /tarefas/lote.
+    async def incluir_tarefas(self, dados, **_):
+
+        """
+        Este método inclui uma lista de tarefas com um único 'insert_many'
+        não ordenado. Tarefas inválidas não impedem a inclusão das demais: a
+        resposta traz, na ordem recebida, o '_id' de cada tarefa incluída ou
+        o erro de cada tarefa rejeitada.
+        """
+
+        if not isinstance(dados, list):
+            raise ErroApi(400, "O corpo deve ser uma lista de tarefas.")
+
+        def incluir():
+            resultados = [None] * len(dados)
+            nomes = {tarefa.get("tecnico") for tarefa in dados
+                     if isinstance(tarefa, dict) and isinstance(tarefa.get("tecnico"), str)}
+            cadastrados = {tecnico["nome"]: tecnico["_id"]
+                           for tecnico in self.tecnicos.find({"nome": {"$in": sorted(nomes)}})} if nomes else {}
+
+            documentos, posicoes = [], []
+            for posicao, tarefa in enumerate(dados):
+                try:
+                    tecnico = ler_tecnico(tarefa) if isinstance(tarefa, dict) else None
+                    if tecnico and tecnico not in cadastrados:
+                        raise ErroApi(422, f"O técnico '{tecnico}' não está cadastrado.")
+                    documentos.append({"_id": ObjectId(), **self.campos_tarefa(tarefa, True, cadastrados)})
+                    posicoes.append(posicao)
+                except ErroApi as erro:
+                    resultados[posicao] = {"erro": erro.mensagem}
+
+            erros = {}
+            if documentos:
+                try:
+                    self.tarefas.insert_many(documentos, ordered=False)
+                except BulkWriteError as erro:
+                    erros = {falha["index"]: falha["errmsg"] for falha in erro.details["writeErrors"]}
+            for indice, (posicao, documento) in enumerate(zip(posicoes, documentos)):
+                resultados[posicao] = {"erro": erros[indice]} if indice in erros else {"_id": documento["_id"]}
+            return resultados
+
+        resultados = await self.chamar(incluir)
+        incluidas = sum("_id" in resultado for resultado in resultados)
+        return (201 if incluidas == len(resultados) else 207 if incluidas else 422), {"resultados": resultados}
+
+    # Define o método 'alterar_tarefas', tratador de PATCH /tarefas/lote.
+    async def alterar_tarefas(self, dados, **_):
+
+        """
+        Este método altera uma lista de tarefas, cada uma com o seu '_id' e
+        os campos a alterar, em um único 'bulk_write' não ordenado. O campo
+        opcional 'versao' (o ETag lido) tem o mesmo efeito de 'If-Match'.
+        A resposta traz as quantidades de tarefas encontradas e alteradas.
+        """
+
+        if not isinstance(dados, list):
+            raise ErroApi(400, "O corpo deve ser uma lista de alterações.")
+
+        def alterar():
+            ids = self.resolver_tecnicos([nome for alteracao in dados for nome in tecnico_enviado(alteracao)])
+            requisicoes = []
+            for alteracao in dados:
+                if not isinstance(alteracao, dict) or "_id" not in alteracao:
+                    raise ErroApi(400, "Cada alteração deve ser um objeto com o campo '_id'.")
+                alteracao = dict(alteracao)
+                versao = alteracao.pop("versao", None)
+                filtro = self.filtro_versao(ler_id(alteracao.pop("_id")), {"if-match": versao} if versao else {})
+                requisicoes.append(UpdateOne(filtro, {"$set": self.campos_tarefa(alteracao, False, ids)}))
+            if not requisicoes:
+                return {"encontradas": 0, "alteradas": 0}
+            resultado = self.tarefas.bulk_write(requisicoes, ordered=False)
+            return {"encontradas": resultado.matched_count, "alteradas": resultado.modified_count}
+
+        return 200, await self.chamar(alterar)
+
+    # Define o método 'excluir_tarefas', tratador de POST /tarefas/lote/excluir.
+    async def excluir_tarefas(self, dados, **_):
+
+        """
+        Este método exclui as tarefas cujos '_id' estão em {"ids": [...]}
+        com um único 'bulk_write' e conclui a exclusão como a interface
+        (registros de exclusão e anexos), com 'excluir_tarefas'.
+        """
+
+        if not isinstance(dados, dict) or not isinstance(dados.get("ids"), list):
+            raise ErroApi(400, "O corpo deve ser um objeto com a lista 'ids'.")
+        ids = [ler_id(identificador, "ids") for identificador in dados["ids"]]
+
+        def excluir():
+            return len(excluir_tarefas(self.armazenamento, self.anexos, [{"_id": tarefa_id} for tarefa_id in ids]))
+
+        return 200, {"excluidas": await self.chamar(excluir)}
+
+    # Define o método 'listar_tecnicos', tratador de GET /tecnicos.
+    async def listar_tecnicos(self, **_):
+        tecnicos = await self.chamar(lambda: list(self.tecnicos.find({}).sort("nome", 1)))
+        return 200, {"tecnicos": tecnicos}
+
+    # Define o método 'contar_tarefas', tratador de GET /tecnicos/contagens.
+    async def contar_tarefas(self, **_):
+
+        """
+        Este método retorna a quantidade de tarefas de cada técnico em cada
+        status, com a mesma agregação da janela "Filas por Técnico".
+        """
+
+        contagens = await self.chamar(lambda: list(self.armazenamento.contar_tarefas_por_tecnico()))
+        return 200, {"contagens": contagens}
+
+    # Define o método 'ler_nome_tecnico', que valida o nome enviado.
+    def ler_nome_tecnico(self, dados):
+        if not isinstance(dados, dict):
+            raise ErroApi(400, "O corpo deve ser um objeto com o campo 'nome'.")
+        nome = dados.get("nome")
+        if not isinstance(nome, str) or not nome.strip():
+            raise ErroApi(422, "Informe o nome do técnico.")
+        return nome.strip()
+
+    # Define o método 'incluir_tecnico', tratador de POST /tecnicos.
+    async def incluir_tecnico(self, dados, **_):
+        tecnico = {"_id": ObjectId(), "nome": self.ler_nome_tecnico(dados), "atualizado_em": agora_utc()}
+        try:
+            await self.chamar(self.tecnicos.insert_one, tecnico)
+        except DuplicateKeyError:
+            raise ErroApi(409, "Já existe um técnico com este nome.")
+        return 201, tecnico, {"ETag": etag_versao(tecnico), "Location": f"/tecnicos/{tecnico['_id']}"}
+
+    # Define o método 'renomear_tecnico', tratador de PATCH /tecnicos/<id>.
+    async def renomear_tecnico(self, tecnico_id, dados, **_):
+
+        """
+        Este método grava o novo nome e a versão do técnico, usada pelas
+        estações para perceber a alteração. As tarefas guardam apenas a
+        referência ao técnico e não precisam ser alteradas.
+        """
+
+        tecnico_id = ObjectId(tecnico_id)
+        campos = {"nome": self.ler_nome_tecnico(dados), "atualizado_em": agora_utc()}
+        try:
+            resultado = await self.chamar(self.tecnicos.update_one, {"_id": tecnico_id}, {"$set": campos})
+        except DuplicateKeyError:
+            raise ErroApi(409, "Já existe um técnico com este nome.")
+        if not resultado.matched_count:
+            raise ErroApi(404, "Técnico não encontrado.")
+        tecnico = {"_id": tecnico_id, **campos}
+        return 200, tecnico, {"ETag": etag_versao(tecnico)}
+
+    # Define o método 'fechar', chamado ao encerrar o serviço.
+    def fechar(self):
+        self.executor.shutdown(wait=True)
+        self.armazenamento.fechar()
+
+
+# Define a função 'servir', que prepara o armazenamento e atende as conexões.
+async def servir(armazenamento, configuracao, endereco, porta):
+
+    """
+    Esta corrotina garante os índices, migra os técnicos legados (como a
+    interface, ao conectar) e atende as requisições até ser cancelada.
+    """
+
+    servico = ServicoApi(armazenamento, configuracao)
+    try:
+        await servico.chamar(conectar, armazenamento)
+        servidor = await asyncio.start_server(servico.atender, endereco, porta)
+        print(f"Serviço de tarefas em http://{endereco}:{porta}/", flush=True)
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servico.fechar()
+
+
+# Executa o serviço apenas quando o arquivo é executado diretamente.
+if __name__ == "__main__":
+
+    leitor_argumentos = argparse.ArgumentParser(description="Serviço HTTP do Gerenciador de Tarefas")
+    leitor_argumentos.add_argument("--config", help="caminho do arquivo de configuração")
+    leitor_argumentos.add_argument("--armazenamento", choices=["mongodb", "sqlite"],
+                                   help="armazenamento das tarefas")
+    leitor_argumentos.add_argument("--memoria", action="store_true",
+                                   help="usa um banco SQLite em memória, sem servidor (para testes)")
+    leitor_argumentos.add_argument("--endereco", help="endereço em que o serviço atende")
+    leitor_argumentos.add_argument("--porta", type=int, help="porta em que o serviço atende")
+    argumentos = leitor_argumentos.parse_args()
+
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    configuracao = carregar_configuracao(argumentos.config)
+    if argumentos.armazenamento:
+        configuracao["armazenamento"]["tipo"] = argumentos.armazenamento
+    armazenamento = ArmazenamentoSQLite(":memory:") if argumentos.memoria else criar_armazenamento(configuracao)
+
+    try:
+        asyncio.run(servir(armazenamento, configuracao, argumentos.endereco or configuracao["api"]["endereco"],
+                           argumentos.porta or int(configuracao["api"]["porta"])))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,372 @@
+# Módulo do teste de carga do Gerenciador de Tarefas.
+# Simula vários atendentes usando o mesmo banco de dados ao mesmo tempo (por
+# exemplo, na troca de turno). Cada usuário simulado roda em uma thread de um
+# pool e repete, com pausas aleatórias, uma mistura configurável das
+# operações que a interface envia ao banco:
+# - 'adicionar' (adicionar_tarefa): insert_one e o recarregamento da lista;
+# - 'atualizar' (atualizar_tarefa): update_one e o recarregamento da lista;
+# - 'excluir' (excluir_tarefa): delete_one, o registro da exclusão e o
+#   recarregamento da lista;
+# - 'selecionar' (ao_selecionar_tarefa): find_one pelo '_id';
+# - 'filtrar' (aplicar_filtro): a consulta da lista com status e busca textual.
+# A cada intervalo, e ao final, são exibidas a vazão (operações por segundo)
+# e as latências p50, p95 e p99 de cada operação.
+#
+# Uso: python teste_carga.py --usuarios 200 --duracao 120
+#      python teste_carga.py --mistura adicionar=10,atualizar=20,excluir=5,selecionar=40,filtrar=25
+# O teste grava no banco '[mongodb] banco' com o sufixo '_carga' (ou no
+# arquivo SQLite 'carga.sqlite3'), e não no banco usado pela aplicação.
+
+# Importa o argparse, usado para ler as opções de linha de comando.
+import argparse
+
+# Importa o csv, formato do arquivo opcional com as medições de cada intervalo.
+import csv
+
+# Importa o random, que sorteia as operações, as tarefas e as pausas.
+import random
+
+# Importa o threading, que protege as medições compartilhadas pelos usuários.
+import threading
+
+# Importa o time, que mede as latências e controla a duração do teste.
+import time
+
+# Importa as classes de data.
+from datetime import datetime
+
+# Importa o executor de threads que executa os usuários simulados.
+from concurrent.futures import ThreadPoolExecutor
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa as funções de configuração da aplicação.
+from configuracao import carregar_configuracao
+
+# Importa a criação do armazenamento e a preparação do banco.
+from armazenamento import criar_armazenamento, conectar
+
+# Importa o registro das exclusões, gravado pela interface a cada exclusão.
+from instantaneo import registrar_exclusoes
+
+# Importa a função que fornece o instante atual usado como versão dos documentos.
+from utilitarios import agora_utc
+
+
+# Operações simuladas e a mistura padrão (pesos relativos).
+OPERACOES = ("adicionar", "atualizar", "excluir", "selecionar", "filtrar")
+MISTURA_PADRAO = "adicionar=10,atualizar=20,excluir=5,selecionar=40,filtrar=25"
+
+# Palavras usadas nos títulos e descrições das tarefas geradas e nas buscas.
+PALAVRAS = ("instalação", "manutenção", "rede", "impressora", "servidor", "backup", "cabo", "senha",
+            "monitor", "teclado", "licença", "atualização", "acesso", "telefone", "câmera", "roteador")
+
+# Percentis exibidos no relatório.
+PERCENTIS = (50, 95, 99)
+
+
+# Define a função 'ler_mistura', que converte o texto da opção '--mistura' em pesos.
+def ler_mistura(texto):
+
+    """
+    Esta função recebe um texto como 'adicionar=10,filtrar=5' e retorna a
+    tupla (operações, pesos). Operações não informadas não são executadas.
+    """
+
+    operacoes, pesos = [], []
+    for item in texto.split(","):
+        nome, _, peso = item.partition("=")
+        nome = nome.strip()
+        if nome not in OPERACOES:
+            raise argparse.ArgumentTypeError(f"Operação desconhecida: {nome!r}")
+        operacoes.append(nome)
+        pesos.append(float(peso or 1))
+    return operacoes, pesos
+
+
+# Define a função 'percentil', que calcula um percentil pelo método do posto mais próximo.
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    posicao = max(0, -(-len(valores_ordenados) * p // 100) - 1)
+    return valores_ordenados[int(posicao)]
+
+
+# Define a função 'nova_tarefa', que gera uma tarefa como o formulário da interface.
+def nova_tarefa(sorteio, tecnicos):
+    return {
+        "_id": ObjectId(),
+        "titulo": " ".join(sorteio.sample(PALAVRAS, 3)).capitalize(),
+        "descricao": " ".join(sorteio.choices(PALAVRAS, k=12)),
+        "status": sorteio.choice(("Pendente", "Concluída")),
+        "data_criacao": datetime.now().strftime("%d/%m/%Y"),
+        "tecnico_id": sorteio.choice(tecnicos) if tecnicos else None,
+        "atualizado_em": agora_utc(),
+    }
+
+
+# Define a classe 'Medicoes', que acumula as latências de cada intervalo.
+class Medicoes:
+
+    """
+    Esta classe guarda as latências (em milissegundos) e a quantidade de
+    erros de cada operação, separadas por intervalo de 'intervalo' segundos
+    desde o início do teste. É compartilhada por todos os usuários simulados.
+    """
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self.inicio = time.perf_counter()
+        self.trava = threading.Lock()
+        self.latencias = {}
+        self.erros = {}
+
+    # Define o método 'registrar', chamado ao fim de cada operação.
+    def registrar(self, operacao, inicio, fim, erro=False):
+        indice = int((inicio - self.inicio) // self.intervalo)
+        with self.trava:
+            if erro:
+                self.erros[(indice, operacao)] = self.erros.get((indice, operacao), 0) + 1
+            else:
+                self.latencias.setdefault((indice, operacao), []).append((fim - inicio) * 1000)
+
+    # Define o método 'resumir', que calcula as estatísticas de um conjunto de intervalos.
+    def resumir(self, indices, segundos):
+
+        """
+        Este método retorna, para cada operação, o dicionário com a vazão
+        (operações concluídas por segundo), os percentis de latência e a
+        quantidade de erros nos intervalos informados.
+        """
+
+        with self.trava:
+            linhas = {}
+            for operacao in OPERACOES:
+                latencias = sorted(latencia for indice in indices
+                                   for latencia in self.latencias.get((indice, operacao), ()))
+                erros = sum(self.erros.get((indice, operacao), 0) for indice in indices)
+                if not latencias and not erros:
+                    continue
+                linhas[operacao] = {"quantidade": len(latencias), "vazao": len(latencias) / segundos,
+                                    "erros": erros,
+                                    **{f"p{p}": percentil(latencias, p) for p in PERCENTIS}}
+            return linhas
+
+
+# Define a classe 'UsuarioSimulado', que repete as operações de um atendente.
+class UsuarioSimulado:
+
+    """
+    Esta classe representa um atendente com a sua janela aberta: o filtro
+    exibido e os '_id' das tarefas da sua lista. As
+    tarefas alteradas e excluídas são sorteadas da própria lista, como
+    acontece na interface, e cada gravação é seguida do recarregamento da
+    lista com o filtro atual.
+    """
+
+    def __init__(self, armazenamento, teste, semente):
+        self.armazenamento = armazenamento
+        self.teste = teste
+        self.sorteio = random.Random(semente)
+        self.tarefas = armazenamento.colecao("tarefas")
+        self.consulta = {}
+        self.ids = []
+
+    # Define o método 'recarregar', a consulta da lista feita pela interface.
+    def recarregar(self):
+        self.ids = [tarefa["_id"] for tarefa in self.tarefas.find(self.consulta)]
+
+    def adicionar(self):
+        self.tarefas.insert_one(nova_tarefa(self.sorteio, self.teste.tecnicos))
+        self.recarregar()
+
+    def atualizar(self):
+        if not self.ids:
+            return self.recarregar()
+        tarefa_id = self.sorteio.choice(self.ids)
+        self.tarefas.update_one({"_id": tarefa_id}, {"$set": {
+            "descricao": " ".join(self.sorteio.choices(PALAVRAS, k=12)),
+            "status": self.sorteio.choice(("Pendente", "Concluída")),
+            "tecnico_id": self.sorteio.choice(self.teste.tecnicos) if self.teste.tecnicos else None,
+            "tecnico": None,
+            "atualizado_em": agora_utc(),
+        }})
+        self.recarregar()
+
+    def excluir(self):
+        if not self.ids:
+            return self.recarregar()
+        tarefa_id = self.ids.pop(self.sorteio.randrange(len(self.ids)))
+        self.tarefas.delete_one({"_id": tarefa_id})
+        registrar_exclusoes(self.armazenamento, [tarefa_id])
+        self.recarregar()
+
+    def selecionar(self):
+        if self.ids:
+            self.tarefas.find_one({"_id": self.sorteio.choice(self.ids)})
+
+    def filtrar(self):
+        consulta = {}
+        status = self.sorteio.choice(("Todos", "Pendente", "Concluída"))
+        if status != "Todos":
+            consulta["status"] = status
+        if self.sorteio.random() < self.teste.fracao_busca:
+            consulta["$text"] = {"$search": self.sorteio.choice(PALAVRAS)}
+        self.consulta = consulta
+        self.recarregar()
+
+    # Define o método 'executar', o laço do usuário simulado.
+    def executar(self):
+        medicoes = self.teste.medicoes
+        self.recarregar()
+        while time.perf_counter() < self.teste.fim:
+            operacao = self.sorteio.choices(self.teste.operacoes, self.teste.pesos)[0]
+            inicio = time.perf_counter()
+            try:
+                getattr(self, operacao)()
+            except Exception:
+                medicoes.registrar(operacao, inicio, time.perf_counter(), erro=True)
+            else:
+                medicoes.registrar(operacao, inicio, time.perf_counter())
+
+            # Pausa do atendente entre duas ações, com distribuição exponencial.
+            restante = self.teste.fim - time.perf_counter()
+            if self.teste.pausa > 0 and restante > 0:
+                time.sleep(min(self.sorteio.expovariate(1 / self.teste.pausa), restante))
+
+
+# Define a classe 'TesteCarga', que prepara o banco e coordena os usuários simulados.
+class TesteCarga:
+
+    """
+    Esta classe cria os usuários simulados e exibe as medições. Cada usuário
+    recebe o seu próprio armazenamento (e, no MongoDB, o seu próprio pool de
+    conexões), como as estações reais; com 'compartilhar', todos usam um
+    único armazenamento.
+    """
+
+    def __init__(self, configuracao, argumentos):
+        self.configuracao = configuracao
+        self.argumentos = argumentos
+        self.operacoes, self.pesos = argumentos.mistura
+        self.pausa = argumentos.pausa_ms / 1000
+        self.fracao_busca = argumentos.fracao_busca
+        self.medicoes = None
+        self.tecnicos = []
+        self.fim = 0
+
+    # Define o método 'preparar', que garante os índices e as tarefas iniciais.
+    def preparar(self, armazenamento):
+
+        """
+        Este método cria os índices, cadastra técnicos de teste e completa a
+        coleção de tarefas até 'tarefas_iniciais', em lotes de 'insert_many'.
+        """
+
+        conectar(armazenamento)
+        tecnicos = armazenamento.colecao("tecnicos")
+        for numero in range(self.argumentos.tecnicos):
+            tecnicos.update_one({"nome": f"Técnico de carga {numero + 1}"},
+                                {"$setOnInsert": {"atualizado_em": agora_utc()}}, upsert=True)
+        self.tecnicos = [tecnico["_id"] for tecnico in tecnicos.find({"nome": {"$regex": "^Técnico de carga "}})]
+
+        tarefas = armazenamento.colecao("tarefas")
+        faltam = self.argumentos.tarefas_iniciais - tarefas.count_documents({})
+        sorteio = random.Random(0)
+        while faltam > 0:
+            lote = [nova_tarefa(sorteio, self.tecnicos) for _ in range(min(faltam, 1000))]
+            tarefas.insert_many(lote, ordered=False)
+            faltam -= len(lote)
+
+    # Define o método 'exibir', que imprime as estatísticas de um período.
+    def exibir(self, titulo, linhas, arquivo_csv=None):
+        print(titulo)
+        print(f"  {'operação':<11}{'ops':>8}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erros':>7}")
+        for operacao, linha in linhas.items():
+            print(f"  {operacao:<11}{linha['quantidade']:>8}{linha['vazao']:>9.1f}{linha['p50']:>9.1f}"
+                  f"{linha['p95']:>9.1f}{linha['p99']:>9.1f}{linha['erros']:>7}")
+            if arquivo_csv:
+                arquivo_csv.writerow([titulo, operacao, linha["quantidade"], f"{linha['vazao']:.2f}",
+                                      *(f"{linha[f'p{p}']:.2f}" for p in PERCENTIS), linha["erros"]])
+        print(flush=True)
+
+    # Define o método 'executar', que roda o teste e exibe as medições.
+    def executar(self):
+        argumentos = self.argumentos
+        principal = criar_armazenamento(self.configuracao)
+        self.preparar(principal)
+
+        armazenamentos = [principal if argumentos.compartilhar else criar_armazenamento(self.configuracao)
+                          for _ in range(argumentos.usuarios)]
+        usuarios = [UsuarioSimulado(armazenamento, self, semente)
+                    for semente, armazenamento in enumerate(armazenamentos, start=1)]
+
+        saida = open(argumentos.saida, "w", encoding="utf-8", newline="") if argumentos.saida else None
+        arquivo_csv = csv.writer(saida) if saida else None
+        if arquivo_csv:
+            arquivo_csv.writerow(["periodo", "operacao", "quantidade", "vazao", *(f"p{p}" for p in PERCENTIS),
+                                  "erros"])
+
+        print(f"{argumentos.usuarios} usuários, {argumentos.duracao} s, mistura: "
+              + ", ".join(f"{operacao}={peso:g}" for operacao, peso in zip(self.operacoes, self.pesos)), flush=True)
+        self.medicoes = Medicoes(argumentos.intervalo)
+        self.fim = self.medicoes.inicio + argumentos.duracao
+        try:
+            with ThreadPoolExecutor(max_workers=argumentos.usuarios, thread_name_prefix="usuario") as executor:
+                futuros = [executor.submit(usuario.executar) for usuario in usuarios]
+
+                # Exibe cada intervalo assim que ele termina.
+                intervalos = int(-(-argumentos.duracao // argumentos.intervalo))
+                for indice in range(intervalos):
+                    fim_intervalo = self.medicoes.inicio + (indice + 1) * argumentos.intervalo
+                    time.sleep(max(0, fim_intervalo - time.perf_counter()))
+                    segundos = min(argumentos.intervalo, argumentos.duracao - indice * argumentos.intervalo)
+                    self.exibir(f"{indice * argumentos.intervalo:g}-{indice * argumentos.intervalo + segundos:g} s",
+                                self.medicoes.resumir([indice], segundos), arquivo_csv)
+                for futuro in futuros:
+                    futuro.result()
+
+            self.exibir("Total", self.medicoes.resumir(range(intervalos + 1), argumentos.duracao), arquivo_csv)
+        finally:
+            if saida:
+                saida.close()
+            for armazenamento in {id(armazenamento): armazenamento for armazenamento in armazenamentos}.values():
+                if armazenamento is not principal:
+                    armazenamento.fechar()
+            principal.fechar()
+
+
+# Executa o teste apenas quando o arquivo é executado diretamente.
+if __name__ == "__main__":
+
+    leitor_argumentos = argparse.ArgumentParser(description="Teste de carga do Gerenciador de Tarefas")
+    leitor_argumentos.add_argument("--config", help="caminho do arquivo de configuração")
+    leitor_argumentos.add_argument("--armazenamento", choices=["mongodb", "sqlite"],
+                                   help="armazenamento das tarefas")
+    leitor_argumentos.add_argument("--banco", help="banco MongoDB (ou arquivo SQLite) usado no teste")
+    leitor_argumentos.add_argument("--usuarios", type=int, default=50, help="quantidade de usuários simulados")
+    leitor_argumentos.add_argument("--duracao", type=float, default=60, help="duração do teste, em segundos")
+    leitor_argumentos.add_argument("--intervalo", type=float, default=10,
+                                   help="intervalo entre os relatórios parciais, em segundos")
+    leitor_argumentos.add_argument("--mistura", type=ler_mistura, default=ler_mistura(MISTURA_PADRAO),
+                                   help=f"pesos das operações (padrão: {MISTURA_PADRAO})")
+    leitor_argumentos.add_argument("--pausa-ms", type=float, default=500,
+                                   help="pausa média de cada usuário entre duas operações, em milissegundos")
+    leitor_argumentos.add_argument("--fracao-busca", type=float, default=0.3,
+                                   help="fração dos filtros que incluem uma busca textual")
+    leitor_argumentos.add_argument("--tarefas-iniciais", type=int, default=5000,
+                                   help="quantidade mínima de tarefas no banco antes do teste")
+    leitor_argumentos.add_argument("--tecnicos", type=int, default=20, help="quantidade de técnicos de teste")
+    leitor_argumentos.add_argument("--compartilhar", action="store_true",
+                                   help="usa um único armazenamento (um único pool) para todos os usuários")
+    leitor_argumentos.add_argument("--saida", help="arquivo CSV com as medições de cada intervalo")
+    argumentos = leitor_argumentos.parse_args()
+
+    configuracao = carregar_configuracao(argumentos.config)
+    if argumentos.armazenamento:
+        configuracao["armazenamento"]["tipo"] = argumentos.armazenamento
+    configuracao["mongodb"]["banco"] = argumentos.banco or configuracao["mongodb"]["banco"] + "_carga"
+    configuracao["armazenamento"]["arquivo_sqlite"] = argumentos.banco or "carga.sqlite3"
+
+    TesteCarga(configuracao, argumentos).executar()
@@ -0,0 +1,272 @@
+# Módulo do teste de desempenho da interface do Gerenciador de Tarefas.
+# Abre a janela da aplicação (GerenciadorTarefasApp) em um display virtual
+# (Xvfb), sem monitor, e mede o custo dos widgets, separado do custo das
+# consultas: as tarefas são geradas em memória e entregues diretamente a
+# 'exibir_tarefas', o mesmo método que recebe o resultado das consultas. Para
+# cada quantidade de linhas são medidos:
+# - a carga da lista vazia e a recarga de uma lista já preenchida (que
+#   também remove as linhas anteriores), em linhas por segundo;
+# - a latência entre a seleção de uma linha e o preenchimento do formulário
+#   por 'ao_selecionar_tarefa';
+# - a duração dos quadros ao rolar a lista do início ao fim, e a quantidade
+#   de quadros que passam do limite (travamentos).
+#
+# Uso: python teste_interface.py --linhas 1000,10000,100000
+# Sem a variável DISPLAY (ou com '--xvfb'), um Xvfb é iniciado e encerrado
+# pelo próprio teste.
+
+# Importa o argparse, usado para ler as opções de linha de comando.
+import argparse
+
+# Importa o csv, formato do arquivo opcional com as medições.
+import csv
+
+# Importa o módulo os, que define a variável DISPLAY.
+import os
+
+# Importa o random, que sorteia as linhas selecionadas.
+import random
+
+# Importa o shutil, que localiza o executável do Xvfb.
+import shutil
+
+# Importa o subprocess, que executa o Xvfb.
+import subprocess
+
+# Importa o tempfile, que cria o diretório local usado pela aplicação no teste.
+import tempfile
+
+# Importa o time, que mede as durações.
+import time
+
+# Importa o tkinter, que cria a janela principal.
+import tkinter as tk
+
+# Importa as funções de configuração da aplicação.
+from configuracao import carregar_configuracao
+
+# Importa o armazenamento SQLite, que guarda os técnicos usados no teste.
+from armazenamento_sqlite import ArmazenamentoSQLite
+
+# Importa a geração de tarefas e o cálculo dos percentis do teste de carga.
+from teste_carga import nova_tarefa, percentil
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa a janela da aplicação.
+from GerenciadorDeTarefas import GerenciadorTarefasApp
+
+
+# Quantidade de técnicos cadastrados no banco do teste.
+QUANTIDADE_TECNICOS = 20
+
+# Tempo máximo de espera pela primeira carga da aplicação, em segundos.
+ESPERA_MAXIMA = 30
+
+
+# Define a função 'iniciar_xvfb', que abre um display virtual.
+def iniciar_xvfb(resolucao):
+
+    """
+    Esta função inicia o Xvfb em um display livre (escolhido pelo próprio
+    Xvfb, com '-displayfd'), define a variável DISPLAY e retorna o processo,
+    que deve ser encerrado ao final do teste.
+    """
+
+    executavel = shutil.which("Xvfb")
+    if executavel is None:
+        raise SystemExit("O Xvfb não está instalado (pacote 'xvfb'), e não há um display (DISPLAY) disponível.")
+    leitura, escrita = os.pipe()
+    processo = subprocess.Popen([executavel, "-displayfd", str(escrita), "-screen", "0", resolucao + "x24",
+                                 "-nolisten", "tcp"], pass_fds=(escrita,), stderr=subprocess.DEVNULL)
+    os.close(escrita)
+    with os.fdopen(leitura) as arquivo:
+        numero = arquivo.readline().strip()
+    if not numero:
+        processo.terminate()
+        raise SystemExit("O Xvfb não informou o número do display.")
+    os.environ["DISPLAY"] = ":" + numero
+    return processo
+
+
+# Define a função 'configuracao_teste', que isola a aplicação em um diretório temporário.
+def configuracao_teste(caminho, diretorio):
+
+    """
+    Esta função retorna a configuração usada no teste: o armazenamento SQLite
+    e os arquivos locais no diretório temporário, sem instantâneo, cache de
+    relatórios ou arquivamento, para que nada interfira nas medições nem nos
+    dados da instalação.
+    """
+
+    configuracao = carregar_configuracao(caminho)
+    configuracao["armazenamento"].update(tipo="sqlite", arquivo_sqlite="teste_interface.sqlite3")
+    configuracao["local"]["diretorio"] = diretorio
+    configuracao["instantaneo"]["arquivo"] = ""
+    configuracao["relatorios"]["diretorio_cache"] = ""
+    configuracao["arquivo"]["idade_dias"] = "0"
+    return configuracao
+
+
+# Define a classe 'TesteInterface', que executa as medições sobre a janela aberta.
+class TesteInterface:
+
+    """
+    Esta classe abre a aplicação, aguarda a primeira carga (da lista vazia)
+    e mede, para cada quantidade de linhas, a carga, a recarga, a seleção e
+    a rolagem. Cada etapa termina com 'update', que processa os eventos e
+    redesenha a janela, como o laço principal do tkinter faria.
+    """
+
+    def __init__(self, configuracao, argumentos):
+        self.argumentos = argumentos
+        self.sorteio = random.Random(0)
+
+        armazenamento = ArmazenamentoSQLite(os.path.join(configuracao["local"]["diretorio"],
+                                                         configuracao["armazenamento"]["arquivo_sqlite"]))
+        tecnicos = [{"_id": ObjectId(), "nome": f"Técnico {numero + 1}"} for numero in range(QUANTIDADE_TECNICOS)]
+        armazenamento.colecao("tecnicos").insert_many(tecnicos)
+        armazenamento.fechar()
+        self.tecnicos = [tecnico["_id"] for tecnico in tecnicos]
+
+        self.janela = tk.Tk()
+        self.app = GerenciadorTarefasApp(self.janela, configuracao)
+        self.aguardar_carga()
+
+    # Define o método 'aguardar_carga', que processa os eventos até a primeira carga.
+    def aguardar_carga(self):
+        limite = time.perf_counter() + ESPERA_MAXIMA
+        while not (self.app.conectado and self.app.diretorio_tecnicos.carregado
+                   and self.app.marca_carregamento is not None):
+            if time.perf_counter() > limite:
+                raise SystemExit("A aplicação não concluiu a primeira carga.")
+            self.janela.update()
+            time.sleep(0.01)
+
+    # Define o método 'exibir', que mede a exibição de uma lista de tarefas.
+    def exibir(self, tarefas):
+        inicio = time.perf_counter()
+        self.app.exibir_tarefas(self.app.marca_carregamento, tarefas, set())
+        self.janela.update()
+        return time.perf_counter() - inicio
+
+    # Define o método 'medir_selecao', que mede a seleção de linhas sorteadas.
+    def medir_selecao(self, tarefas):
+
+        """
+        Este método seleciona linhas sorteadas, como um clique do usuário, e
+        retorna as latências (em milissegundos) até o formulário exibir o
+        título da tarefa selecionada. A seleção dispara '<<TreeviewSelect>>',
+        tratado por 'ao_selecionar_tarefa', que lê a tarefa na camada de dados
+        e preenche o formulário quando o resultado volta pela fila da
+        interface; por isso os eventos são processados até o título aparecer.
+        """
+
+        arvore = self.app.arvore_tarefas
+        latencias = []
+        for tarefa in self.sorteio.sample(tarefas, min(self.argumentos.selecoes, len(tarefas))):
+            iid = str(tarefa["_id"])
+            inicio = time.perf_counter()
+            limite = inicio + ESPERA_MAXIMA
+            arvore.selection_set(iid)
+            self.janela.update()
+            while self.app.entrada_titulo.get() != tarefa["titulo"]:
+                if time.perf_counter() > limite:
+                    raise RuntimeError(f"O formulário não exibiu a tarefa selecionada ({iid}).")
+                self.janela.update()
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        arvore.selection_remove(arvore.selection())
+        self.janela.update()
+        return sorted(latencias)
+
+    # Define o método 'medir_rolagem', que mede os quadros ao rolar a lista.
+    def medir_rolagem(self):
+
+        """
+        Este método rola a lista do início ao fim em 'quadros' posições
+        igualmente espaçadas, como ao arrastar a barra de rolagem, e retorna
+        as durações dos quadros (em milissegundos), cada uma medida do
+        movimento até o fim do redesenho.
+        """
+
+        arvore = self.app.arvore_tarefas
+        arvore.yview_moveto(0)
+        self.janela.update()
+        quadros = []
+        for posicao in range(1, self.argumentos.quadros + 1):
+            inicio = time.perf_counter()
+            arvore.yview_moveto(posicao / self.argumentos.quadros)
+            self.janela.update()
+            quadros.append((time.perf_counter() - inicio) * 1000)
+        return sorted(quadros)
+
+    # Define o método 'medir', que executa todas as medições de uma quantidade de linhas.
+    def medir(self, quantidade):
+        tarefas = [nova_tarefa(self.sorteio, self.tecnicos) for _ in range(quantidade)]
+        self.exibir([])
+        carga = self.exibir(tarefas)
+
+        # A recarga usa novos '_id', para que todas as linhas sejam trocadas.
+        tarefas = [dict(tarefa, _id=ObjectId()) for tarefa in tarefas]
+        recarga = self.exibir(tarefas)
+        selecao = self.medir_selecao(tarefas)
+        quadros = self.medir_rolagem()
+        return {
+            "linhas": quantidade,
+            "carga_linhas_s": quantidade / carga,
+            "recarga_linhas_s": quantidade / recarga,
+            **{f"selecao_p{p}_ms": percentil(selecao, p) for p in (50, 95, 99)},
+            **{f"quadro_p{p}_ms": percentil(quadros, p) for p in (50, 95, 99)},
+            "quadro_max_ms": quadros[-1] if quadros else 0.0,
+            "travamentos": sum(quadro > self.argumentos.limite_quadro_ms for quadro in quadros),
+        }
+
+    # Define o método 'fechar', que fecha a janela como o usuário faria.
+    def fechar(self):
+        self.app.ao_fechar()
+
+
+# Executa o teste apenas quando o arquivo é executado diretamente.
+if __name__ == "__main__":
+
+    leitor_argumentos = argparse.ArgumentParser(description="Teste de desempenho da interface do Gerenciador de Tarefas")
+    leitor_argumentos.add_argument("--config", help="caminho do arquivo de configuração")
+    leitor_argumentos.add_argument("--linhas", default="1000,10000,100000",
+                                   help="quantidades de linhas medidas, separadas por vírgula")
+    leitor_argumentos.add_argument("--selecoes", type=int, default=200, help="linhas selecionadas em cada medição")
+    leitor_argumentos.add_argument("--quadros", type=int, default=300, help="quadros da rolagem em cada medição")
+    leitor_argumentos.add_argument("--limite-quadro-ms", type=float, default=50,
+                                   help="duração a partir da qual um quadro conta como travamento")
+    leitor_argumentos.add_argument("--xvfb", action="store_true", help="usa um Xvfb mesmo se houver um display")
+    leitor_argumentos.add_argument("--resolucao", default="1280x1024", help="resolução do Xvfb")
+    leitor_argumentos.add_argument("--saida", help="arquivo CSV com as medições")
+    argumentos = leitor_argumentos.parse_args()
+
+    xvfb = iniciar_xvfb(argumentos.resolucao) if argumentos.xvfb or not os.environ.get("DISPLAY") else None
+    try:
+        with tempfile.TemporaryDirectory() as diretorio:
+            teste = TesteInterface(configuracao_teste(argumentos.config, diretorio), argumentos)
+            resultados = []
+            try:
+                for quantidade in (int(valor) for valor in argumentos.linhas.split(",")):
+                    resultado = teste.medir(quantidade)
+                    resultados.append(resultado)
+                    print(f"{quantidade} linhas: carga {resultado['carga_linhas_s']:.0f} linhas/s, "
+                          f"recarga {resultado['recarga_linhas_s']:.0f} linhas/s, "
+                          f"seleção p50/p95/p99 {resultado['selecao_p50_ms']:.1f}/{resultado['selecao_p95_ms']:.1f}/"
+                          f"{resultado['selecao_p99_ms']:.1f} ms, "
+                          f"quadros p50/p95/máx {resultado['quadro_p50_ms']:.1f}/{resultado['quadro_p95_ms']:.1f}/"
+                          f"{resultado['quadro_max_ms']:.1f} ms, {resultado['travamentos']} travamentos", flush=True)
+            finally:
+                teste.fechar()
+
+        if argumentos.saida and resultados:
+            with open(argumentos.saida, "w", encoding="utf-8", newline="") as arquivo:
+                escritor = csv.DictWriter(arquivo, fieldnames=list(resultados[0]))
+                escritor.writeheader()
+                escritor.writerows(resultados)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
@@ -0,0 +1,37 @@
+# Configuração dos testes do Gerenciador de Tarefas.
+# Os módulos da aplicação importam uns aos outros pelo nome, a partir do
+# diretório do projeto, que é acrescentado ao caminho de importação. Os testes
+# usam o armazenamento SQLite em memória, sem servidor MongoDB.
+
+# Importa o os e o sys, usados para acrescentar o diretório do projeto.
+import os
+import sys
+
+# Importa o pytest, que fornece as fixtures.
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importa o armazenamento SQLite e o diário offline.
+from armazenamento_sqlite import ArmazenamentoSQLite  # noqa: E402
+from diario_offline import DiarioOffline  # noqa: E402
+
+
+# Define a fixture 'armazenamento', um banco SQLite em memória por teste.
+@pytest.fixture
+def armazenamento():
+    armazenamento = ArmazenamentoSQLite(":memory:")
+    yield armazenamento
+    armazenamento.fechar()
+
+
+# Define a fixture 'tarefas', a coleção de tarefas do armazenamento.
+@pytest.fixture
+def tarefas(armazenamento):
+    return armazenamento.colecao("tarefas")
+
+
+# Define a fixture 'diario', um diário offline em memória por teste.
+@pytest.fixture
+def diario():
+    return DiarioOffline(":memory:")
@@ -0,0 +1,142 @@
+# Testes da emulação da API do pymongo sobre o SQLite: tradução dos filtros,
+# operadores de atualização, upserts e lotes.
+
+# Importa as classes de data.
+from datetime import datetime
+
+# Importa o pytest.
+import pytest
+
+# Importa as operações em lote e os erros do pymongo.
+from pymongo import InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+
+# Define a função 'titulos', que retorna os títulos encontrados por um filtro, em ordem.
+def titulos(colecao, filtro):
+    return sorted(tarefa["titulo"] for tarefa in colecao.find(filtro))
+
+
+# Define a fixture 'amostra', uma coleção de tarefas com três documentos.
+@pytest.fixture
+def amostra(tarefas):
+    tarefas.insert_many([
+        {"titulo": "a", "status": "Pendente", "prioridade": 1, "tags": ["rede", "urgente"],
+         "atualizado_em": datetime(2024, 1, 1)},
+        {"titulo": "b", "status": "Concluída", "prioridade": 2, "tags": ["rede"], "pai_id": None,
+         "atualizado_em": datetime(2024, 2, 1)},
+        {"titulo": "c", "status": "Pendente", "prioridade": 3, "pai_id": ObjectId(),
+         "atualizado_em": datetime(2024, 3, 1)},
+    ])
+    return tarefas
+
+
+# Verifica a igualdade e os operadores de comparação, inclusive com datas.
+def test_filtros_de_igualdade_e_comparacao(amostra):
+    assert titulos(amostra, {"status": "Pendente"}) == ["a", "c"]
+    assert titulos(amostra, {"status": {"$ne": "Pendente"}}) == ["b"]
+    assert titulos(amostra, {"prioridade": {"$gte": 2, "$lt": 3}}) == ["b"]
+    assert titulos(amostra, {"atualizado_em": {"$gt": datetime(2024, 1, 15)}}) == ["b", "c"]
+
+
+# Verifica que None encontra campos nulos e ausentes, como no MongoDB.
+def test_filtro_nulo_encontra_campo_ausente(amostra):
+    assert titulos(amostra, {"pai_id": None}) == ["a", "b"]
+    assert titulos(amostra, {"pai_id": {"$ne": None}}) == ["c"]
+    assert titulos(amostra, {"pai_id": {"$exists": True}}) == ["b", "c"]
+    assert titulos(amostra, {"pai_id": {"$exists": False}}) == ["a"]
+
+
+# Verifica '$in' e '$nin', inclusive com listas vazias e com None.
+def test_filtros_in_e_nin(amostra):
+    assert titulos(amostra, {"prioridade": {"$in": [1, 3]}}) == ["a", "c"]
+    assert titulos(amostra, {"prioridade": {"$nin": [1, 3]}}) == ["b"]
+    assert titulos(amostra, {"prioridade": {"$in": []}}) == []
+    assert titulos(amostra, {"pai_id": {"$in": [None]}}) == ["a", "b"]
+
+
+# Verifica '$or', '$and' e '$nor'.
+def test_filtros_logicos(amostra):
+    assert titulos(amostra, {"$or": [{"prioridade": 1}, {"status": "Concluída"}]}) == ["a", "b"]
+    assert titulos(amostra, {"$and": [{"status": "Pendente"}, {"pai_id": None}]}) == ["a"]
+    assert titulos(amostra, {"$nor": [{"prioridade": 1}]}) == ["b", "c"]
+
+
+# Verifica '$regex' com a opção 'i'.
+def test_filtro_regex_sem_diferenciar_maiusculas(amostra):
+    assert titulos(amostra, {"status": {"$regex": "^conc", "$options": "i"}}) == ["b"]
+
+
+# Verifica os filtros sobre campos lista, traduzidos pela tabela de valores.
+def test_filtros_de_campo_lista(amostra):
+    assert titulos(amostra, {"tags": "rede"}) == ["a", "b"]
+    assert titulos(amostra, {"tags": {"$all": ["rede", "urgente"]}}) == ["a"]
+    assert titulos(amostra, {"tags": {"$in": ["urgente", "outra"]}}) == ["a"]
+    assert titulos(amostra, {"tags": {"$ne": "rede"}}) == ["c"]
+
+
+# Verifica que '$text' sem índice textual é recusado, como no MongoDB.
+def test_busca_textual_exige_indice(amostra):
+    with pytest.raises(OperationFailure):
+        list(amostra.find({"$text": {"$search": "a"}}))
+
+
+# Verifica a ordenação, o deslocamento, o limite e a projeção do cursor.
+def test_ordenacao_limite_e_projecao(amostra):
+    resultado = list(amostra.find({}, {"titulo": 1}).sort("prioridade", -1).skip(1).limit(1))
+    assert resultado == [{"_id": resultado[0]["_id"], "titulo": "b"}]
+
+
+# Verifica os operadores de atualização.
+def test_operadores_de_atualizacao(tarefas):
+    tarefa_id = tarefas.insert_one({"titulo": "a", "contador": 1, "tags": ["x"], "remover": 1}).inserted_id
+    tarefas.update_one({"_id": tarefa_id}, {"$inc": {"contador": 2}, "$addToSet": {"tags": "x"},
+                                            "$push": {"historico": "criada"}, "$unset": {"remover": ""}})
+    tarefas.update_one({"_id": tarefa_id}, {"$addToSet": {"tags": {"$each": ["y", "z"]}}})
+    tarefas.update_one({"_id": tarefa_id}, {"$pull": {"tags": {"$in": ["z"]}}})
+    tarefa = tarefas.find_one({"_id": tarefa_id})
+    assert tarefa["contador"] == 3
+    assert tarefa["tags"] == ["x", "y"]
+    assert tarefa["historico"] == ["criada"]
+    assert "remover" not in tarefa
+
+
+# Verifica que '$setOnInsert' só é aplicado quando o upsert insere o documento.
+def test_upsert_com_set_on_insert(tarefas):
+    filtro = {"modelo_id": "m", "periodo": "2024-01-01"}
+    resultado = tarefas.update_one(filtro, {"$setOnInsert": {"titulo": "nova"}, "$set": {"visto": 1}}, upsert=True)
+    assert resultado.upserted_id is not None
+    tarefa = tarefas.find_one(filtro)
+    assert (tarefa["modelo_id"], tarefa["periodo"], tarefa["titulo"], tarefa["visto"]) == \
+        ("m", "2024-01-01", "nova", 1)
+
+    # Em um documento existente, '$setOnInsert' não altera nada.
+    resultado = tarefas.update_one(filtro, {"$setOnInsert": {"titulo": "outra"}, "$set": {"visto": 2}}, upsert=True)
+    assert resultado.upserted_id is None and resultado.matched_count == 1
+    tarefa = tarefas.find_one(filtro)
+    assert (tarefa["titulo"], tarefa["visto"]) == ("nova", 2)
+    assert tarefas.count_documents({}) == 1
+
+
+# Verifica que um lote ordenado para na chave duplicada e informa as contagens.
+def test_lote_ordenado_para_na_chave_duplicada(tarefas):
+    existente = tarefas.insert_one({"titulo": "a"}).inserted_id
+    requisicoes = [UpdateOne({"_id": existente}, {"$set": {"titulo": "b"}}), InsertOne({"_id": existente}),
+                   DeleteOne({"_id": existente})]
+    with pytest.raises(BulkWriteError) as erro:
+        tarefas.bulk_write(requisicoes, ordered=True)
+    detalhes = erro.value.details
+    assert detalhes["nMatched"] == 1 and detalhes["nRemoved"] == 0
+    assert [falha["index"] for falha in detalhes["writeErrors"]] == [1]
+    assert tarefas.find_one({"_id": existente})["titulo"] == "b"
+
+
+# Verifica o índice único.
+def test_indice_unico(tarefas):
+    tarefas.create_index([("titulo", 1)], unique=True)
+    tarefas.insert_one({"titulo": "a"})
+    with pytest.raises(DuplicateKeyError):
+        tarefas.insert_one({"titulo": "a"})
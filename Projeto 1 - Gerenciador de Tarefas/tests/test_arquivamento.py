@@ -0,0 +1,94 @@
+# Testes do arquivamento das tarefas concluídas: seleção pela idade e
+# alterações ou exclusões feitas por outras estações durante o arquivamento.
+
+# Importa a classe datetime.
+from datetime import datetime
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa as funções testadas.
+from arquivamento import COLECAO_ARQUIVO, arquivar_concluidas
+from exclusao import concluir_exclusao
+from instantaneo import COLECAO_EXCLUSOES, registrar_exclusoes
+from utilitarios import agora_utc
+
+# Versão das tarefas antigas.
+ANTIGA = datetime(2020, 1, 1)
+
+
+# Define a função 'interceptar_exclusao', que executa 'antes' logo antes da
+# exclusão em lote, como outra estação faria entre a leitura e a exclusão.
+def interceptar_exclusao(monkeypatch, tarefas, antes):
+    original = tarefas.bulk_write
+
+    def bulk_write(requisicoes, **opcoes):
+        antes()
+        return original(requisicoes, **opcoes)
+
+    monkeypatch.setattr(tarefas, "bulk_write", bulk_write)
+
+
+# Verifica que apenas as tarefas concluídas mais antigas que a idade são
+# arquivadas, inclusive as sem versão, pelo instante de criação do '_id'.
+def test_seleciona_pela_idade(armazenamento, tarefas):
+    recente_sem_versao = tarefas.insert_one({"titulo": "a", "status": "Concluída"}).inserted_id
+    antiga_sem_versao = tarefas.insert_one({"_id": ObjectId.from_datetime(datetime(2020, 1, 1)), "titulo": "b",
+                                            "status": "Concluída"}).inserted_id
+    tarefas.insert_many([{"titulo": "c", "status": "Concluída", "atualizado_em": ANTIGA},
+                         {"titulo": "d", "status": "Pendente", "atualizado_em": ANTIGA},
+                         {"titulo": "e", "status": "Concluída", "atualizado_em": agora_utc()}])
+
+    assert arquivar_concluidas(armazenamento, idade_dias=30) == 2
+
+    assert sorted(tarefa["titulo"] for tarefa in armazenamento.colecao(COLECAO_ARQUIVO).find({})) == ["b", "c"]
+    assert tarefas.find_one({"_id": recente_sem_versao}) is not None
+    assert tarefas.find_one({"_id": antiga_sem_versao}) is None
+
+
+# Verifica que uma tarefa alterada ou excluída por outra estação durante o
+# arquivamento não fica no arquivo.
+def test_alteracao_e_exclusao_durante_o_arquivamento(armazenamento, tarefas, monkeypatch):
+    movida, alterada, excluida = tarefas.insert_many(
+        [{"titulo": titulo, "status": "Concluída", "atualizado_em": ANTIGA} for titulo in "abc"]).inserted_ids
+
+    def outra_estacao():
+        tarefas.update_one({"_id": alterada}, {"$set": {"status": "Pendente", "atualizado_em": agora_utc()}})
+        tarefas.delete_one({"_id": excluida})
+        registrar_exclusoes(armazenamento, [excluida])
+
+    interceptar_exclusao(monkeypatch, tarefas, outra_estacao)
+
+    assert arquivar_concluidas(armazenamento, idade_dias=30) == 1
+
+    assert [tarefa["_id"] for tarefa in armazenamento.colecao(COLECAO_ARQUIVO).find({})] == [movida]
+    assert [tarefa["_id"] for tarefa in tarefas.find({})] == [alterada]
+    exclusoes = {registro["_id"]: registro["arquivada"] for registro in armazenamento.colecao(COLECAO_EXCLUSOES).find({})}
+    assert exclusoes == {movida: True, excluida: False}
+
+
+# Verifica que uma tarefa arquivada por outra estação ao mesmo tempo continua no arquivo.
+def test_arquivamento_simultaneo(armazenamento, tarefas, monkeypatch):
+    tarefa_id = tarefas.insert_one({"titulo": "a", "status": "Concluída", "atualizado_em": ANTIGA}).inserted_id
+
+    def outra_estacao():
+        tarefas.delete_one({"_id": tarefa_id})
+        registrar_exclusoes(armazenamento, [tarefa_id], arquivadas=True)
+
+    interceptar_exclusao(monkeypatch, tarefas, outra_estacao)
+
+    assert arquivar_concluidas(armazenamento, idade_dias=30) == 0
+    assert armazenamento.colecao(COLECAO_ARQUIVO).count_documents({"_id": tarefa_id}) == 1
+
+
+# Verifica que uma exclusão registrada depois do arquivamento remove a cópia arquivada.
+def test_exclusao_registrada_depois_do_arquivamento(armazenamento, tarefas, monkeypatch):
+    tarefa_id = tarefas.insert_one({"titulo": "a", "status": "Concluída", "atualizado_em": ANTIGA}).inserted_id
+    interceptar_exclusao(monkeypatch, tarefas, lambda: tarefas.delete_one({"_id": tarefa_id}))
+    arquivar_concluidas(armazenamento, idade_dias=30)
+    assert armazenamento.colecao(COLECAO_ARQUIVO).count_documents({}) == 1
+
+    concluir_exclusao(armazenamento, armazenamento.anexos(4), [str(tarefa_id)])
+
+    assert armazenamento.colecao(COLECAO_ARQUIVO).count_documents({}) == 0
+    assert armazenamento.colecao(COLECAO_EXCLUSOES).find_one({"_id": tarefa_id})["arquivada"] is False
@@ -0,0 +1,142 @@
+# Testes da reprodução do diário offline: aplicação das operações, detecção
+# de conflitos, envios interrompidos e revisão dos conflitos.
+
+# Importa as classes de data.
+from datetime import datetime
+
+# Importa as operações em lote do pymongo.
+from pymongo import InsertOne, UpdateOne
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa as constantes e a classe de operação do diário offline.
+from diario_offline import OPERACAO_INSERIR, OPERACAO_ATUALIZAR, OPERACAO_EXCLUIR, OperacaoDiario
+
+# Versões fixas, distintas do carimbo atribuído pela reprodução.
+V1 = datetime(2024, 1, 1, 8, 0)
+V2 = datetime(2024, 1, 1, 9, 0)
+V3 = datetime(2024, 1, 1, 10, 0)
+
+
+# Define a função 'inserir', que grava uma tarefa com a versão informada.
+def inserir(tarefas, versao=V1, **campos):
+    return str(tarefas.insert_one(dict({"titulo": "tarefa", "atualizado_em": versao}, **campos)).inserted_id)
+
+
+# Verifica a reprodução de uma inclusão, uma alteração e uma exclusão.
+def test_reproduz_operacoes(diario, tarefas):
+    alterada = inserir(tarefas, titulo="alterada")
+    excluida = inserir(tarefas, titulo="excluida", data_criacao="05/03/2021")
+    nova = str(ObjectId())
+    diario.registrar(OPERACAO_INSERIR, nova, {"titulo": "nova"}, versao_nova=V2)
+    diario.registrar(OPERACAO_ATUALIZAR, alterada, {"status": "Concluída"}, V1, V2)
+    diario.registrar(OPERACAO_EXCLUIR, excluida, versao_base=V1)
+
+    chamadas = []
+    aplicadas, conflitos = diario.reproduzir(tarefas, ao_excluir=lambda ids, datas: chamadas.append((ids, datas)))
+
+    assert (aplicadas, conflitos) == (3, [])
+    assert tarefas.find_one({"_id": ObjectId(nova)})["titulo"] == "nova"
+    assert tarefas.find_one({"_id": ObjectId(alterada)})["status"] == "Concluída"
+    assert tarefas.find_one({"_id": ObjectId(excluida)}) is None
+    assert chamadas == [([excluida], {excluida: "05/03/2021"})]
+    assert diario.quantidade_pendente() == 0
+
+
+# Verifica que edições encadeadas feitas offline são aplicadas em ordem.
+def test_edicoes_encadeadas(diario, tarefas):
+    tarefa_id = inserir(tarefas)
+    diario.registrar(OPERACAO_ATUALIZAR, tarefa_id, {"titulo": "b"}, V1, V2)
+    diario.registrar(OPERACAO_ATUALIZAR, tarefa_id, {"status": "Concluída"}, V2, V3)
+
+    assert diario.reproduzir(tarefas, tamanho_lote=1) == (2, [])
+    tarefa = tarefas.find_one({"_id": ObjectId(tarefa_id)})
+    assert (tarefa["titulo"], tarefa["status"]) == ("b", "Concluída")
+
+
+# Verifica os conflitos com tarefas alteradas ou excluídas em outra estação.
+def test_conflitos_de_versao(diario, tarefas):
+    alterada = inserir(tarefas, versao=V3)
+    excluida = str(ObjectId())
+    diario.registrar(OPERACAO_ATUALIZAR, alterada, {"titulo": "local"}, V1, V2)
+    diario.registrar(OPERACAO_ATUALIZAR, excluida, {"titulo": "local"}, V1, V2)
+
+    aplicadas, conflitos = diario.reproduzir(tarefas)
+
+    assert aplicadas == 0
+    assert [(operacao.tarefa_id, motivo) for operacao, motivo in conflitos] == [
+        (alterada, "A tarefa foi alterada em outra estação."),
+        (excluida, "A tarefa foi excluída em outra estação.")]
+    assert tarefas.find_one({"_id": ObjectId(alterada)})["titulo"] == "tarefa"
+    assert diario.quantidade_pendente() == 0
+    assert len(diario.conflitos()) == 2
+
+
+# Verifica que uma operação cujo envio foi interrompido depois da gravação não é reenviada.
+def test_envio_interrompido(diario, tarefas):
+    tarefa_id = inserir(tarefas, versao=V3, titulo="enviado")
+    diario.registrar(OPERACAO_ATUALIZAR, tarefa_id, {"titulo": "enviado"}, V1, V2)
+    diario._marcar_envio(diario.pendentes(), V3)
+
+    assert diario.reproduzir(tarefas) == (1, [])
+    assert tarefas.find_one({"_id": ObjectId(tarefa_id)})["atualizado_em"] == V3
+
+
+# Verifica que a exclusão de uma tarefa que já não existe é aplicada e
+# entregue a 'ao_excluir' com a data de criação registrada no diário.
+def test_exclusao_de_tarefa_inexistente(diario, tarefas):
+    tarefa_id = str(ObjectId())
+    diario.registrar(OPERACAO_EXCLUIR, tarefa_id, {"data_criacao": "10/07/2019"}, V1)
+    diario._marcar_envio(diario.pendentes(), V2)
+
+    chamadas = []
+    aplicadas, conflitos = diario.reproduzir(tarefas, ao_excluir=lambda ids, datas: chamadas.append((ids, datas)))
+
+    assert (aplicadas, conflitos) == (1, [])
+    assert chamadas == [([tarefa_id], {tarefa_id: "10/07/2019"})]
+
+
+# Verifica que, quando uma inclusão duplicada interrompe o lote, as
+# alterações anteriores que não encontraram a versão esperada viram conflito.
+def test_lote_com_inclusao_duplicada_confere_as_anteriores(diario, tarefas):
+    alterada = inserir(tarefas, versao=V3)
+    duplicada = inserir(tarefas)
+    planejadas = [OperacaoDiario(1, OPERACAO_ATUALIZAR, alterada, {"titulo": "local"}, V1, V2, None),
+                  OperacaoDiario(2, OPERACAO_INSERIR, duplicada, {"titulo": "tarefa"}, None, V2, None)]
+    requisicoes = [UpdateOne({"_id": ObjectId(alterada), "atualizado_em": V1}, {"$set": {"titulo": "local"}}),
+                   InsertOne({"_id": ObjectId(duplicada), "titulo": "tarefa"})]
+    conflitos = []
+
+    aplicadas = diario._executar_lote(tarefas, requisicoes, planejadas, conflitos, V2)
+
+    assert [operacao.sequencia for operacao in aplicadas] == [2]
+    assert [(operacao.sequencia, motivo) for operacao, motivo in conflitos] == [
+        (1, "A tarefa foi alterada em outra estação.")]
+
+
+# Verifica que reaplicar um conflito o envia sobre a versão atual da tarefa.
+def test_reaplicar_conflito(diario, tarefas):
+    tarefa_id = inserir(tarefas, versao=V3)
+    diario.registrar(OPERACAO_ATUALIZAR, tarefa_id, {"titulo": "local"}, V1, V2)
+    diario.reproduzir(tarefas)
+    sequencia = diario.conflitos()[0][0].sequencia
+
+    assert diario.reaplicar(tarefas, [sequencia]) == []
+    assert diario.conflitos() == []
+    assert diario.reproduzir(tarefas) == (1, [])
+    assert tarefas.find_one({"_id": ObjectId(tarefa_id)})["titulo"] == "local"
+
+
+# Verifica que conflitos sobre tarefas excluídas não são reaplicados e
+# que descartar remove as operações do diário.
+def test_reaplicar_tarefa_excluida_e_descartar(diario, tarefas):
+    tarefa_id = str(ObjectId())
+    diario.registrar(OPERACAO_ATUALIZAR, tarefa_id, {"titulo": "local"}, V1, V2)
+    diario.reproduzir(tarefas)
+    sequencia = diario.conflitos()[0][0].sequencia
+
+    assert [operacao.sequencia for operacao in diario.reaplicar(tarefas, [sequencia])] == [sequencia]
+    assert diario.quantidade_pendente() == 0
+    diario.descartar([sequencia])
+    assert diario.conflitos() == []
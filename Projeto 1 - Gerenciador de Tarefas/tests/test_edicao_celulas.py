@@ -0,0 +1,87 @@
+# Testes da edição de células: acúmulo das edições e gravação condicionada
+# à versão da tarefa editada.
+
+# Importa as classes de data.
+from datetime import datetime, timedelta
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa as classes e funções da edição de células.
+from edicao_celulas import AlteracoesCelulas, gravar_alteracoes
+
+# Versão das tarefas gravadas pelos testes.
+VERSAO = datetime(2024, 1, 1, 8, 0)
+
+
+# Define a função 'inserir', que grava uma tarefa e retorna o seu documento.
+def inserir(tarefas, **campos):
+    documento = dict({"titulo": "tarefa", "status": "Pendente", "atualizado_em": VERSAO}, **campos)
+    documento["_id"] = tarefas.insert_one(documento).inserted_id
+    return documento
+
+
+# Verifica que as edições são acumuladas e que voltar ao valor original descarta a edição.
+def test_acumula_edicoes(tarefas):
+    documento = inserir(tarefas)
+    tarefa_id = str(documento["_id"])
+    alteracoes = AlteracoesCelulas()
+
+    assert alteracoes.registrar(tarefa_id, {"titulo": "b"}, documento)
+    assert alteracoes.registrar(tarefa_id, {"status": "Concluída"}, documento)
+    assert alteracoes.campos(tarefa_id) == {"titulo": "b", "status": "Concluída"}
+    assert alteracoes.registrar(tarefa_id, {"titulo": "tarefa"}, documento)
+    assert not alteracoes.registrar(tarefa_id, {"status": "Pendente"}, documento)
+    assert len(alteracoes) == 0
+
+
+# Verifica a gravação das alterações sobre a versão editada.
+def test_grava_alteracoes(tarefas):
+    documento = inserir(tarefas)
+    tarefa_id = str(documento["_id"])
+    alteracoes = AlteracoesCelulas()
+    alteracoes.registrar(tarefa_id, {"titulo": "b"}, documento)
+
+    lote = alteracoes.retirar_lote()
+    assert gravar_alteracoes(tarefas, lote) == []
+    tarefa = tarefas.find_one({"_id": documento["_id"]})
+    assert (tarefa["titulo"], tarefa["atualizado_em"]) == ("b", lote[0][1]["atualizado_em"])
+
+
+# Verifica que alterações de tarefas alteradas ou excluídas em outra
+# estação, ou que violam um índice único, são rejeitadas com o motivo.
+def test_rejeita_conflitos_e_erros(tarefas):
+    tarefas.create_index([("titulo", 1)], unique=True)
+    gravada = inserir(tarefas, titulo="gravada")
+    alterada = inserir(tarefas, titulo="alterada", atualizado_em=VERSAO + timedelta(hours=1))
+    duplicada = inserir(tarefas, titulo="duplicada")
+    excluida = str(ObjectId())
+    nova = VERSAO + timedelta(hours=2)
+    lote = [(str(gravada["_id"]), {"status": "Concluída", "atualizado_em": nova}, VERSAO),
+            (str(alterada["_id"]), {"status": "Concluída", "atualizado_em": nova}, VERSAO),
+            (str(duplicada["_id"]), {"titulo": "gravada", "atualizado_em": nova}, VERSAO),
+            (excluida, {"status": "Concluída", "atualizado_em": nova}, VERSAO)]
+
+    rejeitadas = dict(gravar_alteracoes(tarefas, lote))
+
+    assert set(rejeitadas) == {str(alterada["_id"]), str(duplicada["_id"]), excluida}
+    assert rejeitadas[str(alterada["_id"])] == "A tarefa foi alterada em outra estação."
+    assert rejeitadas[excluida] == "A tarefa foi excluída em outra estação."
+    assert tarefas.find_one({"_id": gravada["_id"]})["status"] == "Concluída"
+    assert tarefas.find_one({"_id": alterada["_id"]})["status"] == "Pendente"
+
+
+# Verifica que uma edição feita durante a gravação parte da versão que a
+# gravação atribui, e volta à versão anterior se a gravação for rejeitada.
+def test_edicao_durante_a_gravacao(tarefas):
+    documento = inserir(tarefas)
+    tarefa_id = str(documento["_id"])
+    alteracoes = AlteracoesCelulas()
+    alteracoes.registrar(tarefa_id, {"titulo": "b"}, documento)
+    lote = alteracoes.retirar_lote()
+
+    alteracoes.registrar(tarefa_id, {"status": "Concluída"}, documento)
+    assert alteracoes.versoes[tarefa_id] == lote[0][1]["atualizado_em"]
+
+    alteracoes.concluir_lote(rejeitadas={tarefa_id})
+    assert alteracoes.versoes[tarefa_id] == VERSAO
@@ -0,0 +1,83 @@
+# Testes da exclusão e do arquivamento de tarefas: registros de exclusão,
+# subtarefas liberadas, anexos removidos e meses recalculados do resumo.
+
+# Importa as classes de data.
+from datetime import datetime, timedelta
+
+# Importa a classe BytesIO, usada como arquivo dos anexos.
+from io import BytesIO
+
+# Importa a classe ObjectId do módulo bson.
+from bson.objectid import ObjectId
+
+# Importa as funções testadas.
+from exclusao import excluir_tarefas
+from arquivamento import COLECAO_ARQUIVO, arquivar_concluidas
+from instantaneo import COLECAO_EXCLUSOES, registrar_exclusoes
+from resumo_mensal import meses_alterados
+from hierarquia import FILTRO_RAIZES
+from utilitarios import agora_utc
+
+# Versão das tarefas gravadas pelos testes.
+VERSAO = datetime(2024, 1, 1, 8, 0)
+
+
+# Define a função 'anexar', que grava um anexo pequeno para a tarefa.
+def anexar(anexos, tarefa_id):
+    return anexos.enviar(BytesIO(b"conteudo"), "foto.png", "image/png", tarefa_id)
+
+
+# Verifica que a exclusão registra a exclusão, libera as subtarefas e remove os anexos.
+def test_excluir_tarefas_conclui_a_exclusao(armazenamento, tarefas):
+    anexos = armazenamento.anexos(4)
+    pai = tarefas.insert_one({"titulo": "pai", "data_criacao": "05/03/2021", "atualizado_em": VERSAO}).inserted_id
+    filha = tarefas.insert_one({"titulo": "filha", "pai_id": pai, "atualizado_em": VERSAO}).inserted_id
+    anexo_pai = anexar(anexos, pai)
+    anexo_filha = anexar(anexos, filha)
+
+    assert excluir_tarefas(armazenamento, anexos, [{"_id": pai, "atualizado_em": VERSAO}]) == [pai]
+
+    assert [tarefa["_id"] for tarefa in tarefas.find(FILTRO_RAIZES)] == [filha]
+    assert [anexo["_id"] for anexo in anexos.listar([anexo_pai, anexo_filha])] == [anexo_filha]
+    registro = armazenamento.colecao(COLECAO_EXCLUSOES).find_one({"_id": pai})
+    assert registro["data_criacao"] == "05/03/2021"
+
+
+# Verifica que uma tarefa com outra versão, ou inexistente, não é excluída.
+def test_excluir_tarefas_respeita_a_versao(armazenamento, tarefas):
+    anexos = armazenamento.anexos(4)
+    tarefa_id = tarefas.insert_one({"titulo": "a", "atualizado_em": VERSAO}).inserted_id
+    anexo_id = anexar(anexos, tarefa_id)
+
+    filtros = [{"_id": tarefa_id, "atualizado_em": VERSAO + timedelta(hours=1)}, {"_id": ObjectId()}]
+    assert excluir_tarefas(armazenamento, anexos, filtros) == []
+
+    assert tarefas.count_documents({}) == 1
+    assert len(anexos.listar([anexo_id])) == 1
+    assert armazenamento.colecao(COLECAO_EXCLUSOES).count_documents({}) == 0
+
+
+# Verifica que o arquivamento de uma tarefa pai mantém as subtarefas na lista principal.
+def test_arquivamento_libera_subtarefas(armazenamento, tarefas):
+    antiga = datetime(2020, 1, 1)
+    pai = tarefas.insert_one({"titulo": "pai", "status": "Concluída", "data_criacao": "02/01/2020",
+                              "atualizado_em": antiga}).inserted_id
+    filha = tarefas.insert_one({"titulo": "filha", "status": "Pendente", "pai_id": pai,
+                                "atualizado_em": antiga}).inserted_id
+
+    assert arquivar_concluidas(armazenamento, idade_dias=30) == 1
+
+    assert armazenamento.colecao(COLECAO_ARQUIVO).find_one({"_id": pai})["titulo"] == "pai"
+    assert [tarefa["_id"] for tarefa in tarefas.find(FILTRO_RAIZES)] == [filha]
+    assert armazenamento.colecao(COLECAO_EXCLUSOES).find_one({"_id": pai})["data_criacao"] == "02/01/2020"
+
+
+# Verifica que o mês de uma tarefa excluída vem da data de criação do
+# registro de exclusão ou, sem ela, do instante de criação do '_id'.
+def test_meses_alterados_das_exclusoes(armazenamento):
+    desde = agora_utc() - timedelta(hours=1)
+    com_data = ObjectId()
+    sem_data = ObjectId.from_datetime(datetime(2019, 7, 15, 12, 0))
+    registrar_exclusoes(armazenamento, [com_data, sem_data], {com_data: "31/01/2018"})
+
+    assert meses_alterados(armazenamento, desde) == {"2018-01", "2019-07"}
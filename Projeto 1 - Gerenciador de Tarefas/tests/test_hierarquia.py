@@ -0,0 +1,63 @@
+# Testes dos vínculos entre tarefas: validação, gravação e ciclos fechados
+# por outra estação durante a gravação.
+
+# Importa o pytest.
+import pytest
+
+# Importa as funções testadas.
+from hierarquia import CAMPO_DEPENDENCIAS, CAMPO_PAI, vincular
+
+
+# Define a função 'interceptar_validacao', que executa 'depois' ao final da
+# primeira validação, como outra estação faria entre a validação e a gravação.
+def interceptar_validacao(monkeypatch, armazenamento, depois):
+    original = armazenamento.seguir_vinculos
+    chamadas = []
+
+    def seguir_vinculos(tarefa_id, campo, **opcoes):
+        alcancadas = original(tarefa_id, campo, **opcoes)
+        if not chamadas:
+            depois()
+        chamadas.append(tarefa_id)
+        return alcancadas
+
+    monkeypatch.setattr(armazenamento, "seguir_vinculos", seguir_vinculos)
+
+
+# Verifica a gravação dos vínculos e a recusa de um ciclo.
+def test_vincula_e_recusa_ciclos(armazenamento, tarefas):
+    a, b, c = tarefas.insert_many([{"titulo": titulo} for titulo in "abc"]).inserted_ids
+
+    vincular(armazenamento, b, a, CAMPO_PAI)
+    vincular(armazenamento, c, b, CAMPO_PAI)
+    vincular(armazenamento, a, b, CAMPO_DEPENDENCIAS)
+    vincular(armazenamento, a, b, CAMPO_DEPENDENCIAS)
+
+    with pytest.raises(ValueError):
+        vincular(armazenamento, a, c, CAMPO_PAI)
+    with pytest.raises(ValueError):
+        vincular(armazenamento, b, a, CAMPO_DEPENDENCIAS)
+    assert tarefas.find_one({"_id": a}).get(CAMPO_PAI) is None
+    assert tarefas.find_one({"_id": a})[CAMPO_DEPENDENCIAS] == [b]
+
+
+# Verifica que um ciclo fechado por outra estação durante a gravação desfaz
+# o vínculo e restaura o pai anterior.
+@pytest.mark.parametrize("campo", [CAMPO_PAI, CAMPO_DEPENDENCIAS])
+def test_ciclo_fechado_por_outra_estacao(armazenamento, tarefas, monkeypatch, campo):
+    anterior, a, b = tarefas.insert_many([{"titulo": titulo} for titulo in ("anterior", "a", "b")]).inserted_ids
+    if campo == CAMPO_PAI:
+        tarefas.update_one({"_id": a}, {"$set": {CAMPO_PAI: anterior}})
+        operacao = {"$set": {CAMPO_PAI: a}}
+    else:
+        operacao = {"$addToSet": {CAMPO_DEPENDENCIAS: a}}
+    interceptar_validacao(monkeypatch, armazenamento, lambda: tarefas.update_one({"_id": b}, operacao))
+
+    with pytest.raises(ValueError):
+        vincular(armazenamento, a, b, campo)
+
+    tarefa = tarefas.find_one({"_id": a})
+    if campo == CAMPO_PAI:
+        assert tarefa[CAMPO_PAI] == anterior
+    else:
+        assert tarefa[CAMPO_DEPENDENCIAS] == []
@@ -0,0 +1,77 @@
+# Testes das tarefas recorrentes: datas das ocorrências de cada regra e
+# criação das tarefas pelo 'bulk_write' de upserts.
+
+# Importa a classe de data.
+from datetime import date
+
+# Importa o pytest.
+import pytest
+
+# Importa as funções e constantes das tarefas recorrentes.
+from recorrencia import (COLECAO_MODELOS, REGRA_DIARIA, REGRA_SEMANAL, REGRA_MENSAL, novo_modelo, ocorrencias,
+                         materializar_recorrentes)
+
+
+# Verifica a regra diária, inclusive na virada do ano.
+def test_ocorrencias_diarias():
+    modelo = novo_modelo("a", "", None, REGRA_DIARIA, None, date(2024, 12, 30))
+    assert ocorrencias(modelo, date(2024, 12, 30), date(2025, 1, 2)) == [
+        date(2024, 12, 30), date(2024, 12, 31), date(2025, 1, 1), date(2025, 1, 2)]
+
+
+# Verifica a regra semanal, a partir de um dia anterior e do próprio dia da semana.
+def test_ocorrencias_semanais():
+    modelo = novo_modelo("a", "", None, REGRA_SEMANAL, 2, date(2024, 1, 1))
+    assert ocorrencias(modelo, date(2024, 1, 1), date(2024, 1, 24)) == [
+        date(2024, 1, 3), date(2024, 1, 10), date(2024, 1, 17), date(2024, 1, 24)]
+    assert ocorrencias(modelo, date(2024, 1, 3), date(2024, 1, 9)) == [date(2024, 1, 3)]
+    assert ocorrencias(modelo, date(2024, 1, 4), date(2024, 1, 9)) == []
+
+
+# Verifica que, na regra mensal, o dia 31 vira o último dia dos meses mais curtos.
+def test_ocorrencias_mensais_no_fim_do_mes():
+    modelo = novo_modelo("a", "", None, REGRA_MENSAL, 31, date(2023, 1, 1))
+    assert ocorrencias(modelo, date(2023, 1, 1), date(2023, 4, 30)) == [
+        date(2023, 1, 31), date(2023, 2, 28), date(2023, 3, 31), date(2023, 4, 30)]
+    assert ocorrencias(modelo, date(2024, 2, 1), date(2024, 2, 29)) == [date(2024, 2, 29)]
+
+
+# Verifica que o intervalo limita as ocorrências mensais nas duas pontas.
+def test_ocorrencias_mensais_no_intervalo():
+    modelo = novo_modelo("a", "", None, REGRA_MENSAL, 15, date(2024, 1, 1))
+    assert ocorrencias(modelo, date(2024, 1, 16), date(2024, 3, 14)) == [date(2024, 2, 15)]
+
+
+# Verifica a validação da regra e do dia.
+@pytest.mark.parametrize("regra, dia", [("anual", 1), (REGRA_SEMANAL, 7), (REGRA_MENSAL, 0), (REGRA_MENSAL, 32)])
+def test_modelo_invalido(regra, dia):
+    with pytest.raises(ValueError):
+        novo_modelo("a", "", None, regra, dia, date(2024, 1, 1))
+
+
+# Verifica que a materialização cria cada ocorrência uma única vez e não
+# recria ocorrências excluídas.
+def test_materializar_recorrentes(armazenamento, tarefas):
+    modelo = novo_modelo("Backup", "Conferir o backup", None, REGRA_DIARIA, None, date(2024, 1, 1))
+    armazenamento.colecao(COLECAO_MODELOS).insert_one(modelo)
+
+    assert materializar_recorrentes(armazenamento, hoje=date(2024, 1, 3)) == 3
+    assert sorted(tarefa["periodo"] for tarefa in tarefas.find({})) == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert tarefas.find_one({"periodo": "2024-01-02"})["data_criacao"] == "02/01/2024"
+
+    assert materializar_recorrentes(armazenamento, hoje=date(2024, 1, 3)) == 0
+    tarefas.delete_one({"periodo": "2024-01-03"})
+    assert materializar_recorrentes(armazenamento, hoje=date(2024, 1, 4)) == 1
+    assert sorted(tarefa["periodo"] for tarefa in tarefas.find({})) == ["2024-01-01", "2024-01-02", "2024-01-04"]
+
+
+# Verifica que uma execução interrompida antes de avançar 'gerado_ate' não duplica tarefas.
+def test_materializar_depois_de_interrupcao(armazenamento, tarefas):
+    modelo = novo_modelo("Backup", "", None, REGRA_DIARIA, None, date(2024, 1, 1))
+    modelos = armazenamento.colecao(COLECAO_MODELOS)
+    modelos.insert_one(modelo)
+    materializar_recorrentes(armazenamento, hoje=date(2024, 1, 2))
+    modelos.update_one({"_id": modelo["_id"]}, {"$set": {"gerado_ate": modelo["gerado_ate"]}})
+
+    assert materializar_recorrentes(armazenamento, hoje=date(2024, 1, 2)) == 0
+    assert tarefas.count_documents({}) == 2
@@ -0,0 +1,37 @@
+# Testes da leitura das tarefas dos relatórios: ordem por data de criação
+# no banco de dados e mescla das tarefas ativas e arquivadas.
+
+# Importa a classe datetime.
+from datetime import datetime
+
+# Importa as funções testadas.
+from arquivamento import COLECAO_ARQUIVO, mesclar_ordenado
+from modelo_tarefas import chave_data
+
+
+# Define a função 'datas', que retorna as datas de criação das tarefas, em ordem.
+def datas(tarefas):
+    return [tarefa.get("data_criacao") for tarefa in tarefas]
+
+
+# Verifica que as tarefas vêm ordenadas pela data, e não pelo texto DD/MM/AAAA.
+def test_ordena_pela_data_de_criacao(armazenamento, tarefas):
+    tarefas.insert_many([{"titulo": "a", "data_criacao": "20/03/2023"}, {"titulo": "b", "data_criacao": "02/02/2024"},
+                         {"titulo": "c", "data_criacao": datetime(2024, 1, 20, 15, 30)},
+                         {"titulo": "d", "data_criacao": "15/01/2024"}, {"titulo": "e"}])
+
+    assert datas(armazenamento.listar_tarefas_com_tecnico({}, ordenar_por_data=True)) == [
+        None, "20/03/2023", "15/01/2024", datetime(2024, 1, 20, 15, 30), "02/02/2024"]
+
+
+# Verifica a mescla das tarefas ativas e arquivadas, com datas em texto e como data.
+def test_mescla_tarefas_ativas_e_arquivadas(armazenamento, tarefas):
+    tarefas.insert_many([{"titulo": "a", "data_criacao": "15/01/2024"}, {"titulo": "b", "data_criacao": "02/02/2024"}])
+    armazenamento.colecao(COLECAO_ARQUIVO).insert_many([{"titulo": "c", "data_criacao": datetime(2023, 12, 1)},
+                                                        {"titulo": "d", "data_criacao": "20/01/2024"}])
+
+    fontes = [armazenamento.listar_tarefas_com_tecnico({}, ordenar_por_data=True),
+              armazenamento.listar_tarefas_com_tecnico({}, ordenar_por_data=True, colecao=COLECAO_ARQUIVO)]
+    mescladas = mesclar_ordenado(fontes, chave=lambda tarefa: (chave_data(tarefa.get("data_criacao")), tarefa["_id"]))
+
+    assert [tarefa["titulo"] for tarefa in mescladas] == ["c", "a", "d", "b"]
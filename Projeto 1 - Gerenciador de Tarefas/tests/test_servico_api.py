@@ -0,0 +1,121 @@
+# Testes do serviço HTTP sobre o armazenamento SQLite em memória: validação
+# das requisições, respostas de erro e exclusão de tarefas.
+
+# Importa o asyncio e o json.
+import asyncio
+import json
+
+# Importa a classe BytesIO, usada como arquivo dos anexos.
+from io import BytesIO
+
+# Importa o pytest.
+import pytest
+
+# Importa o carregamento da configuração e o serviço HTTP.
+from configuracao import carregar_configuracao
+from servico_api import ServicoApi, TAMANHO_MAXIMO_CORPO
+from hierarquia import FILTRO_RAIZES
+
+
+# Define a classe 'EscritorFalso', que guarda o que o serviço escreve na conexão.
+class EscritorFalso:
+
+    def __init__(self):
+        self.dados = b""
+        self.fechado = False
+
+    def write(self, dados):
+        self.dados += dados
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.fechado = True
+
+
+# Define a fixture 'servico', um serviço sobre o armazenamento em memória.
+@pytest.fixture
+def servico(armazenamento, tmp_path):
+    servico = ServicoApi(armazenamento, carregar_configuracao(str(tmp_path / "inexistente.ini")))
+    yield servico
+    servico.executor.shutdown(wait=True)
+
+
+# Define a função 'requisitar', que trata uma requisição e retorna o estado e o JSON da resposta.
+def requisitar(servico, metodo, alvo, dados=None, cabecalhos=None):
+    corpo = json.dumps(dados).encode("utf-8") if dados is not None else b""
+    estado, resposta, _ = asyncio.run(servico.tratar(metodo, alvo, cabecalhos or {}, corpo))
+    return estado, json.loads(resposta) if resposta else None
+
+
+# Define a função 'atender', que envia bytes crus à conexão e retorna a resposta escrita.
+def atender(servico, requisicao):
+
+    async def executar():
+        leitor = asyncio.StreamReader()
+        leitor.feed_data(requisicao)
+        leitor.feed_eof()
+        escritor = EscritorFalso()
+        await servico.atender(leitor, escritor)
+        return escritor
+
+    return asyncio.run(executar())
+
+
+# Verifica que corpos JSON válidos com tipos errados são recusados com 400 ou 422.
+@pytest.mark.parametrize("metodo, alvo, dados, estado", [
+    ("POST", "/tecnicos", [1], 400),
+    ("POST", "/tecnicos", {"nome": 5}, 422),
+    ("POST", "/tarefas", {"titulo": "a", "tecnico": ["x"]}, 422),
+    ("POST", "/tarefas", {"titulo": 1}, 422),
+    ("POST", "/tarefas", [], 400),
+])
+def test_recusa_tipos_invalidos(servico, metodo, alvo, dados, estado):
+    assert requisitar(servico, metodo, alvo, dados)[0] == estado
+
+
+# Verifica que uma tarefa inválida de um lote é rejeitada sem impedir as demais.
+def test_lote_com_tecnico_invalido(servico):
+    estado, resposta = requisitar(servico, "POST", "/tarefas/lote", [{"titulo": "a", "tecnico": {}}, {"titulo": "b"}])
+    assert estado == 207
+    resultados = resposta["resultados"]
+    assert "erro" in resultados[0] and "_id" in resultados[1]
+
+
+# Verifica que um erro inesperado é respondido com 500.
+def test_erro_inesperado(servico, monkeypatch):
+    def falhar():
+        raise RuntimeError("falha")
+
+    monkeypatch.setattr(servico.armazenamento, "contar_tarefas_por_tecnico", falhar)
+    assert requisitar(servico, "GET", "/tecnicos/contagens") == (500, {"erro": "Erro interno do serviço."})
+
+
+# Verifica as respostas a um 'Content-Length' inválido ou acima do tamanho máximo.
+@pytest.mark.parametrize("tamanho, estado", [("abc", 400), ("-1", 400), (str(TAMANHO_MAXIMO_CORPO + 1), 413)])
+def test_content_length_recusado(servico, tamanho, estado):
+    escritor = atender(servico, f"POST /tarefas HTTP/1.1\r\nContent-Length: {tamanho}\r\n\r\n".encode("latin-1"))
+    assert escritor.dados.startswith(f"HTTP/1.1 {estado} ".encode("latin-1"))
+    assert b"Connection: close" in escritor.dados
+    assert escritor.fechado
+
+
+# Verifica que a exclusão pelo serviço libera as subtarefas e remove os anexos.
+def test_exclusao_conclui_a_exclusao(servico, tarefas):
+    pai = tarefas.insert_one({"titulo": "pai"}).inserted_id
+    filha = tarefas.insert_one({"titulo": "filha", "pai_id": pai}).inserted_id
+    anexo_id = servico.anexos.enviar(BytesIO(b"conteudo"), "foto.png", "image/png", pai)
+
+    assert requisitar(servico, "DELETE", f"/tarefas/{pai}") == (204, None)
+
+    assert [tarefa["_id"] for tarefa in tarefas.find(FILTRO_RAIZES)] == [filha]
+    assert servico.anexos.listar([anexo_id]) == []
+
+
+# Verifica a exclusão em lote pelo serviço.
+def test_exclusao_em_lote(servico, tarefas):
+    ids = tarefas.insert_many([{"titulo": "a"}, {"titulo": "b"}]).inserted_ids
+    estado, resposta = requisitar(servico, "POST", "/tarefas/lote/excluir", {"ids": [str(ids[0])]})
+    assert (estado, resposta) == (200, {"excluidas": 1})
+    assert tarefas.count_documents({}) == 1
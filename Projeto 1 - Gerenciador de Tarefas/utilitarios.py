@@ -0,0 +1,19 @@
+# Módulo de funções utilitárias compartilhadas pelos módulos do
+# Gerenciador de Tarefas.
+
+# Importa as classes de data e fuso horário.
+from datetime import datetime, timezone
+
+
+# Define a função 'agora_utc', que retorna o instante atual em UTC.
+def agora_utc():
+
+    """
+    Esta função retorna o instante atual em UTC, sem fuso horário e com
+    precisão de milissegundos, que é a precisão com que o MongoDB armazena
+    datas. Assim, o valor lido do banco é igual ao valor gravado, o que
+    permite usá-lo como versão do documento.
+    """
+
+    agora = datetime.now(timezone.utc).replace(tzinfo=None)
+    return agora.replace(microsecond=agora.microsecond // 1000 * 1000)